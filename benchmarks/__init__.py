@@ -0,0 +1 @@
+""" Synthetic model generator and population benchmarks """
@@ -0,0 +1,245 @@
+""" generate.py – Write a synthetic system package of any size for benchmarking the populator """
+
+# System
+import random
+import argparse
+from pathlib import Path
+from typing import NamedTuple
+
+_domain = "Benchmark"
+_domain_alias = "BENCH"
+_subsystem = "Main"
+_subsystem_alias = "MAIN"
+_ee = "OUT"
+
+# Kinds of Scrall statements that may be generated
+statement_kinds = ('read', 'compute', 'write', 'traverse', 'select', 'signal')
+
+
+class ModelSpec(NamedTuple):
+    """
+    The knobs that size a generated model
+    """
+    classes: int = 10  # Ordinary classes, not counting those in the generalization
+    associations: int = 12  # Binary associations, at least classes - 1 so that every class is connected
+    gen_depth: int = 2  # Levels of subclassing below a root superclass, 0 for no generalization
+    lifecycles: int = 4  # Classes with a lifecycle state model
+    states: int = 4  # States per lifecycle
+    events: int = 4  # Events per lifecycle
+    methods: int = 2  # Methods per class
+    statements: int = 6  # Statements per activity
+    # Relative weight of each statement kind, any kind not listed is not generated
+    mix: dict[str, int] = {'read': 3, 'compute': 2, 'write': 2, 'traverse': 3, 'select': 1, 'signal': 1}
+    seed: int = 1
+
+    def scaled(self, factor: float) -> "ModelSpec":
+        """
+        Scale the number of classes, associations and lifecycles, keeping the size of each class and activity
+
+        Args:
+            factor: Multiplier
+
+        Returns:
+            The scaled spec
+        """
+        classes = max(2, round(self.classes * factor))
+        return self._replace(classes=classes, associations=max(classes - 1, round(self.associations * factor)),
+                             lifecycles=min(classes, round(self.lifecycles * factor)))
+
+
+class Association(NamedTuple):
+    rnum: str
+    one: str  # Class on the 1 side, referenced
+    many: str  # Class on the M side, referring
+
+
+class ModelGenerator:
+    """
+    Generate a valid system package with one modeled domain
+
+    Every class has an identifier, a Count and a Boolean attribute. Associations are one to many, connecting
+    all classes into a tree with any remaining associations added between random pairs. The generalization
+    is a chain where each superclass is split into two subclasses, one of which is split again at the next level.
+
+    Action text is generated from a weighted mix of statement kinds, each referring only to model elements
+    that exist, so that the package populates without error.
+    """
+
+    def __init__(self, spec: ModelSpec):
+        self.spec = spec
+        self.rand = random.Random(spec.seed)
+        self.classes = [f"C{n}" for n in range(1, spec.classes + 1)]
+        self.lifecycles = self.classes[:spec.lifecycles]
+        self.associations: list[Association] = []
+        self.rnum = 0
+
+    def next_rnum(self) -> str:
+        self.rnum += 1
+        return f"R{self.rnum}"
+
+    def write(self, path: Path):
+        """
+        Write the system package
+
+        Args:
+            path: The system package folder, created if necessary
+        """
+        for n, c in enumerate(self.classes[1:], start=1):
+            self.associations.append(Association(rnum=self.next_rnum(), one=self.rand.choice(self.classes[:n]), many=c))
+        for _ in range(self.spec.associations - len(self.associations)):
+            one, many = self.rand.sample(self.classes, 2) if len(self.classes) > 1 else (self.classes[0],) * 2
+            self.associations.append(Association(rnum=self.next_rnum(), one=one, many=many))
+
+        subsys_path = path / "benchmark" / "main"
+        (subsys_path / "class-model").mkdir(parents=True, exist_ok=True)
+        (path / "system.yaml").write_text(f"Domains:\n  - {_domain}, {_domain_alias}\n  - Output, {_ee}\n")
+        (subsys_path / "class-model" / "main.xcm").write_text(self.class_model())
+        for c in self.classes:
+            method_path = subsys_path / "methods" / c.lower()
+            method_path.mkdir(parents=True, exist_ok=True)
+            for m in range(1, self.spec.methods + 1):
+                # Methods are keyed by file name across the whole subsystem, so each is named for its class
+                (method_path / f"{c.lower()}m{m}.mtd").write_text(self.method(c, m))
+        if self.lifecycles:
+            (subsys_path / "state-machines").mkdir(exist_ok=True)
+            for c in self.lifecycles:
+                (subsys_path / "state-machines" / f"{c.lower()}.xsm").write_text(self.state_model(c))
+        (subsys_path / "external").mkdir(exist_ok=True)
+        (subsys_path / "external" / "external.yaml").write_text(
+            f"External Entities:\n  {_ee}:\n    service domain: Output\n    external events:\n"
+            f"      - name: Updated\n        parameters:\n          value: Count\n")
+        (subsys_path / "external" / "mark.yaml").write_text("Implicit: {}\n")
+
+    def class_model(self) -> str:
+        lines = [f"domain {_domain}, {_domain_alias}",
+                 f"subsystem {_subsystem}, {_subsystem_alias} 1-{self.rnum_limit()}"]
+        referrers = {c: [a for a in self.associations if a.many == c] for c in self.classes}
+        for c in self.classes:
+            lines += [f"class {c}", "attributes", "    ID : Nominal {I}", "    Value : Count", "    Flag : Boolean"]
+            lines += [f"    {a.rnum} ref : Nominal {{{a.rnum}}}" for a in referrers[c]]
+            lines.append("--")
+
+        gen_rels = []
+        superclass = "G0"
+        lines += [f"class {superclass}", "attributes", "    ID : Nominal {I}", "    Value : Count", "--"]
+        for level in range(1, self.spec.gen_depth + 1):
+            rnum = self.next_rnum()
+            subclasses = [f"G{level}A", f"G{level}B"]
+            for s in subclasses:
+                lines += [f"class {s}", "attributes", f"    ID : Nominal {{I, {rnum}}}", "    Flag : Boolean", "--"]
+            gen_rels.append((rnum, superclass, subclasses))
+            superclass = subclasses[0]
+        if not self.spec.gen_depth:
+            lines = lines[:-5]  # No superclass without subclasses
+
+        lines.append("relationships")
+        for a in self.associations:
+            lines += [f"    {a.rnum}", f"    is referenced by, M {a.many}", f"    refers to, 1 {a.one}",
+                      f"    {a.many}.{a.rnum} ref -> {a.one}.ID", "--"]
+        for rnum, superclass, subclasses in gen_rels:
+            lines += [f"    {rnum}", f"    {superclass} +", *[f"        {s}" for s in subclasses],
+                      f"    <subclass>.ID -> {superclass}.ID", "--"]
+        return '\n'.join(lines) + '\n'
+
+    def rnum_limit(self) -> int:
+        # Element numbers are drawn from the subsystem range for classes and relationships
+        return max(99, 2 * (self.spec.classes + self.spec.associations + 2 * self.spec.gen_depth + 1))
+
+    def method(self, cname: str, m: int) -> str:
+        return '\n'.join([
+            "--", f"{cname}.M{m}() : Count", "--",
+            *self.statements(cname, state_events=None),
+            "=>> Value", ""])
+
+    def state_model(self, cname: str) -> str:
+        states = [f"S{n}" for n in range(1, self.spec.states + 1)]
+        events = [f"E{n}" for n in range(1, self.spec.events + 1)]
+        # Each event causes at least one transition so that it has an event specification
+        transitions = {s: {} for s in states}
+        for n, e in enumerate(events):
+            transitions[states[n % len(states)]][e] = states[(n + 1) % len(states)]
+        for n, s in enumerate(states):
+            if not transitions[s]:
+                transitions[s][events[n % len(events)]] = states[(n + 1) % len(states)]
+
+        lines = [f"domain {_domain}", f"class {cname}", "interaction events", *[f"    {e}" for e in events], "--"]
+        for s in states:
+            lines += [f"state {s}", "activity", *[f"    {t}" for t in self.statements(cname, state_events=events)],
+                      "transitions", *[f"    {e} > {to}" for e, to in transitions[s].items()], "--"]
+        return '\n'.join(lines) + '\n'
+
+    def statements(self, cname: str, state_events: list[str] | None) -> list[str]:
+        """
+        Generate a sequence of statements for an activity of a class
+
+        Args:
+            cname: Name of the class
+            state_events: Events of the class lifecycle if this is a state activity, otherwise None
+
+        Returns:
+            Scrall statement lines
+        """
+        mix = {k: w for k, w in self.spec.mix.items() if w and (k != 'signal' or state_events)}
+        if not mix:
+            return []
+        kinds, weights = list(mix), list(mix.values())
+        to_one = [a for a in self.associations if a.many == cname]
+        to_many = [a for a in self.associations if a.one == cname]
+
+        lines = []
+        scalars = []  # Count valued flows defined so far
+        instances = []  # Single instance flows defined so far
+        for n in range(1, self.spec.statements + 1):
+            kind = self.rand.choices(kinds, weights)[0]
+            match kind:
+                case 'read' | 'compute' if len(scalars) < 2 or kind == 'read':
+                    # A computation needs two distinct typed operands, so read them first
+                    source = f"{self.rand.choice(instances)}." if instances else ""
+                    lines.append(f"v{n} = {source}Value")
+                    scalars.append(f"v{n}")
+                case 'compute':
+                    lines.append(f"v{n} = {' + '.join(self.rand.sample(scalars, 2))}")
+                    scalars.append(f"v{n}")
+                case 'write':
+                    lines.append(f"Value = {self.rand.choice(scalars)}" if scalars else "Flag.set")
+                case 'traverse':
+                    if to_one:
+                        a = self.rand.choice(to_one)
+                        lines.append(f"i{n} .= /{a.rnum}/{a.one}")
+                        instances.append(f"i{n}")
+                    elif to_many:
+                        a = self.rand.choice(to_many)
+                        lines.append(f"s{n} ..= /{a.rnum}/{a.many}")
+                case 'select':
+                    if to_many:
+                        a = self.rand.choice(to_many)
+                        lines.append(f"s{n} ..= /{a.rnum}/{a.many}(Flag)")
+                    else:
+                        lines.append(f"s{n} ..= {cname}(Flag)")
+                case 'signal':
+                    lines.append(f"{self.rand.choice(state_events)} -> me")
+        return lines
+
+
+def parse(cl_input=None):
+    defaults = ModelSpec()
+    parser = argparse.ArgumentParser(description="Generate a synthetic system package")
+    parser.add_argument('path', help='System package folder to write')
+    for knob in ModelSpec._fields:
+        if knob != 'mix':
+            parser.add_argument(f"--{knob.replace('_', '-')}", type=int, default=getattr(defaults, knob))
+    parser.add_argument('--mix', nargs='*', default=[],
+                        help=f"Statement kind weights as kind=weight, kinds: {', '.join(statement_kinds)}")
+    return parser.parse_args(cl_input)
+
+
+def main():
+    args = parse()
+    knobs = {k: getattr(args, k) for k in ModelSpec._fields if k != 'mix'}
+    if args.mix:
+        knobs['mix'] = {k: int(w) for k, w in (m.split('=') for m in args.mix)}
+    ModelGenerator(ModelSpec(**knobs)).write(Path(args.path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+""" scaling.py – Populate generated models of growing size and record how time and memory scale """
+
+# System
+import os
+import sys
+import csv
+import json
+import math
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+# xUML Populate
+from xuml_populate.query import Metamodel
+from xuml_populate.storage import backends
+
+# Benchmarks
+from benchmarks.generate import ModelGenerator, ModelSpec
+
+_report_fname = "scaling.json"
+
+
+def run_one(spec: ModelSpec, work_path: Path, parse_actions: bool, storage: str = 'pyral') -> dict:
+    """
+    Generate a model and populate it in a separate process with profiling on
+
+    Each size runs in its own process so that the peak resident memory is not carried over from a larger run
+
+    Args:
+        spec: Model to generate
+        work_path: Folder for the generated package and the populator output
+        parse_actions: Populate the action language
+        storage: The storage backend that holds the metamodel while it is populated
+
+    Returns:
+        A result row
+    """
+    system_path = work_path / "bench"
+    ModelGenerator(spec).write(system_path)
+    profile_path = work_path / "profile.json"
+    cmd = [sys.executable, "-m", "xuml_populate", "-s", str(system_path), "-P", str(profile_path),
+           "--storage", storage]
+    if not parse_actions:
+        cmd.append("-A")
+    proc = subprocess.Popen(cmd, cwd=work_path, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    stderr = proc.stderr.read()
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode:
+        raise RuntimeError(f"Population failed for {spec}:\n{stderr.decode()}")
+
+    with open(profile_path) as f:
+        profile = json.load(f)
+    row = {'storage': storage} | {k: v for k, v in spec._asdict().items() if k not in ('mix', 'seed')}
+    # Counted in the populated metamodel, so any that didn't make it in aren't claimed
+    row['activities'] = len(Metamodel.load(work_path / f"mmdb_bench{backends[storage].extension}").all('Activity'))
+    row['seconds'] = round(profile['seconds'], 3)
+    row['max_rss_mb'] = round(usage.ru_maxrss / 1024, 1)  # Linux reports kilobytes
+    row |= {f"{name}_calls": count for name, count in profile['calls'].items()}
+    row['phases'] = {p['phase']: round(p['seconds'], 3) for p in profile['phases']}
+    return row
+
+
+def growth(rows: list[dict], key: str) -> list[float | None]:
+    """
+    Estimate the exponent k in cost ~ size^k between each pair of successive rows, where size is the number of classes
+
+    Args:
+        rows: Result rows in increasing size
+        key: The cost to estimate
+
+    Returns:
+        The exponent for each row, None for the first
+    """
+    exponents = [None]
+    for prev, row in zip(rows, rows[1:]):
+        if prev[key] > 0 and row[key] > 0 and row['classes'] != prev['classes']:
+            exponents.append(round(math.log(row[key] / prev[key]) / math.log(row['classes'] / prev['classes']), 2))
+        else:
+            exponents.append(None)
+    return exponents
+
+
+def parse(cl_input=None):
+    parser = argparse.ArgumentParser(description="Measure population time and memory on generated models")
+    parser.add_argument('-f', '--factors', nargs='*', type=float, default=[1, 2, 4, 8],
+                        help='Size multipliers applied to the base model')
+    parser.add_argument('-A', '--actions', action='store_true', help='Suppress action language population')
+    parser.add_argument('--storage', nargs='*', choices=('pyral', 'sqlite'), default=['pyral'],
+                        help='Storage backends compared, each size is populated with each')
+    parser.add_argument('-o', '--output', default=_report_fname, help='JSON report, a CSV is written alongside')
+    for knob in ModelSpec._fields:
+        if knob != 'mix':
+            parser.add_argument(f"--{knob.replace('_', '-')}", type=int, default=getattr(ModelSpec(), knob),
+                                help=f"Base model {knob}")
+    return parser.parse_args(cl_input)
+
+
+def main():
+    args = parse()
+    base = ModelSpec(**{k: getattr(args, k) for k in ModelSpec._fields if k != 'mix'})
+    rows = []
+    for factor in args.factors:
+        spec = base.scaled(factor)
+        for storage in args.storage:
+            with tempfile.TemporaryDirectory(prefix="popsystem-bench-") as work_dir:
+                row = run_one(spec, Path(work_dir), parse_actions=not args.actions, storage=storage)
+            rows.append(row)
+            print(f"{storage:<7} classes {row['classes']:>5}  activities {row['activities']:>6}  "
+                  f"{row['seconds']:>9.2f}s  {row['max_rss_mb']:>8.1f}MB", flush=True)
+    for storage in args.storage:
+        storage_rows = [r for r in rows if r['storage'] == storage]
+        for key in ('seconds', 'max_rss_mb'):
+            for row, k in zip(storage_rows, growth(storage_rows, key)):
+                row[f"{key}_exponent"] = k
+
+    report_path = Path(args.output)
+    with open(report_path, 'w') as f:
+        json.dump({'base': base._asdict(), 'parse_actions': not args.actions, 'runs': rows}, f, indent=2)
+    with open(report_path.with_suffix('.csv'), 'w', newline='') as f:
+        fields = [k for k in rows[0] if k != 'phases']
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Report written to: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+""" startup.py – Measure how long popsystem takes to import what it needs before it gets to work """
+
+# System
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import NamedTuple
+
+# Benchmarks
+from benchmarks.generate import ModelGenerator, ModelSpec
+
+_report_fname = "startup.json"
+
+
+class ImportTime(NamedTuple):
+    """
+    One line of python -X importtime output
+    """
+    module: str
+    self_us: int  # Microseconds spent importing the module itself
+    cumulative_us: int  # Including the modules it imported first
+    depth: int  # 0 for a module imported directly, rather than by another module being imported
+
+
+def parse_importtime(stderr: str) -> list[ImportTime]:
+    """
+    Args:
+        stderr: What python -X importtime wrote to stderr, along with anything else the command wrote there
+
+    Returns:
+        Each module imported, in the order its import completed
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix('import time:').split('|')
+        imports.append(ImportTime(module=name.strip(), self_us=int(self_us), cumulative_us=int(cumulative_us),
+                                  depth=(len(name) - len(name.lstrip()) - 1) // 2))
+    return imports
+
+
+def scenarios(system_path: Path) -> dict[str, list[str]]:
+    """
+    Args:
+        system_path: A small system package to populate
+
+    Returns:
+        The Python arguments of each measured command, by name
+    """
+    popsystem = ["-m", "xuml_populate"]
+    return {
+        'version': popsystem + ["-V"],
+        'no-system': popsystem,  # An argument error
+        'import-system': ["-c", "import xuml_populate.system"],
+        'populate-no-actions': popsystem + ["-s", str(system_path), "-A", "-T"],
+        'populate': popsystem + ["-s", str(system_path), "-T"],
+    }
+
+
+def run_one(args: list[str], work_path: Path, repeat: int) -> dict:
+    """
+    Run a command with import timing on, keeping its fastest run
+
+    Args:
+        args: Python arguments
+        work_path: Folder the command runs in
+        repeat: Number of runs
+
+    Returns:
+        A result row
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=work_path,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        seconds = time.perf_counter() - start
+        imports = parse_importtime(proc.stderr)
+        import_us = sum(i.self_us for i in imports)
+        if best is None or import_us < best[1]:
+            best = (seconds, import_us, imports)
+    seconds, import_us, imports = best
+    return {
+        'seconds': round(seconds, 3),
+        'import_ms': round(import_us / 1000, 1),
+        'modules': len(imports),
+        'slowest': [{'module': i.module, 'cumulative_ms': round(i.cumulative_us / 1000, 1)}
+                    for i in sorted(imports, key=lambda i: i.cumulative_us, reverse=True) if i.depth == 0][:10],
+    }
+
+
+def parse(cl_input=None):
+    parser = argparse.ArgumentParser(description="Measure popsystem startup and import time")
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Runs of each command, the fastest is kept')
+    parser.add_argument('-b', '--baseline', help='An earlier report to compare against')
+    parser.add_argument('-o', '--output', default=_report_fname, help='JSON report')
+    return parser.parse_args(cl_input)
+
+
+def main():
+    args = parse()
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['runs']
+    runs = {}
+    with tempfile.TemporaryDirectory(prefix="popsystem-bench-") as work_dir:
+        work_path = Path(work_dir)
+        ModelGenerator(ModelSpec(classes=5, associations=5, lifecycles=1)).write(work_path / "startup")
+        for name, command in scenarios(work_path / "startup").items():
+            row = run_one(command, work_path, repeat=args.repeat)
+            runs[name] = row
+            change = ''
+            if name in baseline:
+                change = f"  ({row['import_ms'] - baseline[name]['import_ms']:+.1f}ms)"
+            print(f"{name:<20} {row['seconds']:>7.3f}s  imports {row['import_ms']:>7.1f}ms{change}  "
+                  f"{row['modules']:>4} modules", flush=True)
+
+    report_path = Path(args.output)
+    with open(report_path, 'w') as f:
+        json.dump({'python': sys.version.split()[0], 'runs': runs}, f, indent=2)
+    print(f"Report written to: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
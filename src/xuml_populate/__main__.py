@@ -5,17 +5,23 @@ Blueprint Model Repository Populator
 # System
 import logging
 import logging.config
+import os
 import sys
 import argparse
 from pathlib import Path
 import atexit
 
 # xUML Populate
-from xuml_populate.system import System
+# Only light modules are imported here, so that -V and argument errors don't wait on PyRAL, the metamodel,
+# the parsers and the populators. The rest is imported in main() once there is a system to populate.
+from xuml_populate.config import storage_backends, export_formats
 from xuml_populate import version
 
 _logpath = Path("popsystem.log")
 _progname = 'Executable UML metamodel repository populator'
+_cache_dir = ".popsystem-cache"
+_profile_fname = "popsystem-profile.json"
+_socket_fname = ".popsystem.sock"
 
 def clean_up():
     """Normal and exception exit activities"""
@@ -41,6 +47,37 @@ def parse(cl_input):
                         help='Generate a diagnostic log file')
     parser.add_argument('-A', '--actions', action='store_true',
                         help='Suppress action language parsing'),
+    parser.add_argument('-j', '--jobs', action='store', type=int, default=1,
+                        help='Number of processes used to parse the model files and action text, 0 for one per CPU')
+    parser.add_argument('-C', '--cache', action='store', nargs='?', const=_cache_dir,
+                        help=f'Reuse parse results cached in this directory (default: {_cache_dir})')
+    parser.add_argument('-I', '--incremental', action='store_true',
+                        help='Update the saved metamodel if only action text has changed')
+    parser.add_argument('--checkpoint', action='store_true',
+                        help='Save the metamodel populated before the actions as a checkpoint for -R')
+    parser.add_argument('-R', '--from-checkpoint', action='store_true',
+                        help='Populate only the actions from the checkpoint of the last full run, saving one if there is none')
+    parser.add_argument('--domain', action='append', dest='domains', default=[], metavar='PATTERN',
+                        help='Populate actions only in domains matching this glob pattern (may be repeated)')
+    parser.add_argument('--class', action='append', dest='classes', default=[], metavar='PATTERN',
+                        help='Populate actions only in methods and state models of matching classes (may be repeated)')
+    parser.add_argument('--activity', action='append', dest='activities', default=[], metavar='PATTERN',
+                        help='Populate actions only in matching methods and states (may be repeated)')
+    parser.add_argument('-E', '--export', action='store', choices=export_formats, default='none',
+                        help='Also export the populated metamodel as typed tables')
+    parser.add_argument('-T', '--no-printout', action='store_true',
+                        help='Do not write the text printout of the populated metamodel')
+    parser.add_argument('--storage', action='store', choices=storage_backends, default='pyral',
+                        help='Backend that stores the metamodel while it is populated')
+    parser.add_argument('--parallel-domains', action='store_true',
+                        help='Populate each modeled domain in its own process and merge the results')
+    parser.add_argument('--serve', action='store', nargs='?', const=_socket_fname, metavar='SOCKET',
+                        help=f'Keep running, populate again on each change and answer requests on this socket '
+                             f'(default: {_socket_fname})')
+    parser.add_argument('-P', '--profile', action='store', nargs='?', const=_profile_fname,
+                        help=f'Write a JSON report of the time spent in each phase (default: {_profile_fname})')
+    parser.add_argument('--slowest', action='store', type=int, default=10,
+                        help='Number of slowest activities listed in the profile report')
     parser.add_argument('-V', '--version', action='store_true',
                         help='Print the current version of the repo populator')
     parser.add_argument('-v', '--verbose', action='store_true',
@@ -76,9 +113,38 @@ def main():
               file=sys.stderr)
         sys.exit(1)
 
+    from xuml_populate.system import System
+    from xuml_populate.serve import PopulateServer
+    from xuml_populate.profiler import Profile
+    from xuml_populate.populate.flow_usage import FlowUsage
+    from xuml_populate.activity_filter import ActivityFilter
+
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+    cache_path = Path(args.cache).resolve() if args.cache else None
+
+    if args.profile:
+        Profile.enable()
+
+    if args.debug:
+        # Cross-check the flow usage recorded as actions are populated against the metamodel
+        FlowUsage.check = True
+
     # By default action language is parsed; -A suppresses it
-    System(name=system_pkg_path.stem, system_path=system_pkg_path,
-           parse_actions=not args.actions, verbose=args.verbose)
+    options = dict(parse_actions=not args.actions, verbose=args.verbose, jobs=jobs, cache_path=cache_path,
+                   checkpoint=args.checkpoint, from_checkpoint=args.from_checkpoint,
+                   select=ActivityFilter(domains=tuple(args.domains), classes=tuple(args.classes),
+                                         activities=tuple(args.activities)),
+                   export=args.export, printout=not args.no_printout, storage=args.storage,
+                   parallel_domains=args.parallel_domains)
+    if args.serve:
+        # The server always populates incrementally, as with -I, and reuses the parse of each unchanged file
+        options['cache_path'] = cache_path or Path(_cache_dir).resolve()
+        PopulateServer(system_path=system_pkg_path, socket_path=Path(args.serve).resolve(), options=options).serve()
+    else:
+        System(name=system_pkg_path.stem, system_path=system_pkg_path, incremental=args.incremental, **options)
+
+    if args.profile:
+        Profile.report(system=system_pkg_path.stem, report_path=Path(args.profile), slowest=args.slowest)
 
     logger.info("No problemo")  # We didn't die on an exception, basically
     if args.verbose:
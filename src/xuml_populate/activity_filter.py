@@ -0,0 +1,63 @@
+""" activity_filter.py – Select the activities whose actions are populated """
+
+# System
+from fnmatch import fnmatchcase
+from typing import NamedTuple
+
+
+def matches(name: str, patterns: tuple[str, ...]) -> bool:
+    """
+    Args:
+        name: A model element name
+        patterns: Glob patterns, matched without regard to case
+
+    Returns:
+        True if there are no patterns or the name matches any of them
+    """
+    return not patterns or any(fnmatchcase(name.lower(), p.lower()) for p in patterns)
+
+
+class ActivityFilter(NamedTuple):
+    """
+    Glob patterns selecting the domains, classes and activities whose actions are populated
+
+    The model structure of every domain is populated regardless. An activity is selected when its domain,
+    its class and its own name each match at least one of the corresponding patterns. Where no patterns of
+    a kind are given, anything matches.
+
+    For a method, the class is the method's class and the activity is the method name. For a state, the
+    class is the lifecycle's class, or the association rnum of an assigner, and the activity is the state name.
+    """
+    domains: tuple[str, ...] = ()
+    classes: tuple[str, ...] = ()
+    activities: tuple[str, ...] = ()
+
+    @property
+    def active(self) -> bool:
+        """
+        Returns:
+            True if any patterns are given
+        """
+        return any(self)
+
+    def selects_domain(self, name: str, alias: str) -> bool:
+        """
+        Args:
+            name: Domain name
+            alias: Domain alias, which may be matched instead of the name
+
+        Returns:
+            True if the actions of the domain are populated
+        """
+        return matches(name, self.domains) or matches(alias, self.domains)
+
+    def selects(self, cname: str, activity: str) -> bool:
+        """
+        Args:
+            cname: Class name, or assigner rnum
+            activity: Method or state name
+
+        Returns:
+            True if the activity is populated (within a selected domain)
+        """
+        return matches(cname, self.classes) and matches(activity, self.activities)
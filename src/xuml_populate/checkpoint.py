@@ -0,0 +1,139 @@
+""" checkpoint.py – Save and restore the metamodel populated up to the point where actions are populated """
+
+# System
+import logging
+import pickle
+from pathlib import Path
+from typing import Optional, Any
+
+# xUML Populate
+from xuml_populate.config import mmdb
+from xuml_populate.db import Database, Relation
+from xuml_populate.storage import Storage
+from xuml_populate.populate.element import Element
+from xuml_populate.populate.flow import Flow
+from xuml_populate.populate.actions.action import Action
+from xuml_populate.populate.mm_type import MMtype
+
+_logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """
+    The model structure of a system, populated and saved just before any actions are populated
+
+    Classes, relationships, types, lineages, state models, method signatures and external entities only
+    change when the model structure does. So when just the action language is being worked on, a run can
+    start from this checkpoint and populate only the Method and State Activity actions.
+
+    Along with the database, the checkpoint holds the numbering counters that the populators keep in Python
+    and the manifest of the system it was taken from, so that it is only used with the same model structure.
+    """
+
+    @classmethod
+    def paths(cls, name: str) -> tuple[Path, Path]:
+        """
+        Args:
+            name: The system name used in the saved metamodel file name
+
+        Returns:
+            The checkpoint database file and the file holding its counters and manifest
+        """
+        return Path(f"mmdb_{name}.checkpoint{Storage.backend.extension}"), Path(f"mmdb_{name}.checkpoint.pickle")
+
+    @classmethod
+    def counters(cls) -> dict[str, Any]:
+        """
+        Returns:
+            The numbering counters and type registries kept by the populators
+        """
+        return {
+            'element_counters': Element._num_counters,
+            'flow_id_ctr': Flow.flow_id_ctr,
+            'next_action_id': Action.next_action_id,
+            'scalar_types': MMtype.scalar_types,
+            'class_names': MMtype.class_names,
+        }
+
+    @classmethod
+    def add_counters(cls, counters: dict[str, Any]):
+        """
+        Add the counters of a domain populated in another process to those kept by the populators
+
+        Each counter is kept by domain, so the counters of separately populated domains never overlap.
+
+        Args:
+            counters: The counters of the domain's population, as returned by counters()
+        """
+        Element._num_counters.update(counters['element_counters'])
+        Flow.flow_id_ctr.update(counters['flow_id_ctr'])
+        Action.next_action_id.update(counters['next_action_id'])
+        MMtype.scalar_types.update(counters['scalar_types'])
+        MMtype.class_names.update(counters['class_names'])
+
+    @classmethod
+    def save(cls, name: str, manifest: dict):
+        """
+        Save the currently populated metamodel and counters as the system's checkpoint
+
+        Args:
+            name: The system name
+            manifest: The manifest of the populated system
+        """
+        db_path, state_path = cls.paths(name)
+        _logger.info(f"Saving checkpoint [{db_path}]")
+        Database.save(db=mmdb, fname=str(db_path))
+        state = {'manifest': manifest} | cls.counters()
+        with open(state_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def restore(cls, name: str, manifest: dict) -> bool:
+        """
+        Load the system's checkpoint, if there is one taken from the same model structure
+
+        Args:
+            name: The system name
+            manifest: The manifest of the system to be populated
+
+        Returns:
+            True if the checkpoint is loaded into an open session
+        """
+        db_path, state_path = cls.paths(name)
+        if not db_path.is_file() or not state_path.is_file():
+            _logger.info("No checkpoint saved")
+            return False
+        try:
+            with open(state_path, 'rb') as f:
+                state = pickle.load(f)
+        except Exception as e:
+            _logger.warning(f"Ignoring unreadable checkpoint [{state_path}]: {e}")
+            return False
+        saved = state['manifest']
+        if any(saved.get(k) != manifest[k] for k in ('version', 'parse_actions', 'structure')):
+            _logger.info("Model structure has changed since the checkpoint was saved")
+            return False
+
+        _logger.info(f"Restoring checkpoint [{db_path}]")
+        Database.open_session(mmdb)
+        Database.load(db=mmdb, fname=str(db_path))
+        Element._num_counters = state['element_counters']
+        Flow.flow_id_ctr = state['flow_id_ctr']
+        Action.next_action_id = state['next_action_id']
+        MMtype.scalar_types = state['scalar_types']
+        MMtype.class_names = state['class_names']
+        return True
+
+    @classmethod
+    def activities(cls, domain: str) -> set[str]:
+        """
+        Args:
+            domain: The domain name
+
+        Returns:
+            The number of each Method and State Activity of the domain in the restored checkpoint
+        """
+        R = f"Domain:<{domain}>"
+        methods = Relation.restrict(db=mmdb, relation='Method', restriction=R).body
+        states = Relation.restrict(db=mmdb, relation='Real State', restriction=R).body
+        return {t['Anum'] for t in methods} | {t['Activity'] for t in states}
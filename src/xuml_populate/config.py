@@ -2,4 +2,10 @@
 
 # The name of the database used throughout the xuml populate package
 
-mmdb = "mmdb"
\ No newline at end of file
+mmdb = "mmdb"
+
+# Names offered on the command line, kept here so that popsystem can check its arguments without importing
+# the storage and export modules, and with them PyRAL
+
+storage_backends = ('pyral', 'sqlite')  # Keys of storage.backends
+export_formats = ('json', 'sqlite', 'none')  # Export.formats
@@ -0,0 +1,131 @@
+""" context.py – Keep the state of each population apart so that systems can be populated in one process """
+
+# System
+import logging
+import functools
+from contextvars import ContextVar
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+_logger = logging.getLogger(__name__)
+
+
+class PopulationContext:
+    """
+    Everything that a population changes as it proceeds
+
+    The populators are classes whose classmethods keep numbering counters, registries of flows and types and
+    working values in class attributes. Each such attribute is declared as a ContextState, so its value is
+    actually held by whichever population context is active when it is read or assigned.
+
+    A System creates a context and activates it while it populates, passing it on to each of its Domains.
+    The active context is a context variable, so a long running process can populate one system after
+    another from a clean state, and separate threads can each populate a system at the same time.
+
+    The metamodel database belongs to the context as well. The storage backends and the relvar index keep
+    their sessions in the active context, so the mmdb session name refers to a different database in each
+    context.
+    """
+    _active: ContextVar['PopulationContext'] = ContextVar('population_context')
+
+    def __init__(self, name: str = ''):
+        """
+        Args:
+            name: The system populated in this context, used only in log messages
+        """
+        self.name = name
+        self.state: dict[str, Any] = {}  # Value of each ContextState by module, class and attribute name
+
+    @classmethod
+    def current(cls) -> 'PopulationContext':
+        """
+        Returns:
+            The active context
+        """
+        try:
+            return cls._active.get()
+        except LookupError:
+            # Outside of any System (a test, for example) each thread has a context of its own
+            context = cls()
+            cls._active.set(context)
+            return context
+
+    @contextmanager
+    def active(self) -> Iterator['PopulationContext']:
+        """
+        Make this the active context within a with block
+        """
+        token = self._active.set(self)
+        try:
+            yield self
+        finally:
+            self._active.reset(token)
+
+
+def in_population_context(fresh: bool = False) -> Callable[[Callable], Callable]:
+    """
+    Run an __init__ with a population context active and keep that context as the new object's context
+
+    The context may be passed as the context keyword argument. Otherwise a new context is made if fresh,
+    else the active one is used.
+
+    Args:
+        fresh: Make a new context when none is passed
+    """
+    def decorator(init: Callable) -> Callable:
+        @functools.wraps(init)
+        def wrapper(self, *args, context: Optional[PopulationContext] = None, **kwargs):
+            self.context = context or (PopulationContext() if fresh else PopulationContext.current())
+            with self.context.active():
+                init(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ContextState:
+    """
+    A class attribute whose value is held by the active population context
+
+    Each context starts with a new value from the factory, for example::
+
+        class Flow(metaclass=ContextScoped):
+            flow_id_ctr = ContextState(dict)
+
+    Assigning the attribute on the class (or a subclass) assigns it in the active context. Assigning it on an
+    instance sets that instance's own value, as it would for any class attribute.
+    """
+
+    def __init__(self, factory: Callable[[], Any] = lambda: None):
+        """
+        Args:
+            factory: Makes the initial value in each context
+        """
+        self.factory = factory
+        self.key = ''
+
+    def __set_name__(self, owner: type, name: str):
+        self.key = f"{owner.__module__}.{owner.__qualname__}.{name}"
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        state = PopulationContext.current().state
+        if self.key not in state:
+            state[self.key] = self.factory()
+        return state[self.key]
+
+    def assign(self, value: Any):
+        PopulationContext.current().state[self.key] = value
+
+
+class ContextScoped(type):
+    """
+    Metaclass of a class with ContextState attributes, so that assigning one on the class keeps it in the
+    active context rather than replacing the attribute
+    """
+
+    def __setattr__(cls, name: str, value: Any):
+        for c in cls.__mro__:
+            if isinstance(attr := c.__dict__.get(name), ContextState):
+                attr.assign(value)
+                return
+        super().__setattr__(name, value)
+
@@ -0,0 +1,232 @@
+""" db.py – The metamodel database calls made by the populators, answered by the storage backend in use """
+
+# System
+from typing import Any, Optional, Sequence
+
+# Model Integration
+from pyral.rtypes import RelationValue
+
+# xUML Populate
+from xuml_populate.storage import Storage
+from xuml_populate.relvar_index import RelvarIndex
+from xuml_populate.tables import RelvarTable
+from xuml_populate.profiler import Profile
+
+
+class Relvar:
+    """
+    Change the relation variables of the metamodel
+
+    Each call has the same signature as PyRAL's call of the same name.
+    """
+
+    @staticmethod
+    def insert(db: str, relvar: str, tuples: list, tr: Optional[str] = None):
+        """
+        Args:
+            db: DB session name
+            relvar: Relvar name
+            tuples: Named tuples or dictionaries of attribute values
+            tr: The transaction the insert is added to, made immediately if None
+        """
+        Profile.counts['insert'] += 1
+        Storage.backend.insert(db=db, relvar=relvar, tuples=tuples, tr=tr)
+        RelvarIndex.inserted(db=db, relvar=relvar, tuples=tuples, tr=tr)
+
+    @staticmethod
+    def updateone(db: str, relvar_name: str, id: dict, update: dict[str, Any]) -> str:
+        """
+        Update a tuple immediately, as PyRAL can't add an update to a transaction
+
+        Args:
+            db: DB session name
+            relvar_name: Relvar name
+            id: Identifier value of the tuple
+            update: New value of each updated attribute
+        """
+        result = Storage.backend.updateone(db=db, relvar_name=relvar_name, id=id, update=update)
+        RelvarIndex.updated(db=db, relvar=relvar_name, tid=id, update=update)
+        return result
+
+    @staticmethod
+    def deleteone(db: str, relvar_name: str, tid: dict, tr: Optional[str] = None) -> str:
+        """
+        Args:
+            db: DB session name
+            relvar_name: Relvar name
+            tid: Identifier value of the tuple
+            tr: The transaction the delete is added to, made immediately if None
+        """
+        result = Storage.backend.deleteone(db=db, relvar_name=relvar_name, tid=tid, tr=tr)
+        RelvarIndex.deleted(db=db, relvar=relvar_name, tid=tid, tr=tr)
+        return result
+
+    @staticmethod
+    def printall(db: str):
+        """
+        Print every relvar in alphabetical order
+
+        Args:
+            db: DB session name
+        """
+        Storage.backend.printall(db=db)
+
+
+class Relation:
+    """
+    Relational operations on the metamodel, each setting the latest result and optionally a session variable
+
+    A relation named None is the latest result. Otherwise each call is as PyRAL's call of the same name.
+    """
+
+    @staticmethod
+    def restrict(db: str, restriction: Optional[str] = None, relation: Optional[str] = None,
+                 svar_name: Optional[str] = None) -> RelationValue:
+        Profile.counts['restrict'] += 1
+        return Storage.backend.restrict(db=db, restriction=restriction, relation=relation, svar_name=svar_name)
+
+    @staticmethod
+    def semijoin(db: str, rname2: Optional[str] = None, attrs: Optional[dict[str, str]] = None,
+                 rname1: Optional[str] = None, svar_name: Optional[str] = None) -> RelationValue:
+        return Storage.backend.semijoin(db=db, rname2=rname2, attrs=attrs, rname1=rname1, svar_name=svar_name)
+
+    @staticmethod
+    def join(db: str, rname2: str, attrs: Optional[dict[str, str]] = None, rname1: Optional[str] = None,
+             svar_name: Optional[str] = None) -> RelationValue:
+        return Storage.backend.join(db=db, rname2=rname2, attrs=attrs, rname1=rname1, svar_name=svar_name)
+
+    @staticmethod
+    def project(db: str, attributes: Sequence[str], exclude: bool = False, relation: Optional[str] = None,
+                svar_name: Optional[str] = None) -> RelationValue:
+        return Storage.backend.project(db=db, attributes=attributes, exclude=exclude, relation=relation,
+                                       svar_name=svar_name)
+
+    @staticmethod
+    def rename(db: str, names: dict[str, str], relation: Optional[str] = None,
+               svar_name: Optional[str] = None) -> RelationValue:
+        return Storage.backend.rename(db=db, names=names, relation=relation, svar_name=svar_name)
+
+
+class Transaction:
+    """
+    Group changes to the metamodel so that they are made together, or not at all
+    """
+
+    @staticmethod
+    def open(db: str, name: str) -> str:
+        """
+        Args:
+            db: DB session name
+            name: Transaction name, unique among the open transactions of the session
+
+        Returns:
+            The transaction name
+        """
+        Profile.counts['transaction_open'] += 1
+        tr = Storage.backend.open_transaction(db=db, name=name)
+        RelvarIndex.opened(db=db, tr=name)
+        return tr
+
+    @staticmethod
+    def append_statement(db: str, name: str, statement: str):
+        """
+        Add a raw TclRAL statement, only where the backend holds the metamodel in TclRAL
+
+        Args:
+            db: DB session name
+            name: Transaction name
+            statement: The statement
+        """
+        Storage.backend.append_statement(db=db, name=name, statement=statement)
+
+    @staticmethod
+    def execute(db: str, name: str):
+        """
+        Args:
+            db: DB session name
+            name: Transaction name
+        """
+        with RelvarIndex.executing(db=db, tr=name):
+            Storage.backend.execute_transaction(db=db, name=name)
+
+
+class Database:
+    """
+    Open, load, save and read back the metamodel database
+    """
+
+    @staticmethod
+    def open_session(name: str):
+        """
+        Args:
+            name: DB session name
+        """
+        Storage.backend.open_session(name)
+
+    @staticmethod
+    def close_session(name: str):
+        """
+        Args:
+            name: DB session name
+        """
+        Storage.backend.close_session(name)
+        RelvarIndex.reset(name)
+
+    @staticmethod
+    def is_open(name: str) -> bool:
+        """
+        Args:
+            name: DB session name
+
+        Returns:
+            True if the session is open
+        """
+        return Storage.backend.is_open(name)
+
+    @staticmethod
+    def load(db: str, fname: str):
+        """
+        Args:
+            db: DB session name
+            fname: A database saved by the backend in use, or a TclRAL database such as the empty metamodel
+        """
+        Storage.backend.load(db=db, fname=fname)
+        RelvarIndex.reset(db)
+
+    @staticmethod
+    def save(db: str, fname: str):
+        """
+        Args:
+            db: DB session name
+            fname: The saved file, replaced if it exists
+        """
+        Storage.backend.save(db=db, fname=fname)
+
+    @staticmethod
+    def execute(db: str, cmd: str, log: bool = True) -> str:
+        """
+        Run a raw TclRAL command, only where the backend holds the metamodel in TclRAL
+
+        Args:
+            db: DB session name
+            cmd: The command
+            log: Log the result
+
+        Returns:
+            TclRAL's result
+        """
+        return Storage.backend.execute(db=db, cmd=cmd, log=log)
+
+    @staticmethod
+    def tables(db: str, typed: bool = True) -> list[RelvarTable]:
+        """
+        Read each relvar
+
+        Args:
+            db: DB session name
+            typed: Convert values to their Python types, otherwise they are kept as TclRAL strings
+
+        Returns:
+            A table for each relvar in alphabetical order
+        """
+        return Storage.backend.tables(db=db, typed=typed)
@@ -0,0 +1,178 @@
+""" domain_pool.py – Populate the modeled domains of a system in separate processes and merge the results """
+
+# System
+import copy
+import logging
+from pathlib import Path
+from typing import NamedTuple, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+
+# xUML Populate
+from xuml_populate.config import mmdb
+from xuml_populate.db import Database, Relvar, Transaction
+from xuml_populate.context import PopulationContext
+from xuml_populate.storage import Storage
+from xuml_populate.activity_filter import ActivityFilter
+from xuml_populate.checkpoint import Checkpoint
+from xuml_populate.parse_cache import ParseCache
+from xuml_populate.tables import RelvarTable
+from xuml_populate.populate.domain import Domain
+
+_logger = logging.getLogger(__name__)
+
+
+class RelvarChanges(NamedTuple):
+    """
+    The changes a population makes to a relvar
+    """
+    removed: list[dict[str, str]]  # Identifier value of each removed tuple
+    added: list[dict[str, str]]  # Each added tuple, in the order the relvar holds them
+
+
+class PopulatedDomain(NamedTuple):
+    """
+    What a worker process populated for a domain
+    """
+    name: str
+    structure: dict[str, RelvarChanges]  # Changes by relvar name made by populating the model structure
+    actions: dict[str, RelvarChanges]  # Further changes made by populating the actions
+    counters: dict[str, Any]  # The populators' counters once the model structure was populated
+
+
+class DomainPool:
+    """
+    Populate each modeled domain of a system in its own process
+
+    Domains don't refer to one another, so each can be populated into a metamodel of its own, starting from the
+    same empty metamodel with the System and its Domains populated. What each worker process then populates is
+    taken as the difference between the relvars before and after, which the parent merges into the system's
+    metamodel.
+    """
+    tr_Merge = "Merge Domains"
+
+    @classmethod
+    def snapshot(cls, db: str = mmdb) -> dict[str, RelvarTable]:
+        """
+        Args:
+            db: DB session name
+
+        Returns:
+            Each relvar by name, with values as TclRAL strings
+        """
+        return {t.name: t for t in Database.tables(db=db, typed=False)}
+
+    @classmethod
+    def changes(cls, before: dict[str, RelvarTable], after: dict[str, RelvarTable]) -> dict[str, RelvarChanges]:
+        """
+        Find the changes made to each relvar
+
+        Args:
+            before: A snapshot of the relvars
+            after: A later snapshot of the same relvars
+
+        Returns:
+            The tuples removed and added, for each relvar that changed
+        """
+        changes = {}
+        for name, table in after.items():
+            attrs = list(table.attributes)
+            old_rows = {tuple(r) for r in before[name].rows}
+            new_rows = {tuple(r) for r in table.rows}
+            removed = [dict(zip(attrs, r)) for r in before[name].rows if tuple(r) not in new_rows]
+            added = [dict(zip(attrs, r)) for r in table.rows if tuple(r) not in old_rows]
+            if removed or added:
+                identifier = table.identifiers[0]
+                changes[name] = RelvarChanges(removed=[{a: t[a] for a in identifier} for t in removed], added=added)
+        return changes
+
+    @classmethod
+    def populate(cls, system_name: str, domains: list[str], content: dict[str, dict], parse_actions: bool,
+                 populate_actions: dict[str, bool], select: Optional[ActivityFilter], verbose: bool,
+                 storage: str, jobs: int) -> list[PopulatedDomain]:
+        """
+        Populate each modeled domain in a worker process, using no more processes than jobs
+
+        Args:
+            system_name: The name of the System
+            domains: The name and alias of each domain, as listed in the system.yaml file
+            content: The parsed content of each modeled domain
+            parse_actions: Populate the action language
+            populate_actions: Whether each domain's actions are populated, when the action language is
+            select: The activities whose actions are populated, if not all of them
+            verbose: Verbose messages
+            storage: Name of the storage backend
+            jobs: Most worker processes
+
+        Returns:
+            What was populated for each domain, in the order of the content
+        """
+        _logger.info(f"Populating {len(content)} domains in parallel")
+        with ProcessPoolExecutor(max_workers=max(1, min(len(content), jobs))) as pool:
+            futures = [
+                pool.submit(populate_domain, system_name=system_name, domains=domains, name=name,
+                            content=domain_content, parse_actions=parse_actions,
+                            populate_actions=populate_actions[name], select=select, verbose=verbose,
+                            storage=storage, cache_path=ParseCache.path)
+                for name, domain_content in content.items()
+            ]
+            return [f.result() for f in futures]
+
+    @classmethod
+    def merge(cls, changes: list[dict[str, RelvarChanges]], db: str = mmdb):
+        """
+        Apply the changes made by each worker process in a single transaction
+
+        Args:
+            changes: The changes to each relvar made for each domain
+            db: DB session name
+        """
+        Transaction.open(db=db, name=cls.tr_Merge)
+        for domain_changes in changes:
+            for relvar, c in domain_changes.items():
+                for tid in c.removed:
+                    Relvar.deleteone(db=db, relvar_name=relvar, tid=tid, tr=cls.tr_Merge)
+                if c.added:
+                    Relvar.insert(db=db, relvar=relvar, tuples=c.added, tr=cls.tr_Merge)
+        Transaction.execute(db=db, name=cls.tr_Merge)
+
+
+def populate_domain(system_name: str, domains: list[str], name: str, content: dict, parse_actions: bool,
+                    populate_actions: bool, select: Optional[ActivityFilter], verbose: bool, storage: str,
+                    cache_path: Optional[Path]) -> PopulatedDomain:
+    """
+    Populate a single domain in a worker process
+
+    Args:
+        system_name: The name of the System
+        domains: The name and alias of each domain, as listed in the system.yaml file
+        name: The name of the domain to populate
+        content: The parsed content of the domain
+        parse_actions: Populate the action language
+        populate_actions: Populate this domain's actions, when the action language is
+        select: The activities whose actions are populated, if not all of them
+        verbose: Verbose messages
+        storage: Name of the storage backend
+        cache_path: Parse cache directory, if any
+
+    Returns:
+        What was populated for the domain
+    """
+    from xuml_populate.system import System  # The system module imports this one
+
+    with PopulationContext(name=name).active():
+        Storage.use(storage)
+        ParseCache.path = cache_path
+        System.open_metamodel(system_name=system_name, domains=domains)
+        empty = DomainPool.snapshot()
+
+        d = Domain(domain=name, content=content, parse_actions=parse_actions, verbose=verbose)
+        structure = DomainPool.snapshot()
+        counters = copy.deepcopy(Checkpoint.counters())  # Populating the actions advances them
+
+        actions = {}
+        if parse_actions and populate_actions:
+            d.populate_actions(select=select)
+            actions = DomainPool.changes(before=structure, after=DomainPool.snapshot())
+        Database.close_session(mmdb)
+        return PopulatedDomain(name=name, structure=DomainPool.changes(before=empty, after=structure),
+                               actions=actions, counters=counters)
@@ -20,3 +20,17 @@ class ReferenceToNonIdentifier(UserModel):
 class MixedTargetID(UserModel):
     def __str__(self):
         return f"{pre}Attributes from more than one ID in target reference"
+
+class CircularAttributeReference(UserModel):
+    def __init__(self, chain):
+        self.chain = chain
+
+    def __str__(self):
+        return f"{pre}Referential attributes refer to each other in a cycle: {' -> '.join(self.chain)}{post}"
+
+class UntypedAttribute(UserModel):
+    def __init__(self, attr):
+        self.attr = attr
+
+    def __str__(self):
+        return f"{pre}Attribute [{self.attr}] has no type and does not refer to any other attribute{post}"
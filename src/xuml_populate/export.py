@@ -0,0 +1,119 @@
+""" export.py – Write the populated metamodel as typed tables for downstream tools """
+
+# System
+import gzip
+import json
+import shutil
+import sqlite3
+import logging
+from pathlib import Path
+
+# xUML Populate
+from xuml_populate.config import export_formats
+from xuml_populate.db import Database
+from xuml_populate.tables import RelvarTable, tclral_types, convert, quote
+
+_logger = logging.getLogger(__name__)
+
+
+class Export:
+    """
+    Export every relvar of the populated metamodel
+
+    The text printout is meant to be read, not loaded. Here each relvar is written as a typed table instead,
+    either into a single SQLite database with a primary key and unique index for each metamodel identifier,
+    or as a gzip compressed JSON lines file per relvar along with a JSON schema of their headings and
+    identifiers.
+    """
+    formats = export_formats
+
+    @classmethod
+    def tables(cls, db: str) -> list[RelvarTable]:
+        """
+        Read each relvar from the metamodel store
+
+        Args:
+            db: DB session name
+
+        Returns:
+            A table for each relvar in alphabetical order
+        """
+        return Database.tables(db)
+
+    @classmethod
+    def write(cls, db: str, name: str, export_format: str) -> Path | None:
+        """
+        Export the metamodel in the requested format
+
+        Args:
+            db: DB session name
+            name: System name used in the exported file name
+            export_format: json, sqlite or none
+
+        Returns:
+            The exported file or directory, None if nothing is exported
+        """
+        match export_format:
+            case 'sqlite':
+                return cls.to_sqlite(tables=cls.tables(db), path=Path(f"mmdb_{name}.sqlite"))
+            case 'json':
+                return cls.to_json(tables=cls.tables(db), path=Path(f"mmdb_{name}.jsonl.d"))
+            case _:
+                return None
+
+    @classmethod
+    def to_sqlite(cls, tables: list[RelvarTable], path: Path) -> Path:
+        """
+        Write each relvar as a table of a new SQLite database
+
+        Args:
+            tables: The relvar tables
+            path: The SQLite database file, replaced if it exists
+
+        Returns:
+            The SQLite database file
+        """
+        _logger.info(f"Exporting metamodel to [{path}]")
+        path.unlink(missing_ok=True)
+        con = sqlite3.connect(path)
+        with con:
+            for t in tables:
+                columns = [f"{quote(a)} {tclral_types.get(tclral_type, ('str', 'TEXT'))[1]}"
+                           for a, tclral_type in t.attributes.items()]
+                if t.identifiers:
+                    columns.append(f"PRIMARY KEY ({', '.join(map(quote, t.identifiers[0]))})")
+                con.execute(f"CREATE TABLE {quote(t.name)} ({', '.join(columns)})")
+                for i, identifier in enumerate(t.identifiers[1:], start=2):
+                    con.execute(f"CREATE UNIQUE INDEX {quote(f'{t.name}_I{i}')} ON {quote(t.name)} "
+                                f"({', '.join(map(quote, identifier))})")
+                if t.rows:
+                    con.executemany(f"INSERT INTO {quote(t.name)} VALUES ({', '.join('?' * len(t.attributes))})",
+                                    t.rows)
+        con.close()
+        return path
+
+    @classmethod
+    def to_json(cls, tables: list[RelvarTable], path: Path) -> Path:
+        """
+        Write each relvar as a gzip compressed JSON lines file, one object per tuple
+
+        The directory also holds schema.json with the heading and identifiers of each relvar.
+
+        Args:
+            tables: The relvar tables
+            path: The export directory, replaced if it exists
+
+        Returns:
+            The export directory
+        """
+        _logger.info(f"Exporting metamodel to [{path}]")
+        shutil.rmtree(path, ignore_errors=True)
+        path.mkdir(parents=True)
+        schema = {t.name: {'attributes': t.attributes, 'identifiers': t.identifiers} for t in tables}
+        with open(path / 'schema.json', 'w') as f:
+            json.dump(schema, f, indent=1)
+        for t in tables:
+            with gzip.open(path / f"{t.name}.jsonl.gz", 'wt') as f:
+                for row in t.rows:
+                    f.write(json.dumps(dict(zip(t.attributes, row))) + '\n')
+        return path
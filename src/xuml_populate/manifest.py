@@ -0,0 +1,158 @@
+""" manifest.py – Record what was populated so that a later run can repopulate only what changed """
+
+# System
+import json
+import logging
+import hashlib
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+# xUML Populate
+from xuml_populate.activity_filter import ActivityFilter
+
+_logger = logging.getLogger(__name__)
+
+# Bump this whenever the manifest content or the populated metamodel changes in an incompatible way
+manifest_version = 1
+
+
+class ActivityChanges(NamedTuple):
+    """
+    Activities within a domain whose action text has changed
+    """
+    methods: list[tuple[str, str]]  # (class name, method name)
+    states: list[tuple[str, str]]  # (state model name, state name)
+
+
+class Manifest:
+    """
+    Fingerprint of a parsed system package
+
+    The populated metamodel is saved along with a manifest that separates the parsed system into two parts:
+    the model structure (classes, relationships, signatures, states, transitions, external services) and the
+    action text of each Method and State Activity. Both are hashed.
+
+    On a later run, if only action text differs, the saved metamodel can be loaded and just the affected
+    Activities repopulated. Any change in structure requires a full population.
+    """
+
+    @classmethod
+    def path(cls, name: str) -> Path:
+        """
+        Args:
+            name: The system name used in the saved metamodel file name
+
+        Returns:
+            The manifest file path saved alongside the populated metamodel
+        """
+        return Path(f"mmdb_{name}.manifest.json")
+
+    @classmethod
+    def digest(cls, text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    @classmethod
+    def build(cls, system_data: dict, content: dict, parse_actions: bool,
+              select: Optional[ActivityFilter] = None) -> dict:
+        """
+        Fingerprint the parsed content of a system
+
+        Args:
+            system_data: The loaded system.yaml data
+            content: Parsed content of each domain as organized by the System
+            parse_actions: True if action text is parsed and populated
+            select: Patterns selecting the activities populated, if not all of them
+
+        Returns:
+            The manifest
+        """
+        structure = [repr(system_data)]
+        activities = {}
+        for domain_name, domain_parse in content.items():
+            structure.append(repr((domain_name, domain_parse['alias'], domain_parse.get('external'),
+                                   domain_parse.get('mark'))))
+            methods = {}
+            states = {}
+            for subsys_name, subsys_parse in domain_parse['subsystems'].items():
+                structure.append(repr((subsys_name, subsys_parse['class_model'])))
+                for m in subsys_parse['methods'].values():
+                    structure.append(repr(m._replace(activity=None)))
+                    methods.setdefault(m.class_name, {})[m.method] = cls.digest(m.activity)
+                for sm in subsys_parse['state_models'].values():
+                    structure.append(repr(sm._replace(states=[s._replace(activity=None) for s in sm.states])))
+                    sm_name = sm.lifecycle if sm.lifecycle else sm.assigner_rnum
+                    for s in sm.states:
+                        # State actions are populated as a single newline terminated text block
+                        states.setdefault(sm_name, {})[s.state.name] = cls.digest(''.join(s.activity) + '\n')
+            activities[domain_name] = {'methods': methods, 'states': states}
+
+        return {
+            'version': manifest_version,
+            'parse_actions': parse_actions,
+            # Only a metamodel with the same activities populated can be updated
+            'select': {k: list(v) for k, v in select._asdict().items()} if select and select.active else None,
+            'structure': cls.digest('\n'.join(structure)),
+            'activities': activities,
+        }
+
+    @classmethod
+    def load(cls, name: str) -> Optional[dict]:
+        """
+        Load the manifest saved by an earlier run
+
+        Args:
+            name: The system name
+
+        Returns:
+            The manifest or None if there isn't a readable one
+        """
+        manifest_path = cls.path(name)
+        if not manifest_path.is_file():
+            return None
+        try:
+            with open(manifest_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            _logger.warning(f"Ignoring unreadable manifest [{manifest_path}]: {e}")
+            return None
+
+    @classmethod
+    def save(cls, name: str, manifest: dict):
+        """
+        Save the manifest alongside the populated metamodel
+
+        Args:
+            name: The system name
+            manifest: The manifest to save
+        """
+        with open(cls.path(name), 'w') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+
+    @classmethod
+    def changed_activities(cls, old: dict, new: dict) -> Optional[dict[str, ActivityChanges]]:
+        """
+        Compare an earlier manifest with the current one
+
+        Args:
+            old: Manifest of the saved metamodel
+            new: Manifest of the current system package
+
+        Returns:
+            Changed activities keyed by domain name (empty if nothing changed) or None
+            if anything other than action text changed, including the selection of populated activities
+        """
+        if (old.get('version') != new['version'] or old.get('parse_actions') != new['parse_actions'] or
+                old.get('select') != new.get('select') or
+                old.get('structure') != new['structure'] or old.get('activities', {}).keys() != new['activities'].keys()):
+            return None
+
+        changes = {}
+        for domain_name, activities in new['activities'].items():
+            old_activities = old['activities'][domain_name]
+            methods = [(cname, mname) for cname, digests in activities['methods'].items()
+                       for mname, h in digests.items() if old_activities['methods'][cname][mname] != h]
+            states = [(sm_name, sname) for sm_name, digests in activities['states'].items()
+                      for sname, h in digests.items() if old_activities['states'][sm_name][sname] != h]
+            if methods or states:
+                changes[domain_name] = ActivityChanges(methods=methods, states=states)
+        return changes
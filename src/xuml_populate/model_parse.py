@@ -0,0 +1,167 @@
+""" model_parse.py – Parse all model files in a system package, optionally in parallel """
+
+# System
+import logging
+import copyreg
+from pathlib import Path
+from typing import NamedTuple, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+
+# xUML Populate
+from xuml_populate.parse_cache import ParseCache, parser_lock
+
+_logger = logging.getLogger(__name__)
+
+
+def _make_state_model(*fields):
+    from xsm_parser.state_model_visitor import StateModel_a
+    _register_state_model()  # The parse may be pickled again, to be sent on to a worker process
+    return StateModel_a(*fields)
+
+
+def _register_state_model():
+    """
+    The xsm parser names its namedtuple type 'State_model_a' but binds it to StateModel_a, so the default
+    pickle lookup by name fails. Register a reducer so that state model parses can cross process boundaries.
+    """
+    from xsm_parser.state_model_visitor import StateModel_a
+    copyreg.pickle(StateModel_a, lambda sm: (_make_state_model, tuple(sm)))
+
+
+class SubsystemFiles(NamedTuple):
+    """
+    All model files found in one subsystem folder, listed in the order they are processed
+    """
+    path: Path
+    class_model: Path
+    methods: list[Path]
+    state_models: list[Path]
+    external: Path | None
+
+
+class ModelParse:
+    """
+    Parse the class model, method and state model files of a system package
+
+    Each file is parsed independently of the others, so the whole set can be spread across a pool
+    of worker processes. Results are always returned in the order the files were requested.
+    """
+
+    @classmethod
+    def find_subsystem_files(cls, subsys_path: Path) -> SubsystemFiles:
+        """
+        Gather the paths of all model files in a subsystem folder
+
+        Args:
+            subsys_path: Path to the subsystem folder
+
+        Returns:
+            The subsystem's model file paths
+        """
+        # The class file name must match the subsystem folder name
+        # Any other .xcm files will be ignored (only one class model recognized per subsystem)
+        cm_path = subsys_path / "class-model" / f"{subsys_path.stem}.xcm"
+
+        method_files = []
+        method_path = subsys_path / "methods"
+        if method_path.is_dir():
+            # Find all class folders in the current subsystem methods directory
+            class_folders = [f for f in method_path.iterdir() if f.is_dir()]
+            for class_folder in class_folders:
+                method_files.extend(class_folder.glob("*.mtd"))
+        else:
+            _logger.info("No method dir")
+
+        sm_files = []
+        sm_path = subsys_path / "state-machines"
+        if sm_path.is_dir():
+            sm_files.extend(sm_path.glob("*.xsm"))
+        else:
+            _logger.info("No state-machines dir")
+
+        ext_path = subsys_path / "external"
+        if not ext_path.is_dir():
+            _logger.info("No external dir")
+            ext_path = None
+
+        return SubsystemFiles(path=subsys_path, class_model=cm_path, methods=method_files,
+                              state_models=sm_files, external=ext_path)
+
+    @classmethod
+    def parse_file(cls, path: Path, cache_path: Optional[Path] = None) -> Any:
+        """
+        Parse a single model file, or fetch its parse from the cache if one is supplied
+
+        Args:
+            path: Path to an .xcm, .mtd or .xsm file
+            cache_path: Parse cache directory, if any
+
+        Returns:
+            The parse result for that file
+        """
+        if not cache_path:
+            return cls.run_parser(path)
+        return ParseCache.fetch(kind=path.suffix, content=path.read_bytes(), parse=lambda: cls.run_parser(path),
+                                cache_path=cache_path)
+
+    @classmethod
+    def run_parser(cls, path: Path) -> Any:
+        """
+        Parse a single model file with the parser matching its file extension
+
+        Each parser is imported only once a file of its kind is parsed. A system without state models, or one
+        whose files are all in the parse cache, never loads the parsers it doesn't need.
+
+        Args:
+            path: Path to an .xcm, .mtd or .xsm file
+
+        Returns:
+            The parse result for that file
+        """
+        with parser_lock:
+            match path.suffix:
+                case ".xcm":
+                    _logger.info(f"Processing class model: [{path}]")
+                    from xcm_parser.class_model_parser import ClassModelParser
+                    return ClassModelParser.parse_file(file_input=path, debug=False)
+                case ".mtd":
+                    _logger.info(f"Processing method: [{path}]")
+                    from mtd_parser.method_parser import MethodParser
+                    return MethodParser.parse_file(path, debug=False)
+                case ".xsm":
+                    _logger.info(f"Processing state model: [{path}]")
+                    from xsm_parser.state_model_parser import StateModelParser
+                    _register_state_model()
+                    return StateModelParser.parse_file(file_input=path, debug=False)
+                case _:
+                    raise ValueError(f"No model parser for file: [{path}]")
+
+    @classmethod
+    def parse_files(cls, paths: list[Path], jobs: int = 1, cache_path: Optional[Path] = None) -> list[Any]:
+        """
+        Parse each model file, in parallel if more than one job is requested
+
+        Args:
+            paths: Model files to parse
+            jobs: Number of worker processes, 1 or less parses serially in this process
+            cache_path: Parse cache directory, if any
+
+        Returns:
+            Parse results in the same order as the supplied paths
+        """
+        if jobs <= 1 or len(paths) < 2:
+            return [cls.parse_file(p, cache_path) for p in paths]
+
+        _logger.info(f"Parsing {len(paths)} model files with {jobs} jobs")
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(cls.parse_file, p, cache_path) for p in paths]
+            results = []
+            for p, f in zip(paths, futures):
+                try:
+                    results.append(f.result())
+                except Exception:
+                    # Parser exceptions don't always survive the trip back from a worker intact,
+                    # so we parse the failing file again here to raise the original error
+                    _logger.error(f"Parse failed in worker process: [{p}]")
+                    results.append(cls.run_parser(p))
+            return results
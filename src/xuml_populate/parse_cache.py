@@ -0,0 +1,187 @@
+""" parse_cache.py – Content addressed on-disk cache of model file and Scrall parse results """
+
+# System
+import os
+import logging
+import pickle
+import hashlib
+import threading
+from pathlib import Path
+from typing import Callable, Any, Optional
+from importlib.metadata import version, PackageNotFoundError
+from concurrent.futures import ProcessPoolExecutor
+
+# xUML Populate
+from xuml_populate.context import ContextScoped, ContextState
+
+_logger = logging.getLogger(__name__)
+
+# Parser package responsible for each kind of cached content
+parser_packages = {
+    '.xcm': 'xcm-parser',
+    '.mtd': 'mtd-parser',
+    '.xsm': 'xsm-parser',
+    'scrall': 'scrall',
+}
+
+# The parsers keep the text being parsed in class attributes, so threads populating at once take turns parsing
+parser_lock = threading.Lock()
+
+
+class ParseCache(metaclass=ContextScoped):
+    """
+    Reuse parse results across populator runs
+
+    Each parse result is pickled into the cache directory under a key computed from the hash of the parsed
+    text and the version of the parser package that produced it. So an edited file, or an upgraded parser,
+    simply misses the cache and is parsed again. Stale entries are never consulted and can be removed by
+    deleting the cache directory.
+    """
+    path: Optional[Path] = ContextState()  # Cache directory, caching is disabled when not set
+    scrall: dict[str, Any] = ContextState(dict)  # Scrall parses prepared before population, by action text
+    _versions: dict[str, str] = {}  # Parser package version by content kind
+
+    @classmethod
+    def parser_version(cls, kind: str) -> str:
+        """
+        Get the installed version of the parser package for a kind of content
+
+        Args:
+            kind: A model file suffix such as '.mtd' or 'scrall' for action text
+
+        Returns:
+            The parser package version string
+        """
+        if kind not in cls._versions:
+            try:
+                cls._versions[kind] = version(parser_packages[kind])
+            except PackageNotFoundError:
+                cls._versions[kind] = 'unknown'
+        return cls._versions[kind]
+
+    @classmethod
+    def key(cls, kind: str, content: bytes) -> str:
+        """
+        Compute the cache key of some parsed content
+
+        Args:
+            kind: A model file suffix such as '.mtd' or 'scrall' for action text
+            content: The text to be parsed
+
+        Returns:
+            A hex digest naming the cache entry
+        """
+        h = hashlib.sha256()
+        h.update(f"{kind}:{cls.parser_version(kind)}:".encode())
+        h.update(content)
+        return h.hexdigest()
+
+    @classmethod
+    def fetch(cls, kind: str, content: bytes, parse: Callable[[], Any], cache_path: Optional[Path] = None) -> Any:
+        """
+        Return the cached parse of some content, parsing and caching it on a miss
+
+        Args:
+            kind: A model file suffix such as '.mtd' or 'scrall' for action text
+            content: The text to be parsed
+            parse: Produces the parse result when the cache misses
+            cache_path: Cache directory, defaults to the configured one
+
+        Returns:
+            The parse result
+        """
+        cache_path = cache_path or cls.path
+        if not cache_path:
+            return parse()
+
+        entry = cache_path / f"{cls.key(kind=kind, content=content)}.pickle"
+        if entry.is_file():
+            try:
+                with open(entry, 'rb') as f:
+                    return pickle.load(f)
+            except Exception as e:
+                # A damaged or incompatible entry is just a miss
+                _logger.warning(f"Ignoring unreadable parse cache entry [{entry}]: {e}")
+
+        result = parse()
+        cache_path.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so that a concurrent reader (another parse process)
+        # or thread never sees a partial entry
+        tmp_entry = entry.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_entry, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_entry, entry)
+        return result
+
+    @classmethod
+    def parse_scrall(cls, scrall_text: str):
+        """
+        Parse Scrall action text, reusing a cached parse if available
+
+        Args:
+            scrall_text: The action text of an activity
+
+        Returns:
+            The Scrall parse
+        """
+        if scrall_text in cls.scrall:
+            return cls.scrall[scrall_text]
+        return cls.fetch(kind='scrall', content=scrall_text.encode(),
+                         parse=lambda: locked_scrall_parse(scrall_text))
+
+    @classmethod
+    def preparse_scrall(cls, texts: list[str], jobs: int):
+        """
+        Parse the action text of many activities across a pool of processes ahead of population
+
+        Each parse is then picked up by parse_scrall when its activity is populated. Any text that fails to
+        parse here is simply left out, so that it is parsed again during population where the error is
+        reported along with its activity.
+
+        Args:
+            texts: Action text of each activity to be populated
+            jobs: Number of worker processes, nothing is parsed ahead unless more than one
+        """
+        texts = [t for t in dict.fromkeys(texts) if t not in cls.scrall]
+        if jobs <= 1 or len(texts) < 2:
+            return
+
+        _logger.info(f"Parsing {len(texts)} activities with {jobs} jobs")
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(parse_scrall_text, t, cls.path) for t in texts]
+            for t, f in zip(texts, futures):
+                try:
+                    cls.scrall[t] = f.result()
+                except Exception:
+                    _logger.warning("Scrall parse failed in worker process, parsing again during population")
+
+
+def parse_scrall_text(scrall_text: str, cache_path: Optional[Path]):
+    """
+    Parse Scrall action text in a worker process
+
+    Args:
+        scrall_text: The action text of an activity
+        cache_path: Parse cache directory, if any
+
+    Returns:
+        The Scrall parse
+    """
+    return ParseCache.fetch(kind='scrall', content=scrall_text.encode(), cache_path=cache_path,
+                            parse=lambda: locked_scrall_parse(scrall_text))
+
+
+def locked_scrall_parse(scrall_text: str):
+    """
+    Parse Scrall action text while no other thread is parsing
+
+    Args:
+        scrall_text: The action text of an activity
+
+    Returns:
+        The Scrall parse
+    """
+    from scrall.parse.parser import ScrallParser  # Only once there is action text to parse
+
+    with parser_lock:
+        return ScrallParser.parse_text(scrall_text=scrall_text, debug=False)
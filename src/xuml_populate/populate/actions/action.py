@@ -8,22 +8,21 @@ from typing import Set, Dict, List, Optional
 
 # Model Integration
 from scrall.parse.visitor import PATH_a
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
 
 # xUML Populate
+from xuml_populate.context import ContextScoped, ContextState
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
 from xuml_metamodel.mmclass_nt import Action_i
 
 _logger = logging.getLogger(__name__)
 
-class Action:
+class Action(metaclass=ContextScoped):
     """
     A metamodel action
     """
 
-    next_action_id = {}
+    next_action_id = ContextState(dict)
 
     @classmethod
     def populate(cls, tr: str, anum: str, domain: str, action_type: str) -> str:
@@ -7,9 +7,6 @@ from typing import TYPE_CHECKING, Optional
 
 # Model Integration
 from scrall.parse.visitor import Call_a, Supplied_Parameter_a
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
 
 from xuml_populate.populate.actions.write_action import WriteAction
 
@@ -18,6 +15,7 @@ if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.utility import print_mmdb
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
 from xuml_populate.populate.flow import Flow, Flow_ap
 from xuml_populate.populate.attribute import Attribute
 from xuml_populate.populate.actions.method_call import MethodCall
@@ -6,17 +6,15 @@ import logging
 from typing import Optional
 from collections import namedtuple
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
-
 # xUML Populate
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.exceptions.action_exceptions import *
 from xuml_populate.populate.actions.aparse_types import Flow_ap
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import Cardinality_Action_i, Relational_Action_i, Scalar_i, Type_i
 
 if __debug__:
@@ -54,9 +52,7 @@ class CardinalityAction:
             This action id and the Scalar output cardinality flow
         """
         # Verify that the Posint Scalar is defined
-        R = f"Name:<{CARD_TYPE}>, Domain:<{self.domain}>"
-        scalar_r = Relation.restrict(db=mmdb, relation="Scalar", restriction=R)
-        if not scalar_r.body:
+        if not RelvarIndex.exists('Scalar', Name=CARD_TYPE, Domain=self.domain):
             # Insert the Scalar
             Transaction.open(db=mmdb, name=tr_Scalar)
             Relvar.insert(db=mmdb, tr=tr_Scalar, relvar="Scalar", tuples=[Scalar_i(Name=CARD_TYPE, Domain=self.domain)])
@@ -74,11 +70,13 @@ class CardinalityAction:
                                               domain=self.domain, activity_tr=tr_Card)
 
         # Insert the Cardinality Action
-        Relvar.insert(db=mmdb, tr=tr_Card, relvar='Cardinality Action', tuples=[
+        usage = [
             Cardinality_Action_i(ID=action_id, Activity=self.anum, Domain=self.domain,
                                  Non_scalar_input_flow=self.ns_flow.fid,
                                  Output_cardinality_flow=sflow_out.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Card, relvar='Cardinality Action', tuples=usage)
+        FlowUsage.record(relvar='Cardinality Action', tuples=usage)
 
         Relvar.insert(db=mmdb, tr=tr_Card, relvar='Relational_Action', tuples=[
             Relational_Action_i(ID=action_id, Activity=self.anum, Domain=self.domain)
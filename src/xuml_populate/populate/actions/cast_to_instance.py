@@ -7,18 +7,15 @@ import logging
 from typing import TYPE_CHECKING, Optional
 from collections import namedtuple
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
-
 # xUML populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
 from xuml_populate.populate.actions.aparse_types import Flow_ap, MaxMult, Content
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.flow import Flow
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import Cast_To_Instance_i, Flow_Connector_i, Instance_Action_i
 
 if __debug__:
@@ -80,10 +77,12 @@ class CastToInstance:
         Relvar.insert(db=mmdb, tr=tr_CastToInstance, relvar='Flow Connector', tuples=[
             Flow_Connector_i(ID=aid, Activity=self.anum, Domain=self.domain)
         ])
-        Relvar.insert(db=mmdb, tr=tr_CastToInstance, relvar='Cast To Instance', tuples=[
+        usage = [
             Cast_To_Instance_i(ID=aid, Activity=self.anum, Domain=self.domain, Instance_flow=cast_iflow.fid,
                                Relation_flow=self.relation_flow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_CastToInstance, relvar='Cast To Instance', tuples=usage)
+        FlowUsage.record(relvar='Cast To Instance', tuples=usage)
         Transaction.execute(db=mmdb, name=tr_CastToInstance)
 
         return aid, cast_iflow
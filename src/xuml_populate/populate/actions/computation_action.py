@@ -7,9 +7,6 @@ import logging
 from typing import Sequence, TYPE_CHECKING, Optional
 
 # Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
 from scrall.parse.visitor import BOOL_a, MATH_a, IN_a, N_a
 
 
@@ -20,10 +17,12 @@ from xuml_populate.exceptions.action_exceptions import ActionException, Incomple
 from xuml_populate.populate.actions.expressions.instance_set import InstanceSet
 from xuml_populate.populate.actions.expressions.table_expr import TableExpr
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
 from xuml_populate.populate.actions.aparse_types import Flow_ap, MaxMult, Content, Boundary_Actions
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.actions.type_selector import TypeSelector
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import (
     Computation_Action_i, Computation_Input_i, Instance_Action_i,
     General_Computation_i, Boolean_Partition_i
@@ -294,9 +293,11 @@ class ComputationAction:
             Computation_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain, Expression=walk_expr)
         ])
         for f in self.operand_flows:
-            Relvar.insert(db=mmdb, tr=tr_Compute, relvar='Computation Input', tuples=[
+            usage = [
                 Computation_Input_i(Computation=self.action_id, Activity=self.anum, Domain=self.domain, Input_flow=f)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_Compute, relvar='Computation Input', tuples=usage)
+            FlowUsage.record(relvar='Computation Input', tuples=usage)
 
         if self.bpart:
             # We don't label the flows since we know there is an assignment to labeled flows
@@ -319,10 +320,12 @@ class ComputationAction:
             scalar_type = self.cast_type if self.cast_type else self.output_type
             output_flow = Flow.populate_scalar_flow(scalar_type=scalar_type, anum=self.anum, domain=self.domain,
                                                     label=f"_{walk_expr}", activity_tr=tr_Compute)
-            Relvar.insert(db=mmdb, tr=tr_Compute, relvar='General Computation', tuples=[
+            usage = [
                 General_Computation_i(ID=self.action_id, Activity=self.anum, Domain=self.domain,
                                       Result_flow=output_flow.fid)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_Compute, relvar='General Computation', tuples=usage)
+            FlowUsage.record(relvar='General Computation', tuples=usage)
             output_flows = [output_flow]
 
         Transaction.execute(db=mmdb, name=tr_Compute)
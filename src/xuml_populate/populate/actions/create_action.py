@@ -8,19 +8,19 @@ from typing import Any, Optional, TYPE_CHECKING, Self
 
 # Model Integration
 from scrall.parse.visitor import New_inst_a
-from pyral.relation import Relation
-from pyral.relvar import Relvar
-from pyral.transaction import Transaction
 
 # xUML populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.populate.actions.new_assoc_ref_action import NewAssociativeReferenceAction
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.populate.actions.aparse_types import Boundary_Actions, New_delegated_inst
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.flow import Flow
 from xuml_populate.exceptions.action_exceptions import *
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import (Create_Action_i, Instance_Initialization_i, Attribute_Initialization_i,
                                                Explicit_Initialization_i, Reference_Initialization_i,
                                                Default_Initialization_i, Local_Create_Action_i,
@@ -123,10 +123,12 @@ class CreateAction:
                 Delegated_Create_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain)
             ])
         else:
-            Relvar.insert(db=mmdb, tr=tr_Create, relvar='Local Create Action', tuples=[
+            usage = [
                 Local_Create_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain,
                                       New_instance_flow=output_flow.fid)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_Create, relvar='Local Create Action', tuples=usage)
+            FlowUsage.record(relvar='Local Create Action', tuples=usage)
 
         # When this class does not participate in any generalization, there is only one of these
         # TODO: Check for generalization
@@ -173,11 +175,13 @@ class CreateAction:
 
         if self.is_delegated:
             for attr_name, attr_flow in self.attr_flows.items():
-                Relvar.insert(db=mmdb, tr=tr_Create, relvar='Explicit Initialization', tuples=[
+                usage = [
                     Explicit_Initialization_i(Create_action=self.action_id, Attribute=attr_name, Class=self.class_name,
                                               Activity=self.anum, Domain=self.domain,
                                               Initial_value_flow=attr_flow)
-                ])
+                ]
+                Relvar.insert(db=mmdb, tr=tr_Create, relvar='Explicit Initialization', tuples=usage)
+                FlowUsage.record(relvar='Explicit Initialization', tuples=usage)
         else:
             # Process all explicit non referential attribute initializations
             from xuml_populate.populate.actions.expressions.scalar_expr import ScalarExpr
@@ -192,24 +196,25 @@ class CreateAction:
                 sflow = sflows[0]
 
                 # Verify that the scalar input matches the attribute scalar
-                R = f"Name:<{name}>, Class:<{self.class_name}>, Domain:<{self.domain}>"
-                attribute_r = Relation.restrict(db=mmdb, relation="Attribute", restriction=R)
-                if not attribute_r.body:
+                attribute = RelvarIndex.lookup('Attribute', Name=name, Class=self.class_name, Domain=self.domain)
+                if not attribute:
                     msg = f"Attribute {self.domain}::{self.class_name}.{name} not defined"
                     _logger.error(msg)
                     raise ActionException(msg)
-                attr_type = attribute_r.body[0]['Scalar']
+                attr_type = attribute[0]['Scalar']
                 if attr_type != sflow.tname:
                     msg = (f"Explicit attribute initialization type mismatch input flow type: {sflow.tname} : does "
                            f"not match attribute type: {attr_type}")
                     _logger.error(msg)
                     ActionException(msg)
 
-                Relvar.insert(db=mmdb, tr=tr_Create, relvar='Explicit Initialization', tuples=[
+                usage = [
                     Explicit_Initialization_i(Create_action=self.action_id, Attribute=name, Class=self.class_name,
                                               Activity=self.anum, Domain=self.domain,
                                               Initial_value_flow=sflow.fid)
-                ])
+                ]
+                Relvar.insert(db=mmdb, tr=tr_Create, relvar='Explicit Initialization', tuples=usage)
+                FlowUsage.record(relvar='Explicit Initialization', tuples=usage)
 
         # Now process each implicit initialization
         # Find all non referential attributes with no value explicitly specified, these will require default values
@@ -219,9 +224,9 @@ class CreateAction:
             default_init_attrs = non_ref_attr_names - set(self.attr_exprs.keys())
 
         for da in default_init_attrs:
-            R = f"Attribute:<{da}>, Class:<{self.class_name}>, Domain:<{self.domain}>"
-            default_ival_r = Relation.restrict(db=mmdb, relation='Default Initial Value', restriction=R)
-            if len(default_ival_r.body) == 1:
+            default_ival = RelvarIndex.lookup('Default Initial Value', Attribute=da, Class=self.class_name,
+                                              Domain=self.domain)
+            if len(default_ival) == 1:
                 # Indicate that there is a value available in the metamodel
                 Relvar.insert(db=mmdb, tr=tr_Create, relvar='Default Initialization', tuples=[
                     Default_Initialization_i(Create_action=self.action_id, Attribute=r, Class=self.class_name,
@@ -265,12 +270,14 @@ class CreateAction:
                     )
                     tuple_fid, ref_attr_names = ref_action.populate()
                     for n in ref_attr_names:
-                        Relvar.insert(db=mmdb, tr=tr_Create, relvar='Reference Initialization', tuples=[
+                        usage = [
                             Reference_Initialization_i(Create_action=self.action_id, Attribute=n, Class=self.class_name,
                                                        Activity=self.anum, Domain=self.domain,
                                                        Initial_value_flow=tuple_fid
                                                     )
-                        ])
+                        ]
+                        Relvar.insert(db=mmdb, tr=tr_Create, relvar='Reference Initialization', tuples=usage)
+                        FlowUsage.record(relvar='Reference Initialization', tuples=usage)
 
                 pass
 
@@ -286,12 +293,14 @@ class CreateAction:
                     )
                     tuple_fid, ref_attr_names = ref_action.populate()
                     for n in ref_attr_names:
-                        Relvar.insert(db=mmdb, tr=tr_Create, relvar='Reference Initialization', tuples=[
+                        usage = [
                             Reference_Initialization_i(Create_action=self.action_id, Attribute=n, Class=self.class_name,
                                                        Activity=self.anum, Domain=self.domain,
                                                        Initial_value_flow=tuple_fid
                                                        )
-                        ])
+                        ]
+                        Relvar.insert(db=mmdb, tr=tr_Create, relvar='Reference Initialization', tuples=usage)
+                        FlowUsage.record(relvar='Reference Initialization', tuples=usage)
                 else:
                     pass
                     # New simple ref action
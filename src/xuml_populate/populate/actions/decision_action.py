@@ -8,9 +8,6 @@ import logging
 
 # Model Integration
 from scrall.parse.visitor import Decision_a, Signal_a, Comp_Statement_Set_a
-from pyral.relvar import Relvar
-from pyral.relvar import Relation
-from pyral.transaction import Transaction
 
 # xUML populate
 if TYPE_CHECKING:
@@ -19,6 +16,7 @@ from xuml_populate.utility import print_mmdb
 from xuml_populate.populate.actions.computation_action import ComputationAction
 from xuml_populate.populate.actions.expressions.instance_set import InstanceSet
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
 from xuml_populate.populate.actions.aparse_types import ActivityAP, Boundary_Actions
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.flow import Flow
@@ -26,6 +24,7 @@ from xuml_populate.populate.actions.expressions.scalar_expr import ScalarExpr
 from xuml_metamodel.mmclass_nt import (Result_i, Decision_Action_i,
                                                Pass_Action_i, Instance_Action_i, Flow_Connector_i)
 from xuml_populate.exceptions.action_exceptions import *
+from xuml_populate.populate.flow_usage import FlowUsage
 
 _logger = logging.getLogger(__name__)
 
@@ -165,10 +164,12 @@ class DecisionAction:
             Relvar.insert(db=mmdb, tr=tr_ResultPass, relvar='Flow Connector', tuples=[
                 Flow_Connector_i(ID=pass_aid, Activity=self.anum, Domain=self.domain)
             ])
-            Relvar.insert(db=mmdb, tr=tr_ResultPass, relvar='Pass Action', tuples=[
+            usage = [
                 Pass_Action_i(ID=pass_aid, Activity=self.anum, Domain=self.domain, Input_flow=self.decision_input_flow.fid,
                               Output_flow=pass_output_flow.fid)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_ResultPass, relvar='Pass Action', tuples=usage)
+            FlowUsage.record(relvar='Pass Action', tuples=usage)
             Transaction.execute(db=mmdb, name=tr_ResultPass)
 
         if false_result:
@@ -189,10 +190,12 @@ class DecisionAction:
         self.action_id = Action.populate(tr=tr_Decision, anum=self.anum, domain=self.domain, action_type="decision")
 
         # input_init_aids.add(self.action_id)
-        Relvar.insert(db=mmdb, tr=tr_Decision, relvar='Decision Action', tuples=[
+        usage = [
             Decision_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain,
                               Boolean_input=self.decision_input_flow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Decision, relvar='Decision Action', tuples=usage)
+        FlowUsage.record(relvar='Decision Action', tuples=usage)
         # Populate Results (Control Flows)
         true_result_flow = Flow.populate_control_flow(tr=tr_Decision, enabled_actions=true_init_actions,
                                                       anum=self.anum, domain=self.domain,
@@ -202,10 +205,12 @@ class DecisionAction:
         if len(true_init_actions) > 1:
             self.activity.block_enabled_actions[self.action_id][true_result_flow] = true_init_actions
 
-        Relvar.insert(db=mmdb, tr=tr_Decision, relvar='Result', tuples=[
+        usage = [
             Result_i(Decision=True, Decision_action=self.action_id, Activity=self.anum, Domain=self.domain,
                      Flow=true_result_flow)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Decision, relvar='Result', tuples=usage)
+        FlowUsage.record(relvar='Result', tuples=usage)
         if false_result:
             false_result_flow = Flow.populate_control_flow(tr=tr_Decision, enabled_actions=false_init_actions,
                                                            anum=self.anum, domain=self.domain,
@@ -215,10 +220,12 @@ class DecisionAction:
             if len(false_init_actions) > 1:
                 self.activity.block_enabled_actions[self.action_id][false_result_flow] = false_init_actions
 
-            Relvar.insert(db=mmdb, tr=tr_Decision, relvar='Result', tuples=[
+            usage = [
                 Result_i(Decision=False, Decision_action=self.action_id, Activity=self.anum, Domain=self.domain,
                          Flow=false_result_flow)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_Decision, relvar='Result', tuples=usage)
+            FlowUsage.record(relvar='Result', tuples=usage)
         Transaction.execute(db=mmdb, name=tr_Decision)
 
         # Decision action always reports self as initial and final.  See comment under process def above
@@ -7,9 +7,6 @@ import logging
 from typing import Any, TYPE_CHECKING
 
 # Model Integration
-from pyral.relation import Relation
-from pyral.relvar import Relvar
-from pyral.transaction import Transaction
 from scrall.parse.visitor import INST_a
 
 # xUML populate
@@ -17,11 +14,13 @@ if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.utility import print_mmdb
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
 from xuml_populate.populate.actions.aparse_types import Boundary_Actions
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.exceptions.action_exceptions import *
 from xuml_metamodel.mmclass_nt import Delete_Action_i, Instance_Action_i
 from xuml_populate.populate.actions.expressions.instance_set import InstanceSet
+from xuml_populate.populate.flow_usage import FlowUsage
 
 _logger = logging.getLogger(__name__)
 
@@ -67,10 +66,12 @@ class DeleteAction:
         Relvar.insert(db=mmdb, tr=tr_Delete, relvar='Instance Action', tuples=[
             Instance_Action_i(ID=self.action_id, Activity=self.activity.anum, Domain=self.activity.domain)
         ])
-        Relvar.insert(db=mmdb, tr=tr_Delete, relvar='Delete Action', tuples=[
+        usage = [
             Delete_Action_i(ID=self.action_id, Activity=self.activity.anum, Domain=self.activity.domain,
                             Flow=i_flow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Delete, relvar='Delete Action', tuples=usage)
+        FlowUsage.record(relvar='Delete Action', tuples=usage)
 
         Transaction.execute(db=mmdb, name=tr_Delete)
 
@@ -7,15 +7,13 @@ from typing import TYPE_CHECKING
 
 # Model Integration
 from scrall.parse.visitor import Delete_Group_a
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
 
 # xUML Populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.utility import print_mmdb
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
 from xuml_populate.populate.actions.delete_action import DeleteAction
 from xuml_populate.exceptions.action_exceptions import *
 from xuml_populate.populate.actions.aparse_types import Boundary_Actions
@@ -6,13 +6,10 @@ class_accessor.py – Populate a Class Accessor action instance in PyRAL
 import logging
 from typing import Optional
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
-
 # xUML Populate
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_metamodel.mmclass_nt import Class_Accessor_i
 from xuml_populate.populate.flow import Flow
 
@@ -36,16 +33,13 @@ class ClassAccessor:
         :return: The output flow id of an existing or newly populated class accessor or none name is not a class
         """
         # Return None if the name does not match any defined Class
-        R = f"Name:<{name}>, Domain:<{domain}>"
-        class_r = Relation.restrict(db=mmdb, relation='Class', restriction=R)
-        if not class_r.body:
+        if not RelvarIndex.exists('Class', Name=name, Domain=domain):
             return None
 
         # Return flow id of existing Class Accessor
-        R = f"Class:<{name}>, Activity:<{anum}>, Domain:<{domain}>"
-        ca_r = Relation.restrict(db=mmdb, relation='Class Accessor', restriction=R)
-        if ca_r.body:
-            return ca_r.body[0]["Output_flow"]
+        ca = RelvarIndex.lookup('Class Accessor', Class=name, Activity=anum, Domain=domain)
+        if ca:
+            return ca[0]["Output_flow"]
 
         # Populate a Class Accessor and Multiple Instance Flow returning the flow id
         Transaction.open(db=mmdb, name=tr_Class_Accessor)
@@ -7,7 +7,6 @@ from typing import TYPE_CHECKING
 
 # Model Integration
 from scrall.parse.visitor import Enum_a
-from pyral.relation import Relation
 
 # xUML Populate
 if TYPE_CHECKING:
@@ -15,6 +14,7 @@ if TYPE_CHECKING:
 from xuml_populate.exceptions.action_exceptions import *
 from xuml_populate.populate.flow import Flow
 from xuml_populate.config import mmdb
+from xuml_populate.relvar_index import RelvarIndex
 
 _logger = logging.getLogger(__name__)
 
@@ -38,14 +38,13 @@ class EnumFlow:
         Returns:
 
         """
-        R = f"Name:<{attr_name}>, Class:<{class_name}>, Domain:<{self.activity.domain}>"
-        attr_r = Relation.restrict(db=mmdb, relation="Attribute", restriction=R)
-        if len(attr_r.body) != 1:
+        attr_r = RelvarIndex.lookup('Attribute', Name=attr_name, Class=class_name, Domain=self.activity.domain)
+        if len(attr_r) != 1:
             msg = (f"Attribute {self.activity.domain}::{class_name}.{attr_name} not defined "
                    f"in {self.activity.activity_path}")
             _logger.error(msg)
             raise ActionException(msg)
-        scalar_type = attr_r.body[0]["Scalar"]
+        scalar_type = attr_r[0]["Scalar"]
         # Find the type name
         # Determine the flow type
         f = Flow.populate_scalar_flow(scalar_type=scalar_type, anum=self.activity.anum, domain=self.activity.domain,
@@ -4,16 +4,13 @@
 import logging
 from typing import Optional, TYPE_CHECKING
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
-
 # xUML Populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.populate.actions.traverse_action import TraverseAction
 from xuml_populate.populate.actions.create_action import CreateAction
 from xuml_populate.populate.actions.external_operation import ExternalOperation
@@ -197,9 +194,8 @@ class InstanceSet:
                 case 'Op_a':
                     if comp.ee:
                         # The owner is an External Entity, so we need to populate an External Operation
-                        R = f"Name:<{comp.op_name}>, EE:<{comp.owner}>, Domain:<{domain}>"
-                        ext_op_r = Relation.restrict(db=mmdb, relation="External Operation", restriction=R)
-                        if not ext_op_r.body:
+                        if not RelvarIndex.exists('External Operation', Name=comp.op_name, EE=comp.owner,
+                                                  Domain=domain):
                             msg = f"Undefined external operation {comp.op_name} in: {self.activity.activity_path}"
                             _logger.error(msg)
                             raise ActionException(msg)
@@ -220,8 +216,8 @@ class InstanceSet:
                             raise ActionException(msg)
 
                         # Verify that the method is defined on the component flow class
-                        R = f"Name:<{op_name}>, Class:<{self.component_flow.tname}>, Domain:<{self.activity.domain}>"
-                        method_r = Relation.restrict(db=mmdb, relation='Method', restriction=R)
+                        method_r = RelvarIndex.lookup('Method', Name=op_name, Class=self.component_flow.tname,
+                                                      Domain=self.activity.domain)
                         if not method_r:
                             msg = (f"Called method [{op_name}] not defined on [{self.component_flow.tname}] in "
                                    f"{self.activity.activity_path}")
@@ -229,7 +225,7 @@ class InstanceSet:
                             raise ActionException(msg)
 
                         # Method and instance target valid
-                        method_t = method_r.body[0]
+                        method_t = method_r[0]
                         from xuml_populate.populate.actions.method_call import MethodCall
                         mcall = MethodCall(
                             method_name=op_name, method_anum=method_t["Anum"],
@@ -265,8 +261,8 @@ class InstanceSet:
                             inst_class_name = inst_flow_r.body[0]['Class']
 
                             # Verify that the method is defined on this class
-                            R = f"Name:<{op_name}>, Class:<{inst_class_name}>, Domain:<{self.activity.domain}>"
-                            method_r = Relation.restrict(db=mmdb, relation='Method', restriction=R)
+                            method_r = RelvarIndex.lookup('Method', Name=op_name, Class=inst_class_name,
+                                                          Domain=self.activity.domain)
                             if not method_r:
                                 msg = (f"Called method [{op_name}] not defined on [{inst_class_name}] in "
                                        f"{self.activity.activity_path}")
@@ -275,7 +271,7 @@ class InstanceSet:
 
                             # Method and instance target valid
                             inst_flow_t = inst_flow_r.body[0]
-                            method_t = method_r.body[0]
+                            method_t = method_r[0]
                             from xuml_populate.populate.actions.method_call import MethodCall
                             mcall = MethodCall(method_name=op_name, method_anum=method_t["Anum"], caller_flow=
                                                Flow_ap( fid=inst_flow_t["ID"], content=Content.INSTANCE,
@@ -7,14 +7,14 @@ import logging
 from typing import Optional, Set, Dict, List, TYPE_CHECKING
 
 # Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
 from scrall.parse.visitor import N_a, BOOL_a, Op_a, Criteria_Selection_a
 
 # xUML Populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.exceptions.action_exceptions import ActionException, IncompleteActionException
 from xuml_populate.populate.attribute import Attribute
 from xuml_populate.populate.actions.validation.parameter_validation import validate_param
@@ -25,6 +25,7 @@ from xuml_populate.exceptions.action_exceptions import ComparingNonAttributeInSe
 from xuml_metamodel.mmclass_nt import (Restriction_Condition_i, Equivalence_Criterion_i,
                                                Comparison_Criterion_i, Criterion_i, Table_Restriction_Condition_i)
 from xuml_populate.populate.flow import Flow
+from xuml_populate.populate.flow_usage import FlowUsage
 
 if __debug__:
     from xuml_populate.utility import print_mmdb
@@ -184,9 +185,8 @@ class RestrictCondition:
                             text += f" {criterion_id}"
                         # Is this an identifier attribute combined with the == operator?
                         if operator == '==':
-                            R = f"Attribute:<{o.name}>, Class:<{self.input_nsflow.tname}>, Domain:<{self.domain}>"
-                            identifier_r = Relation.restrict(db=mmdb, relation='Identifier Attribute', restriction=R)
-                            if identifier_r.body:
+                            if RelvarIndex.exists('Identifier Attribute', Attribute=o.name,
+                                                  Class=self.input_nsflow.tname, Domain=self.domain):
                                 self.identifier_attrs.add(o.name)
                     else:
                         # The scalar expression on the right side of the comparison must be a scalar flow
@@ -280,10 +280,12 @@ class RestrictCondition:
         if not sflow:
             raise ActionException  # TODO: Make specific
         criterion_id = self.pop_criterion(attr)
-        Relvar.insert(db=mmdb, tr=self.tr, relvar='Comparison Criterion', tuples=[
+        usage = [
             Comparison_Criterion_i(ID=criterion_id, Action=self.action_id, Activity=self.anum, Attribute=attr,
                                    Comparison=op, Value=sflow.fid, Domain=self.domain)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=self.tr, relvar='Comparison Criterion', tuples=usage)
+        FlowUsage.record(relvar='Comparison Criterion', tuples=usage)
         self.comparison_criteria.append(Attribute_Comparison(attr, op))
         return criterion_id
 
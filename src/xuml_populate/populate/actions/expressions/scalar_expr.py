@@ -10,6 +10,7 @@ from pyral.relation import Relation  # Keep for debugging
 
 # xUML Populate
 from xuml_populate.config import mmdb
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.populate.actions.expressions.instance_set import InstanceSet
 from xuml_populate.populate.actions.read_action import ReadAction
 from xuml_populate.populate.actions.extract_action import ExtractAction
@@ -113,9 +114,7 @@ class ScalarExpr:
         # Just in case there's another possibility, leave a placeholder for anything else
 
         # Attribute check
-        R = f"Name:<{name}>, Class:<{self.component_flow.tname}>, Domain:<{self.domain}>"
-        attribute_r = Relation.restrict(db=mmdb, relation="Attribute", restriction=R)
-        if attribute_r.body:
+        if RelvarIndex.exists('Attribute', Name=name, Class=self.component_flow.tname, Domain=self.domain):
             # Create a read action to obtain the value
             ra = ReadAction(input_single_instance_flow=self.component_flow, attrs=(name,),
                             anum=self.anum, domain=self.domain)
@@ -160,9 +159,8 @@ class ScalarExpr:
 
                         # Attribute check
                         read_sflows = None
-                        R = f"Name:<{sexpr.iset.name}>, Class:<{self.component_flow.tname}>, Domain:<{self.domain}>"
-                        attribute_r = Relation.restrict(db=mmdb, relation="Attribute", restriction=R)
-                        if attribute_r.body:
+                        if RelvarIndex.exists('Attribute', Name=sexpr.iset.name, Class=self.component_flow.tname,
+                                              Domain=self.domain):
                             # Create a read action to obtain the value
                             ra = ReadAction(input_single_instance_flow=self.component_flow, attrs=(sexpr.iset.name,),
                                             anum=self.anum, domain=self.domain)
@@ -328,9 +326,8 @@ class ScalarExpr:
                 if self.component_flow:
                     # Check for attribute only if there is an available component flow
                     # (which we won't have if this is an assigner activity, for example)
-                    R = f"Name:<{sexpr.name}>, Class:<{self.component_flow.tname}>, Domain:<{self.domain}>"
-                    attribute_r = Relation.restrict(db=mmdb, relation="Attribute", restriction=R)
-                    if attribute_r.body:
+                    if RelvarIndex.exists('Attribute', Name=sexpr.name, Class=self.component_flow.tname,
+                                          Domain=self.domain):
                         # Create a read action to obtain the value
                         ra = ReadAction(input_single_instance_flow=self.component_flow, attrs=(sexpr.name,),
                                         anum=self.anum, domain=self.domain)
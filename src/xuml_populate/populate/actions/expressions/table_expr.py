@@ -6,12 +6,12 @@ from typing import TYPE_CHECKING
 
 # Model Integration
 from scrall.parse.visitor import Table_term_a, TOP_a
-from pyral.relation import Relation
 
 # xUML Populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.populate.actions.expressions.instance_set import InstanceSet
 from xuml_populate.populate.actions.expressions.class_accessor import ClassAccessor
 from xuml_populate.populate.flow import Flow
@@ -116,11 +116,11 @@ class TableExpr:
                 self.action_outputs[aid] = {component_flow.fid}
             case 'N_a' | 'IN_a':
                 # Is the name an existing Labeled Flow?
-                R = f"Name:<{table_term.name}>, Activity:<{self.anum}>, Domain:<{self.domain}>"
-                result = Relation.restrict(db=mmdb, relation='Labeled_Flow', restriction=R)
-                if result.body:
+                result = RelvarIndex.lookup('Labeled_Flow', Name=table_term.name, Activity=self.anum,
+                                            Domain=self.domain)
+                if result:
                     # Name corresponds to some Labeled Flow instance
-                    label_fid = result.body[0]['ID']
+                    label_fid = result[0]['ID']
                     component_flow = Flow.lookup_data(fid=label_fid, anum=self.anum, domain=self.domain)
                 else:
                     # Not a Labled Flow instance
@@ -7,20 +7,20 @@ from typing import Optional, TYPE_CHECKING
 
 # Model Integration
 from scrall.parse.visitor import Call_a, Op_a, Supplied_Parameter_a
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
 
 # xUML Populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.actions.read_action import ReadAction
 from xuml_populate.exceptions.action_exceptions import *
 from xuml_populate.populate.actions.aparse_types import Boundary_Actions, Flow_ap, MaxMult, ActivityType
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import (
     Operation_Call_i, Operation_Call_Parameter_i, Operation_Call_Output_i, Instance_Action_i
 )
@@ -136,9 +136,7 @@ class ExternalOperation:
                 # Populate parameter data flows
                 if sval_name is not None:
                     # We have either a flow label or an attribute name
-                    R = f"Name:<{sval_name}>, Class:<{self.class_name}>, Domain:<{self.domain}>"
-                    attr_r = Relation.restrict(db=mmdb, relation="Attribute", restriction=R)
-                    if attr_r.body:
+                    if RelvarIndex.exists('Attribute', Name=sval_name, Class=self.class_name, Domain=self.domain):
                         ra = ReadAction(input_single_instance_flow=self.activity.xiflow,
                                         attrs=(sval_name,), anum=self.anum, domain=self.domain)
                         aid, sflows = ra.populate()
@@ -159,11 +157,13 @@ class ExternalOperation:
                 _logger.error(msg)
                 raise ActionException  # TODO : Type define mismatch exception
 
-            Relvar.insert(db=mmdb, tr=tr_ExtOp, relvar='Operation Call Parameter', tuples=[
+            usage = [
                 Operation_Call_Parameter_i(
                     Operation_call=self.action_id, Activity=self.anum, Parameter=pname,
                     Signature=self.signum, EE=self.ee, Domain=self.domain, Flow=sval_flow.fid)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_ExtOp, relvar='Operation Call Parameter', tuples=usage)
+            FlowUsage.record(relvar='Operation Call Parameter', tuples=usage)
 
         # Populate the Operation Call Output if an output flow is specified
         output_r = Relation.semijoin(db=mmdb, rname1=ext_service_sv, rname2='External Operation Output', attrs={
@@ -174,11 +174,13 @@ class ExternalOperation:
             # There is an output defined
             output_scalar = output_r.body[0]['Type']
             sflow = Flow.populate_scalar_flow(scalar_type=output_scalar, anum=self.anum, domain=self.domain)
-            Relvar.insert(db=mmdb, tr=tr_ExtOp, relvar='Operation Call Output', tuples=[
+            usage = [
                 Operation_Call_Output_i(
                     Operation_call=self.action_id, Activity=self.anum, EE=self.ee, Domain=self.domain,
                     Operation_name=self.op_name, Flow=sflow.fid)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_ExtOp, relvar='Operation Call Output', tuples=usage)
+            FlowUsage.record(relvar='Operation Call Output', tuples=usage)
 
         Transaction.execute(db=mmdb, name=tr_ExtOp)
 
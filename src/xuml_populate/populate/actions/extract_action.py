@@ -5,13 +5,9 @@ extract_action.py – Populate an Extract Action instance in PyRAL
 import logging
 from typing import Set, Dict, List, Optional, TYPE_CHECKING
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
-
 # xUML Populate
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
 from xuml_populate.populate.actions.table import Table
 from xuml_populate.populate.actions.aparse_types import Flow_ap, MaxMult, Content
 from xuml_populate.populate.actions.action import Action
@@ -20,6 +16,7 @@ from xuml_populate.populate.ns_flow import NonScalarFlow
 from xuml_populate.populate.flow import Flow
 from xuml_metamodel.mmclass_nt import Relational_Action_i, Extract_Action_i
 from xuml_populate.exceptions.action_exceptions import *
+from xuml_populate.populate.flow_usage import FlowUsage
 
 if __debug__:
     from xuml_populate.utility import print_mmdb
@@ -78,10 +75,12 @@ class ExtractAction:
         Relvar.insert(db=mmdb, tr=tr_Extract, relvar='Relational_Action', tuples=[
             Relational_Action_i(ID=action_id, Activity=self.anum, Domain=self.domain)
         ])
-        Relvar.insert(db=mmdb, tr=tr_Extract, relvar='Extract_Action', tuples=[
+        usage = [
             Extract_Action_i(ID=action_id, Activity=self.anum, Domain=self.domain, Input_tuple=self.tuple_flow.fid,
                              Table=self.tuple_flow.tname, Attribute=self.attr, Output_scalar=output_sflow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Extract, relvar='Extract_Action', tuples=usage)
+        FlowUsage.record(relvar='Extract_Action', tuples=usage)
         Transaction.execute(db=mmdb, name=tr_Extract)
 
         return action_id, output_sflow
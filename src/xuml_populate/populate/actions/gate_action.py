@@ -7,20 +7,18 @@ import logging
 from typing import Sequence, TYPE_CHECKING, Optional
 import re
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
-
 from xuml_populate.exceptions.action_exceptions import ActionException
 
 # xUML populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.populate.actions.aparse_types import Flow_ap, MaxMult, Content
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.flow import Flow
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import Gate_Input_i, Gate_Action_i, Instance_Action_i, Flow_Connector_i
 
 if __debug__:
@@ -96,9 +94,8 @@ class GateAction:
 
         # Check for existing gate
         # That gate will use the label name as its output
-        R = f"Output_flow:<{duplicate_flow.fid}>, Activity:<{activity.anum}>, Domain:<{activity.domain}>"
-        gate_action_r = Relation.restrict(db=mmdb, relation="Gate Action", restriction=R)
-        if gate_action_r.body:
+        if RelvarIndex.exists('Gate Action', Output_flow=duplicate_flow.fid, Activity=activity.anum,
+                              Domain=activity.domain):
             # We need to attach the specified input as a gate input and relabel it
             pass
         else:
@@ -157,15 +154,19 @@ class GateAction:
         Relvar.insert(db=mmdb, tr=tr_Gate, relvar='Flow Connector', tuples=[
             Flow_Connector_i(ID=gate_aid, Activity=self.anum, Domain=self.domain)
         ])
-        Relvar.insert(db=mmdb, tr=tr_Gate, relvar='Gate Action', tuples=[
+        usage = [
             Gate_Action_i(ID=gate_aid, Output_flow=gate_output_flow.fid, Activity=self.anum, Domain=self.domain)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Gate, relvar='Gate Action', tuples=usage)
+        FlowUsage.record(relvar='Gate Action', tuples=usage)
 
         # Populate each input flow
         for f in self.input_flows:
-            Relvar.insert(db=mmdb, tr=tr_Gate, relvar='Gate Input', tuples=[
+            usage = [
                 Gate_Input_i(Gate_action=gate_aid, Input_flow=f.fid, Activity=self.anum, Domain=self.domain)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_Gate, relvar='Gate Input', tuples=usage)
+            FlowUsage.record(relvar='Gate Input', tuples=usage)
 
         Transaction.execute(db=mmdb, name=tr_Gate)
 
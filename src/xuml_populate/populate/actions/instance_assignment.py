@@ -8,14 +8,13 @@ from typing import Set, TYPE_CHECKING
 
 # Model Integration
 from scrall.parse.visitor import Inst_Assignment_a
-from pyral.transaction import Transaction
 from pyral.relation import Relation  # For debugging
-from pyral.relvar import Relvar
 
 # xUML Populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
 from xuml_metamodel.mmclass_nt import Labeled_Flow_i
 from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.actions.cast_to_instance import CastToInstance
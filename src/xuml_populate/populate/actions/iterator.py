@@ -7,9 +7,6 @@ import logging
 from typing import Sequence, TYPE_CHECKING, Optional
 
 # Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
 from scrall.parse.visitor import BOOL_a, MATH_a, IN_a, N_a
 
 
@@ -18,9 +15,11 @@ if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.exceptions.action_exceptions import *
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
 from xuml_populate.populate.actions.aparse_types import Flow_ap, MaxMult
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.flow import Flow
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import (Instance_Action_i, Iterator_i, Iterated_Instance_Flow_i)
 
 if __debug__:
@@ -58,13 +57,17 @@ class IteratorAction:
         Relvar.insert(db=mmdb, tr=tr, relvar='Instance Action', tuples=[
             Instance_Action_i(ID=iterator_id, Activity=activity.anum, Domain=activity.domain)
         ])
-        Relvar.insert(db=mmdb, tr=tr, relvar='Iterator', tuples=[
+        usage = [
             Iterator_i(ID=iterator_id, Activity=activity.anum, Domain=activity.domain,
                        Input_flow=input_mult_inst_flow.fid)
-        ])
-        Relvar.insert(db=mmdb, tr=tr, relvar='Iterated Instance Flow', tuples=[
+        ]
+        Relvar.insert(db=mmdb, tr=tr, relvar='Iterator', tuples=usage)
+        FlowUsage.record(relvar='Iterator', tuples=usage)
+        usage = [
             Iterated_Instance_Flow_i(Iterator=iterator_id, Activity=activity.anum, Domain=activity.domain,
                                      Flow=siflow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr, relvar='Iterated Instance Flow', tuples=usage)
+        FlowUsage.record(relvar='Iterated Instance Flow', tuples=usage)
 
         return iterator_id, siflow
@@ -7,21 +7,22 @@ from typing import Optional, TYPE_CHECKING
 
 # Model Integration
 from scrall.parse.visitor import Call_a, Op_a
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
 
 # xUML Populate
+from xuml_populate.context import ContextScoped, ContextState
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.utility import print_mmdb
 from xuml_populate.populate.actions.expressions.scalar_expr import ScalarExpr
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.actions.read_action import ReadAction
 from xuml_populate.exceptions.action_exceptions import *
 from xuml_populate.populate.actions.aparse_types import Boundary_Actions, Flow_ap, MaxMult, ActivityType
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import (Method_Call_i, Method_Call_Parameter_i, Method_Call_Output_i,
                                                Instance_Action_i)
 
@@ -37,7 +38,7 @@ tr_Call = "Method Call"
 # so populate can be deferred until all Methods have been populated and we post_process them
 tr_MethodCallOutput = "Method Call Output"
 
-class MethodCall:
+class MethodCall(metaclass=ContextScoped):
     """
     Populate all components of a Method Call action and any other
     actions required by the parse
@@ -47,7 +48,7 @@ class MethodCall:
     # And it will have been closed before we start processing any State Activities
     # So this attribute is not relevant to State Activities which do not use a transaction for Method Call Output
     # population
-    method_call_output_transaction_open: bool = False
+    method_call_output_transaction_open: bool = ContextState(bool)
 
     def __init__(self, method_name: str, method_anum: str, caller_flow: Flow_ap, parse: Call_a | Op_a,
                  activity: 'Activity'):
@@ -97,10 +98,12 @@ class MethodCall:
         Relvar.insert(db=mmdb, tr=tr_Call, relvar='Instance Action', tuples=[
             Instance_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain)
         ])
-        Relvar.insert(db=mmdb, tr=tr_Call, relvar='Method Call', tuples=[
+        usage = [
             Method_Call_i(ID=self.action_id, Activity=self.anum, Domain=self.domain, Method=self.method_anum,
                           Instance_flow=self.caller_flow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Call, relvar='Method Call', tuples=usage)
+        FlowUsage.record(relvar='Method Call', tuples=usage)
 
         # Validate Method Call params (ensure that the call matches the Method's populated signature
         R = f"Anum:<{self.method_anum}>, Domain:<{self.domain}>"
@@ -147,9 +150,7 @@ class MethodCall:
             # Populate parameter data flows
             if not sval_flow and sval_name is not None:
                 # We have either a flow label or an attribute name
-                R = f"Name:<{sval_name}>, Class:<{self.caller_flow.tname}>, Domain:<{self.domain}>"
-                attr_r = Relation.restrict(db=mmdb, relation="Attribute", restriction=R)
-                if attr_r.body:
+                if RelvarIndex.exists('Attribute', Name=sval_name, Class=self.caller_flow.tname, Domain=self.domain):
                     ra = ReadAction(input_single_instance_flow=self.caller_flow,
                                     attrs=(sval_name,), anum=self.anum, domain=self.domain)
                     aid, sflows = ra.populate()
@@ -175,10 +176,12 @@ class MethodCall:
                 _logger.error(msg)
                 raise ActionException  # TODO : Type define mismatch exception
 
-            Relvar.insert(db=mmdb, tr=tr_Call, relvar='Method Call Parameter', tuples=[
+            usage = [
                 Method_Call_Parameter_i(Method_call=self.action_id, Activity=self.anum, Parameter=pname,
                                         Signature=target_method_signum, Domain=self.domain, Flow=sval_flow.fid)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_Call, relvar='Method Call Parameter', tuples=usage)
+            FlowUsage.record(relvar='Method Call Parameter', tuples=usage)
 
         # Validate match between set of supplied params and the Method Signature Parameters
         if sp_pnames != set(sig_params.keys()):
@@ -225,6 +228,8 @@ class MethodCall:
                     # TODO: Construct table name from method signature (need an example)
 
         Transaction.execute(db=mmdb, name=tr_Call)
+        # The called method may write any attribute
+        ReadAction.forget(anum=self.anum, domain=self.domain)
 
         # We have populated everything in the Method Call except for any Method Call Output instances at this point
         # We proceed differently for Method and non-Method Activities
@@ -243,10 +248,12 @@ class MethodCall:
                 # This must be a State Activity and we don't use a transaction
                 use_tr = None
 
-            Relvar.insert(db=mmdb, relvar="Method Call Output", tr=use_tr, tuples=[
+            usage = [
                 Method_Call_Output_i(Method_call=self.action_id, Activity=self.anum, Domain=self.domain,
                                      Target_method=target_method_anum, Flow=method_call_output_flow.fid)
-            ])
+            ]
+            Relvar.insert(db=mmdb, relvar="Method Call Output", tr=use_tr, tuples=usage)
+            FlowUsage.record(relvar='Method Call Output', tuples=usage)
 
         return self.action_id, self.action_id, method_call_output_flow
 
@@ -7,9 +7,6 @@ import logging
 from typing import TYPE_CHECKING, Optional
 
 # Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
 from scrall.parse.visitor import Op_a
 
 
@@ -18,11 +15,14 @@ if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.exceptions.action_exceptions import *
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.populate.actions.aparse_types import Flow_ap, MaxMult, Content, Boundary_Actions
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.mm_class import MMclass
 from xuml_populate.populate.actions.iterator import IteratorAction
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import Method_Extender_i, Extender_i
 
 if __debug__:
@@ -84,13 +84,12 @@ class MethodExtender:
         # Validate method and obtain its anum
         method_name = self.op_parse.op_name
         class_name = self.input_flow.tname
-        R = f"Name:<{method_name}>, Class:<{class_name}>, Domain:<{self.domain}>"
-        method_r = Relation.restrict(db=mmdb, relation="Method", restriction=R)
-        if not method_r.body:
+        method = RelvarIndex.lookup('Method', Name=method_name, Class=class_name, Domain=self.domain)
+        if not method:
             msg = f"Method {self.domain}:{class_name}.{method_name} for Method Extender's Method Call not found"
             _logger.error(msg)
             raise FlowException(msg)
-        method_anum = method_r.body[0]['Anum']
+        method_anum = method[0]['Anum']
 
         # Populate the method call
         from xuml_populate.populate.actions.method_call import MethodCall
@@ -122,10 +121,12 @@ class MethodExtender:
                                                              domain=self.domain, max_mult=MaxMult.MANY)
         pass
         # Now we can finish population of the Method Extender action
-        Relvar.insert(db=mmdb, tr=tr_Method_Extender, relvar='Extender', tuples=[
+        usage = [
             Extender_i(ID=iterator_id, Activity=self.anum, Domain=self.domain, Attribute_flow=sflow.fid,
                        Table_output=output_tflow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Method_Extender, relvar='Extender', tuples=usage)
+        FlowUsage.record(relvar='Extender', tuples=usage)
 
         Transaction.execute(db=mmdb, name=tr_Method_Extender)
 
@@ -6,20 +6,18 @@ new_assoc_ref_action.py – Populate a New Associative Reference Action
 import logging
 from typing import List, TYPE_CHECKING
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
-
 # xUML Populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.populate.actions.table import Table
 from xuml_populate.populate.actions.aparse_types import Flow_ap, Content, MaxMult, New_delegated_inst
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.flow import Flow
 from xuml_populate.exceptions.action_exceptions import *
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import (New_Associative_Reference_Action_i, Reference_Action_i,
                                                New_Reference_Action_i, T_Ref_Instance_i, P_Ref_Instance_i,
                                                Referenced_Instance_i, Instance_Action_i)
@@ -69,13 +67,11 @@ class NewAssociativeReferenceAction:
                                          action_type="new assoc ref")
 
         # Now we need to create the t and p class names
-        R = f"Ref_type:<T>, Rnum:<{self.rnum}>, Domain:<{self.activity.domain}>"
-        tref_r = Relation.restrict(db=mmdb, relation='Association Reference', restriction=R)
-        R = f"Ref_type:<P>, Rnum:<{self.rnum}>, Domain:<{self.activity.domain}>"
-        pref_r = Relation.restrict(db=mmdb, relation='Association Reference', restriction=R)
+        tref = RelvarIndex.lookup('Association Reference', Ref_type='T', Rnum=self.rnum, Domain=self.activity.domain)
+        pref = RelvarIndex.lookup('Association Reference', Ref_type='P', Rnum=self.rnum, Domain=self.activity.domain)
 
-        self.t_class = tref_r.body[0]["To_class"]
-        self.p_class = pref_r.body[0]["To_class"]
+        self.t_class = tref[0]["To_class"]
+        self.p_class = pref[0]["To_class"]
 
         # Obtain the T and P instance flows typed by the participating Classes
         if not self.is_delegated:
@@ -102,11 +98,13 @@ class NewAssociativeReferenceAction:
             Referenced_Instance_i(Flow=self.ref_flows[self.p_class], Activity=self.activity.anum,
                                   Domain=self.activity.domain)], tr=self.tr)
 
-        Relvar.insert(db=mmdb, relvar="New Associative Reference Action", tuples=[
+        usage = [
             New_Associative_Reference_Action_i(ID=self.action_id, Activity=self.activity.anum,
                                                Domain=self.activity.domain,
                                                T_instance=self.ref_flows[self.t_class],
-                                               P_instance=self.ref_flows[self.p_class])], tr=self.tr)
+                                               P_instance=self.ref_flows[self.p_class])]
+        Relvar.insert(db=mmdb, relvar="New Associative Reference Action", tuples=usage, tr=self.tr)
+        FlowUsage.record(relvar='New Associative Reference Action', tuples=usage)
 
         # Create the output tuple table type
         # Get all referential attributes associated with the associative relationship
@@ -130,10 +128,12 @@ class NewAssociativeReferenceAction:
         Relvar.insert(db=mmdb, tr=self.tr, relvar="Reference Action", tuples=[
             Reference_Action_i(ID=self.action_id, Activity=self.activity.anum, Domain=self.activity.domain,
                                Association=self.rnum)])
-        Relvar.insert(db=mmdb, tr=self.tr, relvar="New Reference Action", tuples=[
+        usage = [
             New_Reference_Action_i(ID=self.action_id, Activity=self.activity.anum, Domain=self.activity.domain,
                                    Create_action=self.create_action_id, Ref_attr_values=tf.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=self.tr, relvar="New Reference Action", tuples=usage)
+        FlowUsage.record(relvar='New Reference Action', tuples=usage)
 
         ref_attr_names = [k for k in name_type_pairs.keys()]
 
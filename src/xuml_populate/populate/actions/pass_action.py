@@ -8,21 +8,18 @@ from typing import Sequence, TYPE_CHECKING, Optional
 from collections import namedtuple
 import re
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
-
 from xuml_populate.exceptions.action_exceptions import IncompleteActionException
 
 # xUML populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
 from xuml_populate.populate.actions.aparse_types import Flow_ap, MaxMult, Content
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.actions.gate_action import GateAction
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import Pass_Action_i, Instance_Action_i, Flow_Connector_i
 
 if __debug__:
@@ -128,10 +125,12 @@ class PassAction:
         Relvar.insert(db=mmdb, tr=tr_Pass, relvar='Flow Connector', tuples=[
             Flow_Connector_i(ID=pass_aid, Activity=self.anum, Domain=self.domain)
         ])
-        Relvar.insert(db=mmdb, tr=tr_Pass, relvar='Pass Action', tuples=[
+        usage = [
             Pass_Action_i(ID=pass_aid, Activity=self.anum, Domain=self.domain, Input_flow=self.input_fid,
                           Output_flow=pass_output_flow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Pass, relvar='Pass Action', tuples=usage)
+        FlowUsage.record(relvar='Pass Action', tuples=usage)
         Transaction.execute(db=mmdb, name=tr_Pass)
 
         # Rename the other matching pass flow and feed both into the new gate
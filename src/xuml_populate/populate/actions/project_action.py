@@ -7,18 +7,18 @@ from typing import TYPE_CHECKING
 
 # Model Integration
 from scrall.parse.visitor import Projection_a
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
 
 # xUML Populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.exceptions.action_exceptions import ProjectedAttributeNotDefined
 from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.actions.aparse_types import Flow_ap, Content
 from xuml_populate.populate.actions.action import Action
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import (Relational_Action_i, Table_Action_i, Project_Action_i,
                                                Projected_Attribute_i)
 
@@ -54,15 +54,14 @@ class ProjectAction:
         # Get type of each attribute
         for pattr in projection.attrs:
             if input_nsflow.content == Content.INSTANCE:
-                R = f"Name:<{pattr.name}>, Class:<{input_nsflow.tname}>, Domain:<{domain}>"
-                result = Relation.restrict(db=mmdb, relation='Attribute', restriction=R)
+                result = RelvarIndex.lookup('Attribute', Name=pattr.name, Class=input_nsflow.tname, Domain=domain)
             else:
-                R = f"Name:<{pattr.name}>, Table:<{input_nsflow.tname}>, Domain:<{domain}>"
-                result = Relation.restrict(db=mmdb, relation='Table_Attribute', restriction=R)
-            if not result.body:
+                result = RelvarIndex.lookup('Table_Attribute', Name=pattr.name, Table=input_nsflow.tname,
+                                            Domain=domain)
+            if not result:
                 _logger.error(f"Attribute [{pattr.name}] in projection not defined on class [{input_nsflow.tname}]")
                 raise ProjectedAttributeNotDefined
-            table_header[pattr.name] = result.body[0]['Scalar']
+            table_header[pattr.name] = result[0]['Scalar']
 
         output_rel_flow = Flow.populate_relation_flow_by_header(table_header=table_header, anum=anum, domain=domain,
                                                                 max_mult=input_nsflow.max_mult)
@@ -72,10 +71,12 @@ class ProjectAction:
         Relvar.insert(db=mmdb, tr=tr_Project, relvar='Relational_Action', tuples=[
             Relational_Action_i(ID=action_id, Activity=anum, Domain=domain)
         ])
-        Relvar.insert(db=mmdb, tr=tr_Project, relvar='Table_Action', tuples=[
+        usage = [
             Table_Action_i(ID=action_id, Activity=anum, Domain=domain, Input_a_flow=input_nsflow.fid,
                            Output_flow=output_rel_flow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Project, relvar='Table_Action', tuples=usage)
+        FlowUsage.record(relvar='Table_Action', tuples=usage)
         Relvar.insert(db=mmdb, tr=tr_Project, relvar='Project_Action', tuples=[
             Project_Action_i(ID=action_id, Activity=anum, Domain=domain)
         ])
@@ -6,9 +6,7 @@ import logging
 from typing import Set, TYPE_CHECKING, Optional
 
 # Model Integration
-from pyral.relvar import Relvar
 from pyral.relation import Relation  # Here for debugging
-from pyral.transaction import Transaction
 from scrall.parse.visitor import Criteria_Selection_a, Rank_Selection_a
 
 from xuml_populate.exceptions.action_exceptions import IncompleteActionException
@@ -17,12 +15,14 @@ from xuml_populate.exceptions.action_exceptions import IncompleteActionException
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
 from xuml_populate.populate.actions.aparse_types import Flow_ap
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.actions.expressions.restriction_condition import RestrictCondition
 from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.actions.iterator import IteratorAction
 from xuml_populate.populate.actions.method_extender import MethodExtender
+from xuml_populate.populate.flow_usage import FlowUsage
 # from xuml_populate.populate.actions.type_operation_extender import TypeOperationExtender
 from xuml_metamodel.mmclass_nt import Relational_Action_i, Table_Action_i, Rank_Restrict_Action_i
 
@@ -106,10 +106,12 @@ class RankRestrictAction:
         Relvar.insert(db=mmdb, tr=tr_Rank_Restrict_Action, relvar='Relational_Action', tuples=[
             Relational_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain)
         ])
-        Relvar.insert(db=mmdb, tr=tr_Rank_Restrict_Action, relvar='Table_Action', tuples=[
+        usage = [
             Table_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain,
                            Input_a_flow=self.input_flow.fid, Output_flow=self.output_relation_flow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Rank_Restrict_Action, relvar='Table_Action', tuples=usage)
+        FlowUsage.record(relvar='Table_Action', tuples=usage)
         Relvar.insert(db=mmdb, tr=tr_Rank_Restrict_Action, relvar='Rank_Restrict_Action', tuples=[
             Rank_Restrict_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain,
                                    Attribute=self.ranked_attr_name, Non_scalar_type=self.input_flow.tname,
@@ -4,21 +4,23 @@ read_action.py – Populate a read action instance in PyRAL
 
 # System
 import logging
-from typing import Set, List, Tuple, TYPE_CHECKING
+from contextlib import contextmanager
+from typing import Set, List, Tuple, Iterator, Optional, TYPE_CHECKING
 
 # Model Integration
 from scrall.parse.visitor import Projection_a
-from pyral.relvar import Relvar
-from pyral.transaction import Transaction
 
 # xUML populate
+from xuml_populate.context import ContextScoped, ContextState
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
 from xuml_populate.populate.actions.aparse_types import Flow_ap, MaxMult, Content, ActivityAP
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.mm_class import MMclass
 from xuml_populate.populate.flow import Flow
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import Read_Action_i, Attribute_Read_Access_i, Instance_Action_i
 
 _logger = logging.getLogger(__name__)
@@ -26,10 +28,59 @@ _logger = logging.getLogger(__name__)
 # Transactions
 tr_Read = "Read Action"
 
-class ReadAction:
+class ReadAction(metaclass=ContextScoped):
     """
     Populate a Read Action
+
+    When an activity reads the same attributes from the same instance flow more than once, the first Read
+    Action and its output flows are reused rather than populating a duplicate. Reuse is limited to the
+    control scope in which the first Read Action was populated (see control_scope) so that a reused Read
+    Action never gains or loses a control dependency. And a read populated before an action that may change
+    the attribute values (see forget) is not reused by any read that follows.
     """
+    # Read Actions that may be reused in each open control scope of an activity, innermost last, by anum:domain
+    # (input instance flow id, attribute names): (action id, output scalar flows)
+    reusable: dict[str, list[dict[tuple[str, tuple[str, ...]], tuple[str, list[Flow_ap]]]]] = ContextState(dict)
+
+    @classmethod
+    @contextmanager
+    def control_scope(cls, anum: str, domain: str) -> Iterator[None]:
+        """
+        Open a scope within which Read Actions may be reused
+
+        Actions populated within a scope execute under the same control dependencies: those of a case or
+        decision result, or a sequence token. A Read Action populated outside the scope is not reused inside it,
+        and one populated inside is forgotten when the scope closes. Outside of any scope, nothing is reused.
+
+        Args:
+            anum: The activity number
+            domain: The domain name
+        """
+        scopes = cls.reusable.setdefault(f'{domain}:{anum}', [])
+        scopes.append({})
+        try:
+            yield
+        finally:
+            scopes.pop()
+            if not scopes:
+                del cls.reusable[f'{domain}:{anum}']
+
+    @classmethod
+    def forget(cls, anum: str, domain: str, attr: Optional[str] = None):
+        """
+        Stop reusing the Read Actions populated so far in an activity
+
+        Called when an action that may change attribute values, such as a Write Action, is populated so that
+        a later read sees the new value.
+
+        Args:
+            anum: The activity number
+            domain: The domain name
+            attr: Forget only the reads of an attribute with this name, or every read if None
+        """
+        for reads in cls.reusable.get(f'{domain}:{anum}', []):
+            for read_key in [k for k in reads if attr is None or attr in k[1]]:
+                del reads[read_key]
 
     def __init__(self, input_single_instance_flow: Flow_ap, attrs: Tuple[str], anum: str, domain: str):
         """
@@ -59,6 +110,17 @@ class ReadAction:
         Returns:
             A tuple of scalar flows matching the order of the specified attrs
         """
+        scopes = self.reusable.get(f'{self.domain}:{self.anum}')
+        reads = scopes[-1] if scopes else None
+        read_key = (self.input_instance_flow.fid, tuple(self.attrs))
+        if reads is not None and read_key in reads:
+            action_id, scalar_flows = reads[read_key]
+            # Once an output flow is labeled it may be relabeled by a later assignment, so it is no longer shared
+            if not any(Flow.lookup_label(fid=f.fid, anum=self.anum, domain=self.domain) for f in scalar_flows):
+                _logger.info(f"Reusing read action {action_id} in {self.domain}::{self.anum}")
+                self.action_id = action_id
+                return action_id, list(scalar_flows)
+
         # Get the class header
         class_attrs = MMclass.header(cname=self.source_class, domain=self.domain)
 
@@ -68,19 +130,25 @@ class ReadAction:
         Relvar.insert(db=mmdb, tr=tr_Read, relvar='Instance Action', tuples=[
             Instance_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain)
         ])
-        Relvar.insert(db=mmdb, tr=tr_Read, relvar='Read Action', tuples=[
+        usage = [
             Read_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain,
                           Instance_flow=self.input_instance_flow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Read, relvar='Read Action', tuples=usage)
+        FlowUsage.record(relvar='Read Action', tuples=usage)
         scalar_flows = []
         for a in self.attrs:
             of = Flow.populate_scalar_flow(scalar_type=class_attrs[a], anum=self.anum, domain=self.domain, label=None)
-            Relvar.insert(db=mmdb, tr=tr_Read, relvar='Attribute_Read_Access', tuples=[
+            usage = [
                 Attribute_Read_Access_i(Attribute=a, Class=self.source_class, Read_action=self.action_id,
                                         Activity=self.anum, Domain=self.domain, Output_flow=of.fid)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_Read, relvar='Attribute_Read_Access', tuples=usage)
+            FlowUsage.record(relvar='Attribute_Read_Access', tuples=usage)
             scalar_flows.append(of)
 
             # output_flows[pa] = of
         Transaction.execute(db=mmdb, name=tr_Read)
+        if reads is not None:
+            reads[read_key] = (self.action_id, list(scalar_flows))
         return self.action_id, scalar_flows
@@ -5,18 +5,16 @@ rename_action.py – Populate a selection action instance in PyRAL
 import logging
 from typing import TYPE_CHECKING
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.transaction import Transaction
-
 # xUML Populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
 from xuml_populate.populate.actions.aparse_types import Flow_ap, MaxMult, Content
 from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.ns_flow import NonScalarFlow
 from xuml_populate.populate.actions.action import Action
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import Relational_Action_i, Table_Action_i, Rename_Action_i
 
 if __debug__:
@@ -73,10 +71,12 @@ class RenameAction:
         Relvar.insert(db=mmdb, tr=tr_Rename, relvar='Relational_Action', tuples=[
             Relational_Action_i(ID=action_id, Activity=self.anum, Domain=self.domain)
         ])
-        Relvar.insert(db=mmdb, tr=tr_Rename, relvar='Table_Action', tuples=[
+        usage = [
             Table_Action_i(ID=action_id, Activity=self.anum, Domain=self.domain, Input_a_flow=self.input_nsflow.fid,
                            Output_flow=output_tflow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Rename, relvar='Table_Action', tuples=usage)
+        FlowUsage.record(relvar='Table_Action', tuples=usage)
         Relvar.insert(db=mmdb, tr=tr_Rename, relvar='Rename_Action', tuples=[
             Rename_Action_i(
                 ID=action_id, Activity=self.anum, Domain=self.domain,
@@ -7,19 +7,19 @@ import logging
 from typing import Set, TYPE_CHECKING
 
 # Model Integration
-from pyral.relvar import Relvar
 from pyral.relation import Relation  # Here for debugging
-from pyral.transaction import Transaction
 from scrall.parse.visitor import Criteria_Selection_a, Rank_Selection_a
 
 # xUML Populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
 from xuml_populate.populate.actions.aparse_types import Flow_ap
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.actions.expressions.restriction_condition import RestrictCondition
 from xuml_populate.populate.flow import Flow
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import (Relational_Action_i, Table_Action_i, Restrict_Action_i,
                                                Table_Restriction_Condition_i)
 
@@ -70,10 +70,12 @@ class RestrictAction:
         Relvar.insert(db=mmdb, tr=tr_Restrict_Action, relvar='Relational Action', tuples=[
             Relational_Action_i(ID=self.action_id, Activity=anum, Domain=domain)
         ])
-        Relvar.insert(db=mmdb, tr=tr_Restrict_Action, relvar='Table Action', tuples=[
+        usage = [
             Table_Action_i(ID=self.action_id, Activity=anum, Domain=domain,
                            Input_a_flow=input_relation_flow.fid, Output_flow=self.output_relation_flow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Restrict_Action, relvar='Table Action', tuples=usage)
+        FlowUsage.record(relvar='Table Action', tuples=usage)
         Relvar.insert(db=mmdb, tr=tr_Restrict_Action, relvar='Restrict Action', tuples=[
             Restrict_Action_i(ID=self.action_id, Activity=anum, Domain=domain)
         ])
@@ -8,14 +8,13 @@ from collections import namedtuple
 
 # Model Integration
 from scrall.parse.visitor import Scalar_Assignment_a
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
 
 # xUML populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_metamodel.mmclass_nt import Labeled_Flow_i
 from xuml_populate.populate.actions.pass_action import PassAction
 from xuml_populate.populate.actions.extract_action import ExtractAction
@@ -191,9 +190,8 @@ class ScalarAssignment:
             # to that attribute and in this case, there is no need for a Labeled Flow
 
             if self.input_instance_flow:
-                R = f"Name:<{lhs_label}>, Class:<{self.input_instance_flow.tname}>, Domain:<{self.activity.domain}>"
-                attribute_r = Relation.restrict(db=mmdb, relation="Attribute", restriction=R)
-                if attribute_r.body:
+                if RelvarIndex.exists('Attribute', Name=lhs_label, Class=self.input_instance_flow.tname,
+                                      Domain=self.activity.domain):
                     writing_to_attribute = True
                     wa = WriteAction(write_to_instance_flow=self.input_instance_flow,
                                      value_to_write_flow=rhs_flow,
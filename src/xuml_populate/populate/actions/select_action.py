@@ -5,20 +5,17 @@ select_action.py – Populate a selection action instance in PyRAL
 import logging
 from typing import List, TYPE_CHECKING
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
-
 # xUML Populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
 from xuml_populate.populate.actions.aparse_types import Flow_ap, MaxMult, Attribute_Comparison
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.flow import Flow
 from xuml_populate.exceptions.action_exceptions import *
 from xuml_populate.populate.actions.expressions.restriction_condition import RestrictCondition
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import (Select_Action_i, Single_Select_i, Identifier_Select_i,
                                                Zero_One_Cardinality_Select_i, Many_Select_i,
                                                Class_Restriction_Condition_i, Instance_Action_i, Select_None_i)
@@ -77,10 +74,12 @@ class SelectAction:
         Relvar.insert(db=mmdb, tr=tr_Select, relvar='Instance Action', tuples=[
             Instance_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain)
         ])
-        Relvar.insert(db=mmdb, tr=tr_Select, relvar='Select Action', tuples=[
+        usage = [
             Select_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain,
                             Input_flow=self.input_instance_flow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Select, relvar='Select Action', tuples=usage)
+        FlowUsage.record(relvar='Select Action', tuples=usage)
         # Walk through the criteria parse tree storing any attributes or input flows
         # Also check to see if we are selecting on an identifier
         if selection_parse.criteria:
@@ -256,10 +255,12 @@ class SelectAction:
                          f"{self.input_instance_flow.tname}:{self.activity.activity_path.split(':')[-1]}"
                          f":{output_instance_flow}]")
             # Populate the Single Select subclass
-            Relvar.insert(db=mmdb, tr=tr_Select, relvar='Single Select', tuples=[
+            usage = [
                 Single_Select_i(ID=self.action_id, Activity=self.anum, Domain=self.domain,
                                 Output_flow=output_instance_flow.fid)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_Select, relvar='Single Select', tuples=usage)
+            FlowUsage.record(relvar='Single Select', tuples=usage)
             if selection_idnum:
                 # Populate an Identifier Select subclass
                 Relvar.insert(db=mmdb, tr=tr_Select, relvar='Identifier Select', tuples=[
@@ -287,8 +288,10 @@ class SelectAction:
                          f"{self.input_instance_flow.tname}:{self.activity.activity_path.split(':')[-1]}"
                          f":{output_instance_flow}]")
             # Populate the Many Select subclass
-            Relvar.insert(db=mmdb, tr=tr_Select, relvar='Many Select', tuples=[
+            usage = [
                 Many_Select_i(ID=self.action_id, Activity=self.anum, Domain=self.domain,
                               Output_flow=output_instance_flow.fid)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_Select, relvar='Many Select', tuples=usage)
+            FlowUsage.record(relvar='Many Select', tuples=usage)
         return max_mult, output_instance_flow
@@ -5,13 +5,9 @@ sequence_flow.py – Populate a sequence control flow dependency
 # System
 import logging
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
-
 # xUML Populate
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
 from xuml_populate.populate.flow import Flow
 from xuml_metamodel.mmclass_nt import Sequence_Flow_i
 
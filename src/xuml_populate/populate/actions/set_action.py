@@ -5,14 +5,12 @@ set_action.py – Populate a Set Action instance in PyRAL
 import logging
 from typing import TYPE_CHECKING
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.transaction import Transaction
-
 # xUML Populate
+from xuml_populate.context import ContextScoped, ContextState
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
 from xuml_populate.populate.actions.table import Table
 from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.actions.aparse_types import Flow_ap, MaxMult, Content
@@ -21,6 +19,7 @@ from xuml_populate.exceptions.action_exceptions import (ProductForbidsCommonAttr
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.mm_class import MMclass
 from xuml_populate.populate.ns_flow import NonScalarFlow
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import Relational_Action_i, Table_Action_i, Set_Action_i
 
 _logger = logging.getLogger(__name__)
@@ -28,16 +27,16 @@ _logger = logging.getLogger(__name__)
 # Transactions
 tr_Set_Action = "Set Action"
 
-class SetAction:
+class SetAction(metaclass=ContextScoped):
     """
     Create all relations for a ProjectAction
     """
-    domain = None
-    anum = None
-    activity_path = None
-    scrall_text = None
-    action_id = None
-    ns_type = None
+    domain = ContextState()
+    anum = ContextState()
+    activity_path = ContextState()
+    scrall_text = ContextState()
+    action_id = ContextState()
+    ns_type = ContextState()
 
     @classmethod
     def populate(cls, a_input: Flow_ap, b_input: Flow_ap, setop: str, activity: 'Activity') -> (str, Flow_ap):
@@ -95,12 +94,16 @@ class SetAction:
         Relvar.insert(db=mmdb, tr=tr_Set_Action, relvar='Relational_Action', tuples=[
             Relational_Action_i(ID=cls.action_id, Activity=anum, Domain=domain)
         ])
-        Relvar.insert(db=mmdb, tr=tr_Set_Action, relvar='Table_Action', tuples=[
+        usage = [
             Table_Action_i(ID=cls.action_id, Activity=anum, Domain=domain, Input_a_flow=a_input.fid,
                            Output_flow=output_tflow.fid)
-        ])
-        Relvar.insert(db=mmdb, tr=tr_Set_Action, relvar='Set_Action', tuples=[
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Set_Action, relvar='Table_Action', tuples=usage)
+        FlowUsage.record(relvar='Table_Action', tuples=usage)
+        usage = [
             Set_Action_i(ID=cls.action_id, Operation=setop, Activity=anum, Domain=domain, Input_b_flow=b_input.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Set_Action, relvar='Set_Action', tuples=usage)
+        FlowUsage.record(relvar='Set_Action', tuples=usage)
         Transaction.execute(db=mmdb, name=tr_Set_Action)
         return cls.action_id, output_tflow
@@ -8,9 +8,6 @@ from typing import TYPE_CHECKING, Optional
 
 # Model Integration
 from scrall.parse.visitor import Signal_a, External_Signal_a
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
 
 from xuml_populate.exceptions.action_exceptions import ActionException, IncompleteActionException
 
@@ -22,6 +19,8 @@ if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.populate.flow import Flow
 from xuml_populate.names import IPS_name  # Initial pseudo-state name
 from xuml_populate.populate.delegated_creation import DelegatedCreationActivity
@@ -33,6 +32,7 @@ from xuml_populate.populate.flow import Flow_ap
 from xuml_populate.populate.actions.gate_action import GateAction
 from xuml_populate.populate.actions.expressions.scalar_expr import ScalarExpr
 from xuml_populate.populate.actions.expressions.instance_set import InstanceSet
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import (
     Signal_Action_i, Supplied_Parameter_Value_i, Signal_Instance_Action_i, Delivery_Time_i,
     Multiple_Assigner_Partition_Instance_i, Signal_Assigner_Action_i, Instance_Action_i, Initial_Signal_Action_i,
@@ -300,13 +300,12 @@ class SignalAction:
                                     Class=dest_class, Pseudo_state=IPS_name)
         ])
         # Look up the Initial Pseudo State and get the associated activity number
-        R = f"Class:<{dest_class}>, Domain:<{self.domain}>"
-        ip_state_r = Relation.restrict(db=mmdb, relation='Initial Pseudo State', restriction=R)
-        if len(ip_state_r.body) != 1:
+        ip_state = RelvarIndex.lookup('Initial Pseudo State', Class=dest_class, Domain=self.domain)
+        if len(ip_state) != 1:
             msg = f"Single initial_pseudo_state Pseudo State for Lifecycle: [{self.class_name}] not defined in metamodel"
             _logger.error(msg)
             raise ActionException(msg)
-        creation_activity_anum = ip_state_r.body[0]["Creation_activity"]
+        creation_activity_anum = ip_state[0]["Creation_activity"]
 
         # The Initial Signal Action is signaling this Delegated Creation Activity
         Relvar.insert(db=mmdb, tr=tr_Signal, relvar='Signaled Creation', tuples=[
@@ -368,10 +367,12 @@ class SignalAction:
         # An instance set destination was specified, so a signal will be sent to each instance in the set
         dest_iflow = self.find_dest_flow()
 
-        Relvar.insert(db=mmdb, tr=tr_Signal, relvar='Signal Instance Action', tuples=[
+        usage = [
             Signal_Instance_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain,
                                      Instance_flow=dest_iflow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Signal, relvar='Signal Instance Action', tuples=usage)
+        FlowUsage.record(relvar='Signal Instance Action', tuples=usage)
 
         self.complete_send_signal_transaction()
 
@@ -400,14 +401,14 @@ class SignalAction:
         self.aids_out.add(aout)
 
         # If the destination is a Multiple Assigner, populate the partition instance
-        R = f"Rnum:<{dest_sm}>, Domain:<{self.domain}>"
-        multiple_assigner_r = Relation.restrict(db=mmdb, relation="Multiple Assigner", restriction=R)
-        if multiple_assigner_r.body:
-            Relvar.insert(db=mmdb, tr=tr_Signal, relvar='Multiple Assigner Partition Instance', tuples=[
+        if RelvarIndex.exists('Multiple Assigner', Rnum=dest_sm, Domain=self.domain):
+            usage = [
                 Multiple_Assigner_Partition_Instance_i(Action=self.action_id, Activity=self.anum,
                                                        Domain=self.domain,
                                                        Partition=f.fid)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_Signal, relvar='Multiple Assigner Partition Instance', tuples=usage)
+            FlowUsage.record(relvar='Multiple Assigner Partition Instance', tuples=usage)
 
         Relvar.insert(db=mmdb, tr=tr_Signal, relvar='Signal Assigner Action', tuples=[
             Signal_Assigner_Action_i(ID=self.action_id, Activity=self.anum,
@@ -512,9 +513,8 @@ class SignalAction:
                 # Populate parameter data flows
                 if sval_name is not None:
                     # We have either a flow label or an attribute name
-                    R = f"Name:<{sval_name}>, Class:<{self.activity.xiflow.tname}>, Domain:<{self.domain}>"
-                    attr_r = Relation.restrict(db=mmdb, relation="Attribute", restriction=R)
-                    if attr_r.body:
+                    if RelvarIndex.exists('Attribute', Name=sval_name, Class=self.activity.xiflow.tname,
+                                          Domain=self.domain):
                         ra = ReadAction(input_single_instance_flow=self.activity.xiflow,
                                         attrs=(sval_name,), anum=self.anum, domain=self.domain)
                         aid, sflows = ra.populate()
@@ -536,11 +536,13 @@ class SignalAction:
                 _logger.error(msg)
                 raise ActionException  # TODO : Type define mismatch exception
 
-            Relvar.insert(db=mmdb, tr=tr_Signal, relvar='External Signal Parameter', tuples=[
+            usage = [
                 External_Signal_Parameter_i(
                     Signal_action=self.action_id, Activity=self.anum, EE=ee, Parameter=pname,
                     Signature=signum, Domain=self.domain, Flow=sval_flow.fid)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_Signal, relvar='External Signal Parameter', tuples=usage)
+            FlowUsage.record(relvar='External Signal Parameter', tuples=usage)
 
 
     def populate_supplied_params(self):
@@ -548,19 +550,17 @@ class SignalAction:
         Populate any Supplied Parmaeters
         """
         # Make sure the event spec exists while setting its state sig num
-        R = f"Name:<{self.event_name}>, State_model:<{self.dest_sm}>, Domain:<{self.domain}>"
-        event_spec_r = Relation.restrict(db=mmdb, relation="Event Specification", restriction=R)
-        if not event_spec_r.body:
+        event_spec = RelvarIndex.lookup('Event Specification', Name=self.event_name, State_model=self.dest_sm,
+                                        Domain=self.domain)
+        if not event_spec:
             msg = f"Event specification {self.event_name} in {self.activity.activity_path} not found"
             _logger.error(msg)
             raise ActionException(msg)
-        evspec_sig = event_spec_r.body[0]['State_signature']
+        evspec_sig = event_spec[0]['State_signature']
 
         for p in self.statement_parse.supplied_params:
             # Validate the parameter
-            R = f"Name:<{p.pname}>, Signature:<{evspec_sig}>, Domain:<{self.domain}>"
-            parameter_r = Relation.restrict(db=mmdb, relation="Parameter", restriction=R)
-            if not parameter_r.body:
+            if not RelvarIndex.exists('Parameter', Name=p.pname, Signature=evspec_sig, Domain=self.domain):
                 msg = f"No parameters defined for event {self.event_name} with signature: {evspec_sig}"
                 _logger.error(msg)
                 raise ActionException(msg)
@@ -573,10 +573,12 @@ class SignalAction:
                 _logger.error(msg)
                 ActionException(msg)
             param_flow = sflows[0]
-            Relvar.insert(db=mmdb, tr=tr_Signal, relvar='Supplied Parameter Value', tuples=[
+            usage = [
                 Supplied_Parameter_Value_i(Parameter=p.pname, Signature=evspec_sig, Action=self.action_id,
                                            Activity=self.anum, Domain=self.domain, Data_flow=param_flow.fid)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_Signal, relvar='Supplied Parameter Value', tuples=usage)
+            FlowUsage.record(relvar='Supplied Parameter Value', tuples=usage)
 
     def populate_delay(self, delay_parse):
         """
@@ -611,7 +613,9 @@ class SignalAction:
         relative = True if signal_delay_input_flow.tname == 'Duration' else False
 
         # Populate
-        Relvar.insert(db=mmdb, tr=tr_Signal, relvar='Delivery Time', tuples=[
+        usage = [
             Delivery_Time_i(Action=self.action_id, Activity=self.anum, Domain=self.domain,
                             Flow=signal_delay_input_flow.fid, Relative=relative)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Signal, relvar='Delivery Time', tuples=usage)
+        FlowUsage.record(relvar='Delivery Time', tuples=usage)
@@ -8,18 +8,19 @@ from collections import namedtuple, Counter
 
 # Model Integration
 from scrall.parse.visitor import Switch_a
-from pyral.relvar import Relvar
 from pyral.relation import Relation  # Keep here for debugging
-from pyral.transaction import Transaction
 
 # xUML Populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.exceptions.action_exceptions import *
 from xuml_populate.populate.actions.aparse_types import ActivityAP, Boundary_Actions
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.flow import Flow
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import (Switch_Action_i, Scalar_Switch_Action_i, Case_i, Match_Value_i,
                                                Sequence_Flow_i, Subclass_Switch_Action_i, Gate_Action_i, Gate_Input_i,
                                                Instance_Action_i, Flow_Connector_i)
@@ -62,14 +63,11 @@ class SwitchStatement:
         """
         rnum = self.parse.input_flow.rnum
         cases = {enum for c in self.parse.cases for enum in c.enums}
-        R = f"Rnum:<{rnum}>, Domain:<{self.domain}>"
-        superclass_r = Relation.restrict(db=mmdb, relation="Superclass", restriction=R)
-        if not superclass_r.body:
+        if not RelvarIndex.exists('Superclass', Rnum=rnum, Domain=self.domain):
             msg = f"Switch input rnum {self.domain}::{rnum} not defined in at {self.activity.activity_path}"
             _logger.error(msg)
             ActionException(msg)
-        subclasses_r = Relation.restrict(db=mmdb, relation="Subclass", restriction=R)
-        subclass_names = {s["Class"] for s in subclasses_r.body}
+        subclass_names = {s["Class"] for s in RelvarIndex.lookup('Subclass', Rnum=rnum, Domain=self.domain)}
         if subclass_names != cases:
             msg = (f"Switch input cases {cases} do not match subclass names {subclass_names} "
                    f"at {self.activity.activity_path}")
@@ -151,9 +149,11 @@ class SwitchStatement:
         for k, v in cactions.items():
             control_flow_fid = Flow.populate_control_flow(tr=tr_Switch, label=k, enabled_actions=v.target_actions,
                                                           anum=self.anum, domain=self.domain)
-            Relvar.insert(db=mmdb, tr=tr_Switch, relvar='Case', tuples=[
+            usage = [
                 Case_i(Flow=control_flow_fid, Activity=self.anum, Domain=self.domain, Switch_action=action_id)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_Switch, relvar='Case', tuples=usage)
+            FlowUsage.record(relvar='Case', tuples=usage)
             for mv in v.match_values:
                 Relvar.insert(db=mmdb, tr=tr_Switch, relvar='Match Value', tuples=[
                     Match_Value_i(Case_flow=control_flow_fid, Activity=self.anum, Domain=self.domain, Value=mv)
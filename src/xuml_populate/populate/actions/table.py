@@ -3,9 +3,8 @@
 import logging
 from typing import Tuple, Dict
 from xuml_populate.config import mmdb
-from pyral.transaction import Transaction
-from pyral.relvar import Relvar
-from pyral.relation import Relation
+from xuml_populate.db import Relation, Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_metamodel.mmclass_nt import Table_i, Type_i, Table_Attribute_i, Model_Attribute_i
 
 _logger = logging.getLogger(__name__)
@@ -25,9 +24,8 @@ class Table:
         :param domain:  Domain name
         :return:  Dictionary of attr:scalar (type) values
         """
-        R = f"Table:<{tname}>, Domain:<{domain}>"
-        attrs = Relation.restrict(mmdb, relation='Table_Attribute', restriction=R)
-        h = {a['Name']: a['Scalar'] for a in attrs.body}
+        attrs = RelvarIndex.lookup('Table_Attribute', Table=tname, Domain=domain)
+        h = {a['Name']: a['Scalar'] for a in attrs}
         return h
 
     @classmethod
@@ -45,9 +43,7 @@ class Table:
         table_name = "_".join([f"{attr_name}_{attr_type}" for attr_name, attr_type in table_header.items()])
 
         # Check to see if the table already exists, if so, just return the name
-        R = f"Name:<{table_name}>, Domain:<{domain}>"
-        result = Relation.restrict(mmdb, relation='Table', restriction=R)
-        if result.body:
+        if RelvarIndex.exists('Table', Name=table_name, Domain=domain):
             return table_name
 
         _logger.info(f"Populating Table flow on existing Table: [{table_name}]")
@@ -7,17 +7,16 @@ from typing import Dict, Set, TYPE_CHECKING
 
 # Model Integration
 from scrall.parse.visitor import Table_Assignment_a
-from pyral.relvar import Relvar
 from pyral.relation import Relation  # Keep for debugging
-from pyral.transaction import Transaction
 
 
 # xUML Populate
+from xuml_populate.context import ContextScoped, ContextState
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.exceptions.action_exceptions import *
 from xuml_populate.config import mmdb
-from xuml_metamodel.mmclass_nt import Labeled_Flow_i
+from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.actions.gate_action import GateAction
 from xuml_populate.populate.actions.expressions.table_expr import TableExpr
 from xuml_populate.populate.actions.aparse_types import (Flow_ap, MaxMult, Content, Boundary_Actions, Labeled_Flow)
@@ -27,23 +26,19 @@ if __debug__:
 
 _logger = logging.getLogger(__name__)
 
-# Transactions
-tr_Migrate = "Migrate to Label"
-
-
-class TableAssignment:
+class TableAssignment(metaclass=ContextScoped):
     """
     Break down a table assignment statement into action semantics and populate them
 
     """
 
-    input_instance_flow = None  # The instance flow feeding the next component on the RHS
-    input_instance_ctype = None  # The class type of the input instance flow
-    domain = None
-    anum = None
-    mmdb = None
-    activity_path = None
-    scrall_text = None
+    input_instance_flow = ContextState()  # The instance flow feeding the next component on the RHS
+    input_instance_ctype = ContextState()  # The class type of the input instance flow
+    domain = ContextState()
+    anum = ContextState()
+    mmdb = ContextState()
+    activity_path = ContextState()
+    scrall_text = ContextState()
 
     @classmethod
     def process(cls, activity: 'Activity', table_assign_parse: Table_Assignment_a, case_name: str) -> Boundary_Actions:
@@ -90,17 +85,7 @@ class TableAssignment:
         # TODO: handle case where lhs is an explicit table assignment
 
         # Migrate the output_flow to a labeled flow
-        _logger.info(f"Labeling output of table expression to [{lhs}]")
-        Transaction.open(db=mmdb, name=tr_Migrate)
-        # Delete the Unlabeled flow
-        Relvar.deleteone(db=mmdb, tr=tr_Migrate, relvar_name="Unlabeled_Flow",
-                         tid={"ID": output_flow.fid, "Activity": activity.anum, "Domain": activity.domain})
-        # Insert the labeled flow
-        Relvar.insert(db=mmdb, tr=tr_Migrate, relvar='Labeled_Flow', tuples=[
-            Labeled_Flow_i(ID=output_flow.fid, Activity=activity.anum, Domain=activity.domain,
-                           Name=output_flow_label)
-        ])
-        Transaction.execute(db=mmdb, name=tr_Migrate)
+        Flow.label_flow(label=output_flow_label, fid=output_flow.fid, anum=activity.anum, domain=activity.domain)
 
         pass
         GateAction.gate_duplicate_labeled_nsflow(aid=final_output_aid, fid=output_flow.fid, label=output_flow_label, activity=activity)
@@ -2,9 +2,9 @@
 
 import logging
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.exceptions.action_exceptions import UndefinedTableAttribute
-from pyral.relvar import Relvar
-from pyral.relation import Relation
 
 _logger = logging.getLogger(__name__)
 
@@ -27,9 +27,8 @@ class TableAttribute:
         :param domain:  Domain name
         :return: Name of Table Attribute's Scalar (Type)
         """
-        R = f"Name:<{name}>, Table:<{table}>, Domain:<{domain}>"
-        result = Relation.restrict(mmdb, relation='Table_Attribute', restriction=R)
-        if not result.body:
+        result = RelvarIndex.lookup('Table_Attribute', Name=name, Table=table, Domain=domain)
+        if not result:
             _logger.error(f"Undefined table attribute: [{name}:{domain}]")
             raise UndefinedTableAttribute
-        return result.body[0]['Scalar']
+        return result[0]['Scalar']
@@ -8,16 +8,16 @@ from typing import Set, Dict, List, TYPE_CHECKING
 
 # Model Integration
 from scrall.parse.visitor import PATH_a
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
 
 # XUML_Populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.flow import Flow
+from xuml_populate.populate.class_topology import ClassTopology, ResolvedPath
 from xuml_populate.exceptions.action_exceptions import (UndefinedRelationship, IncompletePath,
                                                         NoDestinationInPath, UndefinedClass,
                                                         RelationshipUnreachableFromClass, HopToUnreachableClass,
@@ -35,6 +35,7 @@ from xuml_metamodel.mmclass_nt import (Action_i, Traverse_Action_i, Path_i, Hop_
                                                Perspective_Hop_i, Generalization_Hop_i, To_Subclass_Hop_i,
                                                To_Superclass_Hop_i, Association_Hop_i, Instance_Action_i)
 from xuml_populate.populate.actions.hop_types import *
+from xuml_populate.populate.flow_usage import FlowUsage
 
 if __debug__:
     from xuml_populate.utility import print_mmdb
@@ -71,6 +72,7 @@ class TraverseAction:
         self.domain = activity.domain
         self.activity_path = activity.activity_path
         self.scrall_text = activity.scrall_text
+        self.topology = ClassTopology.of(domain=self.domain)
         self.mult = input_instance_flow.max_mult  # Will be updated as the max mult of the current hop
         self.to_many_assoc_on_one = False  # Set to true if final hop navigates to many associative from one inst
 
@@ -87,9 +89,8 @@ class TraverseAction:
 
         # Check for hop to many associative class
         self.many_associative_dest_class = False  # Default assumption
-        R = f"Class:<{self.dest_class}>, Domain:<{self.domain}>"
-        association_class_r = Relation.restrict(db=mmdb, relation="Association Class", restriction=R)
-        if association_class_r.body and association_class_r.body[0]["Multiplicity"] == 'M':
+        association_class = self.topology.formalized_by.get(self.dest_class)
+        if association_class and association_class[0]["Multiplicity"] == 'M':
             self.many_associative_dest_class = True
 
         self.output_flow = self.build_path()
@@ -120,6 +121,16 @@ class TraverseAction:
             raise NoDestinationInPath(self.path)
         self.dest_class = terminal_hop.name
 
+        # Reuse the resolution of this path if it has been traversed before from the same class and multiplicity
+        path_key = (self.class_cursor, self.path_text(), self.mult)
+        if resolved := self.topology.paths.get(path_key):
+            self.name, self.class_cursor, self.mult = resolved.name, resolved.dest_class, resolved.mult
+            self.to_many_assoc_on_one = resolved.to_many_assoc_on_one
+            self.hops = [hop_class(hoptype=getattr(self, hoptype), **values)
+                         for hop_class, hoptype, values in resolved.hops]
+            self.populate()
+            return Flow_ap(fid=self.dest_fid, content=Content.INSTANCE, tname=self.dest_class, max_mult=self.mult)
+
         # Valdiate path continuity
         # Step through the path validating each relationship, phrase, and class
         # Ensure that each step is reachable on the class model
@@ -142,13 +153,8 @@ class TraverseAction:
                 # Determine the type and call the corresponding hop populator
 
                 # First we look for any References to or from the class cursor
-                R = f"(From_class:<{self.class_cursor}> OR To_class:<{self.class_cursor}>), Rnum:<{hop.rnum}>, " \
-                    f"Domain:<{self.domain}>"
-                ref_r = Relation.restrict(db=mmdb, restriction=R, relation="Reference")
-                if ref_r.body:
-                    P = ('Ref', 'From_class', 'To_class')
-                    refs = Relation.project(db=mmdb, attributes=P, svar_name='rhop').body
-
+                refs = self.topology.class_refs(rnum=hop.rnum, cname=self.class_cursor)
+                if refs:
                     # Generalization
                     if refs[0]['Ref'] == 'G':
                         self.hop_generalization(refs=refs)
@@ -165,12 +171,26 @@ class TraverseAction:
             # Path does not reach destination
             pass
 
+        self.topology.paths[path_key] = ResolvedPath(
+            name=self.name, dest_class=self.class_cursor, mult=self.mult,
+            to_many_assoc_on_one=self.to_many_assoc_on_one,
+            hops=[(type(h), h.hoptype.__name__, {k: v for k, v in vars(h).items() if k != 'hoptype'})
+                  for h in self.hops]
+        )
+
         # Now we can populate the path
         self.populate()
 
         return Flow_ap(fid=self.dest_fid, content=Content.INSTANCE, tname=self.dest_class, max_mult=self.mult)
 
 
+    def path_text(self) -> str:
+        """
+        Returns:
+            The path as written, each rnum or name separated by a slash
+        """
+        return '/' + '/'.join(str(getattr(h, 'rnum', getattr(h, 'name', h))) for h in self.path.hops)
+
     def populate(self):
         """
         Populate the Traverse Statement, Path and all Hops
@@ -191,14 +211,14 @@ class TraverseAction:
         Relvar.insert(db=mmdb, tr=tr_Traverse, relvar='Instance Action', tuples=[
             Instance_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain)
         ])
-        Relvar.insert(db=mmdb, tr=tr_Traverse, relvar='Traverse Action', tuples=[
+        usage = [
             Traverse_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain, Path=self.name,
                               Source_flow=self.input_instance_flow.fid, Destination_flow=self.dest_fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Traverse, relvar='Traverse Action', tuples=usage)
+        FlowUsage.record(relvar='Traverse Action', tuples=usage)
         # If the path already exists, we can just reuse it
-        R = f"Name:<{self.name}>, Domain:<{self.domain}>"
-        path_r = Relation.restrict(db=mmdb, relation='Path', restriction=R)
-        reusing_path = True if path_r.body else False
+        reusing_path = RelvarIndex.exists('Path', Name=self.name, Domain=self.domain)
         if not reusing_path:
             Relvar.insert(db=mmdb, tr=tr_Traverse, relvar='Path', tuples=[
                 Path_i(Name=self.name, Domain=self.domain, Dest_class=self.dest_class)
@@ -217,8 +237,7 @@ class TraverseAction:
         _logger.info(f"EXECUTED > {mmdb}:{tr_Traverse}")
 
     def validate_rel(self, rnum: str):
-        rel = f"Rnum:<{rnum}>, Domain:<{self.domain}>"
-        if not Relation.restrict(db=mmdb, restriction=rel, relation="Relationship").body:
+        if rnum not in self.topology.rnums:
             _logger.error(f"Undefined Rnum {rnum} in Domain {self.domain}")
             raise UndefinedRelationship(rnum=rnum, domain=self.domain)
 
@@ -270,11 +289,6 @@ class TraverseAction:
 
         """
         _logger.info("ACTION:Traverse - Populating a To Association Class Hop")
-        # First check the case where this is the final hop leading to a many associative class
-        # If so, any calling Select Action using this traversal as input will take that into account
-        if self.many_associative_dest_class and to_class == self.dest_class and input_mult == MaxMult.ONE:
-            self.to_many_assoc_on_one = True
-
         # Populate
         Relvar.insert(db=mmdb, tr=tr_Traverse, relvar='To Association Class Hop', tuples=[
             To_Association_Class_Hop_i(Number=number, Path=self.name, Domain=self.domain, Many_associative=False)
@@ -338,8 +352,7 @@ class TraverseAction:
         :param rnum: Class participates in this association
         :return: True of the class is an association class formalizing the specified association
         """
-        r = f"Class:<{cname}>, Rnum:<{rnum}>, Domain:<{self.domain}>"
-        return bool(Relation.restrict(db=mmdb, restriction=r, relation="Association_Class").body)
+        return (rnum, cname) in self.topology.assoc_classes
 
     def is_reflexive(self, rnum: str) -> int:
         """
@@ -351,15 +364,14 @@ class TraverseAction:
         :return: Zero if non-reflexive, 1 if symmetric and 2 if assymmetric reflexive
         """
         # Get all perspectives defined on rnum
-        R = f"Rnum:<{rnum}>, Domain:<{self.domain}>"
-        perspectives = Relation.restrict(db=mmdb, restriction=R, relation="Perspective")
-        if not perspectives.body:
+        perspectives = self.topology.perspectives.get(rnum)
+        if not perspectives:
             # Every association relationship defines at least one perspective
             raise UndefinedAssociation(rnum=rnum, domain=self.domain)
-        vclasses = Relation.project(db=mmdb, attributes=('Viewed_class',)).body
+        vclasses = {p['Viewed_class'] for p in perspectives}
         # Reflexive if there is both viewed classes are the same (only 1)
         # So, if reflexive, return 1 (S - Symmetric) or 2 (T,P - Assymetric), otherwise 0, non-reflexive
-        return len(perspectives.body) if len(vclasses) == 1 else 0
+        return len(perspectives) if len(vclasses) == 1 else 0
 
     def reachable_classes(self, rnum: str) -> Set[str]:
         """
@@ -369,9 +381,7 @@ class TraverseAction:
         :return:
         """
         reachable_classes = set()
-        R = f"Rnum:<{rnum}>, Domain:<{self.domain}>"
-        refs = Relation.restrict(db=mmdb, restriction=R, relation="Reference").body
-        for ref in refs:
+        for ref in self.topology.references.get(rnum, []):
             reachable_classes.add(ref['To_class'])
             reachable_classes.add(ref['From_class'])
         return reachable_classes
@@ -379,9 +389,7 @@ class TraverseAction:
     def resolve_ordinal_perspective(self, perspective: str) -> bool:
         # Search for ordinal rel with the supplied perspective
         # TODO: Update metamodel with two additional identifiers
-        R = f"Ranked_class:<{self.class_cursor}>, Domain:<{self.domain}>, " \
-            f"(Ascending_perspective:<{perspective}> OR Descending_perspective:<{perspective}>)"
-        orel = Relation.restrict(db=mmdb, restriction=R, relation="Ordinal_Relationship").body[0]
+        orel = self.topology.ordinal(ranked_class=self.class_cursor, perspective=perspective)
         if not orel:
             return False
         self.rel_cursor = orel['Rnum']
@@ -401,9 +409,7 @@ class TraverseAction:
         super_class = refs[0]['To_class']
         if len(refs) > 1:
             # We are hopping from the super_class to a subclass
-            P = ("From_class",)
-            sub_tuples = Relation.project(db=mmdb, attributes=P, relation="rhop").body
-            subclasses = {s['From_class'] for s in sub_tuples}
+            subclasses = {r['From_class'] for r in refs}
             # The subclass must be specified in the next hop
             self.path_index += 1
             next_hop = self.path.hops[self.path_index]
@@ -449,9 +455,8 @@ class TraverseAction:
                     # Since this is an R ref (no association class) we just need to specify the
                     # rnum, domain, and viewed class which will be the updated class cursor
                     self.class_cursor = to_class if to_class != self.class_cursor else from_class
-                    R = f"Rnum:<{self.rel_cursor}>, Domain:<{self.domain}>, Viewed_class:<{self.class_cursor}>"
-                    persp_r = Relation.restrict(db=mmdb, relation='Perspective', restriction=R)
-                    if not persp_r.body:
+                    persp = self.topology.perspective(rnum=self.rel_cursor, viewed_class=self.class_cursor)
+                    if not persp:
                         msg = f"Hopping R association with no perspective at {self.activity.activity_path}"
                         _logger.error(msg)
                         raise IncompleteActionException(msg)
@@ -459,7 +464,7 @@ class TraverseAction:
                         # If we are a 1 mult, we might change that to M mult
                         # But if we are M mult, we don't change it (even if we are traversing to 1, EACH of the M
                         # set will get 1 leaving us with M)
-                        self.mult = MaxMult.ONE if persp_r.body[0]['Multiplicity'] == '1' else MaxMult.MANY
+                        self.mult = MaxMult.ONE if persp['Multiplicity'] == '1' else MaxMult.MANY
                     self.hops.append(
                         Hop(hoptype=self.straight_hop, to_class=self.class_cursor, rnum=self.rel_cursor)
                     )
@@ -488,9 +493,8 @@ class TraverseAction:
                     self.class_cursor = from_class
                     # Update multiplicity
                     # First check multiplicity on to_class perspective (same as ref)
-                    R = f"Rnum:<{self.rel_cursor}>, Domain:<{self.domain}>, Side:<{ref}>"
-                    persp_r = Relation.restrict(db=mmdb, relation='Perspective', restriction=R)
-                    if not persp_r.body:
+                    persp = self.topology.perspective(rnum=self.rel_cursor, side=ref)
+                    if not persp:
                         msg = f"Hopping T/P association with no perspective at {self.activity.activity_path}"
                         _logger.error(msg)
                         raise IncompleteActionException(msg)
@@ -501,19 +505,26 @@ class TraverseAction:
                     input_mult = self.mult  # Save this to remember the input mult before the hop
 
                     # Set multiplicity based on the perspective
-                    self.mult = MaxMult.ONE if persp_r.body[0]['Multiplicity'] == '1' else MaxMult.MANY
+                    self.mult = MaxMult.ONE if persp['Multiplicity'] == '1' else MaxMult.MANY
 
                     # If multiplicity has been set to 1, but associative multiplicity is M, we need to set it as M
-                    R = f"Rnum:<{self.rel_cursor}>, Domain:<{self.domain}>, Class:<{self.class_cursor}>"
-                    assoc_class_r = Relation.restrict(db=mmdb, relation='Association Class', restriction=R)
-                    if not assoc_class_r.body:
+                    assoc_class = self.topology.assoc_classes.get((self.rel_cursor, self.class_cursor))
+                    if not assoc_class:
                         msg = f"Hopping T/P with no aclass at {self.activity.activity_path}"
                         _logger.error(msg)
                         raise IncompleteActionException(msg)
-                    associative_mult = assoc_class_r.body[0]['Multiplicity']
+                    associative_mult = assoc_class['Multiplicity']
                     # Associative mult of M overrides a single mult
                     self.mult = MaxMult.MANY if associative_mult == 'M' else self.mult
 
+                    # Check the case where this is the final hop leading to a many associative class
+                    # If so, any calling Select Action using this traversal as input will take that into account
+                    # This is decided here rather than as the hop is populated, since a path already
+                    # populated in the domain is reused without populating its hops again
+                    if (self.many_associative_dest_class and self.class_cursor == self.dest_class and
+                            input_mult == MaxMult.ONE):
+                        self.to_many_assoc_on_one = True
+
                     self.name += self.class_cursor + '/'
                     self.hops.append(
                         ToAssocClassHop(hoptype=self.to_association_class, to_class=self.class_cursor,
@@ -527,8 +538,8 @@ class TraverseAction:
                 else:
                     # Get the To class of the other (T or P) reference
                     other_ref_name = 'P' if ref == 'T' else 'T'
-                    R = f"Ref:<{other_ref_name}>, Rnum:<{self.rel_cursor}>, Domain:<{self.domain}>"
-                    other_ref = Relation.restrict(db=mmdb, restriction=R, relation="Reference").body
+                    other_ref = [r for r in self.topology.references.get(self.rel_cursor, [])
+                                 if r['Ref'] == other_ref_name]
                     if not other_ref:
                         # The model must be currupted somehow
                         raise MissingTorPrefInAssociativeRel(rnum=self.rel_cursor, domain=self.domain)
@@ -560,10 +571,7 @@ class TraverseAction:
             if next_hop.name in particip_classes:
                 # The particpating class is explicitly named
                 self.class_cursor = next_hop.name
-                R = f"Viewed_class:<{self.class_cursor}>, Rnum:<{self.rel_cursor}>, Domain:<{self.domain}>"
-                Relation.restrict(db=mmdb, relation='Perspective', restriction=R)
-                P = ('Side',)
-                side = Relation.project(db=mmdb, attributes=P).body[0]['Side']
+                side = self.topology.perspective(rnum=self.rel_cursor, viewed_class=self.class_cursor)['Side']
                 self.name += self.class_cursor + '/'
                 self.hops.append(
                     FromAsymAssocHop(hoptype=self.from_asymmetric_association_class, to_class=self.class_cursor,
@@ -582,13 +590,11 @@ class TraverseAction:
         :param phrase:  Perspective phrase text such as 'travels along'
         """
         # Find phrase and ensure that it is on an association that involves the class cursor
-        R = f"Phrase:<{phrase}>, Domain:<{self.domain}>"
-        r_result = Relation.restrict(db=mmdb, relation='Perspective', restriction=R)
-        if not r_result.body:
+        r_result = self.topology.phrases.get(phrase)
+        if not r_result:
             return False
         P = ('Side', 'Rnum', 'Viewed_class')
-        p_result = Relation.project(db=mmdb, attributes=P)
-        side, rnum, viewed_class = map(p_result.body[0].get, P)
+        side, rnum, viewed_class = map(r_result[0].get, P)
         self.rel_cursor = rnum
 
         # The next hop may be a class name that matches the viewed class
@@ -7,16 +7,16 @@ from typing import Optional
 
 # Model Integration
 from scrall.parse.visitor import Supplied_Parameter_a
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
 
 # xUML Populate
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.exceptions.action_exceptions import *
 from xuml_populate.populate.actions.aparse_types import ActivityAP, Boundary_Actions, Flow_ap
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import Type_Action_i, Type_Operation_i
 
 if __debug__:
@@ -68,12 +68,12 @@ class TypeAction:
         # This is just a default label that will be superceded by any user specified label by the caller of this
         # action, an assigment statement, for example.
         # If it is labeled, we can copy that label into the suffix
-        R = f"ID:<{self.input_flow.fid}>, Activity:<{self.anum}>, Domain:<{self.domain}>"
-        labeled_flow_r = Relation.restrict(db=mmdb, relation="Labeled Flow", restriction=R)
+        labeled_flow = RelvarIndex.lookup('Labeled Flow', ID=self.input_flow.fid, Activity=self.anum,
+                                          Domain=self.domain)
         suffix = self.action_id[4:]  # Just take the number at the end
-        if labeled_flow_r.body:
+        if labeled_flow:
             # Op name and input label if it is labeled, otherwise, use action number
-            suffix = labeled_flow_r.body[0]["Name"]
+            suffix = labeled_flow[0]["Name"]
         self.default_label = f"_{self.name}_{suffix}"
 
         # Populate the output scalar flow (but don't use the generated label)
@@ -81,15 +81,19 @@ class TypeAction:
                                                    domain=self.domain, activity_tr=tr_Type)
 
         # Insert the Type Operation Instance providing the input flow scalar, since that's what we're operating on
-        Relvar.insert(db=mmdb, tr=tr_Type, relvar='Type Action', tuples=[
+        usage = [
             Type_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain, Scalar=self.input_flow.tname,
                           Output_flow=self.sflow_out.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Type, relvar='Type Action', tuples=usage)
+        FlowUsage.record(relvar='Type Action', tuples=usage)
 
-        Relvar.insert(db=mmdb, tr=tr_Type, relvar='Type Operation', tuples=[
+        usage = [
             Type_Operation_i(ID=self.action_id, Activity=self.anum, Domain=self.domain,
                              Name=self.name, Input_flow=self.input_flow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Type, relvar='Type Operation', tuples=usage)
+        FlowUsage.record(relvar='Type Operation', tuples=usage)
         Transaction.execute(db=mmdb, name=tr_Type)
         return self.action_id, self.action_id, self.sflow_out
 
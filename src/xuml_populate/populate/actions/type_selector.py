@@ -5,20 +5,17 @@ type_selector.py – Process a Type Selector action
 import logging
 from typing import Optional, TYPE_CHECKING
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
-
 # xUML Populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
 from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.exceptions.action_exceptions import *
 from xuml_populate.populate.actions.aparse_types import ActivityAP, Boundary_Actions, Flow_ap
 from xuml_populate.populate.mm_type import MMtype
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import Type_Action_i, Type_Operation_i, Selector_i
 
 if __debug__:
@@ -75,10 +72,12 @@ class TypeSelector:
                                                    domain=self.domain, label=label, activity_tr=tr_Selector)
 
         # Insert the Type Operation Instance providing the input flow scalar, since that's what we're operating on
-        Relvar.insert(db=mmdb, tr=tr_Selector, relvar='Type Action', tuples=[
+        usage = [
             Type_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain, Scalar=self.scalar,
                           Output_flow=self.sflow_out.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Selector, relvar='Type Action', tuples=usage)
+        FlowUsage.record(relvar='Type Action', tuples=usage)
 
         Relvar.insert(db=mmdb, tr=tr_Selector, relvar='Selector', tuples=[
             Selector_i(ID=self.action_id, Activity=self.anum, Domain=self.domain, Value=self.value)
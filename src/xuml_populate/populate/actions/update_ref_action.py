@@ -8,19 +8,19 @@ from typing import List, TYPE_CHECKING
 
 # Model Integration
 from scrall.parse.visitor import Update_ref_a
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
 
 # xUML Populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
 from xuml_populate.populate.actions.expressions.instance_set import InstanceSet
 from xuml_populate.populate.actions.aparse_types import Boundary_Actions
 from xuml_populate.populate.actions.action import Action
+from xuml_populate.populate.actions.read_action import ReadAction
 from xuml_populate.populate.flow import Flow
 from xuml_populate.exceptions.action_exceptions import *
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import (
     Instance_Action_i, Reference_Action_i, Update_Reference_Action_i,
     To_Ref_Instance_i, Referenced_Instance_i
@@ -83,12 +83,14 @@ class UpdateReferenceAction:
         ain, _, to_ref_iflow = ie.process()
         self.input_aids.update(ain)
 
-        Relvar.insert(db=mmdb, tr=tr_Update, relvar='Update Reference Action', tuples=[
+        usage = [
             Update_Reference_Action_i(
                 ID=self.action_id, Activity=self.anum, Domain=self.domain,
                 From_instance=from_ref_iflow.fid, To_instance=to_ref_iflow.fid
             )
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Update, relvar='Update Reference Action', tuples=usage)
+        FlowUsage.record(relvar='Update Reference Action', tuples=usage)
 
         Relvar.insert(db=mmdb, tr=tr_Update, relvar='Referenced Instance', tuples=[
             Referenced_Instance_i(
@@ -102,5 +104,7 @@ class UpdateReferenceAction:
         ])
 
         Transaction.execute(db=mmdb, name=tr_Update)
+        # Referential attribute values change
+        ReadAction.forget(anum=self.anum, domain=self.domain)
 
         return Boundary_Actions(ain=self.input_aids, aout={self.action_id})
@@ -6,13 +6,12 @@ parameter_validation.py – Verify that a parameter is defined
 import logging
 from typing import TYPE_CHECKING
 
-# Model Integration
-from pyral.relation import Relation
-
 # xUML Populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.exceptions.action_exceptions import UndefinedParameter
 from xuml_populate.populate.actions.aparse_types import ActivityAP
 
@@ -30,8 +29,7 @@ def validate_param(name: str, activity: 'Activity') -> str:
         They type of the parameter
     """
     # Verify that there is a populated instance of Parameter
-    R = f"Name:<{name}>, Signature:<{activity.signum}>, Domain:<{activity.domain}>"
-    param_r = Relation.restrict(db=mmdb, relation='Parameter', restriction=R)
-    if not param_r.body:
+    param = RelvarIndex.lookup('Parameter', Name=name, Signature=activity.signum, Domain=activity.domain)
+    if not param:
         raise UndefinedParameter
-    return param_r.body[0]['Type']
+    return param[0]['Type']
@@ -5,18 +5,17 @@ write_action.py – Populate a write action instance in PyRAL
 import logging
 from typing import Set, List, Tuple, TYPE_CHECKING
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.transaction import Transaction
-
 # xUML Populate
 if TYPE_CHECKING:
     from xuml_populate.populate.activity import Activity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
 from xuml_populate.populate.actions.aparse_types import Flow_ap, MaxMult, Content, ActivityAP
 from xuml_populate.populate.actions.action import Action
+from xuml_populate.populate.actions.read_action import ReadAction
 from xuml_populate.populate.mm_class import MMclass
 from xuml_populate.populate.flow import Flow
+from xuml_populate.populate.flow_usage import FlowUsage
 from xuml_metamodel.mmclass_nt import Write_Action_i, Attribute_Write_Access_i
 
 _logger = logging.getLogger(__name__)
@@ -61,16 +60,21 @@ class WriteAction:
         # Populate the Action superclass instance and obtain its action_id
         Transaction.open(db=mmdb, name=tr_Write)
         self.action_id = Action.populate(tr=tr_Write, anum=self.anum, domain=self.domain, action_type="write")
-        Relvar.insert(db=mmdb, tr=tr_Write, relvar='Write Action', tuples=[
+        usage = [
             Write_Action_i(ID=self.action_id, Activity=self.anum, Domain=self.domain,
                            Instance_flow=self.write_to_instance_flow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Write, relvar='Write Action', tuples=usage)
+        FlowUsage.record(relvar='Write Action', tuples=usage)
 
-        Relvar.insert(db=mmdb, tr=tr_Write, relvar='Attribute Write Access', tuples=[
+        usage = [
             Attribute_Write_Access_i(Attribute=self.attr_name, Class=self.cname, Write_action=self.action_id,
                                      Activity=self.anum, Domain=self.domain, Input_flow=self.value_to_write_flow.fid)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Write, relvar='Attribute Write Access', tuples=usage)
+        FlowUsage.record(relvar='Attribute Write Access', tuples=usage)
 
         # We now have a transaction with all select-action instances, enter into the metamodel db
         Transaction.execute(db=mmdb, name=tr_Write)  # write action
+        ReadAction.forget(anum=self.anum, domain=self.domain, attr=self.attr_name)
         return self.action_id
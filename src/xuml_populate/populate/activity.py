@@ -4,25 +4,23 @@ activity.py – Populate an Activity
 
 # System
 import logging
-from typing import NamedTuple, Optional
+from typing import Optional
 # For debugging
 from collections import namedtuple, defaultdict
 
 # Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
 from pyral.rtypes import JoinCmd, ProjectCmd, SetCompareCmd, SetOp, Attribute, SumExpr, RelationValue
-from scrall.parse.parser import ScrallParser
 
 # xUML Populate
 from xuml_populate.populate.signature import Signature
 from xuml_populate.exceptions.action_exceptions import *
-from xuml_populate.populate.actions.sequence_flow import SequenceFlow
-from xuml_populate.populate.xunit import ExecutionUnit
 from xuml_metamodel.mmclass_nt import Flow_Dependency_i, Delegated_Creation_Activity_i, Real_State_Activity_i
 from xuml_populate.config import mmdb
+from xuml_populate.db import Database, Relation, Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
+from xuml_populate.parse_cache import ParseCache
 from xuml_populate.populate.flow import Flow, Flow_ap
+from xuml_populate.populate.flow_usage import FlowUsage, flow_attrs
 from xuml_populate.populate.actions.action import Action
 from xuml_populate.populate.element import Element
 from xuml_populate.populate.actions.aparse_types import (ActivityAP, SMType, ActivityType, Boundary_Actions,
@@ -47,75 +45,6 @@ slogger.addHandler(null_handler)
 slogger.propagate = False
 
 
-# TODO: This can be generated later by make_repo, ensure each name ends with 'Action'
-class UsageAttrs(NamedTuple):
-    cname: str
-    id_attr: str | None
-    in_attr: str | None = None
-    out_attr: str | None = None
-    in_attr2: str | None = None  # New Associative Reference Action for example
-
-# We use the following list of tuples to extract the required input and output flows of each Action type
-# Create a tuple for each class that specifies an input, output or both flows as part of some Action's subsystem
-# Some Action's require one class while others may have two or three
-
-# cname - the name of the class holding references to one or more required flows, PyRAL allows spaces in class name
-# id_attr - The attribute holding the Action ID, so the type must be Action ID, PyRAL requires snake_case for attrs
-# in_attr - The name of the required input, for now we assume there is only one, type of this attr must be Flow ID
-# in_attr2 - Okay, make that two possible required inputs in rare cases, same rules as for in_attr
-# out_attr - The name of a required output attr, again a Flow ID type
-
-flow_attrs = [
-    UsageAttrs(cname='External Signal Parameter', id_attr='Signal_action', in_attr='Flow', out_attr=None),
-    UsageAttrs(cname='Reference Initialization', id_attr='Create_action', in_attr='Initial_value_flow', out_attr=None),
-    UsageAttrs(cname='Local Create Action', id_attr='ID', in_attr=None, out_attr='New_instance_flow'),
-    UsageAttrs(cname='New Reference Action', id_attr='ID', in_attr=None, out_attr='Ref_attr_values'),
-    UsageAttrs(cname='Update Reference Action', id_attr='ID', in_attr='From_instance', in_attr2='To_instance'),
-    UsageAttrs(cname='New Associative Reference Action', id_attr='ID', in_attr='T_instance', in_attr2='P_instance',
-               out_attr=None),
-    UsageAttrs(cname='Iterated Instance Flow', id_attr='Iterator', in_attr=None, out_attr='Flow'),
-    UsageAttrs(cname='Iterator', id_attr='ID', in_attr='Input_flow', out_attr=None),
-    UsageAttrs(cname='Extender', id_attr='ID', in_attr='Attribute_flow', out_attr='Table_output'),
-    UsageAttrs(cname='Cardinality Action', id_attr='ID', in_attr='Non_scalar_input_flow',
-               out_attr='Output_cardinality_flow'),
-    UsageAttrs(cname='Cast To Instance', id_attr='ID', in_attr='Relation_flow', out_attr='Instance_flow'),
-    UsageAttrs(cname='Supplied Parameter Value', id_attr='Action', in_attr='Data_flow', out_attr=None),
-    UsageAttrs(cname='Computation Input', id_attr='Computation', in_attr='Input_flow', out_attr=None),
-    UsageAttrs(cname='General Computation', id_attr='ID', in_attr=None, out_attr='Result_flow'),
-    UsageAttrs(cname='Type Action', id_attr='ID', in_attr=None, out_attr='Output_flow'),
-    UsageAttrs(cname='Type Operation', id_attr='ID', in_attr='Input_flow', out_attr=None),
-    UsageAttrs(cname='Pass Action', id_attr='ID', in_attr='Input_flow', out_attr='Output_flow'),
-    UsageAttrs(cname='Delete Action', id_attr='ID', in_attr='Flow', out_attr=None),
-    UsageAttrs(cname='Operation Call Output', id_attr='Operation_call', in_attr=None, out_attr='Flow'),
-    UsageAttrs(cname='Operation Call Parameter', id_attr='Operation_call', in_attr='Flow', out_attr=None),
-    UsageAttrs(cname='Method Call', id_attr='ID', in_attr='Instance_flow', out_attr=None),
-    UsageAttrs(cname='Method Call Parameter', id_attr='Method_call', in_attr='Flow', out_attr=None),
-    UsageAttrs(cname='Method Call Output', id_attr='Method_call', in_attr=None, out_attr='Flow'),
-    UsageAttrs(cname='Decision Action', id_attr='ID', in_attr='Boolean_input', out_attr=None),
-    UsageAttrs(cname='Result', id_attr='Decision_action', in_attr=None, out_attr='Flow'),
-    UsageAttrs(cname='Explicit Initialization', id_attr='Create_action', in_attr='Initial_value_flow', out_attr=None),
-    UsageAttrs(cname='Local Create Action', id_attr='ID', in_attr=None, out_attr='New_instance_flow'),
-    UsageAttrs(cname='Multiple Assigner Partition Instance', id_attr='Action', in_attr='Partition', out_attr=None),
-    UsageAttrs(cname='Delivery Time', id_attr='Action', in_attr='Flow', out_attr=None),
-    UsageAttrs(cname='Signal Instance Action', id_attr='ID', in_attr='Instance_flow', out_attr=None),
-    UsageAttrs(cname='Write Action', id_attr='ID', in_attr='Instance_flow', out_attr=None),
-    UsageAttrs(cname='Attribute Write Access', id_attr='Write_action', in_attr='Input_flow', out_attr=None),
-    UsageAttrs(cname='Select Action', id_attr='ID', in_attr='Input_flow', out_attr=None),
-    UsageAttrs(cname='Traverse Action', id_attr='ID', in_attr='Source_flow', out_attr='Destination_flow'),
-    UsageAttrs(cname='Many Select', id_attr='ID', in_attr=None, out_attr='Output_flow'),
-    UsageAttrs(cname='Single Select', id_attr='ID', in_attr=None, out_attr='Output_flow'),
-    UsageAttrs(cname='Table Action', id_attr='ID', in_attr='Input_a_flow', out_attr='Output_flow'),
-    UsageAttrs(cname='Set Action', id_attr='ID', in_attr='Input_b_flow', out_attr=None),
-    UsageAttrs(cname='Read Action', id_attr='ID', in_attr='Instance_flow', out_attr=None),
-    UsageAttrs(cname='Attribute Read Access', id_attr='Read_action', in_attr=None, out_attr='Output_flow'),
-    UsageAttrs(cname='Comparison Criterion', id_attr='Action', in_attr='Value', out_attr=None),
-    UsageAttrs(cname='Gate Action', id_attr='ID', in_attr=None, out_attr='Output_flow'),
-    UsageAttrs(cname='Gate Input', id_attr='Gate_action', in_attr='Input_flow', out_attr=None),
-    UsageAttrs(cname='Case', id_attr='Switch_action', in_attr=None, out_attr='Flow'),
-    UsageAttrs(cname='Control Dependency', id_attr='Action', in_attr='Control_flow', out_attr=None),
-    UsageAttrs(cname='Extract Action', id_attr='ID', in_attr='Input_tuple', out_attr='Output_scalar'),
-]
-
 Action_i = namedtuple('Action_i', 'ID')
 
 class Activity:
@@ -139,6 +68,9 @@ class Activity:
         self.domain = activity_data.domain
         self.activity_path = activity_data.activity_path
         self.labeled_outputs: dict[str, str] = {}
+        # Source and dest actions by flow, recorded by FlowUsage as the flow usage classes are populated
+        self.flow_usage: dict[str, dict[str, set[str]]] = {}
+        FlowUsage.register(self)
 
         # Any Action, such as the Decision or Switch Actions that enable sets of Actions via
         # the Scrall component_statement_set must retain the set of Action IDs that must be enabled
@@ -206,7 +138,12 @@ class Activity:
         """
         Populate all actions for this Activity
         """
-        self.pop_xunits()
+        # The action populators are imported only once actions are populated, so that -A runs don't load them
+        from xuml_populate.populate.actions.read_action import ReadAction
+
+        # Duplicate reads of the same attributes from the same instance flow share one Read Action
+        with ReadAction.control_scope(anum=self.anum, domain=self.domain):
+            self.pop_xunits()
         if self.atype == ActivityType.STATE and self.smtype == SMType.LIFECYCLE:
             self.check_implicit_state_entry_event()
         if self.atype == ActivityType.METHOD:
@@ -262,6 +199,8 @@ class Activity:
         self.pop_flow_dependencies()
 
     def pop_seq_flows(self):
+        from xuml_populate.populate.actions.sequence_flow import SequenceFlow
+
         for source, destinations in self.seq_flows.items():
             # Find the token associated with the source action
             # A source action can emit at most one sequence flow, so only one t value should be found
@@ -325,10 +264,12 @@ class Activity:
             Relvar.insert(db=mmdb, tr=tr_Pass, relvar='Flow Connector', tuples=[
                 Flow_Connector_i(ID=aid, Activity=self.anum, Domain=self.domain)
             ])
-            Relvar.insert(db=mmdb, tr=tr_Pass, relvar='Pass Action', tuples=[
+            usage = [
                 Pass_Action_i(ID=aid, Activity=self.anum, Domain=self.domain, Input_flow=input_fid,
                               Output_flow=pass_output_flow.fid)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_Pass, relvar='Pass Action', tuples=usage)
+            FlowUsage.record(relvar='Pass Action', tuples=usage)
             Transaction.execute(db=mmdb, name=tr_Pass)
 
         pass
@@ -354,16 +295,20 @@ class Activity:
         Relvar.insert(db=mmdb, tr=tr_Gate, relvar='Flow Connector', tuples=[
             Flow_Connector_i(ID=gate_aid, Activity=self.anum, Domain=self.domain)
         ])
-        Relvar.insert(db=mmdb, tr=tr_Gate, relvar='Gate Action', tuples=[
+        usage = [
             Gate_Action_i(ID=gate_aid, Output_flow=gate_output_flow.fid, Activity=self.anum, Domain=self.domain)
-        ])
+        ]
+        Relvar.insert(db=mmdb, tr=tr_Gate, relvar='Gate Action', tuples=usage)
+        FlowUsage.record(relvar='Gate Action', tuples=usage)
 
         # A Gate Input is populated per input flow
         for input_fid in gate_input_fids:
-            Relvar.insert(db=mmdb, tr=tr_Gate, relvar='Gate Input', tuples=[
+            usage = [
                 Gate_Input_i(Gate_action=gate_aid, Input_flow=input_fid, Activity=self.anum,
                              Domain=self.domain)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr_Gate, relvar='Gate Input', tuples=usage)
+            FlowUsage.record(relvar='Gate Input', tuples=usage)
 
         Transaction.execute(db=mmdb, name=tr_Gate)
         pass
@@ -385,6 +330,8 @@ class Activity:
         Break each parsed Scrall statement down into any number of Actions, or at the very least, Flow
         assignments, and populate the relevant metamodel classes.
         """
+        from xuml_populate.populate.xunit import ExecutionUnit
+
         # Iterate through each Scrall statement
         for count, xunit in enumerate(self.parse):
             c = count + 1  # Use count to assist debugging
@@ -450,6 +397,80 @@ class Activity:
         ])
         return Anum
 
+    @classmethod
+    def depopulate_actions(cls, domain: str, keep_flows: dict[str, set[str]]):
+        """
+        Remove everything populated from the action language of the specified Activities
+
+        The Activities themselves remain along with the Flows populated with them (executing instance and
+        parameter flows) so that their actions can be populated again from edited action text.
+
+        Every instance of a class that has an Activity attribute is removed, with the exception of the
+        Activity Inputs and Real States, which belong to the Activity's signature rather than to its actions.
+        Synchronous Outputs of any Method Activities and Signaled Creations of any signaling Activities are
+        removed as well as any Tables and Paths that are no longer referenced by a remaining Relation Flow or
+        Traverse Action.
+
+        All removals are made in a single transaction, so if some other Activity still depends on any removed
+        instance, the transaction fails and the database is left unchanged.
+
+        Args:
+            domain: The domain name
+            keep_flows: The set of fids to retain, keyed by the anum of each Activity to depopulate
+        """
+        tr_Depopulate = "Depopulate Actions"
+        anums = ' '.join(keep_flows.keys())
+        _logger.info(f"Depopulating actions of activities: [{domain}:{anums}]")
+
+        # Find all relvars that hold Activity content
+        relvar_names = Database.execute(db=mmdb, cmd="relvar names", log=False).split()
+        hop_relvars = []
+        Transaction.open(db=mmdb, name=tr_Depopulate)
+        for rv in relvar_names:
+            attrs = Database.execute(db=mmdb, cmd=f"relation attributes [relvar set {rv}]", log=False).split()
+            if {'Number', 'Path'} <= set(attrs):
+                hop_relvars.append(rv)  # Hop or one of its subclasses
+            if 'Activity' not in attrs or rv.lstrip(':') in {'Activity_Input', 'Real_State'}:
+                continue
+            for anum, fids in keep_flows.items():
+                cond = f"[tuple extract $t Activity] eq {{{anum}}} && [tuple extract $t Domain] eq {{{domain}}}"
+                if 'ID' in attrs and fids:
+                    # Flow IDs and Action IDs never overlap, so this only spares the retained Flows
+                    cond += f" && [tuple extract $t ID] ni {{{' '.join(fids)}}}"
+                Transaction.append_statement(db=mmdb, name=tr_Depopulate,
+                                             statement=f"relvar delete {rv} t {{{cond}}}")
+        # Synchronous Outputs are keyed by Anum and Delegated Creation Signals by the signaling Activity
+        for rv, activity_attr in (('Synchronous_Output', 'Anum'), ('Initialization_Source', 'Signal_activity'),
+                                  ('Signaled_Creation', 'Signal_activity')):
+            Transaction.append_statement(
+                db=mmdb, name=tr_Depopulate,
+                statement=f"relvar delete {rv} t {{[tuple extract $t {activity_attr}] in {{{anums}}} && "
+                          f"[tuple extract $t Domain] eq {{{domain}}}}}")
+
+        # Tables and Paths are populated on demand and shared by any Actions that need them, so remove any
+        # that are no longer used by a remaining Relation Flow or Traverse Action
+        # They will be populated again if the new actions need them
+        orphans = [
+            ('Table', 'Relation_Flow', 'Type',
+             [('Table', 'Name'), ('Table_Attribute', 'Table'), ('Model_Attribute', 'Non_scalar_type'), ('Type', 'Name')]),
+            ('Path', 'Traverse_Action', 'Path', [('Path', 'Name')] + [(rv, 'Path') for rv in hop_relvars]),
+        ]
+        for owner, user, ref_attr, removals in orphans:
+            Transaction.append_statement(
+                db=mmdb, name=tr_Depopulate,
+                statement=f"set used [relation list [relation project [relation restrict [relvar set {user}] t "
+                          f"{{[tuple extract $t Domain] eq {{{domain}}}}}] {ref_attr}]]")
+            Transaction.append_statement(
+                db=mmdb, name=tr_Depopulate,
+                statement=f"set unused [relation list [relation project [relation restrict [relvar set {owner}] t "
+                          f"{{[tuple extract $t Domain] eq {{{domain}}} && [tuple extract $t Name] ni $used}}] Name]]")
+            for rv, name_attr in removals:
+                Transaction.append_statement(
+                    db=mmdb, name=tr_Depopulate,
+                    statement=f"relvar delete {rv} t {{[tuple extract $t Domain] eq {{{domain}}} && "
+                              f"[tuple extract $t {name_attr}] in $unused}}")
+        Transaction.execute(db=mmdb, name=tr_Depopulate)
+
     @classmethod
     def populate_state(cls, tr: str, state_model: str, sm_type: SMType, actions: str,
                        subsys: str, domain: str, parse_actions: bool, initial_pseudo_state: bool = False) -> dict:
@@ -472,7 +493,7 @@ class Activity:
         # Parse scrall in this state and add it to temporary sm dictionary
         action_text = ''.join(actions) + '\n'
         if parse_actions:
-            parsed_activity = ScrallParser.parse_text(scrall_text=action_text, debug=False)
+            parsed_activity = ParseCache.parse_scrall(scrall_text=action_text)
         else:
             parsed_activity = None
         # cls.populate_activity(text=action_text, pa=parsed_activity)
@@ -518,98 +539,17 @@ class Activity:
                     Single_Assigner_Activity_i(Anum=Anum, Domain=domain)
         return state_info
 
-    def initially_enabled_flows(self):
-        """
-        There are three kinds of Flows that are enabled prior to any Action execution in an Activity.
-        In other words, these Flows are enabled before the first Wave executes.
-
-        These are all parameter flows, the executing instance flow, and the optional output flow
-
-        Here we create a relation representing the set of all flow IDs for these flows.
-        """
-        # Get the executing instance flow (probably always F1, but just to be safe...)
-        # It's a referential attribute of Method, so we just project on that
-
-        # Parameter flows
-        # We already found the parameter input flows when computing functional dependencies as 'param_flows'
-
-        # Executing instance flow
-        # We already know our executing instance flow id, but we need it as a relation
-        xi_fid = self.xiflow.fid if self.xiflow else 'NONE'  # NONE is not a legal fid, so it will return zero tuples
-        FID = namedtuple('FID', 'Flow')  # We need a named tuple to spedicify the flow value as a tuple
-        Relation.create(db=mmdb, attrs=[Attribute(name='Flow', type='string')], tuples=[FID(Flow=xi_fid)],
-                        svar_name="xi_flow")
-
-        # Get any class accessor flows for our Anum and Domain
-        R = f"Activity:<{self.anum}>, Domain:<{self.domain}>"
-        Relation.restrict(db=mmdb, relation='Class_Accessor', restriction=R)
-        # Project on the referential attribute to the flow
-        Relation.project(db=mmdb, attributes=("Output_flow",))
-        # Rename it to "Flow"
-        Relation.rename(db=mmdb, names={"Output_flow": "Flow"}, svar_name="class_flows")
-
-        # Now take the union of all three categories of initally available flows
-        Relation.union(db=mmdb, relations=("xi_flow", "param_flows", "class_flows"), svar_name="wave_enabled_flows")
-
-    def initially_executable_actions(self) -> RelationValue:
-        """
-        Identify all actions that can be executed in the first wave.
-
-        To populate the first wave of execution we need to gather all Actions whose inputs consist entirely
-        of Flows that are initially available. In other words, each Action in the initial_pseudo_state Wave will require
-        no inputs from any other Action.
-        """
-        # Get all downstream actions (actions that require input from other actions)
-
-        # First we'll need to pair down the Flow Dependency instances to just those
-        # in our Method Activity
-        R = f"Activity:<{self.anum}>, Domain:<{self.domain}>"
-        Relation.restrict(db=mmdb, relation='Flow_Dependency', restriction=R, svar_name="fd")
-        # fd relaton set to local Flow Dependency instances
-
-        # Define downstream_actions as the ID's of those Actions that take at least one input from some other Action
-        Relation.project(db=mmdb, attributes=("To_action",))  # Actions that are a Flow destination
-        Relation.rename(db=mmdb, names={"To_action": "ID"}, svar_name="downstream_actions")
-
-        # Now subtract those downstream actions from the set of unexecuted_actions (all Actions at this point)
-        ia = Relation.subtract(db=mmdb, rname1="unexecuted_actions", rname2="downstream_actions",
-                               svar_name="executable_actions")
-        # Relation.print(db=mmdb, variable_name="executable_actions")
-        # Here we are initializing a relation variable named "executable_actions" that will update for each new Wave
-        # And in Wave 1, it is the set of initial_pseudo_state actions
-        return ia
-
-    def enable_action_outputs(self, source_action_relation: str):
-        """
-        Given a set of Action IDs as a relation value, get the set of all output Flows for those Actions
-        Those Flows are saved in the wave_enabled_flows relation value
-
-        :param source_action_relation: This relation is a set of Action IDs representing the source of the output Flows
-        """
-        # Lookup all Flow Dependencies where the source action is a From_action and collect the output Flows
-        Relation.join(db=mmdb, rname1=source_action_relation, rname2="fd", attrs={"ID": "From_action"})
-        Relation.project(db=mmdb, attributes=("Flow",), svar_name="wave_enabled_flows")
-        # Relation.print(db=mmdb, variable_name="wave_enabled_flows")
-
     def pop_flow_dependencies(self):
         """
         For each activity, determine the flow dependencies among its actions and populate the Flow Dependency class
         """
-        # TODO: Optimize redundant read actions ... (moved here from Read Action)
-        # TODO: Avoid populating duplicate for reading the same attr set by maintaining dict of action/flows
-        # TODO: for the current activity. If duplicate found, return its action id and output flows instead.
-        # TODO: Ensure that the existing read action that has no incoming control flows
 
         # Initialize dict with key for each flow, status to be determined
-        R = f"Activity:<{self.anum}>, Domain:<{self.domain}>"
-        flow_r = Relation.restrict(db=mmdb, relation='Flow', restriction=R)
-        self.flow_path = {f['ID']: {'source': set(), 'dest': set(), 'available': False} for f in flow_r.body}
+        flows = RelvarIndex.lookup('Flow', Activity=self.anum, Domain=self.domain)
+        self.flow_path = {f['ID']: {'source': set(), 'dest': set(), 'available': False} for f in flows}
 
         # Set each sequence flow dependency first
-        # Find all sequence flows
-        R = f"Activity:<{self.anum}>, Domain:<{self.domain}>"
-        seq_flow_r = Relation.restrict(db=mmdb, relation='Sequence Flow', restriction=R)
-        for seq_flow_t in seq_flow_r.body:
+        for seq_flow_t in RelvarIndex.lookup('Sequence Flow', Activity=self.anum, Domain=self.domain):
             source_action = seq_flow_t["Source_action"]
             seq_fid = seq_flow_t["Flow"]
             sdeps = self.seq_flows[source_action]
@@ -617,33 +557,13 @@ class Activity:
                 self.flow_path[seq_fid]['dest'].add(dest_action)
                 self.flow_path[seq_fid]['source'].add(source_action)
 
-        # Now proceed through each flow usage class (actions, cases, etc)
-        for flow_header in flow_attrs:
-            # Get all instances below the flow_header
-            R = f"Activity:<{self.anum}>, Domain:<{self.domain}>"
-            flow_usage_r = Relation.restrict(db=mmdb, relation=flow_header.cname, restriction=R)
-            flow_usage_instances = flow_usage_r.body
-
-            for flow_usage in flow_usage_instances:  # For each instance of this usage
-                # If the header specifies an action id
-                if flow_header.in_attr:
-                    # Header specifies an input flow, thus a destination action
-                    input_flow = flow_usage[flow_header.in_attr]
-                    if input_flow in self.flow_path[input_flow]['dest']:
-                        pass  # Dest added previously
-                    self.flow_path[input_flow]['dest'].add(flow_usage[flow_header.id_attr])
-                if flow_header.in_attr2:
-                    # Header specifies an additional input flow, thus a destination action
-                    input_flow = flow_usage[flow_header.in_attr2]
-                    if input_flow in self.flow_path[input_flow]['dest']:
-                        pass  # Dest added previously
-                    self.flow_path[input_flow]['dest'].add(flow_usage[flow_header.id_attr])
-                if flow_header.out_attr:
-                    output_flow = flow_usage[flow_header.out_attr]
-                    if output_flow in self.flow_path[output_flow]['source']:
-                        pass  # Source added previously
-                    self.flow_path[output_flow]['source'].add(flow_usage[flow_header.id_attr])
-        pass
+        # Now add the source and destination actions of each flow used by an action (or case, etc)
+        # These were recorded as each flow usage class was populated
+        if FlowUsage.check:
+            self.check_flow_usage(self.flow_usage)
+        for fid, actions in self.flow_usage.items():
+            self.flow_path[fid]['source'] |= actions['source']
+            self.flow_path[fid]['dest'] |= actions['dest']
 
         # The single executing instance flow is available
         if self.xiflow:
@@ -662,25 +582,50 @@ class Activity:
         R = f"Activity:<{self.anum}>, Domain:<{self.domain}>"
         Relation.restrict(db=mmdb, restriction=R)
         Relation.project(db=mmdb, attributes=("ID",))
-        param_flows_r = Relation.rename(db=mmdb, names={'ID': 'Flow'}, svar_name='param_flows')
-        # We save this query result using svar_name for use during wave assignement
+        param_flows_r = Relation.rename(db=mmdb, names={'ID': 'Flow'})
         # Set all of our input param flows to available
         for p in param_flows_r.body:
             self.flow_path[p['Flow']]['available'] = True
 
         # All class accessor flows are available
-        R = f"Activity:<{self.anum}>, Domain:<{self.domain}>"
-        result = Relation.restrict(db=mmdb, relation='Class_Accessor', restriction=R)
-        for ca_flow in result.body:
+        for ca_flow in RelvarIndex.lookup('Class_Accessor', Activity=self.anum, Domain=self.domain):
             self.flow_path[ca_flow['Output_flow']]['available'] = True
 
-        for f, p in self.flow_path.items():
-            if not (p['source'] and p['dest']):
-                continue
-            for source_action in p['source']:
-                for dest_action in p['dest']:
-                    Relvar.insert(db=mmdb, relvar='Flow Dependency', tuples=[
-                        Flow_Dependency_i(From_action=source_action, To_action=dest_action,
-                                          Activity=self.anum, Domain=self.domain, Flow=f)
-                    ])
-        pass
\ No newline at end of file
+        # Insert all of the dependencies together rather than one tuple at a time
+        # Actions are sorted so that the dependencies are inserted in the same order on every run
+        flow_deps = [
+            Flow_Dependency_i(From_action=source_action, To_action=dest_action,
+                              Activity=self.anum, Domain=self.domain, Flow=f)
+            for f, p in self.flow_path.items() if p['source'] and p['dest']
+            for source_action in sorted(p['source']) for dest_action in sorted(p['dest'])
+        ]
+        if flow_deps:
+            Relvar.insert(db=mmdb, relvar='Flow Dependency', tuples=flow_deps)
+        FlowUsage.clear(anum=self.anum, domain=self.domain)
+
+    def check_flow_usage(self, usage: dict[str, dict[str, set[str]]]):
+        """
+        Verify the recorded flow usage of this activity against the populated flow usage classes
+
+        Args:
+            usage: Source and destination actions of each flow as recorded by FlowUsage
+        """
+        found: dict[str, dict[str, set[str]]] = {}
+        for flow_header in flow_attrs:
+            # Get all instances below the flow_header
+            R = f"Activity:<{self.anum}>, Domain:<{self.domain}>"
+            flow_usage_r = Relation.restrict(db=mmdb, relation=flow_header.cname, restriction=R)
+            for flow_usage in flow_usage_r.body:  # For each instance of this usage
+                aid = flow_usage[flow_header.id_attr]
+                for in_attr in (flow_header.in_attr, flow_header.in_attr2):
+                    if in_attr:
+                        # Header specifies an input flow, thus a destination action
+                        found.setdefault(flow_usage[in_attr], {'source': set(), 'dest': set()})['dest'].add(aid)
+                if flow_header.out_attr:
+                    found.setdefault(flow_usage[flow_header.out_attr], {'source': set(), 'dest': set()})[
+                        'source'].add(aid)
+        if found != usage:
+            mismatched = sorted(f for f in found.keys() | usage.keys() if found.get(f) != usage.get(f))
+            msg = f"Recorded flow usage does not match the metamodel for flows {mismatched} in: {self.activity_path}"
+            _logger.error(msg)
+            raise FlowException(msg)
\ No newline at end of file
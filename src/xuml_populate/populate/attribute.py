@@ -6,13 +6,13 @@ attribute.py – Process parsed attribute to populate the metamodel db
 import logging
 from typing import Set, Optional
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-
 # xUML Populate
+from xuml_populate.context import ContextScoped, ContextState
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.exceptions.action_exceptions import UndefinedAttribute, IncompleteActionException
+from xuml_populate.exceptions.class_exceptions import CircularAttributeReference, UntypedAttribute
 from xuml_populate.populate.mm_type import MMtype
 from xuml_metamodel.mmclass_nt import (
     Attribute_i, Non_Derived_Attribute_i, Model_Attribute_i,
@@ -24,15 +24,18 @@ UNRESOLVED = '__unresolved__'  # Attribute type is referential and type resoluti
 
 _logger = logging.getLogger(__name__)
 
+# Transactions
+tr_Resolve = "Resolve Attribute Types"
+
 
-class Attribute:
+class Attribute(metaclass=ContextScoped):
     """
     Populate all relevant Attribute relvars
     """
 
-    record = None
-    dtype = None
-    participating_ids = None
+    record = ContextState()
+    dtype = ContextState()
+    participating_ids = ContextState()
 
     @classmethod
     def defined(cls, name: str, class_name: str, domain: str) -> bool:
@@ -42,9 +45,7 @@ class Attribute:
         Returns:
             True if the attribute is defined
         """
-        R = f"Name:<{name}>, Class:<{class_name}>, Domain:<{domain}>"
-        attribute_r = Relation.restrict(db=mmdb, relation="Attribute", restriction=R)
-        return bool(attribute_r.body)
+        return RelvarIndex.exists('Attribute', Name=name, Class=class_name, Domain=domain)
 
     @classmethod
     def scalar(cls, name: str, tname: str, domain: str) -> str:
@@ -62,20 +63,14 @@ class Attribute:
 
             Name of Attribute's Scalar (Type)
         """
-        R = f"Name:<{name}>, Non_scalar_type:<{tname}>, Domain:<{domain}>"
-        model_attr_r = Relation.restrict(db=mmdb, relation='Model Attribute', restriction=R, svar_name="model_attr_rv")
-        if not model_attr_r.body:
+        if not RelvarIndex.exists('Model Attribute', Name=name, Non_scalar_type=tname, Domain=domain):
             _logger.error(f"Undefined attribute: [{name}:{tname}:{domain}]")
             raise UndefinedAttribute
-        class_attr_r = Relation.semijoin(db=mmdb, rname1="model_attr_rv", rname2="Attribute",
-                                         attrs={"Name":"Name", "Non_scalar_type":"Class", "Domain":"Domain"})
-        if class_attr_r.body:
-            return class_attr_r.body[0]['Scalar']
+        if class_attr := RelvarIndex.lookup('Attribute', Name=name, Class=tname, Domain=domain):
+            return class_attr[0]['Scalar']
 
-        table_attr_r = Relation.semijoin(db=mmdb, rname1="model_attr_rv", rname2="Table_Attribute",
-                                         attrs={"Name":"Name", "Non_scalar_type":"Table", "Domain":"Domain"})
-        if table_attr_r.body:
-            return table_attr_r.body[0]['Scalar']
+        if table_attr := RelvarIndex.lookup('Table Attribute', Name=name, Table=tname, Domain=domain):
+            return table_attr[0]['Scalar']
 
     @classmethod
     def populate(cls, tr: str, domain: str, cname: str, class_identifiers: Set[int], record):
@@ -141,58 +136,69 @@ class Attribute:
     def ResolveAttrTypes(cls, domain: str):
         """
         Determine an update type of each unresolved (referential) attribute
+
+        The modeler specifies explicit types only for non-referential attributes.
+        This means that all attributes with unresolved types are referential.
+
+        Each unresolved attribute takes the type of an attribute it refers to. That attribute may be
+        referential too, so we follow the chain of references until we land on a specified type.
+        Since many chains pass through the same attributes, each attribute is resolved only once.
+        PyRAL's updateone can't be added to a transaction, so each Attribute is instead replaced with a delete
+        and an insert, all of them made in a single transaction.
         """
-        # TODO: Make this first part work and deprecate second
-        R = f"Scalar:<{UNRESOLVED}>, Domain:<{domain}>"
-        Relation.restrict(db=mmdb, relation='Attribute', restriction=R)
-        uattrs = Relation.project(db=mmdb, attributes=('Name', 'Class'))
-
-        # Rather than batch all the updates, we do them one by one
-        # This reduces the search space for each subsequent type resolution
-        for a in uattrs.body:
-            assign_type = cls.ResolveAttr(attr=a['Name'], cname=a['Class'], domain=domain)
-            Relvar.updateone(db=mmdb, relvar_name='Attribute',
-                             id={'Name': a['Name'], 'Class': a['Class'], 'Domain': domain},
-                             update={'Scalar': assign_type})
+        # Attribute types and one (there could be multiple) referenced attribute of each referential attribute
+        attributes = {(a['Name'], a['Class']): a for a in RelvarIndex.lookup('Attribute', Domain=domain)}
+        types = {k: a['Scalar'] for k, a in attributes.items()}
+        refers_to = {}
+        for aref in RelvarIndex.lookup('Attribute Reference', Domain=domain):
+            refers_to.setdefault((aref['From_attribute'], aref['From_class']), (aref['To_attribute'], aref['To_class']))
+
+        uattrs = [a for a, t in types.items() if t == UNRESOLVED]
+        if uattrs:
+            Transaction.open(db=mmdb, name=tr_Resolve)
+            for name, cname in uattrs:
+                assign_type = cls.ResolveAttr(attr=name, cname=cname, types=types, refers_to=refers_to)
+                Relvar.deleteone(db=mmdb, relvar_name='Attribute', tr=tr_Resolve,
+                                 tid={'Name': name, 'Class': cname, 'Domain': domain})
+                Relvar.insert(db=mmdb, relvar='Attribute', tr=tr_Resolve, tuples=[
+                    attributes[(name, cname)] | {'Scalar': assign_type}
+                ])
+            Transaction.execute(db=mmdb, name=tr_Resolve)
 
         # All attr types resolved, so delete the dummy UNRESOLVED type
         MMtype.depopulate_scalar(name=UNRESOLVED, domain=domain)
 
     @classmethod
-    def ResolveAttr(cls, attr: str, cname: str, domain: str) -> str:
+    def ResolveAttr(cls, attr: str, cname: str, types: dict[tuple[str, str], str],
+                    refers_to: dict[tuple[str, str], tuple[str, str]]) -> str:
         """
-        The modeler specifies explicit types only for non-referential attributes.
-        This means that all attributes with unresolved types are referential.
-
-        We need to obtain one (there could be multiple) Attribute Reference where the unresolved attribute is a source
-        *From attribute* referring to some *To attribute*. Then we check the type of that *To attribute*.
+        Resolve the type of a referential attribute by following its chain of references
 
-        If the type is not <unresolved>, we return it. Otherwise, we recursively apply the same process to
-        the *To attribute*.
+        Every attribute resolved along the way, including this one, has its type updated in types so that
+        it needn't be resolved again.
 
         The chain of references must eventually land on a specified type if the model has been properly formalized.
 
         :param attr: Unresolved attribute: A referential attribute with an unresolved type
         :param cname: The class name
-        :param domain: The domain name
+        :param types: The type of each attribute in the domain keyed by attribute and class name
+        :param refers_to: An attribute referred to by each referential attribute
         :return: Type name to assign
         """
-        _logger.info(f"Resolving attribute type [{cname}.{attr}]")
-        # We join the two relvars on the To_attribute so that we can obtain that attribute's Type
-
-        Relation.join(db=mmdb, rname1='Attribute', rname2='Attribute_Reference',
-                      attrs={'Name': 'To_attribute', 'Class': 'To_class', 'Domain': 'Domain'})
-
-        # Finally, we restrict and project on our from attribute to get its reference type
-        R = f"From_attribute:<{attr}>, From_class:<{cname}>, Domain:<{domain}>"
-        from_attrs = Relation.restrict(db=mmdb, restriction=R)
-
-        # The same attribute could participate in multiple References, so we just pick one arbitrarily
-        aref = from_attrs.body[0]
-        to_name, to_class, to_type = aref['Name'], aref['Class'], aref['Scalar']
-
-        if to_type != UNRESOLVED:
-            return to_type  # The To_attribute has a type
-        else:
-            # The To_attribute is also unresolved. Resolve it!
-            return cls.ResolveAttr(attr=to_name, cname=to_class, domain=domain)
+        chain = [(attr, cname)]
+        while types[chain[-1]] == UNRESOLVED:
+            _logger.info(f"Resolving attribute type [{chain[-1][1]}.{chain[-1][0]}]")
+            to_attr = refers_to.get(chain[-1])
+            if not to_attr:
+                _logger.error(f"No type or reference for attribute [{chain[-1][1]}.{chain[-1][0]}]")
+                raise UntypedAttribute(attr=f"{chain[-1][1]}.{chain[-1][0]}")
+            if to_attr in chain:
+                names = [f"{c}.{a}" for a, c in chain + [to_attr]]
+                _logger.error(f"Circular attribute reference: {names}")
+                raise CircularAttributeReference(chain=names)
+            chain.append(to_attr)
+
+        assign_type = types[chain[-1]]
+        for a in chain:
+            types[a] = assign_type
+        return assign_type
@@ -5,12 +5,10 @@ binary_association.py – Process a parsed binary association to populate the me
 # System
 import logging
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-
 # xUML Populate
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.exceptions.class_exceptions import MixedTargetID, ReferenceToNonIdentifier
 from xuml_metamodel.mmclass_nt import (Association_i, Binary_Association_i, Association_Class_i,
                                                Perspective_i, Asymmetric_Perspective_i, T_Perspective_i,
@@ -205,12 +203,12 @@ class BinaryAssociation:
         # OR restriction criteria not yet supported in PyRAL, so we iterate on the attributes
         to_id = None
         for to_attr in ref['attrs']:
-            R = f"Attribute:<{to_attr}>, Class:<{ref['class']}>, Domain:<{self.domain}>"
-            result = Relation.restrict(db=mmdb, relation='Identifier_Attribute', restriction=R)
-            if not result.body:
+            result = RelvarIndex.lookup('Identifier_Attribute', Attribute=to_attr, Class=ref['class'],
+                                        Domain=self.domain)
+            if not result:
                 _logger.exception(f"No identifier found in attribute reference on [{self.rnum}]")
                 raise ReferenceToNonIdentifier
-            attr_id = int(result.body[0]['Identifier'])
+            attr_id = int(result[0]['Identifier'])
             if not to_id:
                 to_id = attr_id
             elif to_id != attr_id:
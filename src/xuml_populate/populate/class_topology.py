@@ -0,0 +1,139 @@
+"""
+class_topology.py – The relationship graph of a domain's class model, held in memory for path resolution
+"""
+
+# System
+import logging
+from typing import Optional, NamedTuple, Any
+
+# xUML Populate
+from xuml_populate.context import ContextScoped, ContextState
+from xuml_populate.relvar_index import RelvarIndex
+from xuml_populate.populate.actions.aparse_types import MaxMult
+
+_logger = logging.getLogger(__name__)
+
+
+class ResolvedPath(NamedTuple):
+    """
+    A path validated and classified by a Traverse Action
+    """
+    name: str  # Path name, the text of its rnums and named classes
+    hops: list[tuple[type, str, dict[str, Any]]]  # Hop class, name of its populating method and the method values
+    dest_class: str
+    mult: MaxMult  # Multiplicity at the end of the path
+    to_many_assoc_on_one: bool  # Final hop lands on a many associative class from a single instance
+
+
+class ClassTopology(metaclass=ContextScoped):
+    """
+    The classes of a domain and the relationships connecting them
+
+    A Traverse Action checks every hop of its path against the References, Perspectives, Association Classes
+    and Ordinal Relationships of its domain. Since the class model is fully populated before any action is,
+    these are read once per domain and each hop is then resolved without querying the metamodel.
+
+    The same path is often traversed from the same class in many activities. So each path resolved by a
+    Traverse Action is kept as well and the next traversal only has to populate it.
+
+    The tuples held here are shared with the RelvarIndex and must not be modified.
+    """
+    domains: dict[str, 'ClassTopology'] = ContextState(dict)  # Topology of each domain with populated actions
+
+    @classmethod
+    def build(cls, domain: str) -> 'ClassTopology':
+        """
+        Read the relationship graph of a domain whose class model has been populated
+
+        Args:
+            domain: Domain name
+
+        Returns:
+            The domain's topology
+        """
+        _logger.info(f"Building class model topology of domain [{domain}]")
+        cls.domains[domain] = cls(domain=domain)
+        return cls.domains[domain]
+
+    @classmethod
+    def of(cls, domain: str) -> 'ClassTopology':
+        """
+        Args:
+            domain: Domain name
+
+        Returns:
+            The domain's topology, built now if it hasn't been yet
+        """
+        return cls.domains.get(domain) or cls.build(domain)
+
+    def __init__(self, domain: str):
+        """
+        Args:
+            domain: Domain name
+        """
+        self.domain = domain
+        self.rnums = {r['Rnum'] for r in RelvarIndex.lookup('Relationship', Domain=domain)}
+
+        # Each edge is kept by relationship, References are also kept by each class they connect
+        self.references: dict[str, list[dict[str, str]]] = {}
+        self.class_references: dict[tuple[str, str], list[dict[str, str]]] = {}
+        for ref in RelvarIndex.lookup('Reference', Domain=domain):
+            self.references.setdefault(ref['Rnum'], []).append(ref)
+            for cname in {ref['From_class'], ref['To_class']}:
+                self.class_references.setdefault((ref['Rnum'], cname), []).append(ref)
+
+        self.perspectives: dict[str, list[dict[str, str]]] = {}
+        self.phrases: dict[str, list[dict[str, str]]] = {}
+        for p in RelvarIndex.lookup('Perspective', Domain=domain):
+            self.perspectives.setdefault(p['Rnum'], []).append(p)
+            self.phrases.setdefault(p['Phrase'], []).append(p)
+
+        self.assoc_classes: dict[tuple[str, str], dict[str, str]] = {}  # By (rnum, class)
+        self.formalized_by: dict[str, list[dict[str, str]]] = {}  # Association Classes by class
+        for ac in RelvarIndex.lookup('Association Class', Domain=domain):
+            self.assoc_classes[(ac['Rnum'], ac['Class'])] = ac
+            self.formalized_by.setdefault(ac['Class'], []).append(ac)
+
+        self.ordinals: dict[str, list[dict[str, str]]] = {}  # Ordinal Relationships by ranked class
+        for o in RelvarIndex.lookup('Ordinal Relationship', Domain=domain):
+            self.ordinals.setdefault(o['Ranked_class'], []).append(o)
+
+        # Resolved paths by source class, path text and the multiplicity of the source flow
+        self.paths: dict[tuple[str, str, MaxMult], ResolvedPath] = {}
+
+    def class_refs(self, rnum: str, cname: str) -> list[dict[str, str]]:
+        """
+        Args:
+            rnum: Relationship number
+            cname: Class name
+
+        Returns:
+            The References of the relationship to or from the class
+        """
+        return self.class_references.get((rnum, cname), [])
+
+    def perspective(self, rnum: str, side: Optional[str] = None,
+                    viewed_class: Optional[str] = None) -> Optional[dict[str, str]]:
+        """
+        Args:
+            rnum: Association number
+            side: Perspective side (T, P or S), any side if not specified
+            viewed_class: The class viewed from the perspective, any class if not specified
+
+        Returns:
+            The first matching Perspective of the association, if any
+        """
+        return next((p for p in self.perspectives.get(rnum, [])
+                     if side in (None, p['Side']) and viewed_class in (None, p['Viewed_class'])), None)
+
+    def ordinal(self, ranked_class: str, perspective: str) -> Optional[dict[str, str]]:
+        """
+        Args:
+            ranked_class: The class ranked by the Ordinal Relationship
+            perspective: Ascending or descending perspective phrase
+
+        Returns:
+            The Ordinal Relationship of the ranked class with the perspective, if any
+        """
+        return next((o for o in self.ordinals.get(ranked_class, [])
+                     if perspective in (o['Ascending_perspective'], o['Descending_perspective'])), None)
@@ -6,9 +6,6 @@ from typing import TYPE_CHECKING
 from collections import namedtuple
 
 # Model Integration
-from pyral.transaction import Transaction
-from pyral.relvar import Relvar
-from pyral.relation import Relation
 from scrall.parse.visitor import New_inst_a
 
 # xUML Populate
@@ -23,6 +20,7 @@ from xuml_populate.populate.actions.expressions.instance_set import InstanceSet
 from xuml_populate.populate.flow import Flow
 from xuml_populate.utility import print_mmdb
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
 from xuml_populate.exceptions.action_exceptions import *
 
 _logger = logging.getLogger(__name__)
@@ -4,21 +4,27 @@ domain.py – Process parsed domain to populate the metamodel db
 
 # System
 import logging
-from typing import Dict
+from typing import Any, Dict, Optional
 from contextlib import redirect_stdout  # For diagnostics
 
-# Model Integration
-from pyral.transaction import Transaction
-from pyral.relvar import Relvar
-from pyral.relvar import Relation  # For debugging
-
 # xUML Populate
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
+from xuml_populate.context import in_population_context
+from xuml_populate.profiler import Profile
+from xuml_populate.relvar_index import RelvarIndex
+from xuml_populate.activity_filter import ActivityFilter
 from xuml_populate.populate.actions.aparse_types import Method_Output_Type
 from xuml_populate.populate.attribute import Attribute
 from xuml_populate.populate.mm_class import MMclass
 from xuml_populate.populate.method import Method
+from xuml_populate.populate.activity import Activity
+from xuml_populate.populate.actions.action import Action
+from xuml_populate.populate.flow import Flow
+from xuml_populate.populate.flow_usage import FlowUsage
+from xuml_populate.populate.mm_type import MMtype
 from xuml_populate.populate.relationship import Relationship
+from xuml_populate.populate.class_topology import ClassTopology
 from xuml_populate.populate.lineage import Lineage
 from xuml_populate.populate.subsystem import Subsystem
 from xuml_populate.populate.state_model import StateModel
@@ -32,6 +38,23 @@ if __debug__:
 
 _logger = logging.getLogger(__name__)
 
+
+def called_operations(parse: Any) -> set[str]:
+    """
+    Args:
+        parse: A Scrall parse, or any part of one
+
+    Returns:
+        The name of each operation invoked on an instance, such as a Method Call, but not on an External Entity
+    """
+    names = set()
+    if type(parse).__name__ == 'Op_a' and not parse.ee:
+        names.add(parse.op_name)
+    if isinstance(parse, (list, tuple)):  # Each node of the parse is a named tuple
+        for p in parse:
+            names |= called_operations(p)
+    return names
+
 # Transactions
 tr_Modeled_Domain = "Modeled Domain"
 
@@ -39,12 +62,19 @@ class Domain:
     """
     Populate all relevant Domain relvars
     """
-    def __init__(self, domain: str, content: Dict, parse_actions: bool, verbose: bool):
+    @in_population_context()
+    def __init__(self, domain: str, content: Dict, parse_actions: bool, verbose: bool,
+                 anums: Optional[set[str]] = None, select: Optional[ActivityFilter] = None):
         """
-        Insert all user model elements in this Domain into the corresponding Metamodel classes.
+        Insert all user model elements in this Domain into the corresponding Metamodel classes, all but the actions
+        within each Activity.
 
         :param domain:  The name of the domain extracted from the content
         :param content:  The parsed content of the domain
+        :param anums:  If supplied, the domain is already populated in a loaded database and only the actions
+        of these Activities, removed earlier with depopulate_activities, are populated again
+        :param select:  If supplied with anums, only the selected Activities among them are populated
+        :param context:  The population context of the System, passed as a keyword, the active one if not supplied
         """
         _logger.info(f"Populating modeled domain [{domain}]")
 
@@ -56,6 +86,13 @@ class Domain:
         self.state_models = []
         self.unpopulated_ees = {}  # EEs encountered in the external yaml file, but without any explicit ops/services
 
+        if anums is not None:
+            self.restore(content=content, anums=anums)
+            self.populate_actions(anums=anums, select=select)
+            if verbose:
+                Relvar.printall(mmdb)
+            return
+
         _logger.info(f"Transaction open: domain and subsystems [{domain}]")
         Transaction.open(db=mmdb, name=tr_Modeled_Domain)
 
@@ -83,34 +120,93 @@ class Domain:
             _logger.info("Populating classes")
 
             # Insert classes
-            for c in subsys_parse['class_model'].classes:
-                MMclass.populate(domain=domain, subsystem=subsys, record=c)
+            with Profile.phase("classes"):
+                for c in subsys_parse['class_model'].classes:
+                    MMclass.populate(domain=domain, subsystem=subsys, record=c)
             _logger.info("Populating relationships")
-            for r in subsys_parse['class_model'].rels:
-                Relationship.populate(domain=domain, subsystem=subsys, record=r)
+            with Profile.phase("relationships"):
+                for r in subsys_parse['class_model'].rels:
+                    Relationship.populate(domain=domain, subsystem=subsys, record=r)
 
             # Insert methods
             _logger.info("Populating methods")
-            for m_parse in subsys_parse['methods'].values():
-                # All classes must be populated first, so that parameter types in signatures can be resolved
-                # as class or non-class types
-                m = Method(domain=self.name, subsys=subsys.name, m_parse=m_parse, parse_actions=parse_actions)
-                self.methods[m.anum] = m
+            with Profile.phase("methods"):
+                for m_parse in subsys_parse['methods'].values():
+                    # All classes must be populated first, so that parameter types in signatures can be resolved
+                    # as class or non-class types
+                    m = Method(domain=self.name, subsys=subsys.name, m_parse=m_parse, parse_actions=parse_actions)
+                    self.methods[m.anum] = m
 
             # Insert state models
             _logger.info("Populating state models")
-            for sm in subsys_parse['state_models'].values():
-                pop_sm = StateModel(subsys=subsys.name, sm=sm, parse_actions=self.parse_actions)
-                self.state_models.append(pop_sm)
+            with Profile.phase("state models"):
+                for sm in subsys_parse['state_models'].values():
+                    pop_sm = StateModel(subsys=subsys.name, sm=sm, parse_actions=self.parse_actions)
+                    self.state_models.append(pop_sm)
 
         _logger.info("Resolving attribute types")
-        Attribute.ResolveAttrTypes(domain=domain)
+        with Profile.phase("resolve attribute types"):
+            Attribute.ResolveAttrTypes(domain=domain)
 
         _logger.info("Populating lineage")
-        Lineage.Derive(domain=domain)
+        with Profile.phase("lineage"):
+            Lineage.Derive(domain=domain)
+
+        with Profile.phase("external entities"):
+            # Populate all external entities, explicit external services
+            for ee, ee_info in content.get('external', {}).get('External Entities', {}).items():
 
-        # Populate actions for all Activities
+                first_service = True
+                events = ee_info.get('external events', [])
+                ops = ee_info.get('external operations', [])
+                if not events and not ops:
+                    # This External Entity appears to have no services and cannot be populated now
+                    # However, it may yet offer implicit services such as state entry implicit external events
+                    # So we will retain the ee info, but will wait for implicit event/op processing before attempting
+                    # to populate it
+                    # If there is no implicit usage, the External Entity will not be populated
+                    self.unpopulated_ees[ee] = ee_info['service domain']
+                    continue
+                service_domain = ee_info.get('service domain')
+                # Open a new EE transaction and insert the EE instance
+                EE.populate(name=ee, domain=self.name, service_domain=service_domain)
+                for op in ops:
+                    # TODO: Populate explicit/implicit external operations
+                    ExternalOperation.populate(ee=ee, domain=self.name, parse=op,
+                                               ee_tr=EE.tr if first_service else None)
+                    first_service = False
+                for e in events:
+                    ExternalEvent.populate_explicit(ee=ee, domain=self.name, ev_name=e['name'],
+                                                    params=e.get('parameters', {}),
+                                                    responses = e.get('responses', []),
+                                                    ee_tr=EE.tr if first_service else None)
+                    first_service = False
 
+            # If the marking file specified any implicit external events to be triggered by
+            # entry into certain states, we organize that data into a dictionary that we can reference
+            # when we enter any of the implicitly mapped states
+            implicit_state_entry_events = {}
+            if state_entry_marks := content.get('mark', {}).get('Implicit', {}).get('state entry to event'):
+                for item in state_entry_marks:
+                    ees = item['to']
+                    if isinstance(ees, str):
+                        ees = [ees]
+                    event_name = item.get('event', item['state'])  # if no event name specified, use state name
+                    ExternalEvent.populate_implicit_state_entry_ext_event(
+                        ees=ees, state_name=item['state'], event_name=event_name, class_name=item['class'],
+                        domain=self.name, unpopulated_ees=self.unpopulated_ees)
+
+        # The action language for each Activity is populated separately with populate_actions once the
+        # model structure of every domain is in place (see System.populate)
+
+    def populate_actions(self, anums: Optional[set[str]] = None, select: Optional[ActivityFilter] = None):
+        """
+        Populate the actions of each Method and State Activity
+
+        :param anums:  Populate only the Method Activities with these numbers, if supplied
+        (State Models are already restricted to the states being repopulated)
+        :param select:  Populate only the selected Activities, if supplied, along with the Methods they call
+        """
         # For Methods, we must populate activities in two passes
 
         # This is because a Method might call some other Method using a Method Call Action
@@ -128,69 +224,131 @@ class Domain:
             anum: Method_Output_Type(name=m.method_parse.flow_out, mult=m.method_parse.mult_out)
             for anum, m in self.methods.items()
         }
+        methods = [m for anum, m in self.methods.items() if anums is None or anum in anums]
+        states = {sm.sm_name: list(sm.states) for sm in self.state_models}
+        if select:
+            states = {sm_name: [name for name in names if select.selects(sm_name, name)]
+                      for sm_name, names in states.items()}
+            # The target of a Method Call in a State is only resolved as the State is populated, which is after
+            # every Method it might call, so each Method named by an operation in a selected State is included
+            called = set().union(*(called_operations(sm.states[name]['parse'])
+                                   for sm in self.state_models for name in states[sm.sm_name]))
+            methods = [m for m in methods if select.selects(m.class_name, m.name) or m.name in called]
 
-        # Populate all external entities, explicit external services
-        for ee, ee_info in content.get('external', {}).get('External Entities', {}).items():
-
-            first_service = True
-            events = ee_info.get('external events', [])
-            ops = ee_info.get('external operations', [])
-            if not events and not ops:
-                # This External Entity appears to have no services and cannot be populated now
-                # However, it may yet offer implicit services such as state entry implicit external events
-                # So we will retain the ee info, but will wait for implicit event/op processing before attempting
-                # to populate it
-                # If there is no implicit usage, the External Entity will not be populated
-                self.unpopulated_ees[ee] = ee_info['service domain']
-                continue
-            service_domain = ee_info.get('service domain')
-            # Open a new EE transaction and insert the EE instance
-            EE.populate(name=ee, domain=self.name, service_domain=service_domain)
-            for op in ops:
-                # TODO: Populate explicit/implicit external operations
-                ExternalOperation.populate(ee=ee, domain=self.name, parse=op,
-                                           ee_tr=EE.tr if first_service else None)
-                first_service = False
-            for e in events:
-                ExternalEvent.populate_explicit(ee=ee, domain=self.name, ev_name=e['name'],
-                                                params=e.get('parameters', {}),
-                                                responses = e.get('responses', []),
-                                                ee_tr=EE.tr if first_service else None)
-                first_service = False
-
-        # If the marking file specified any implicit external events to be triggered by
-        # entry into certain states, we organize that data into a dictionary that we can reference
-        # when we enter any of the implicitly mapped states
-        implicit_state_entry_events = {}
-        if state_entry_marks := content.get('mark', {}).get('Implicit', {}).get('state entry to event'):
-            for item in state_entry_marks:
-                ees = item['to']
-                if isinstance(ees, str):
-                    ees = [ees]
-                event_name = item.get('event', item['state'])  # if no event name specified, use state name
-                ExternalEvent.populate_implicit_state_entry_ext_event(
-                    ees=ees, state_name=item['state'], event_name=event_name, class_name=item['class'],
-                    domain=self.name, unpopulated_ees=self.unpopulated_ees)
-
-
-        # Populate the action language for each Activity, unless action parsing was suppressed.
-        # When suppressed, the model structure (classes, relationships, states, method signatures)
-        # is populated, but the actions within each Activity are not.
-        if self.parse_actions:
-            # First pass: Method action population
-            # Here we populate everything except the Method Call Action parameter inputs
-            # Note that we inject the method output types
-            for anum, m in self.methods.items():
-                m.process_execution_units(method_output_types=method_output_types)
-
-            # Second pass: Compute any Method Call population
-            for anum, m in self.methods.items():
+        # The class model is complete, so paths in the actions can be resolved against its relationship graph
+        ClassTopology.build(domain=self.name)
+
+        # First pass: Method action population
+        # Here we populate everything except the Method Call Action parameter inputs
+        # Note that we inject the method output types
+        with Profile.phase("method actions pass 1"):
+            populated = set()
+            while pending := [m for m in methods if m.anum not in populated]:
+                for m in pending:
+                    m.process_execution_units(method_output_types=method_output_types)
+                    populated.add(m.anum)
+                # The outputs of a Method Call refer to the called Method's output, so the callees of a selected
+                # Method must be populated too
+                if select:
+                    targets = {c['Method'] for m in pending
+                               for c in RelvarIndex.lookup('Method Call', Activity=m.anum, Domain=self.name)}
+                    methods += [self.methods[t] for t in sorted(targets - populated)
+                                if t in self.methods and (anums is None or t in anums)]
+
+        # Second pass: Compute any Method Call population
+        with Profile.phase("method actions pass 2"):
+            for m in methods:
                 m.post_process()
 
+        with Profile.phase("state activities"):
             for s in self.state_models:
-                s.process_states(method_output_types=method_output_types)
+                s.process_states(method_output_types=method_output_types, states=states[s.sm_name])
+
+    def restore(self, content: Dict, anums: set[str]):
+        """
+        Set up the Methods, State Models and implicit external events of a domain already populated
+        in a loaded database so that the actions of the specified Activities can be populated again
+
+        :param content:  The parsed content of the domain
+        :param anums:  Activities whose actions will be populated
+        """
+        _logger.info(f"Restoring populated domain [{self.name}]")
+        MMtype.load_domain_types(domain=self.name)
+
+        R = f"Domain:<{self.name}>"
+        method_r = Relation.restrict(db=mmdb, relation='Method', restriction=R)
+        method_anums = {(t['Class'], t['Name']): t['Anum'] for t in method_r.body}
+        for subsys_parse in content['subsystems'].values():
+            subsys = subsys_parse['class_model'].subsystem['name']
+            for m_parse in subsys_parse['methods'].values():
+                m = Method(domain=self.name, subsys=subsys, m_parse=m_parse, parse_actions=self.parse_actions,
+                           anum=method_anums[(m_parse.class_name, m_parse.method)])
+                self.methods[m.anum] = m
+            for sm in subsys_parse['state_models'].values():
+                pop_sm = StateModel(subsys=subsys, sm=sm, parse_actions=self.parse_actions, populate=False)
+                pop_sm.restore_states(sm=sm, anums=anums)
+                if pop_sm.states:
+                    self.state_models.append(pop_sm)
+
+        # The actions of a repopulated state may include an implicit external event
+        if state_entry_marks := content.get('mark', {}).get('Implicit', {}).get('state entry to event'):
+            for item in state_entry_marks:
+                event_name = item.get('event', item['state'])
+                ExternalEvent.implicit_state_entry.setdefault(item['class'], {})[item['state']] = event_name
+
+        # Action and Flow IDs continue from those populated along with each Activity
+        for anum in anums:
+            activity_key = f"{self.name}:{anum}"
+            Action.next_action_id.pop(activity_key, None)
+            R = f"Activity:<{anum}>, Domain:<{self.name}>"
+            fids = [int(t['ID'][1:]) for t in Relation.restrict(db=mmdb, relation='Flow', restriction=R).body]
+            Flow.flow_id_ctr[activity_key] = max(fids, default=0)
+            Flow.activity_flows.pop(activity_key, None)
+            FlowUsage.clear(anum=anum, domain=self.name)
+
+    @classmethod
+    def depopulate_activities(cls, domain: str, methods: list[tuple[str, str]], states: list[tuple[str, str]]) -> set[str]:
+        """
+        Remove the actions of the specified Methods and States from a loaded database
+
+        Any Activity that calls a Method whose actions are removed has its actions removed as well since
+        its Method Call outputs refer to the called Method's Synchronous Output. Delegated Creation Activities
+        are populated by the Activities that signal them, so these are removed together. Both apply transitively.
+
+        :param domain:  The domain name
+        :param methods:  (class name, method name) of each Method
+        :param states:  (state model name, state name) of each State
+        :return:  The numbers of all Activities whose actions were removed
+        """
+        anums = set()
+        for cname, mname in methods:
+            R = f"Name:<{mname}>, Class:<{cname}>, Domain:<{domain}>"
+            anums.add(Relation.restrict(db=mmdb, relation='Method', restriction=R).body[0]['Anum'])
+        for sm_name, sname in states:
+            R = f"Name:<{sname}>, State_model:<{sm_name}>, Domain:<{domain}>"
+            anums.add(Relation.restrict(db=mmdb, relation='Real State', restriction=R).body[0]['Activity'])
+
+        R = f"Domain:<{domain}>"
+        calls = Relation.restrict(db=mmdb, relation='Method Call Output', restriction=R).body
+        creations = Relation.restrict(db=mmdb, relation='Signaled Creation', restriction=R).body
+        added = anums
+        while added:
+            added = ({c['Activity'] for c in calls if c['Target_method'] in added} |
+                     {c['Creation_activity'] for c in creations if c['Signal_activity'] in added} |
+                     {c['Signal_activity'] for c in creations if c['Creation_activity'] in added}) - anums
+            anums |= added
+
+        # Retain the executing instance and input Flows populated along with each Activity
+        keep_flows = {anum: set() for anum in anums}
+        for relvar, flow_attr in (('Method', 'Executing_instance_flow'),
+                                  ('Lifecycle Activity', 'Executing_instance_flow'),
+                                  ('Multiple Assigner Activity', 'Partitioning_instance_flow')):
+            for t in Relation.restrict(db=mmdb, relation=relvar, restriction=R).body:
+                if t['Anum'] in anums:
+                    keep_flows[t['Anum']].add(t[flow_attr])
+        for t in Relation.restrict(db=mmdb, relation='Activity Input', restriction=R).body:
+            if t['Activity'] in anums:
+                keep_flows[t['Activity']].add(t['Input_flow'])
 
-        # Print out the populated metamodel
-        if verbose:
-            Relvar.printall(mmdb)
-        #
+        Activity.depopulate_actions(domain=domain, keep_flows=keep_flows)
+        return anums
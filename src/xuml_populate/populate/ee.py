@@ -6,14 +6,10 @@ import logging
 
 # xUML Populate
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
 from xuml_metamodel.mmclass_nt import External_Entity_i, Domain_i, Realized_Domain_i
 from xuml_populate.exceptions.domain_exceptions import *
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
-
 if __debug__:
     from xuml_populate.utility import print_mmdb
 
@@ -5,21 +5,20 @@ element.py – Populate an element instance in PyRAL
 import logging
 
 # xUML Populate
+from xuml_populate.context import ContextScoped, ContextState
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar
 from xuml_metamodel.mmclass_nt import Element_i, Spanning_Element_i, Subsystem_Element_i
 
-# Model Integration
-from pyral.relvar import Relvar
-
 # TODO: Add spanning element support
 
 _logger = logging.getLogger(__name__)
 
-class Element:
+class Element(metaclass=ContextScoped):
     """
     Create a State Model relation
     """
-    _num_counters: dict[str, dict[str, int]] = {}
+    _num_counters: dict[str, dict[str, int]] = ContextState(dict)
 
     @classmethod
     def init_counter(cls, prefix: str, key: str) -> int:
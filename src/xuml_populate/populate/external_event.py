@@ -5,13 +5,10 @@ external_event.py – Populate an External Event
 # System
 import logging
 
-# Model Integration
-from pyral.transaction import Transaction
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-
 # xUML Populate
+from xuml_populate.context import ContextScoped, ContextState
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
 from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.signature import Signature
 from xuml_populate.populate.activity import Activity
@@ -29,11 +26,11 @@ if __debug__:
 
 _logger = logging.getLogger(__name__)
 
-class ExternalEvent:
+class ExternalEvent(metaclass=ContextScoped):
     """
     Populate an External Event
     """
-    implicit_state_entry = {}
+    implicit_state_entry = ContextState(dict)
 
     @classmethod
     def populate_implicit_state_entry_ext_event(cls, ees: list[str], state_name: str, event_name: str, class_name: str, domain: str,
@@ -5,12 +5,9 @@ external_service.py – Populate external services from parsed input
 # System
 import logging
 
-# Model Integration
-from pyral.transaction import Transaction
-from pyral.relvar import Relvar
-
 # xUML Populate
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
 from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.signature import Signature
 from xuml_populate.populate.activity import Activity
@@ -7,13 +7,13 @@ import logging
 from typing import Optional, Set, List, Dict
 
 # Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
 from pyral.rtypes import SetOp
 
 # xUML Populate
+from xuml_populate.context import ContextScoped, ContextState
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.populate.actions.table import Table
 from xuml_populate.exceptions.action_exceptions import FlowException, ControlFlowHasNoTargetActions, ActionException
 from xuml_metamodel.mmclass_nt import (
@@ -22,6 +22,7 @@ from xuml_metamodel.mmclass_nt import (
     Tuple_Flow_i, Table_Flow_i, Control_Dependency_i, Scalar_Value_i
 )
 from xuml_populate.populate.actions.aparse_types import Flow_ap, MaxMult, Content
+from xuml_populate.populate.flow_usage import FlowUsage
 
 if __debug__:
     from xuml_populate.utility import print_mmdb
@@ -37,11 +38,62 @@ tr_Scalar_Flow = "Scalar Flow"
 tr_Label = "Label Flow"
 
 
-class Flow:
+class ActivityFlows:
+    """
+    The Flows populated in one Activity
+
+    Each Data Flow summary is registered as the Flow is populated along with the label, if any, of every Flow
+    so that the populators can look up the flows of an Activity without querying the metamodel
+    """
+    def __init__(self):
+        self.data: dict[str, Flow_ap] = {}  # Data Flow summaries by flow id
+        self.labeled: dict[str, list[str]] = {}  # Flow ids of each label
+        self.label_seq: dict[str, int] = {}  # Flow ids in the order they were labeled
+
+    def label(self, fid: str, label: str):
+        self.label_seq[fid] = len(self.label_seq)
+        self.labeled.setdefault(label, []).append(fid)
+
+    def relabel(self, fid: str, new_label: str):
+        for label, fids in self.labeled.items():
+            if fid in fids:
+                fids.remove(fid)
+                break
+        # A relabeled flow keeps its place among the flows sharing its new label
+        fids = self.labeled.setdefault(new_label, [])
+        fids.append(fid)
+        fids.sort(key=lambda f: self.label_seq[f])
+
+
+class Flow(metaclass=ContextScoped):
     """
     Populate relevant Flow relvars
     """
-    flow_id_ctr = {}  # Manage flow id numbering per anum:domain
+    flow_id_ctr = ContextState(dict)  # Manage flow id numbering per anum:domain
+    activity_flows: dict[str, ActivityFlows] = ContextState(dict)  # Flow registry per anum:domain
+
+    @classmethod
+    def registry(cls, anum: str, domain: str) -> ActivityFlows:
+        """
+        Get the Flow registry of an Activity, starting it with any Flows already in the metamodel the first time
+
+        Args:
+            anum: Activity number
+            domain: Domain name
+
+        Returns:
+            The Activity's Flow registry
+        """
+        activity_id = f'{domain}:{anum}'
+        flows = cls.activity_flows.get(activity_id)
+        if flows is None:
+            flows = cls.activity_flows[activity_id] = ActivityFlows()
+            # Flows retained when an Activity is repopulated are already in the metamodel
+            for t in RelvarIndex.lookup('Labeled Flow', Activity=anum, Domain=domain):
+                flows.label(fid=t['ID'], label=t['Name'])
+            for t in RelvarIndex.lookup('Data Flow', Activity=anum, Domain=domain):
+                flows.data[t['ID']] = cls.query_data(fid=t['ID'], anum=anum, domain=domain)
+        return flows
 
     @classmethod
     def lookup_label(cls, fid: str, anum: str, domain: str) -> str:
@@ -57,19 +109,17 @@ class Flow:
             Label text or empty string if the Flow is unlabeled
         """
         # If the flow does not exist, we want to raise an error
-        R = f"ID:<{fid}>, Activity:<{anum}>, Domain:<{domain}>"
-        flow_r = Relation.restrict(db=mmdb, relation="Flow", restriction=R)
-        if not flow_r.body:
+        if not RelvarIndex.exists('Flow', ID=fid, Activity=anum, Domain=domain):
             msg = f"Flow {fid} in {anum}:{domain} not found"
             _logger.error(msg)
             raise FlowException(msg)
 
         # Now get the related Labeled Flow subclass instance
-        labeled_flow_r = Relation.semijoin(db=mmdb, rname2="Labeled Flow")
-        if not labeled_flow_r.body:
+        labeled_flow = RelvarIndex.lookup('Labeled Flow', ID=fid, Activity=anum, Domain=domain)
+        if not labeled_flow:
             return ""  # Flow exists, but must be an Unlabeled Flow
 
-        return labeled_flow_r.body[0]["Name"]
+        return labeled_flow[0]["Name"]
 
     @classmethod
     def relabel_flow(cls, new_label: str, fid: str, anum: str, domain: str):
@@ -82,10 +132,13 @@ class Flow:
             anum: Activity Number
             domain: Domain Name
         """
+        # The registry is started, if need be, from the metamodel as it was before the update
+        registry = cls.registry(anum=anum, domain=domain)
         # This is a simple relvar update in PyRAL
         Relvar.updateone(db=mmdb, relvar_name='Labeled_Flow', id={
            'ID': fid, 'Activity': anum, 'Domain': domain
         }, update={'Name': new_label})
+        registry.relabel(fid=fid, new_label=new_label)
 
     @classmethod
     def label_flow(cls, label: str, fid: str, anum: str, domain: str):
@@ -96,6 +149,8 @@ class Flow:
         """
         # Migrate the flow to a labeled flow
         _logger.info(f"Labeling flow {fid} in {domain}::{anum} as [{label}]")
+        # The registry is started, if need be, before the flow is labeled so that it's not registered twice
+        registry = cls.registry(anum=anum, domain=domain)
         Transaction.open(db=mmdb, name=tr_Label)
         # Delete the Unlabeled flow
         Relvar.deleteone(db=mmdb, tr=tr_Label, relvar_name="Unlabeled Flow",
@@ -105,6 +160,7 @@ class Flow:
             Labeled_Flow_i(ID=fid, Activity=anum, Domain=domain, Name=label)
         ])
         Transaction.execute(db=mmdb, name=tr_Label)
+        registry.label(fid=fid, label=label)
 
     @classmethod
     def populate_switch_output(cls, label: str, ref_flow: Flow_ap, anum: str, domain: str) -> Flow_ap:
@@ -185,38 +241,24 @@ class Flow:
         Returns:
             A possibly empty list of Flow summaries
         """
-        fids = cls.find_labeled_flows(name=name, anum=anum, domain=domain)
-        if not fids:
-            return []
+        registry = cls.registry(anum=anum, domain=domain)
         flows = []
         iflows = True
-        for fid in fids:
+        for fid in registry.labeled.get(name, []):
+            flow = registry.data.get(fid)
+            content = flow.content if flow else None
 
             if iflows:
                 # TODO: The iflows flag is a temporary hack
                 # Are these Instance Flows?
-                R = f"ID:<{fid}>, Activity:<{anum}>, Domain:<{domain}>"
-                if_result = Relation.restrict(db=mmdb, relation='Instance_Flow', restriction=R)
-                if if_result.body:
-                    # Okay, it's an instance flow. Now we need the multiplicity on that flow
-                    ctype = if_result.body[0]['Class']
-                    many_if_result = Relation.restrict(db=mmdb, relation='Multiple_Instance_Flow', restriction=R)
-                    m = MaxMult.MANY if many_if_result.body else MaxMult.ONE
-                    flows.append(Flow_ap(fid=fid, content=Content.INSTANCE, tname=ctype, max_mult=m))
+                if content == Content.INSTANCE:
+                    flows.append(flow)
                 else:
                     # They aren't instance flows
                     iflows = False  # Subsequent fids, if any will be assumed as relation flows
 
-            if not iflows:
-                # It must be a Relation flow
-                R = f"ID:<{fid}>, Activity:<{anum}>, Domain:<{domain}>"
-                rf_result = Relation.restrict(db=mmdb, relation='Relation_Flow', restriction=R)
-                if rf_result.body:
-                    # It's a Relation Flow. Tuple or Table?
-                    ttype = rf_result.body[0]['Type']
-                    ntuples = Relation.restrict(db=mmdb, relation='Table_Flow', restriction=R)
-                    m = MaxMult.MANY if ntuples.body else MaxMult.ONE
-                    flows.append(Flow_ap(fid=fid, content=Content.RELATION, tname=ttype, max_mult=m))
+            if not iflows and content == Content.RELATION:
+                flows.append(flow)
 
         return flows
 
@@ -232,17 +274,9 @@ class Flow:
         :param domain: The domain name
         :return: A flow summary or None if no such labeled flow is defined
         """
-        fids = cls.find_labeled_flows(name=name, anum=anum, domain=domain)
-        if not fids:
-            return []
-        sflows = []
-        for fid in fids:
-            R = f"ID:<{fid}>, Activity:<{anum}>, Domain:<{domain}>"
-            scalar_flow_r = Relation.restrict(db=mmdb, relation='Scalar Flow', restriction=R)
-            if scalar_flow_r.body:
-                for f in scalar_flow_r.body:
-                    sflows.append(Flow_ap(fid=fid, content=Content.SCALAR, tname=scalar_flow_r.body[0]['Type'], max_mult=None))
-        return sflows
+        registry = cls.registry(anum=anum, domain=domain)
+        flows = (registry.data.get(fid) for fid in registry.labeled.get(name, []))
+        return [f for f in flows if f and f.content == Content.SCALAR]
 
     @classmethod
     def find_labeled_flows(cls, name: str, anum: str, domain: str) -> List[str]:
@@ -257,8 +291,7 @@ class Flow:
         Returns:
             All flow ids matching the same Flow Name in the specified Activity:Domain
         """
-        R = f"Name:<{name}>, Activity:<{anum}>, Domain:<{domain}>"
-        labeled_flow_r = Relation.restrict(db=mmdb, relation='Labeled Flow', restriction=R)
+        fids = list(cls.registry(anum=anum, domain=domain).labeled.get(name, []))
         # TODO: Verify common content and multiplicity
         # if len(labeled_flow_r.body) > 1:
         #     # Get the fid's of the labeled flows
@@ -272,7 +305,7 @@ class Flow:
         #             # They are all from the same subclass
         #             pass
         #     # Verify consistent flow type
-        return [f['ID'] for f in labeled_flow_r.body]
+        return fids
 
     @classmethod
     def populate_control_flow(cls, tr: str, enabled_actions: Set[str], anum: str, domain: str,
@@ -304,9 +337,11 @@ class Flow:
             _logger.error(msg)
             raise ControlFlowHasNoTargetActions(msg)
         for a in enabled_actions:
-            Relvar.insert(db=mmdb, tr=tr, relvar='Control Dependency', tuples=[
+            usage = [
                 Control_Dependency_i(Control_flow=flow_id, Action=a, Activity=anum, Domain=domain)
-            ])
+            ]
+            Relvar.insert(db=mmdb, tr=tr, relvar='Control Dependency', tuples=usage)
+            FlowUsage.record(relvar='Control Dependency', tuples=usage)
 
         # The subclass (Sequence Flow, Result, Case, ...) is not populated here since each
         # requires different attributes.  So the outer transaction must complete the subclass
@@ -348,19 +383,15 @@ class Flow:
         table_attrs = {name: type_ for name, type_ in zip(parts[0::2], parts[1::2])}
 
         # Get identifiers for class
-        R = f"Class:<{class_name}>, Domain:<{domain}>"
-        id_s = Relation.restrict(db=mmdb, relation="Identifier", restriction=R)
-        id_count = len(id_s.body)
+        id_count = len(RelvarIndex.lookup('Identifier', Class=class_name, Domain=domain))
         # IDs in the model are numbered starting at 1
         # Try to match any ID working from I, I2, ...
         for idnum in range(1, id_count+1):
-            R = f"Identifier:<{idnum}>, Class:<{class_name}>, Domain:<{domain}>"
-            Relation.restrict(db=mmdb, relation="Identifier Attribute", restriction=R)
-            id_attr_types = Relation.semijoin(db=mmdb, rname2='Attribute', attrs={"Attribute": "Name",
-                                                                                  "Class": "Class",
-                                                                                  "Domain": "Domain"})
+            id_attr_names = {i['Attribute'] for i in RelvarIndex.lookup(
+                'Identifier Attribute', Identifier=idnum, Class=class_name, Domain=domain)}
             # Create a dictionary of name-type pairs for the current Identifier
-            id_attrs = {i['Name']: i['Scalar'] for i in id_attr_types.body}
+            id_attrs = {a['Name']: a['Scalar'] for a in RelvarIndex.lookup('Attribute', Class=class_name, Domain=domain)
+                        if a['Name'] in id_attr_names}
             # Now check to see if this is a subset of the table header
             if set(id_attrs.items()) < set(table_attrs.items()):
                 return True
@@ -391,46 +422,53 @@ class Flow:
 
         Raise exception if no such Data Flow
 
+        :param fid: Flow ID of a Data Flow
+        :param anum: The activity number
+        :param domain: The domain name
+        :return: A flow summary for the supplied ID
+        """
+        flow = cls.registry(anum=anum, domain=domain).data.get(fid)
+        if not flow:
+            # Either fid not defined or it is a Control Flow
+            raise FlowException
+        return flow
+
+    @classmethod
+    def query_data(cls, fid: str, anum: str, domain: str) -> Flow_ap:
+        """
+        Query the metamodel for the summary of a Data Flow
+
+        Used to register any Data Flows already populated in an Activity, lookup_data answers from the registry
+
         :param fid: Flow ID of a Data Flow
         :param anum: The activity number
         :param domain: The domain name
         :return: A flow summary for the supplied ID
         """
         # First verify that the fid corresponds to some Data Flow instance
-        R = f"ID:<{fid}>, Activity:<{anum}>, Domain:<{domain}>"
-        data_flow_r = Relation.restrict(db=mmdb, relation='Data_Flow', restriction=R)
-        if not data_flow_r.body:
+        if not RelvarIndex.exists('Data_Flow', ID=fid, Activity=anum, Domain=domain):
             # Either fid not defined or it is a Control Flow
             raise FlowException
 
         # Is Non Scalar or Scalar Flow?
-        R = f"ID:<{fid}>, Activity:<{anum}>, Domain:<{domain}>"
-        non_scalar_flow_r = Relation.restrict(db=mmdb, relation='Non_Scalar_Flow', restriction=R)
-        if non_scalar_flow_r.body:
+        if RelvarIndex.exists('Non_Scalar_Flow', ID=fid, Activity=anum, Domain=domain):
             # It is a Non Scalar Flow
-            R = f"ID:<{fid}>, Activity:<{anum}>, Domain:<{domain}>"
-            instance_flow_r = Relation.restrict(db=mmdb, relation='Instance_Flow', restriction=R)
-            if instance_flow_r.body:
+            instance_flow = RelvarIndex.lookup('Instance_Flow', ID=fid, Activity=anum, Domain=domain)
+            if instance_flow:
                 # It's an Instance Flow
-                tname = instance_flow_r.body[0]['Class']
-                R = f"ID:<{fid}>, Activity:<{anum}>, Domain:<{domain}>"
-                result = Relation.restrict(db=mmdb, relation='Multiple_Instance_Flow', restriction=R)
-                max_mult = MaxMult.MANY if result.body else MaxMult.ONE
+                tname = instance_flow[0]['Class']
+                many = RelvarIndex.exists('Multiple_Instance_Flow', ID=fid, Activity=anum, Domain=domain)
+                max_mult = MaxMult.MANY if many else MaxMult.ONE
                 return Flow_ap(fid=fid, content=Content.INSTANCE, tname=tname, max_mult=max_mult)
             else:
                 # Must be a Table Flow
-                R = f"ID:<{fid}>, Activity:<{anum}>, Domain:<{domain}>"
-                relation_flow_r = Relation.restrict(db=mmdb, relation='Relation_Flow', restriction=R)
-                tname = relation_flow_r.body[0]['Type']
-                R = f"ID:<{fid}>, Activity:<{anum}>, Domain:<{domain}>"
-                table_flow_r = Relation.restrict(db=mmdb, relation='Table_Flow', restriction=R)
-                max_mult = MaxMult.MANY if table_flow_r.body else MaxMult.ONE
+                tname = RelvarIndex.lookup('Relation_Flow', ID=fid, Activity=anum, Domain=domain)[0]['Type']
+                many = RelvarIndex.exists('Table_Flow', ID=fid, Activity=anum, Domain=domain)
+                max_mult = MaxMult.MANY if many else MaxMult.ONE
                 return Flow_ap(fid=fid, content=Content.RELATION, tname=tname, max_mult=max_mult)
         else:
             # It's a Scalar Flow
-            R = f"ID:<{fid}>, Activity:<{anum}>, Domain:<{domain}>"
-            scalar_flow_r = Relation.restrict(db=mmdb, relation='Scalar_Flow', restriction=R)
-            tname = scalar_flow_r.body[0]['Type']
+            tname = RelvarIndex.lookup('Scalar_Flow', ID=fid, Activity=anum, Domain=domain)[0]['Type']
             return Flow_ap(fid=fid, content=Content.SCALAR, tname=tname, max_mult=None)
 
     @classmethod
@@ -455,9 +493,7 @@ class Flow:
         tr = tr_Inst_Flow if not activity_tr else activity_tr
 
         # Is the type a Class Type?
-        R = f"Name:<{mm_type}>, Domain:<{domain}>"
-        r_class = Relation.restrict(db=mmdb, relation='Class', restriction=R)
-        if r_class.body:
+        if RelvarIndex.exists('Class', Name=mm_type, Domain=domain):
             # It's a class type, create an instance flow
             single = True if mult == MaxMult.ONE else False
             flow = cls.populate_instance_flow(cname=mm_type, anum=anum, domain=domain, label=label, single=single,
@@ -465,8 +501,7 @@ class Flow:
             return flow  # Instance flow (single or multiple)
 
         # Table Type?
-        r_table = Relation.restrict(db=mmdb, relation='Table', restriction=R)
-        if r_table.body:
+        if RelvarIndex.exists('Table', Name=mm_type, Domain=domain):
             is_tuple = True if mult == MaxMult.ONE else False
             flow = cls.populate_relation_flow(table_name=mm_type, anum=anum, domain=domain, label=label,
                                               is_tuple=is_tuple, activity_tr=tr)
@@ -507,7 +542,8 @@ class Flow:
         if not activity_tr:
             Transaction.execute(db=mmdb, name=tr)
 
-        return Flow_ap(fid=flow_id, content=Content.SCALAR, tname=scalar_type, max_mult=None)
+        return cls.register(anum=anum, domain=domain, flow=Flow_ap(
+            fid=flow_id, content=Content.SCALAR, tname=scalar_type, max_mult=None))
 
     @classmethod
     def populate_instance_flow(cls, cname: str, anum: str, domain: str, label: Optional[str] = None,
@@ -552,7 +588,24 @@ class Flow:
         if not activity_tr:
             Transaction.execute(db=mmdb, name=tr)
 
-        return Flow_ap(fid=flow_id, content=Content.INSTANCE, tname=cname, max_mult=max_mult)
+        return cls.register(anum=anum, domain=domain, flow=Flow_ap(
+            fid=flow_id, content=Content.INSTANCE, tname=cname, max_mult=max_mult))
+
+    @classmethod
+    def register(cls, anum: str, domain: str, flow: Flow_ap) -> Flow_ap:
+        """
+        Register the summary of a newly populated Data Flow
+
+        Args:
+            anum: Activity number
+            domain: Domain name
+            flow: The Data Flow summary
+
+        Returns:
+            The registered summary
+        """
+        cls.registry(anum=anum, domain=domain).data[flow.fid] = flow
+        return flow
 
     @classmethod
     def populate_non_scalar_flow(cls, tr: str, anum: str, domain: str, label: Optional[str] = None) -> str:
@@ -607,8 +660,9 @@ class Flow:
             Relvar.insert(db=mmdb, tr=tr, relvar='Table_Flow', tuples=[
                 Table_Flow_i(ID=flow_id, Activity=anum, Domain=domain)
             ])
-        return Flow_ap(fid=flow_id, content=Content.RELATION, tname=table_name,
-                       max_mult=MaxMult.ONE if is_tuple else MaxMult.MANY)
+        return cls.register(anum=anum, domain=domain, flow=Flow_ap(
+            fid=flow_id, content=Content.RELATION, tname=table_name,
+            max_mult=MaxMult.ONE if is_tuple else MaxMult.MANY))
 
     @classmethod
     def copy_data_flow(cls, tr: str, ref_fid: str, ref_anum: str, new_anum: str, domain: str,
@@ -701,6 +755,7 @@ class Flow:
             cls.flow_id_ctr[activity_id] = 0
 
         # Populate Flow instance
+        registry = cls.registry(anum=anum, domain=domain)  # Started before the activity's first Flow is added
         cls.flow_id_ctr[activity_id] += 1  # Increment the flow id counter for this anum
         fid = f"F{cls.flow_id_ctr[activity_id]}"
         Relvar.insert(db=mmdb, tr=tr, relvar='Flow', tuples=[
@@ -712,6 +767,7 @@ class Flow:
             Relvar.insert(db=mmdb, tr=tr, relvar='Labeled_Flow', tuples=[
                 Labeled_Flow_i(Name=label, ID=fid, Activity=anum, Domain=domain)
             ])
+            registry.label(fid=fid, label=label)
         else:
             Relvar.insert(db=mmdb, tr=tr, relvar='Unlabeled_Flow', tuples=[
                 Unlabeled_Flow_i(ID=fid, Activity=anum, Domain=domain)
@@ -0,0 +1,156 @@
+"""
+flow_usage.py – Record the flows consumed and produced by each action as it is populated
+"""
+
+# System
+import logging
+from typing import NamedTuple, TYPE_CHECKING
+
+# Model Integration
+from pyral.rtypes import snake
+
+# xUML Populate
+from xuml_populate.context import ContextScoped, ContextState
+
+if TYPE_CHECKING:
+    from xuml_populate.populate.activity import Activity
+
+_logger = logging.getLogger(__name__)
+
+# TODO: This can be generated later by make_repo, ensure each name ends with 'Action'
+class UsageAttrs(NamedTuple):
+    cname: str
+    id_attr: str | None
+    in_attr: str | None = None
+    out_attr: str | None = None
+    in_attr2: str | None = None  # New Associative Reference Action for example
+
+# We use the following list of tuples to extract the required input and output flows of each Action type
+# Create a tuple for each class that specifies an input, output or both flows as part of some Action's subsystem
+# Some Action's require one class while others may have two or three
+
+# cname - the name of the class holding references to one or more required flows, PyRAL allows spaces in class name
+# id_attr - The attribute holding the Action ID, so the type must be Action ID, PyRAL requires snake_case for attrs
+# in_attr - The name of the required input, for now we assume there is only one, type of this attr must be Flow ID
+# in_attr2 - Okay, make that two possible required inputs in rare cases, same rules as for in_attr
+# out_attr - The name of a required output attr, again a Flow ID type
+
+flow_attrs = [
+    UsageAttrs(cname='External Signal Parameter', id_attr='Signal_action', in_attr='Flow', out_attr=None),
+    UsageAttrs(cname='Reference Initialization', id_attr='Create_action', in_attr='Initial_value_flow', out_attr=None),
+    UsageAttrs(cname='Local Create Action', id_attr='ID', in_attr=None, out_attr='New_instance_flow'),
+    UsageAttrs(cname='New Reference Action', id_attr='ID', in_attr=None, out_attr='Ref_attr_values'),
+    UsageAttrs(cname='Update Reference Action', id_attr='ID', in_attr='From_instance', in_attr2='To_instance'),
+    UsageAttrs(cname='New Associative Reference Action', id_attr='ID', in_attr='T_instance', in_attr2='P_instance',
+               out_attr=None),
+    UsageAttrs(cname='Iterated Instance Flow', id_attr='Iterator', in_attr=None, out_attr='Flow'),
+    UsageAttrs(cname='Iterator', id_attr='ID', in_attr='Input_flow', out_attr=None),
+    UsageAttrs(cname='Extender', id_attr='ID', in_attr='Attribute_flow', out_attr='Table_output'),
+    UsageAttrs(cname='Cardinality Action', id_attr='ID', in_attr='Non_scalar_input_flow',
+               out_attr='Output_cardinality_flow'),
+    UsageAttrs(cname='Cast To Instance', id_attr='ID', in_attr='Relation_flow', out_attr='Instance_flow'),
+    UsageAttrs(cname='Supplied Parameter Value', id_attr='Action', in_attr='Data_flow', out_attr=None),
+    UsageAttrs(cname='Computation Input', id_attr='Computation', in_attr='Input_flow', out_attr=None),
+    UsageAttrs(cname='General Computation', id_attr='ID', in_attr=None, out_attr='Result_flow'),
+    UsageAttrs(cname='Type Action', id_attr='ID', in_attr=None, out_attr='Output_flow'),
+    UsageAttrs(cname='Type Operation', id_attr='ID', in_attr='Input_flow', out_attr=None),
+    UsageAttrs(cname='Pass Action', id_attr='ID', in_attr='Input_flow', out_attr='Output_flow'),
+    UsageAttrs(cname='Delete Action', id_attr='ID', in_attr='Flow', out_attr=None),
+    UsageAttrs(cname='Operation Call Output', id_attr='Operation_call', in_attr=None, out_attr='Flow'),
+    UsageAttrs(cname='Operation Call Parameter', id_attr='Operation_call', in_attr='Flow', out_attr=None),
+    UsageAttrs(cname='Method Call', id_attr='ID', in_attr='Instance_flow', out_attr=None),
+    UsageAttrs(cname='Method Call Parameter', id_attr='Method_call', in_attr='Flow', out_attr=None),
+    UsageAttrs(cname='Method Call Output', id_attr='Method_call', in_attr=None, out_attr='Flow'),
+    UsageAttrs(cname='Decision Action', id_attr='ID', in_attr='Boolean_input', out_attr=None),
+    UsageAttrs(cname='Result', id_attr='Decision_action', in_attr=None, out_attr='Flow'),
+    UsageAttrs(cname='Explicit Initialization', id_attr='Create_action', in_attr='Initial_value_flow', out_attr=None),
+    UsageAttrs(cname='Local Create Action', id_attr='ID', in_attr=None, out_attr='New_instance_flow'),
+    UsageAttrs(cname='Multiple Assigner Partition Instance', id_attr='Action', in_attr='Partition', out_attr=None),
+    UsageAttrs(cname='Delivery Time', id_attr='Action', in_attr='Flow', out_attr=None),
+    UsageAttrs(cname='Signal Instance Action', id_attr='ID', in_attr='Instance_flow', out_attr=None),
+    UsageAttrs(cname='Write Action', id_attr='ID', in_attr='Instance_flow', out_attr=None),
+    UsageAttrs(cname='Attribute Write Access', id_attr='Write_action', in_attr='Input_flow', out_attr=None),
+    UsageAttrs(cname='Select Action', id_attr='ID', in_attr='Input_flow', out_attr=None),
+    UsageAttrs(cname='Traverse Action', id_attr='ID', in_attr='Source_flow', out_attr='Destination_flow'),
+    UsageAttrs(cname='Many Select', id_attr='ID', in_attr=None, out_attr='Output_flow'),
+    UsageAttrs(cname='Single Select', id_attr='ID', in_attr=None, out_attr='Output_flow'),
+    UsageAttrs(cname='Table Action', id_attr='ID', in_attr='Input_a_flow', out_attr='Output_flow'),
+    UsageAttrs(cname='Set Action', id_attr='ID', in_attr='Input_b_flow', out_attr=None),
+    UsageAttrs(cname='Read Action', id_attr='ID', in_attr='Instance_flow', out_attr=None),
+    UsageAttrs(cname='Attribute Read Access', id_attr='Read_action', in_attr=None, out_attr='Output_flow'),
+    UsageAttrs(cname='Comparison Criterion', id_attr='Action', in_attr='Value', out_attr=None),
+    UsageAttrs(cname='Gate Action', id_attr='ID', in_attr=None, out_attr='Output_flow'),
+    UsageAttrs(cname='Gate Input', id_attr='Gate_action', in_attr='Input_flow', out_attr=None),
+    UsageAttrs(cname='Case', id_attr='Switch_action', in_attr=None, out_attr='Flow'),
+    UsageAttrs(cname='Control Dependency', id_attr='Action', in_attr='Control_flow', out_attr=None),
+    UsageAttrs(cname='Extract Action', id_attr='ID', in_attr='Input_tuple', out_attr='Output_scalar'),
+]
+
+
+# Flow usage classes by relvar name as PyRAL snakes it
+usage_by_relvar: dict[str, list[UsageAttrs]] = {}
+for _usage in flow_attrs:
+    usage_by_relvar.setdefault(snake(_usage.cname), []).append(_usage)
+
+
+class FlowUsage(metaclass=ContextScoped):
+    """
+    The source and destination actions of each flow, recorded on its Activity as the flow usage classes are populated
+
+    Every action populator inserts the tuples that connect its action to its input and output flows (a
+    Read Action's instance flow and attribute outputs, for example). Rather than read each of the usage
+    classes back out of the metamodel once an activity is populated, the populator records each of those
+    inserts in the flow_usage of the Activity it belongs to as it is made so that the activity's flow
+    dependencies can be derived directly. An Activity is registered when it is created, since some usage (the outputs of a
+    Method Call) is inserted only after the Activity's own actions are populated.
+
+    Setting check cross-checks each recording against the metamodel usage classes (see flow_attrs).
+    """
+    check = False
+    # Each Activity being populated by domain and anum
+    activities: dict[str, 'Activity'] = ContextState(dict)
+
+    @classmethod
+    def register(cls, activity: 'Activity'):
+        """
+        Record flow usage inserted from now on for this activity in its flow_usage
+
+        Args:
+            activity: An Activity about to be populated
+        """
+        cls.activities[f"{activity.domain}:{activity.anum}"] = activity
+
+    @classmethod
+    def record(cls, relvar: str, tuples: list):
+        """
+        Record the flows each inserted usage tuple connects to its action
+
+        Args:
+            relvar: Name of a flow usage class
+            tuples: The inserted tuples, named tuples or dicts
+        """
+        for t in tuples:
+            # Values are formatted as PyRAL formats them in the insert command
+            t = {snake(a): f"{v}" for a, v in (t._asdict() if hasattr(t, '_asdict') else t).items()}
+            activity = cls.activities.get(f"{t['Domain']}:{t['Activity']}")
+            if activity is None:
+                continue  # Not populated as an Activity, so its flow dependencies are never derived
+            for header in usage_by_relvar[snake(relvar)]:
+                aid = t[header.id_attr]
+                for in_attr in (header.in_attr, header.in_attr2):
+                    if in_attr:
+                        activity.flow_usage.setdefault(t[in_attr], {'source': set(), 'dest': set()})['dest'].add(aid)
+                if header.out_attr:
+                    activity.flow_usage.setdefault(t[header.out_attr], {'source': set(), 'dest': set()})[
+                        'source'].add(aid)
+
+    @classmethod
+    def clear(cls, anum: str, domain: str):
+        """
+        Stop recording for an activity once its flow dependencies are populated, or as it is depopulated
+
+        Args:
+            anum: Activity number
+            domain: Domain name
+        """
+        cls.activities.pop(f"{domain}:{anum}", None)
@@ -5,11 +5,9 @@ generalization.py – Process parsed generalization to populate the metamodel db
 # System
 import logging
 
-# Model Integration
-from pyral.relvar import Relvar
-
 # xUML Populate
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar
 from xuml_populate.populate.reference import targetid
 from xuml_populate.exceptions.mp_exceptions import LessThanTwoSubclassesInGeneralization
 from xuml_metamodel.mmclass_nt import (Generalization_i, Facet_i, Superclass_i, Subclass_i,
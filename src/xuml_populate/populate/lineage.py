@@ -4,30 +4,34 @@ lineage.py – Compute all lineage instances and populate them
 
 import logging
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
+from xuml_populate.context import ContextScoped, ContextState
 from typing import List, Set, Optional
 from xuml_populate.tree.tree import extract
 from xuml_metamodel.mmclass_nt import Element_i, Spanning_Element_i, Lineage_i, Class_In_Lineage_i
-from pyral.transaction import Transaction
-from pyral.relvar import Relvar
-from pyral.relation import Relation
+from xuml_populate.relvar_index import RelvarIndex
 
 _logger = logging.getLogger(__name__)
 
 tr_Lin = "Lineage"
 
-class Lineage:
+class Lineage(metaclass=ContextScoped):
     """
     Create all lineages for a domain
     """
 
-    domain = None
+    domain = ContextState()
 
-    lnums = 0
-    walks = []
-    xrels = set()
-    xclasses = set()
-    popclasses = set()
-    lineages = None
+    lnums = ContextState(int)
+    walks = ContextState(list)
+    xrels = ContextState(set)
+    xclasses = ContextState(set)
+    lineages = ContextState()
+
+    # The generalizations of the domain, loaded once when the domain's lineages are derived
+    facets: dict[str, list[str]] = ContextState(dict)  # Rnums of each class's Facets
+    subclasses: dict[str, set[str]] = ContextState(dict)  # By generalization rnum
+    superclasses: dict[str, str] = ContextState(dict)  # By generalization rnum
 
     @classmethod
     def Derive(cls, domain: str):
@@ -36,16 +40,19 @@ class Lineage:
         :param domain:
         :return:
         """
+        # Each domain starts fresh
         cls.domain = domain
+        cls.lnums = 0
+        cls.walks = []
+        cls.lineages = None
+        cls.load_generalizations()
 
         # Get all classes with at least one subclass facet and no superclass facets
         # These constitute 'leaves'. We use them as starting points as we step through a set of generalizations
         # to identify lineages.
-
-        Relation.project(mmdb, attributes=('Class', 'Domain'), relation='Subclass', svar_name='subs')
-        Relation.project(mmdb, attributes=('Class', 'Domain'), relation='Superclass', svar_name='supers')
-        leaf_tuples = Relation.subtract(mmdb, rname1='subs', rname2='supers')
-        leaf_classes = [t['Class'] for t in leaf_tuples.body]
+        superclass_names = set(cls.superclasses.values())
+        leaf_classes = list(dict.fromkeys(
+            c for subs in cls.subclasses.values() for c in subs if c not in superclass_names))
 
         # Now we walk (step) through each generalization to build trees of one or more lineages
         for leaf in leaf_classes:
@@ -70,6 +77,19 @@ class Lineage:
         # Finally, we load each lineage into the tclral
         cls.populate()
 
+    @classmethod
+    def load_generalizations(cls):
+        """
+        Load the Facets of every Generalization in the domain
+        """
+        cls.facets, cls.subclasses, cls.superclasses = {}, {}, {}
+        for f in RelvarIndex.lookup('Facet', Domain=cls.domain):
+            cls.facets.setdefault(f['Class'], []).append(f['Rnum'])
+        for f in RelvarIndex.lookup('Subclass', Domain=cls.domain):
+            cls.subclasses.setdefault(f['Rnum'], set()).add(f['Class'])
+        for f in RelvarIndex.lookup('Superclass', Domain=cls.domain):
+            cls.superclasses[f['Rnum']] = f['Class']
+
     @classmethod
     def step(cls, walk: List, cvisit: str, rvisit: Optional[str] = None) -> List:
         """
@@ -89,11 +109,8 @@ class Lineage:
         # Get all adjacent relationships, if any, on the civisit class that have not already been traversed
         # Could be either superclass_name or subclasses, so we search Facets
         # Get all Facets that cvisit participates in
-        R = f"Class:<{cvisit}>, Domain:<{cls.domain}>"
-        Relation.restrict(mmdb, restriction=R, relation="Facet")
-        s = Relation.project(mmdb, attributes=("Rnum", ))
         # Grab the result being careful to exclude prior traversals so we don't walk around in circles!
-        adj_rels = [r['Rnum'] for r in s.body if r['Rnum'] not in cls.xrels and r['Rnum'] != rvisit]
+        adj_rels = [r for r in cls.facets.get(cvisit, []) if r not in cls.xrels and r != rvisit]
 
         # We have nowhere else to walk if cvisit does not participate in any new rels
         if not adj_rels:
@@ -150,18 +167,11 @@ class Lineage:
         :param domain:
         :return:
         """
-        Relation.restrict(mmdb, relation='Subclass', restriction=f"Rnum:<{grel}>, Domain:<{cls.domain}>")
-        s = Relation.project(mmdb, attributes=('Class', ))
-
-        return {t['Class'] for t in s.body}
+        return set(cls.subclasses.get(grel, set()))
 
     @classmethod
     def isSubclass(cls, grel: str, cname: str) -> bool:
-        Relation.restrict(mmdb,
-                          relation='Subclass',
-                          restriction=f"Class:<{cname}>, Rnum:<{grel}>, Domain:<{cls.domain}>")
-        s = Relation.project(mmdb, attributes=())
-        return bool(s.body)
+        return cname in cls.subclasses.get(grel, set())
 
     @classmethod
     def findSuperclass(cls, grel: str) -> str:
@@ -172,33 +182,32 @@ class Lineage:
         :param domain:  A the name of the domain
         :return:
         """
-        Relation.restrict(mmdb, relation='Superclass', restriction=f"Rnum:<{grel}>, Domain:<{cls.domain}>")
-        s = Relation.project(mmdb, attributes=("Class", ))
-        return s.body[0]['Class']
+        return cls.superclasses[grel]
 
     @classmethod
     def populate(cls):
         """
         Trace through walks to populate all Lineages
 
+        Lineages are numbered in sorted order and all are inserted in a single transaction
+
         :return:
         """
-        for lin in cls.lineages:
+        if not cls.lineages:
+            return
+        elements, spanning_elements, lineages, classes_in_lineage = [], [], [], []
+        for lin in sorted(cls.lineages):
             cls.lnums += 1
             lnum = 'L' + (str(cls.lnums))
             _logger.info(f"Populating lineage [{lnum}]")
-            Transaction.open(mmdb, tr_Lin)
-            Relvar.insert(mmdb, tr=tr_Lin, relvar='Element', tuples=[
-                Element_i(Label=lnum, Domain=cls.domain)
-            ])
-            Relvar.insert(mmdb, tr=tr_Lin, relvar='Spanning_Element', tuples=[
-                Spanning_Element_i(Label=lnum, Domain=cls.domain)
-            ])
-            Relvar.insert(mmdb, tr=tr_Lin, relvar='Lineage', tuples=[
-                Lineage_i(Lnum=lnum, Domain=cls.domain)
-            ])
-            for cname in lin.split(':'):
-                Relvar.insert(mmdb, tr=tr_Lin, relvar='Class_In_Lineage', tuples=[
-                    Class_In_Lineage_i(Class=cname,Lnum=lnum, Domain=cls.domain)
-                ])
-            Transaction.execute(mmdb, tr_Lin)
+            elements.append(Element_i(Label=lnum, Domain=cls.domain))
+            spanning_elements.append(Spanning_Element_i(Label=lnum, Domain=cls.domain))
+            lineages.append(Lineage_i(Lnum=lnum, Domain=cls.domain))
+            classes_in_lineage.extend(Class_In_Lineage_i(Class=cname, Lnum=lnum, Domain=cls.domain)
+                                      for cname in lin.split(':'))
+        Transaction.open(mmdb, tr_Lin)
+        Relvar.insert(mmdb, tr=tr_Lin, relvar='Element', tuples=elements)
+        Relvar.insert(mmdb, tr=tr_Lin, relvar='Spanning_Element', tuples=spanning_elements)
+        Relvar.insert(mmdb, tr=tr_Lin, relvar='Lineage', tuples=lineages)
+        Relvar.insert(mmdb, tr=tr_Lin, relvar='Class_In_Lineage', tuples=classes_in_lineage)
+        Transaction.execute(mmdb, tr_Lin)
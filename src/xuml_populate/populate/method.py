@@ -3,25 +3,26 @@ method.py – Process parsed method to populate the metamodel db
 """
 # System
 import logging
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
+if TYPE_CHECKING:
+    from mtd_parser.method_visitor import Method_a
 
 # Model Integration
-from pyral.transaction import Transaction
-from pyral.relvar import Relvar
 from pyral.relation import Relation  # For debugging
-from mtd_parser.method_visitor import Method_a
-from scrall.parse.parser import ScrallParser
 
 # xUML Populate
 from xuml_populate.exceptions import *
 from xuml_populate.exceptions.action_exceptions import IncompleteActionException
-from xuml_populate.populate.xunit import ExecutionUnit
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
+from xuml_populate.parse_cache import ParseCache
+from xuml_populate.profiler import Profile
 from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.signature import Signature
 from xuml_populate.populate.activity import Activity
 from xuml_populate.populate.mm_type import MMtype
-from xuml_populate.populate.actions.aparse_types import Method_Output_Type
+from xuml_populate.populate.actions.aparse_types import Method_Output_Type, Flow_ap, Content, MaxMult
 from xuml_metamodel.mmclass_nt import (
     Method_Signature_i, Method_i, Parameter_i, Synchronous_Output_i, Activity_Input_i
 )
@@ -41,7 +42,8 @@ class Method:
     """
     Populate all relevant Method relvars
     """
-    def __init__(self, domain: str, subsys: str, m_parse: Method_a, parse_actions: bool):
+    def __init__(self, domain: str, subsys: str, m_parse: 'Method_a', parse_actions: bool,
+                 anum: Optional[str] = None):
         """
         Populate a Method
 
@@ -50,6 +52,8 @@ class Method:
             subsys: The name of the subsystem
             m_parse: The parsed content of the method
             parse_actions:
+            anum: Activity number of a Method already populated in a loaded database, in which case
+                nothing is populated and its actions can be processed again
         """
         self.domain = domain
         self.subsys = subsys
@@ -62,6 +66,13 @@ class Method:
         self.xi_flow = None
         self.path = f"{domain}:{self.class_name}.{self.name}"
         self.activity_obj: Optional[Activity] = None
+        self.activity_parse = None
+
+        if anum:
+            # The Method and its parameters are already populated, we only need to parse its actions
+            # if they are to be populated again (see process_execution_units)
+            self.anum = anum
+            return
 
         Transaction.open(db=mmdb, name=tr_Method)
         _logger.info("Transaction open: Populating method")
@@ -73,8 +84,9 @@ class Method:
                                Domain=self.domain)
         ])
 
-        # Parse the scrall and save for later population
-        self.activity_parse = ScrallParser.parse_text(scrall_text=self.method_parse.activity, debug=False)
+        # Parse the scrall and save for later population, unless action language parsing is suppressed (-A)
+        if parse_actions:
+            self.activity_parse = ParseCache.parse_scrall(scrall_text=self.method_parse.activity)
 
         # Populate the method
         self.anum = Activity.populate(tr=tr_Method, action_text=self.activity_parse, subsys=subsys, domain=self.domain)
@@ -124,22 +136,26 @@ class Method:
         """
         _logger.info(f"Populating method execution units: {self.path}")
         # Look up signature
-        R = f"Method:<{self.name}>, Class:<{self.class_name}>, Domain:<{self.domain}>"
-        method_sig_r = Relation.restrict(db=mmdb, relation='Method Signature', restriction=R)
-        if not method_sig_r.body:
-            msg = f"No signature found for {R} while processing execution units"
+        method_sig = RelvarIndex.lookup('Method Signature', Method=self.name, Class=self.class_name,
+                                        Domain=self.domain)
+        if not method_sig:
+            msg = f"No signature found for {self.path} while processing execution units"
             _logger.error(msg)
             raise IncompleteActionException(msg)
-        self.signum = method_sig_r.body[0]['SIGnum']
+        self.signum = method_sig[0]['SIGnum']
 
         # Look up xi flow
-        R = f"Name:<{self.name}>, Class:<{self.class_name}>, Domain:<{self.domain}>"
-        method_r = Relation.restrict(db=mmdb, relation='Method', restriction=R)
-        if not method_r.body:
-            msg = f"No Method found for {R} while processing execution units"
+        method = RelvarIndex.lookup('Method', Name=self.name, Class=self.class_name, Domain=self.domain)
+        if not method:
+            msg = f"No Method found for {self.path} while processing execution units"
             _logger.error(msg)
             raise IncompleteActionException(msg)
-        self.xi_flow_id = method_r.body[0]['Executing_instance_flow']
+        self.xi_flow_id = method[0]['Executing_instance_flow']
+        if not self.xi_flow:
+            self.xi_flow = Flow_ap(fid=self.xi_flow_id, content=Content.INSTANCE, tname=self.class_name,
+                                   max_mult=MaxMult.ONE)
+        if not self.activity_parse:
+            self.activity_parse = ParseCache.parse_scrall(scrall_text=self.method_parse.activity)
 
         method_data = MethodActivityAP(
             anum=self.anum, domain=self.domain, cname=self.class_name, opname=self.name, signum=self.signum,
@@ -147,15 +163,17 @@ class Method:
             parse=self.activity_parse[0], scrall_text=self.method_parse.activity)
 
         # Populate the Method Actions
-        self.activity_obj = Activity(activity_data=method_data)
-        self.activity_obj.pop_actions()
+        with Profile.activity(anum=self.anum, domain=self.domain, path=self.path):
+            self.activity_obj = Activity(activity_data=method_data)
+            self.activity_obj.pop_actions()
 
     def post_process(self):
         """
         """
         # Finally, we can populate Method Call Outputs
         from xuml_populate.populate.actions.method_call import MethodCall
-        MethodCall.complete_output_transaction()
-        self.activity_obj.prep_for_execution()
+        with Profile.activity(anum=self.anum, domain=self.domain, path=self.path):
+            MethodCall.complete_output_transaction()
+            self.activity_obj.prep_for_execution()
 
 
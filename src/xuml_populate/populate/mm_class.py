@@ -6,13 +6,11 @@ mm_class.py – Process parsed class to populate the metamodel db
 from typing import Dict
 import logging
 
-# Model Integration
-from pyral.transaction import Transaction
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-
 # xUML Populate
+from xuml_populate.context import ContextScoped, ContextState
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_populate.populate.element import Element
 from xuml_populate.populate.attribute import Attribute
 from xuml_populate.populate.mm_type import MMtype
@@ -24,19 +22,19 @@ _logger = logging.getLogger(__name__)
 _tr_Class = "Class"
 
 
-class MMclass:
+class MMclass(metaclass=ContextScoped):
     """
     Populate all relevant Class relvars
     """
-    record = None
-    name = None
-    alias = None
-    cnum = None
-    identifiers = None
-    attributes = None
-    methods = None
-    ee = None
-    ee_ops = None
+    record = ContextState()
+    name = ContextState()
+    alias = ContextState()
+    cnum = ContextState()
+    identifiers = ContextState()
+    attributes = ContextState()
+    methods = ContextState()
+    ee = ContextState()
+    ee_ops = ContextState()
 
     @classmethod
     def header(cls, cname: str, domain: str) -> Dict[str, str]:
@@ -47,9 +45,8 @@ class MMclass:
         :param domain:  Domain name
         :return: The header as a dictionary of attr;type key value pairs
         """
-        R = f"Class:<{cname}>, Domain:<{domain}>"
-        attrs = Relation.restrict(db=mmdb, relation='Attribute', restriction=R)
-        h = {a['Name']: a['Scalar'] for a in attrs.body}
+        attrs = RelvarIndex.lookup('Attribute', Class=cname, Domain=domain)
+        h = {a['Name']: a['Scalar'] for a in attrs}
         return h
 
     @classmethod
@@ -60,9 +57,7 @@ class MMclass:
         :param domain: Its domain name
         :return: True if the class has been populated into this domain
         """
-        R = f"Name:<{cname}>, Domain:<{domain}>"
-        result = Relation.restrict(db=mmdb, relation='Class', restriction=R)
-        return bool(result.body)
+        return RelvarIndex.exists('Class', Name=cname, Domain=domain)
 
     @classmethod
     def populate(cls, domain: str, subsystem, record):
@@ -5,13 +5,11 @@ mm_type.py – Pouplate (metamodel) Type instance
 # System
 import logging
 
-# Model Integration
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
-
 # xUML Populate
+from xuml_populate.context import ContextScoped, ContextState
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
+from xuml_populate.relvar_index import RelvarIndex
 from xuml_metamodel.mmclass_nt import Type_i, Scalar_i, Table_i, Table_Attribute_i
 
 if __debug__:
@@ -23,16 +21,16 @@ _logger = logging.getLogger(__name__)
 tr_Scalar = "Scalar"
 tr_Scalar_Delete = "Scalar Delete"
 
-class MMtype:
+class MMtype(metaclass=ContextScoped):
     """
     Populate (metamodel) Type instances
     """
 
-    name = None
-    domain = None
-    mmdb = None
-    scalar_types = {}
-    class_names = set()
+    name = ContextState()
+    domain = ContextState()
+    mmdb = ContextState()
+    scalar_types = ContextState(dict)
+    class_names = ContextState(set)
 
     @classmethod
     def populate_unknown(cls, name: str, domain: str):
@@ -115,9 +113,7 @@ class MMtype:
         """
         # Verify that the scalar exists. It may already be absent (e.g. no attributes deferred
         # resolution), in which case there is nothing to depopulate.
-        R = f"Name:<{name}>, Domain:<{domain}>"
-        result = Relation.restrict(db=mmdb, restriction=R, relation="Type").body
-        if not result:
+        if not RelvarIndex.exists('Type', Name=name, Domain=domain):
             _logger.debug("Scalar dummy UNRESOLVED not found during depopulate -- nothing to remove")
             return
         # Depopulate scalar
@@ -125,3 +121,17 @@ class MMtype:
         Relvar.deleteone(db=mmdb, tr=tr_Scalar_Delete, relvar_name='Type', tid={'Name': name, 'Domain': domain})
         Relvar.deleteone(db=mmdb, tr=tr_Scalar_Delete, relvar_name='Scalar', tid={'Name': name, 'Domain': domain})
         Transaction.execute(db=mmdb, name=tr_Scalar_Delete)
+
+    @classmethod
+    def load_domain_types(cls, domain: str):
+        """
+        Record the Class and Scalar types of a domain already present in a loaded database
+
+        This lets us populate more actions into a previously populated domain without attempting to
+        populate any of its types a second time.
+
+        Args:
+            domain: The domain name
+        """
+        cls.class_names.update(t['Name'] for t in RelvarIndex.lookup('Class', Domain=domain))
+        cls.scalar_types.setdefault(domain, set()).update(t['Name'] for t in RelvarIndex.lookup('Scalar', Domain=domain))
@@ -4,7 +4,7 @@ ns_flow.py – Process a Non Scalar Flow
 
 import logging
 from xuml_populate.config import mmdb
-from pyral.relation import Relation
+from xuml_populate.db import Relation
 from typing import Optional, List, Dict
 from xuml_populate.exceptions.action_exceptions import FlowException, NonScalarFlowRequired
 from xuml_populate.populate.actions.aparse_types import Flow_ap, MaxMult, Content
@@ -5,11 +5,9 @@ ordinal.py – Process a parsed ordinal relationship to populate the metamodel d
 # System
 import logging
 
-# Model Integration
-from pyral.relvar import Relvar
-
 # xUML Populate
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar
 from xuml_metamodel.mmclass_nt import Ordinal_Relationship_i
 
 _logger = logging.getLogger(__name__)
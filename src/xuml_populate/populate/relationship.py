@@ -4,12 +4,12 @@ relationship.py – Convert parsed relationship to a relation
 
 import logging
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar, Transaction
+from xuml_populate.context import ContextScoped, ContextState
 from xuml_populate.populate.element import Element
 from xuml_populate.populate.generalization import Generalization
 from xuml_populate.populate.binary_association import BinaryAssociation
 from xuml_populate.populate.ordinal import Ordinal
-from pyral.transaction import Transaction
-from pyral.relvar import Relvar
 from xuml_populate.exceptions.mp_exceptions import UnknownRelationshipType
 from xuml_metamodel.mmclass_nt import Relationship_i
 
@@ -18,11 +18,11 @@ _logger = logging.getLogger(__name__)
 # Transactions
 tr_Rel = "Relationship"
 
-class Relationship:
+class Relationship(metaclass=ContextScoped):
     """
     Populate a Relationship
     """
-    rnum = None
+    rnum = ContextState()
 
     @classmethod
     def populate(cls, domain: str, subsystem, record):
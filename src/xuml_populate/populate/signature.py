@@ -5,12 +5,10 @@ import logging
 
 # xUML Populate
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar
 from xuml_populate.populate.element import Element
 from xuml_metamodel.mmclass_nt import Signature_i
 
-# Model Integration
-from pyral.relvar import Relvar
-
 _logger = logging.getLogger(__name__)
 
 class Signature:
@@ -13,6 +13,8 @@ from pyral.relation import Relation  # For debugging
 # xUML Populate
 from xuml_populate.exceptions.action_exceptions import *
 from xuml_populate.config import mmdb
+from xuml_populate.relvar_index import RelvarIndex
+from xuml_populate.profiler import Profile
 from xuml_populate.names import IPS_name
 from xuml_populate.utility import print_mmdb
 from xuml_populate.populate.actions.aparse_types import SMType, Flow_ap, Content, MaxMult, Method_Output_Type
@@ -68,44 +70,40 @@ class StateActivity:
             return
         _logger.info(f"Populating state activity execution units: {self.path}")
         # Look up signature
-        R = f"Name:<{self.name}>, State_model:<{self.sm_name}>, Domain:<{self.domain}>"
-        real_state_r = Relation.restrict(db=mmdb, relation='Real State', restriction=R)
-        if not real_state_r.body:
-            msg = f"Real State not defined for {R} in state activity"
+        real_state = RelvarIndex.lookup('Real State', Name=self.name, State_model=self.sm_name, Domain=self.domain)
+        if not real_state:
+            msg = f"Real State not defined for {self.path} in state activity"
             _logger.error(msg)
             raise IncompleteActionException(msg)
-        self.signum = real_state_r.body[0]['Signature']
+        self.signum = real_state[0]['Signature']
 
         match self.sm_type:
             case SMType.LIFECYCLE:
                 # Look up the executing instance (xi) flow
-                R = f"Anum:<{self.anum}>, Domain:<{self.domain}>"
-                lifecycle_activity_r = Relation.restrict(db=mmdb, relation='Lifecycle Activity', restriction=R)
-                if not lifecycle_activity_r.body:
-                    msg = f"No lifecyle activity found for {R} in StateActivity"
+                lifecycle_activity = RelvarIndex.lookup('Lifecycle Activity', Anum=self.anum, Domain=self.domain)
+                if not lifecycle_activity:
+                    msg = f"No lifecyle activity found for {self.anum}:{self.domain} in StateActivity"
                     _logger.error(msg)
                     raise ActionException(msg)
-                self.xi_flow_id = lifecycle_activity_r.body[0]['Executing_instance_flow']
+                self.xi_flow_id = lifecycle_activity[0]['Executing_instance_flow']
                 self.xi_flow = Flow_ap(fid=self.xi_flow_id, content=Content.INSTANCE, tname=self.sm_name,
                                        max_mult=MaxMult.ONE)
             case SMType.MA:
                 # Look up the partitioning instance (pi) flow
-                R = f"Anum:<{self.anum}>, Domain:<{self.domain}>"
-                ma_activity_r = Relation.restrict(db=mmdb, relation='Multiple Assigner Activity', restriction=R)
-                if not ma_activity_r.body:
-                    msg = f"No multiple assigner activity found for {R} in StateActivity"
+                ma_activity = RelvarIndex.lookup('Multiple Assigner Activity', Anum=self.anum, Domain=self.domain)
+                if not ma_activity:
+                    msg = f"No multiple assigner activity found for {self.anum}:{self.domain} in StateActivity"
                     _logger.error(msg)
                     raise ActionException(msg)
-                self.pi_flow_id = ma_activity_r.body[0]['Partitioning_instance_flow']
+                self.pi_flow_id = ma_activity[0]['Partitioning_instance_flow']
                 self.pi_flow = Flow_ap(fid=self.pi_flow_id, content=Content.INSTANCE, tname=self.state_model.pclass,
                                        max_mult=MaxMult.ONE)
-                R = f"Rnum:<{self.sm_name}>, Domain:<{self.domain}>"
-                ma_r = Relation.restrict(db=mmdb, relation='Multiple Assigner', restriction=R)
-                if not ma_r.body:
-                    msg = f"No multiple assigner found for {R} in StateActivity"
+                ma = RelvarIndex.lookup('Multiple Assigner', Rnum=self.sm_name, Domain=self.domain)
+                if not ma:
+                    msg = f"No multiple assigner found for {self.sm_name}:{self.domain} in StateActivity"
                     _logger.error(msg)
                     raise ActionException(msg)
-                self.pclass = ma_r.body[0]['Partitioning_class']
+                self.pclass = ma[0]['Partitioning_class']
             case SMType.SA:
                 pass  # No xi or pi flow (rnum only, no associated instance)
 
@@ -116,7 +114,8 @@ class StateActivity:
             activity_path=self.path, parse=self.state_parse["parse"], scrall_text=self.state_parse['text'])
 
         # Populate the State Activity Actions
-        activity_obj = Activity(activity_data=state_activity_data)
-        activity_obj.pop_actions()
-        activity_obj.prep_for_execution()
+        with Profile.activity(anum=self.anum, domain=self.domain, path=self.path):
+            activity_obj = Activity(activity_data=state_activity_data)
+            activity_obj.pop_actions()
+            activity_obj.prep_for_execution()
         pass
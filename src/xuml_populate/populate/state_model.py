@@ -5,19 +5,16 @@ state_model.py – Process parsed lifecycle to p
 # System
 import logging
 from enum import Enum
-from typing import Tuple
-
-# Model Integration
-from xsm_parser.state_model_parser import StateModel_a
-from pyral.relvar import Relvar
-from pyral.relation import Relation
-from pyral.transaction import Transaction
-
+from typing import Tuple, Optional, TYPE_CHECKING
+if TYPE_CHECKING:
+    from xsm_parser.state_model_visitor import StateModel_a
 
 # xUML Populate
 from xuml_populate.populate.actions.aparse_types import SMType, Method_Output_Type
 from xuml_populate.populate.state_activity import StateActivity
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar, Transaction
+from xuml_populate.parse_cache import ParseCache
 from xuml_populate.exceptions.mp_exceptions import MismatchedStateSignature, BadStateModelName
 from xuml_populate.populate.flow import Flow
 from xuml_populate.populate.signature import Signature
@@ -42,8 +39,17 @@ class StateModel:
     Create a State Model relation
     """
 
-    def __init__(self, subsys: str, sm: StateModel_a, parse_actions: bool):
-        """Constructor"""
+    def __init__(self, subsys: str, sm: 'StateModel_a', parse_actions: bool, populate: bool = True):
+        """
+        Populate a State Model
+
+        Args:
+            subsys: The name of the subsystem
+            sm: The parsed state model
+            parse_actions: If true, the action text of each state is parsed
+            populate: If false, the state model is already populated in a loaded database
+                and the states whose actions are to be processed again must be specified with restore_states
+        """
 
         self.cname = sm.lifecycle
         self.rnum = sm.assigner_rnum
@@ -63,6 +69,13 @@ class StateModel:
         self.parse_actions = parse_actions
         self.states: dict[str, dict] = {}
         self.domain = sm.domain
+        if self.cname:
+            self.sm_type = SMType.LIFECYCLE
+        else:
+            self.sm_type = SMType.MA if self.pclass else SMType.SA
+
+        if not populate:
+            return
 
         # Populate
         # It is easiest to create all events and states at once before checking constraints
@@ -71,7 +84,6 @@ class StateModel:
             State_Model_i(Name=self.sm_name, Domain=sm.domain)
         ])
         if self.cname:  # Lifecycle state model
-            self.sm_type = SMType.LIFECYCLE
             _logger.info(f"Populating Lifecycle [{self.cname}]")
             Relvar.insert(db=mmdb, tr=tr_SM, relvar='Lifecycle', tuples=[
                 Lifecycle_i(Class=self.cname, Domain=sm.domain)
@@ -83,13 +95,11 @@ class StateModel:
             ])
             if self.pclass:
                 # Multiple assigner with a partitioning class
-                self.sm_type = SMType.MA
                 Relvar.insert(db=mmdb, tr=tr_SM, relvar='Multiple Assigner', tuples=[
                     Multiple_Assigner_i(Rnum=self.rnum, Partitioning_class=self.pclass, Domain=sm.domain)
                 ])
             else:
                 # Single assigner
-                self.sm_type = SMType.SA
                 Relvar.insert(db=mmdb, tr=tr_SM, relvar='Single Assigner', tuples=[
                     Single_Assigner_i(Rnum=self.rnum, Domain=sm.domain)
                 ])
@@ -278,11 +288,38 @@ class StateModel:
 
         Transaction.execute(db=mmdb, name=tr_SM)
 
-    def process_states(self, method_output_types: dict[str, Method_Output_Type]):
+    def restore_states(self, sm: 'StateModel_a', anums: set[str]):
+        """
+        Prepare the already populated states with the specified activities to have their actions processed again
+
+        Args:
+            sm: The parsed state model
+            anums: Activity numbers of the states to process
         """
+        R = f"State_model:<{self.sm_name}>, Domain:<{self.domain}>"
+        real_state_r = Relation.restrict(db=mmdb, relation='Real State', restriction=R)
+        state_anums = {t['Name']: t['Activity'] for t in real_state_r.body}
+        for s in sm.states:
+            anum = state_anums[s.state.name]
+            if anum not in anums:
+                continue
+            action_text = ''.join(s.activity) + '\n'
+            self.states[s.state.name] = {'anum': anum, 'sm_type': self.sm_type,
+                                         'parse': ParseCache.parse_scrall(scrall_text=action_text)[0],
+                                         'text': action_text, 'domain': self.domain}
+
+    def process_states(self, method_output_types: dict[str, Method_Output_Type], states: Optional[list[str]] = None):
+        """
+        Populate the actions of each State Activity
+
+        Args:
+            method_output_types: Output type of each Method in the domain by activity number
+            states: Names of the states to populate, all states if not specified
         """
         _logger.info(f"Populating lifecycle: {self.sm_name}")
         for name, s_data in self.states.items():
+            if states is not None and name not in states:
+                continue
             sa = StateActivity(state_name=name, state_model=self, state_parse=s_data,
                                method_output_types=method_output_types)
             _logger.info(f"Populated state: [{name}]")
@@ -2,12 +2,11 @@
 
 # System
 import logging
+from contextlib import nullcontext
 from typing import TYPE_CHECKING, List
 
 # Model Integration
 from scrall.parse.visitor import Output_Flow_a, Seq_Statement_Set_a, Comp_Statement_Set_a
-from pyral.relvar import Relvar
-from pyral.relation import Relation
 
 # Xuml Populate
 if TYPE_CHECKING:
@@ -15,6 +14,8 @@ if TYPE_CHECKING:
 
 from xuml_populate.utility import print_mmdb
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relation, Relvar
+from xuml_populate.context import ContextScoped, ContextState
 from xuml_populate.populate.actions.aparse_types import Flow_ap, Content, MaxMult
 from xuml_populate.populate.statement import Statement
 from xuml_populate.populate.actions.aparse_types import ActivityAP, Boundary_Actions
@@ -31,7 +32,7 @@ tr_OutputFlow = "OutputFlow"
 _logger = logging.getLogger(__name__)
 
 
-class ExecutionUnit:
+class ExecutionUnit(metaclass=ContextScoped):
     """
     Process a Scrall execution_unit
 
@@ -54,6 +55,7 @@ class ExecutionUnit:
 
     To sum up, we take either a sequenced or component statement set
     """
+    activity = ContextState()  # The activity whose synchronous output is being processed
 
     @classmethod
     def process_synch_output(cls, activity: 'Activity', synch_output: Output_Flow_a) -> Boundary_Actions:
@@ -219,22 +221,27 @@ class ExecutionUnit:
             # Parsing error, cannot have both
             raise Exception
 
-        if single_statement:
-            boundary_actions = Statement.populate(activity=activity, statement_parse=single_statement)
-
-        elif block:
-            ain: set[str] = set()
-            aout: set[str] = set()
-            for count, s in enumerate(block):
-                b = ExecutionUnit.process_statement_set(content=s.statement_set, activity=activity)
-                ain.update(b.ain)
-                aout.update(b.aout)
-            boundary_actions = Boundary_Actions(ain=ain, aout=aout)
-
-            pass  # TODO: Look at the b list and figure out what to return based on example
-        else:
-            # Parsing error, neither were specified
-            raise Exception
+        # The actions of a case or decision result, or of a statement enabled by a sequence token, execute
+        # under a control dependency, so they don't share Read Actions with those outside
+        controlled = type(content).__name__ == 'Comp_Statement_Set_a' or bool(content.input_tokens)
+        with (ReadAction.control_scope(anum=activity.anum, domain=activity.domain) if controlled
+              else nullcontext()):
+            if single_statement:
+                boundary_actions = Statement.populate(activity=activity, statement_parse=single_statement)
+
+            elif block:
+                ain: set[str] = set()
+                aout: set[str] = set()
+                for count, s in enumerate(block):
+                    b = ExecutionUnit.process_statement_set(content=s.statement_set, activity=activity)
+                    ain.update(b.ain)
+                    aout.update(b.aout)
+                boundary_actions = Boundary_Actions(ain=ain, aout=aout)
+
+                pass  # TODO: Look at the b list and figure out what to return based on example
+            else:
+                # Parsing error, neither were specified
+                raise Exception
 
         # aid = Statement.populate()
         pass
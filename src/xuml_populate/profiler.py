@@ -0,0 +1,110 @@
+""" profiler.py – Time each population phase and count the database calls it makes """
+
+# System
+import json
+import time
+import logging
+from pathlib import Path
+from contextlib import contextmanager
+
+_logger = logging.getLogger(__name__)
+
+# Database calls counted in each phase by the db module, by the name used in the report
+counted_calls = ('restrict', 'insert', 'transaction_open')
+
+
+class Profile:
+    """
+    Collect wall time and database call counts for each phase of a population run
+
+    Phases are entered with the phase context manager. Time spent in a phase entered more than once
+    (such as populating the classes of each subsystem) is accumulated. Each Activity whose actions are
+    populated is timed individually so that the slowest ones can be reported.
+
+    Calls are always counted, but nothing is recorded unless the profile is enabled, so the context managers
+    can be left in place.
+    """
+    enabled = False
+    counts = {name: 0 for name in counted_calls}  # Running total of each counted call
+    phases: dict[str, dict] = {}  # Accumulated time and counts keyed by phase name, in the order first entered
+    activities: dict[str, dict] = {}  # Accumulated time and counts keyed by domain:anum
+    start_time = 0.0
+
+    @classmethod
+    def enable(cls):
+        """
+        Start profiling
+        """
+        if cls.enabled:
+            return
+        cls.enabled = True
+        cls.start_time = time.perf_counter()
+
+    @classmethod
+    def accumulate(cls, record: dict, seconds: float, start_counts: dict):
+        record['seconds'] = record.get('seconds', 0.0) + seconds
+        for name, count in cls.counts.items():
+            record[name] = record.get(name, 0) + count - start_counts[name]
+
+    @classmethod
+    @contextmanager
+    def phase(cls, name: str):
+        """
+        Time a phase of the population
+
+        Args:
+            name: Phase name as it appears in the report
+        """
+        if not cls.enabled:
+            yield
+            return
+        start_counts = dict(cls.counts)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.accumulate(record=cls.phases.setdefault(name, {}), seconds=time.perf_counter() - start,
+                           start_counts=start_counts)
+
+    @classmethod
+    @contextmanager
+    def activity(cls, anum: str, domain: str, path: str):
+        """
+        Time the population of an Activity's actions
+
+        Args:
+            anum: The Activity number
+            domain: The domain name
+            path: The Activity path used in diagnostics
+        """
+        if not cls.enabled:
+            yield
+            return
+        start_counts = dict(cls.counts)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = cls.activities.setdefault(f"{domain}:{anum}", {'anum': anum, 'domain': domain, 'path': path})
+            cls.accumulate(record=record, seconds=time.perf_counter() - start, start_counts=start_counts)
+
+    @classmethod
+    def report(cls, system: str, report_path: Path, slowest: int = 10):
+        """
+        Write the profile as JSON
+
+        Args:
+            system: The system name
+            report_path: Where to write the report
+            slowest: Number of slowest Activities to list
+        """
+        report = {
+            'system': system,
+            'seconds': time.perf_counter() - cls.start_time,
+            'calls': cls.counts,
+            'phases': [{'phase': name} | record for name, record in cls.phases.items()],
+            'slowest_activities': sorted(cls.activities.values(), key=lambda a: a['seconds'], reverse=True)[:slowest],
+        }
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        _logger.info(f"Profile written to: [{report_path}]")
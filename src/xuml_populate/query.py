@@ -0,0 +1,244 @@
+""" query.py – Read-only indexed access to a saved metamodel database """
+
+# System
+import logging
+from pathlib import Path
+from collections import namedtuple
+from typing import Any, Optional
+
+# xUML Populate
+from xuml_populate.tables import RelvarTable
+from xuml_populate.storage import PyRALStorage, backends
+
+_logger = logging.getLogger(__name__)
+
+Row = tuple  # A named tuple with a relvar's attributes as fields
+
+# Attributes on which each relvar is indexed when loaded, in addition to its identifiers
+# These are the foreign keys most often followed by the typed accessors
+common_keys = {
+    'Class': [('Domain',)],
+    'Attribute': [('Class', 'Domain')],
+    'State': [('State_model', 'Domain')],
+    'Real_State': [('State_model', 'Domain')],
+    'Event': [('State_model', 'Domain')],
+    'Transition': [('State_model', 'Domain')],
+    'Method': [('Class', 'Domain')],
+    'Action': [('Activity', 'Domain')],
+    'Flow': [('Activity', 'Domain')],
+    'Flow_Dependency': [('From_action', 'Activity', 'Domain'), ('To_action', 'Activity', 'Domain')],
+}
+
+
+class Metamodel:
+    """
+    A populated metamodel loaded once into Python and indexed for lookup
+
+    Code generators and simulators ask many small questions of a populated metamodel (the states of a
+    state model, the actions of an activity). Rather than restrict a TclRAL relvar for each one, the saved
+    database is read in full when loaded. Each relvar is indexed on its identifiers and on the foreign keys
+    listed in common_keys. Any other combination of attributes is indexed the first time it is searched.
+
+    Each tuple is a named tuple with the relvar's attributes as fields and values converted to their Python
+    types. Tuples and the sequences returned are immutable, so the loaded metamodel cannot be changed.
+    """
+
+    @classmethod
+    def load(cls, path: Path | str, db: str = "mmdb_query") -> 'Metamodel':
+        """
+        Load a metamodel database saved by the populator
+
+        Args:
+            path: The saved database, for example mmdb_<system>.ral, or mmdb_<system>.db if saved by the
+                sqlite storage backend
+            db: Name of the session used while loading, closed once loaded
+
+        Returns:
+            The loaded metamodel
+        """
+        _logger.info(f"Loading metamodel [{path}]")
+        backend = next((b for b in backends.values() if b.extension == Path(path).suffix), PyRALStorage)
+        backend.open_session(db)
+        try:
+            backend.load(db=db, fname=str(path))
+            tables = backend.tables(db)
+        finally:
+            backend.close_session(db)
+        return cls(tables=tables)
+
+    def __init__(self, tables: list[RelvarTable]):
+        """
+        Args:
+            tables: Each relvar read from a metamodel database
+        """
+        self._rows: dict[str, tuple[Row, ...]] = {}
+        self._identifiers: dict[str, list[tuple[str, ...]]] = {}
+        # Tuples by attribute values for each relvar and indexed attribute combination
+        self._index: dict[str, dict[tuple[str, ...], dict[tuple[Any, ...], tuple[Row, ...]]]] = {}
+        for t in tables:
+            row_type = namedtuple(t.name, t.attributes.keys())
+            self._rows[t.name] = tuple(row_type(*r) for r in t.rows)
+            self._identifiers[t.name] = [tuple(sorted(i)) for i in t.identifiers]
+            for attrs in self._identifiers[t.name] + common_keys.get(t.name, []):
+                self._indexed(t.name, tuple(sorted(attrs)))
+
+    def _indexed(self, relvar: str, attrs: tuple[str, ...]) -> dict[tuple[Any, ...], tuple[Row, ...]]:
+        relvar_index = self._index.setdefault(relvar, {})
+        if attrs not in relvar_index:
+            index = {}
+            for t in self._rows[relvar]:
+                index.setdefault(tuple(getattr(t, a) for a in attrs), []).append(t)
+            relvar_index[attrs] = {k: tuple(v) for k, v in index.items()}
+        return relvar_index[attrs]
+
+    @property
+    def relvars(self) -> list[str]:
+        """
+        Returns:
+            The name of each relvar, in alphabetical order
+        """
+        return sorted(self._rows)
+
+    def all(self, relvar: str) -> tuple[Row, ...]:
+        """
+        Args:
+            relvar: Relvar name, in snake case or with spaces as the populator names it
+
+        Returns:
+            Every tuple of the relvar
+        """
+        return self._rows[relvar.replace(' ', '_')]
+
+    def find(self, relvar: str, **match: Any) -> tuple[Row, ...]:
+        """
+        Find the tuples of a relvar matching the supplied attribute values, for example::
+
+            metamodel.find('Attribute', Class='Cabin', Domain='Elevator Management')
+
+        Args:
+            relvar: Relvar name, in snake case or with spaces as the populator names it
+            match: Value of each matched attribute
+
+        Returns:
+            The matching tuples
+        """
+        relvar = relvar.replace(' ', '_')
+        attrs = tuple(sorted(match))
+        return self._indexed(relvar, attrs).get(tuple(match[a] for a in attrs), ())
+
+    def get(self, relvar: str, **identifier: Any) -> Optional[Row]:
+        """
+        Get the tuple of a relvar with the supplied identifier value, for example::
+
+            metamodel.get('Class', Name='Cabin', Domain='Elevator Management')
+
+        Args:
+            relvar: Relvar name, in snake case or with spaces as the populator names it
+            identifier: Value of each attribute of one of the relvar's identifiers
+
+        Returns:
+            The identified tuple, None if there is none
+        """
+        if tuple(sorted(identifier)) not in self._identifiers[relvar.replace(' ', '_')]:
+            raise KeyError(f"{sorted(identifier)} is not an identifier of relvar [{relvar}]")
+        return next(iter(self.find(relvar, **identifier)), None)
+
+    def classes(self, domain: str) -> tuple[Row, ...]:
+        """
+        Args:
+            domain: Domain name
+
+        Returns:
+            The Classes of the domain
+        """
+        return self.find('Class', Domain=domain)
+
+    def attributes(self, cname: str, domain: str) -> tuple[Row, ...]:
+        """
+        Args:
+            cname: Class name
+            domain: Domain name
+
+        Returns:
+            The Attributes of the class
+        """
+        return self.find('Attribute', Class=cname, Domain=domain)
+
+    def methods(self, cname: str, domain: str) -> tuple[Row, ...]:
+        """
+        Args:
+            cname: Class name
+            domain: Domain name
+
+        Returns:
+            The Methods of the class
+        """
+        return self.find('Method', Class=cname, Domain=domain)
+
+    def states(self, state_model: str, domain: str) -> tuple[Row, ...]:
+        """
+        Args:
+            state_model: State model name, the lifecycle class or assigner rnum
+            domain: Domain name
+
+        Returns:
+            The States of the state model
+        """
+        return self.find('State', State_model=state_model, Domain=domain)
+
+    def transitions(self, state_model: str, domain: str) -> tuple[Row, ...]:
+        """
+        Args:
+            state_model: State model name, the lifecycle class or assigner rnum
+            domain: Domain name
+
+        Returns:
+            The Transitions of the state model
+        """
+        return self.find('Transition', State_model=state_model, Domain=domain)
+
+    def actions(self, anum: str, domain: str) -> tuple[Row, ...]:
+        """
+        Args:
+            anum: Activity number
+            domain: Domain name
+
+        Returns:
+            The Actions of the activity
+        """
+        return self.find('Action', Activity=anum, Domain=domain)
+
+    def flows(self, anum: str, domain: str) -> tuple[Row, ...]:
+        """
+        Args:
+            anum: Activity number
+            domain: Domain name
+
+        Returns:
+            The Flows of the activity
+        """
+        return self.find('Flow', Activity=anum, Domain=domain)
+
+    def dependencies_from(self, action: str, anum: str, domain: str) -> tuple[Row, ...]:
+        """
+        Args:
+            action: Action ID
+            anum: Activity number
+            domain: Domain name
+
+        Returns:
+            The Flow Dependencies on which the action is the source
+        """
+        return self.find('Flow_Dependency', From_action=action, Activity=anum, Domain=domain)
+
+    def dependencies_to(self, action: str, anum: str, domain: str) -> tuple[Row, ...]:
+        """
+        Args:
+            action: Action ID
+            anum: Activity number
+            domain: Domain name
+
+        Returns:
+            The Flow Dependencies on which the action is the destination
+        """
+        return self.find('Flow_Dependency', To_action=action, Activity=anum, Domain=domain)
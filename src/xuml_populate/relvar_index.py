@@ -0,0 +1,209 @@
+""" relvar_index.py – Answer metamodel key lookups from Python instead of TclRAL """
+
+# System
+import logging
+from contextlib import contextmanager
+from typing import Callable, Any, Iterator
+
+# Model Integration
+from pyral.rtypes import snake
+
+# xUML Populate
+from xuml_populate.context import ContextScoped, ContextState
+from xuml_populate.config import mmdb
+from xuml_populate.storage import Storage
+
+_logger = logging.getLogger(__name__)
+
+
+class RelvarIndex(metaclass=ContextScoped):
+    """
+    Write-through copy of the metamodel relvars used for key lookups
+
+    Most populators look up metamodel instances by matching attribute values, for example, the Attribute of
+    a Class with a given name. Asking TclRAL means building a restriction string, evaluating it across the Tcl
+    bridge and parsing the result. Instead, a relvar is read from the storage backend once, the first time it
+    is looked up, and thereafter kept current as each insert, update and delete made through the db module
+    tells the index about it. A lookup is then answered from a hash index built on the matched attributes.
+
+    Changes added to a transaction are applied only when the transaction executes, so the index always holds
+    what the backend holds. Loading or closing a session through the db module resets the index for that
+    session. Anything else that changes the database (deleting with a raw TclRAL command) must call reset.
+    """
+    # Tuples of each loaded relvar by db and relvar name
+    rows: dict[str, dict[str, list[dict[str, str]]]] = ContextState(dict)
+    keys: dict[tuple[str, str], dict[tuple[str, ...], dict[tuple[str, ...], list[dict[str, str]]]]] = ContextState(dict)
+    staged: dict[tuple[str, str], list[Callable]] = ContextState(dict)  # Changes waiting on each open (db, transaction)
+
+    @classmethod
+    def inserted(cls, db: str, relvar: str, tuples: list, tr: str | None = None):
+        """
+        Args:
+            db: DB session name
+            relvar: Relvar name
+            tuples: The inserted tuples
+            tr: The transaction the insert was added to, if any
+        """
+        cls.record(db, tr, lambda: cls.insert_rows(db, relvar, tuples))
+
+    @classmethod
+    def updated(cls, db: str, relvar: str, tid: dict, update: dict[str, Any]):
+        """
+        Args:
+            db: DB session name
+            relvar: Relvar name
+            tid: Identifier value of the updated tuple
+            update: New value of each updated attribute
+        """
+        cls.update_row(db, relvar, tid, update)
+
+    @classmethod
+    def deleted(cls, db: str, relvar: str, tid: dict, tr: str | None = None):
+        """
+        Args:
+            db: DB session name
+            relvar: Relvar name
+            tid: Identifier value of the deleted tuple
+            tr: The transaction the delete was added to, if any
+        """
+        cls.record(db, tr, lambda: cls.delete_row(db, relvar, tid))
+
+    @classmethod
+    def opened(cls, db: str, tr: str):
+        """
+        Args:
+            db: DB session name
+            tr: A transaction just opened, with nothing staged yet
+        """
+        cls.staged.pop((db, tr), None)
+
+    @classmethod
+    @contextmanager
+    def executing(cls, db: str, tr: str) -> Iterator[None]:
+        """
+        Apply the changes staged in a transaction once it executes, or drop them if it fails
+
+        Args:
+            db: DB session name
+            tr: Transaction name
+        """
+        changes = cls.staged.pop((db, tr), [])
+        yield
+        for change in changes:
+            change()
+
+    @classmethod
+    def reset(cls, db: str = mmdb):
+        """
+        Forget everything indexed for a database so that each relvar is read again from the storage backend when next
+        looked up
+
+        Args:
+            db: DB session name
+        """
+        cls.rows.pop(db, None)
+        cls.keys = {k: v for k, v in cls.keys.items() if k[0] != db}
+        cls.staged = {k: v for k, v in cls.staged.items() if k[0] != db}
+
+    @classmethod
+    def record(cls, db: str, tr: str | None, change: Callable):
+        if tr:
+            cls.staged.setdefault((db, tr), []).append(change)
+        else:
+            change()
+
+    @classmethod
+    def load(cls, db: str, rv: str) -> list[dict[str, str]]:
+        """
+        Get the tuples of a relvar, reading them from the storage backend if the relvar hasn't been loaded yet
+
+        Args:
+            db: DB session name
+            rv: Relvar name in snake case
+
+        Returns:
+            The relvar tuples
+        """
+        db_rows = cls.rows.setdefault(db, {})
+        if rv not in db_rows:
+            db_rows[rv] = Storage.backend.body(db, rv)
+        return db_rows[rv]
+
+    @classmethod
+    def lookup(cls, relvar: str, db: str = mmdb, **match: str) -> list[dict[str, str]]:
+        """
+        Find the tuples of a relvar matching the supplied attribute values
+
+        Equivalent to restricting the relvar on each attribute value, for example::
+
+            RelvarIndex.lookup('Attribute', Name=name, Class=cname, Domain=domain)
+
+        has the same body as::
+
+            Relation.restrict(db=mmdb, relation='Attribute', restriction=f"Name:<{name}>, Class:<{cname}>, ...")
+
+        The returned tuples are shared with the index and must not be modified.
+
+        Args:
+            relvar: Relvar name
+            db: DB session name
+            match: Value of each matched attribute, keyed by snake case attribute name
+
+        Returns:
+            The matching tuples
+        """
+        rv = snake(relvar)
+        rows = cls.load(db, rv)
+        attrs = tuple(sorted(match))
+        relvar_keys = cls.keys.setdefault((db, rv), {})
+        if attrs not in relvar_keys:
+            relvar_keys[attrs] = index = {}
+            for t in rows:
+                index.setdefault(tuple(t[a] for a in attrs), []).append(t)
+        return relvar_keys[attrs].get(tuple(str(match[a]) for a in attrs), [])
+
+    @classmethod
+    def exists(cls, relvar: str, db: str = mmdb, **match: str) -> bool:
+        """
+        Args:
+            relvar: Relvar name
+            db: DB session name
+            match: Value of each matched attribute, keyed by snake case attribute name
+
+        Returns:
+            True if some tuple of the relvar matches the supplied attribute values
+        """
+        return bool(cls.lookup(relvar, db=db, **match))
+
+    @classmethod
+    def insert_rows(cls, db: str, relvar: str, tuples: list):
+        rv = snake(relvar)
+        if rv not in cls.rows.get(db, {}):
+            return  # Read in full when first looked up
+        # Values are formatted as PyRAL formats them in the insert command
+        new_rows = [{snake(a): f"{v}" for a, v in (t._asdict() if hasattr(t, '_asdict') else t).items()}
+                    for t in tuples]
+        cls.rows[db][rv].extend(new_rows)
+        for attrs, index in cls.keys.get((db, rv), {}).items():
+            for t in new_rows:
+                index.setdefault(tuple(t[a] for a in attrs), []).append(t)
+
+    @classmethod
+    def matching_row(cls, db: str, relvar: str, tid: dict) -> dict[str, str] | None:
+        rv = snake(relvar)
+        if rv not in cls.rows.get(db, {}):
+            return None
+        # Lookups are rebuilt on the next use since the changed tuple may move between keys
+        cls.keys.pop((db, rv), None)
+        tid = {snake(a): f"{v}" for a, v in tid.items()}
+        return next((t for t in cls.rows[db][rv] if all(t[a] == v for a, v in tid.items())), None)
+
+    @classmethod
+    def update_row(cls, db: str, relvar: str, tid: dict, update: dict[str, Any]):
+        if (t := cls.matching_row(db, relvar, tid)) is not None:
+            t.update({snake(a): f"{v}" for a, v in update.items()})
+
+    @classmethod
+    def delete_row(cls, db: str, relvar: str, tid: dict):
+        if (t := cls.matching_row(db, relvar, tid)) is not None:
+            cls.rows[db][snake(relvar)].remove(t)
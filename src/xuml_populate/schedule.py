@@ -0,0 +1,184 @@
+""" schedule.py – Assign the actions of each activity to execution waves """
+
+# System
+import json
+import logging
+from pathlib import Path
+from typing import NamedTuple, Iterable
+
+# xUML Populate
+from xuml_populate.config import mmdb
+from xuml_populate.relvar_index import RelvarIndex
+
+_logger = logging.getLogger(__name__)
+
+
+class ActivitySchedule(NamedTuple):
+    """
+    The execution waves of an activity
+    """
+    waves: list[list[str]]  # Action IDs of each wave, starting with those that can execute first
+    width: int  # Most actions in any one wave, the most that can ever execute in parallel
+    critical_path: int  # Number of waves, the longest chain of dependent actions
+
+
+def action_order(aid: str) -> tuple[int, str]:
+    """
+    Sort key that puts ACTN2 before ACTN10
+    """
+    return len(aid), aid
+
+
+class Schedule:
+    """
+    Assign each action of an activity to the earliest wave in which it can execute
+
+    An action can execute once each of its input flows is enabled. The parameter, executing instance and
+    class accessor flows of an activity are enabled before any action executes, so the first wave holds the
+    actions that don't depend on any other action. Each action in a later wave depends (through a Flow
+    Dependency) on at least one action in the wave just before it, and on none in any later wave.
+
+    The schedule of every activity is computed from the populated Flow Dependencies once population is
+    complete and saved alongside the metamodel, so a model executor can run the waves in order without
+    analyzing each activity's dependency graph itself.
+    """
+
+    @classmethod
+    def components(cls, successors: dict[str, set[str]]) -> dict[str, int]:
+        """
+        Find the strongly connected components of a dependency graph
+
+        Args:
+            successors: The actions that depend on each action
+
+        Returns:
+            A component number for each action, actions in a dependency cycle share a number
+        """
+        # Kosaraju's algorithm with explicit stacks: order actions by finishing time, then collect
+        # each component by walking the reversed graph in reverse finishing order
+        finished = []
+        visited = set()
+        for start in successors:
+            if start in visited:
+                continue
+            visited.add(start)
+            stack = [(start, iter(successors[start]))]
+            while stack:
+                a, remaining = stack[-1]
+                s = next((s for s in remaining if s not in visited), None)
+                if s is None:
+                    finished.append(a)
+                    stack.pop()
+                else:
+                    visited.add(s)
+                    stack.append((s, iter(successors[s])))
+
+        predecessors: dict[str, set[str]] = {a: set() for a in successors}
+        for a, succ in successors.items():
+            for s in succ:
+                predecessors[s].add(a)
+        component: dict[str, int] = {}
+        n = 0
+        for start in reversed(finished):
+            if start in component:
+                continue
+            n += 1
+            component[start] = n
+            stack = [start]
+            while stack:
+                for p in predecessors[stack.pop()]:
+                    if p not in component:
+                        component[p] = n
+                        stack.append(p)
+        return component
+
+    @classmethod
+    def waves(cls, actions: Iterable[str], dependencies: Iterable[tuple[str, str]]) -> list[list[str]]:
+        """
+        Layer a dependency graph of actions into waves
+
+        Actions that depend on one another in a cycle, such as an iterator and the actions of its body,
+        are placed in the same wave.
+
+        Args:
+            actions: Action IDs of an activity
+            dependencies: (from action, to action) pairs, the to action requires an output of the from action
+
+        Returns:
+            The action IDs in each wave
+        """
+        successors: dict[str, set[str]] = {a: set() for a in actions}
+        for from_action, to_action in dependencies:
+            successors[from_action].add(to_action)
+        component = cls.components(successors)
+
+        # Layer the acyclic graph of components
+        members: dict[int, list[str]] = {}
+        for a, c in component.items():
+            members.setdefault(c, []).append(a)
+        component_successors: dict[int, set[int]] = {c: set() for c in members}
+        for a, succ in successors.items():
+            component_successors[component[a]].update(component[s] for s in succ if component[s] != component[a])
+        waiting_on = {c: 0 for c in members}  # Number of components each component depends on
+        for succ in component_successors.values():
+            for s in succ:
+                waiting_on[s] += 1
+
+        waves = []
+        ready = [c for c, n in waiting_on.items() if not n]
+        while ready:
+            waves.append(sorted((a for c in ready for a in members[c]), key=action_order))
+            enabled = []
+            for c in ready:
+                for s in component_successors[c]:
+                    waiting_on[s] -= 1
+                    if not waiting_on[s]:
+                        enabled.append(s)
+            ready = enabled
+        return waves
+
+    @classmethod
+    def build(cls, db: str = mmdb) -> dict[str, dict[str, ActivitySchedule]]:
+        """
+        Schedule every activity in the populated metamodel
+
+        Args:
+            db: DB session name
+
+        Returns:
+            The schedule of each activity by domain and activity number
+        """
+        actions: dict[tuple[str, str], list[str]] = {
+            (t['Domain'], t['Anum']): [] for t in RelvarIndex.load(db, 'Activity')
+        }
+        for t in RelvarIndex.load(db, 'Action'):
+            actions[(t['Domain'], t['Activity'])].append(t['ID'])
+        dependencies: dict[tuple[str, str], list[tuple[str, str]]] = {}
+        for t in RelvarIndex.load(db, 'Flow_Dependency'):
+            dependencies.setdefault((t['Domain'], t['Activity']), []).append((t['From_action'], t['To_action']))
+
+        schedules: dict[str, dict[str, ActivitySchedule]] = {}
+        for (domain, anum), aids in sorted(actions.items(), key=lambda a: (a[0][0], action_order(a[0][1]))):
+            waves = cls.waves(actions=aids, dependencies=dependencies.get((domain, anum), []))
+            schedules.setdefault(domain, {})[anum] = ActivitySchedule(
+                waves=waves, width=max(map(len, waves), default=0), critical_path=len(waves))
+        return schedules
+
+    @classmethod
+    def save(cls, name: str, db: str = mmdb) -> Path:
+        """
+        Schedule every activity and save the schedules as JSON alongside the populated metamodel
+
+        Args:
+            name: The system name used in the saved metamodel file name
+            db: DB session name
+
+        Returns:
+            The saved schedule file
+        """
+        path = Path(f"mmdb_{name}.schedule.json")
+        schedules = {domain: {anum: s._asdict() for anum, s in activities.items()}
+                     for domain, activities in cls.build(db).items()}
+        with open(path, 'w') as f:
+            json.dump(schedules, f, indent=1)
+        return path
@@ -0,0 +1,181 @@
+""" serve.py – Keep a populator running that populates a system package again whenever it is edited """
+
+# System
+import json
+import time
+import socket
+import logging
+import threading
+import socketserver
+from pathlib import Path
+from typing import Any, Optional
+
+# xUML Populate
+from xuml_populate.system import System
+from xuml_populate.storage import backends
+
+_logger = logging.getLogger(__name__)
+
+
+class PopulateServer:
+    """
+    Populate a system package whenever it changes and answer requests for the result on a local socket
+
+    Each popsystem run pays for starting the interpreter and importing PyRAL, the parsers and the populators
+    before it populates anything. A server pays for that once. It then polls the files of the system package
+    and populates the package again when any of them change. Since each population is incremental (see -I),
+    only the activities whose action text has changed are populated again, unless the model structure has
+    changed. Either way the saved metamodel and its printout stay up to date as the package is edited.
+
+    Requests are made on a Unix domain socket. Each request is a line of JSON such as {"command": "populate"}
+    and is answered with a line of JSON holding the result of a population (see result). The commands are:
+
+        populate: Populate any changes not yet populated, then answer the result of the latest population
+        status: Answer the result of the latest population without waiting for any population in progress
+        stop: Stop the server
+    """
+
+    def __init__(self, system_path: Path, socket_path: Path, options: dict[str, Any], interval: float = 0.5):
+        """
+        Args:
+            system_path: The path to the system package
+            socket_path: The Unix domain socket to answer requests on
+            options: System keyword arguments other than the name, path and incremental
+            interval: Seconds between each check of the system package for changed files
+        """
+        self.system_path = system_path
+        self.socket_path = socket_path
+        self.options = options
+        self.interval = interval
+        # Modification time and size of each file when last populated, None until the first population
+        self.files: Optional[dict[Path, tuple[int, int]]] = None
+        self.result: dict[str, Any] = {'ok': False, 'mmdb': None, 'seconds': None, 'error': "Not populated yet"}
+        self.populating = threading.Lock()  # Held while the system package is scanned and populated
+        self.stopped = threading.Event()
+
+    def scan(self) -> dict[Path, tuple[int, int]]:
+        """
+        Returns:
+            The modification time and size of each file in the system package, except hidden files
+            such as editor swap files
+        """
+        files = {}
+        for p in self.system_path.rglob('*'):
+            if any(part.startswith('.') for part in p.relative_to(self.system_path).parts) or not p.is_file():
+                continue
+            s = p.stat()
+            files[p] = (s.st_mtime_ns, s.st_size)
+        return files
+
+    def refresh(self) -> dict[str, Any]:
+        """
+        Populate the system package if any of its files changed since it was last populated
+
+        Returns:
+            The result of the latest population
+        """
+        with self.populating:
+            files = self.scan()
+            if files != self.files:
+                self.files = files
+                self.populate()
+            return self.result
+
+    def populate(self):
+        """
+        Populate the system package, keeping the result
+        """
+        name = self.system_path.stem
+        _logger.info(f"Populating system [{name}]")
+        start = time.perf_counter()
+        try:
+            System(name=name, system_path=self.system_path, incremental=True, **self.options)
+        except Exception as e:
+            # A model error fails only this population, the server carries on with the next edit
+            _logger.exception(f"Population of system [{name}] failed")
+            self.result = {'ok': False, 'mmdb': None, 'seconds': round(time.perf_counter() - start, 3),
+                           'error': f"{type(e).__name__}: {e}"}
+        else:
+            extension = backends[self.options.get('storage', 'pyral')].extension
+            self.result = {'ok': True, 'mmdb': f"mmdb_{name}{extension}",
+                           'seconds': round(time.perf_counter() - start, 3), 'error': None}
+
+    def answer(self, command: str) -> dict[str, Any]:
+        """
+        Args:
+            command: A request command, populate, status or stop
+
+        Returns:
+            The reply to the request
+        """
+        match command:
+            case 'populate':
+                return self.refresh()
+            case 'status':
+                return self.result
+            case 'stop':
+                self.stopped.set()
+                return {'ok': True, 'error': None}
+            case _:
+                return {'ok': False, 'error': f"Unknown command: [{command}]"}
+
+    def watch(self):
+        """
+        Populate the system package again each time it changes, until the server stops
+        """
+        while not self.stopped.wait(self.interval):
+            self.refresh()
+
+    def serve(self):
+        """
+        Populate the system package, then keep it populated and answer requests until stopped
+        """
+        self.refresh()
+        self.socket_path.unlink(missing_ok=True)
+        with socketserver.ThreadingUnixStreamServer(str(self.socket_path), RequestHandler) as server:
+            server.daemon_threads = True
+            server.populator = self
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            threading.Thread(target=self.watch, daemon=True).start()
+            print(f"Serving system [{self.system_path.stem}] on [{self.socket_path}]")
+            try:
+                self.stopped.wait()
+            except KeyboardInterrupt:
+                self.stopped.set()
+            server.shutdown()
+        self.socket_path.unlink(missing_ok=True)
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """
+    Answer each line of JSON received on a connection with a line of JSON
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                command = json.loads(line)['command']
+            except (ValueError, KeyError, TypeError):
+                reply = {'ok': False, 'error': 'Each request is a JSON object with a command'}
+            else:
+                reply = self.server.populator.answer(command)
+            self.wfile.write(json.dumps(reply).encode() + b'\n')
+
+
+def request(socket_path: Path, command: str = 'populate') -> dict[str, Any]:
+    """
+    Make a request of a running server, as an editor integration or a CI step would
+
+    Args:
+        socket_path: The server's socket
+        command: populate, status or stop
+
+    Returns:
+        The server's reply
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(str(socket_path))
+        with s.makefile('rwb') as f:
+            f.write(json.dumps({'command': command}).encode() + b'\n')
+            f.flush()
+            return json.loads(f.readline())
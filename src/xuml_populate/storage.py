@@ -0,0 +1,955 @@
+""" storage.py – Interchangeable stores for the metamodel behind the database calls made by the populators """
+
+# System
+import re
+import json
+import logging
+import sqlite3
+import threading
+from abc import ABC, ABCMeta, abstractmethod
+from pathlib import Path
+from fnmatch import fnmatchcase
+from typing import Any, Callable, NamedTuple, Optional, Sequence
+
+# Model Integration
+from pyral.database import Database
+from pyral.relation import Relation
+from pyral.relvar import Relvar
+from pyral.transaction import Transaction
+from pyral.rtypes import RelationValue, snake
+from pyral.exceptions import PyRALException, NoOpenTransaction, SessionNotOpen
+
+# xUML Populate
+from xuml_populate.context import ContextScoped, ContextState
+from xuml_populate.tables import RelvarTable, convert, quote
+
+_logger = logging.getLogger(__name__)
+
+last_result = r'^relation'  # PyRAL's name for the latest relation result, used when no relation is named
+
+
+# A term of a PyRAL restriction, see Relation.restrict
+_restriction_token = re.compile(
+    r"\s*(?:(?P<match>(?P<mattr>\w+):<(?P<mval>[^>]*)>)"
+    r"|(?P<cmp>(?P<cattr>\w+)\s*(?P<cop>==|!=|>=|<=|<|>)\s*(?P<cval>-?\d+(?:\.\d+)?))"
+    r"|(?P<bare>(?P<battr>\w+):(?P<bval>[^\s<>()&|!,]+))"
+    r"|(?P<op>\(|\)|,|AND\b|OR\b|NOT\b))"
+)
+_comparisons = {
+    '==': float.__eq__, '!=': float.__ne__, '>=': float.__ge__, '<=': float.__le__, '<': float.__lt__,
+    '>': float.__gt__,
+}
+
+
+class Restriction:
+    """
+    A PyRAL restriction string parsed into a predicate on tuples
+
+    Terms are string matches (``Name:<Floor>`` or ``Name:Floor``, where the value is a glob pattern as in Tcl's
+    string match) and numeric comparisons (``Speed > 14``), combined with ``, `` or ``AND``, ``OR``, ``NOT``
+    and parentheses. NOT binds tightest, then AND, then OR, as they do once PyRAL converts them to Tcl.
+    """
+
+    def __init__(self, text: str):
+        """
+        Args:
+            text: The restriction
+        """
+        self.text = text
+        self.tokens = []
+        pos = 0
+        while pos < len(text.rstrip()):
+            m = _restriction_token.match(text, pos)
+            if not m:
+                _logger.error(f"Cannot parse restriction [{text}] at [{text[pos:]}]")
+                raise PyRALException
+            self.tokens.append(m)
+            pos = m.end()
+        self.pos = 0
+        self.predicate = self.disjunction()
+        if self.pos != len(self.tokens):
+            _logger.error(f"Unexpected [{self.tokens[self.pos].group(0).strip()}] in restriction [{text}]")
+            raise PyRALException
+
+    @property
+    def exact(self) -> Optional[dict[str, str]]:
+        """
+        Returns:
+            The value of each attribute if the restriction only ANDs together matches on literal values,
+            otherwise None
+        """
+        values = {}
+        for i, t in enumerate(self.tokens):
+            if i % 2:
+                if t['op'] not in (',', 'AND'):
+                    return None
+            elif t['match'] or t['bare']:
+                attr, value = (t['mattr'], t['mval']) if t['match'] else (t['battr'], t['bval'])
+                if any(c in value for c in '*?[]\\') or values.get(attr, value) != value:
+                    return None
+                values[attr] = value
+            else:
+                return None
+        return values
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos]['op'] if self.pos < len(self.tokens) else None
+
+    def disjunction(self) -> Callable[[dict], bool]:
+        terms = [self.conjunction()]
+        while self.peek() == 'OR':
+            self.pos += 1
+            terms.append(self.conjunction())
+        return terms[0] if len(terms) == 1 else lambda t: any(p(t) for p in terms)
+
+    def conjunction(self) -> Callable[[dict], bool]:
+        terms = [self.negation()]
+        while self.peek() in (',', 'AND'):
+            self.pos += 1
+            terms.append(self.negation())
+        return terms[0] if len(terms) == 1 else lambda t: all(p(t) for p in terms)
+
+    def negation(self) -> Callable[[dict], bool]:
+        if self.peek() == 'NOT':
+            self.pos += 1
+            term = self.negation()
+            return lambda t: not term(t)
+        return self.term()
+
+    def term(self) -> Callable[[dict], bool]:
+        if self.pos >= len(self.tokens):
+            _logger.error(f"Restriction [{self.text}] ends unexpectedly")
+            raise PyRALException
+        t = self.tokens[self.pos]
+        self.pos += 1
+        if t['op'] == '(':
+            inner = self.disjunction()
+            if self.peek() != ')':
+                _logger.error(f"Unbalanced parentheses in restriction [{self.text}]")
+                raise PyRALException
+            self.pos += 1
+            return inner
+        if t['match'] or t['bare']:
+            attr, pattern = (t['mattr'], t['mval']) if t['match'] else (t['battr'], t['bval'])
+            return lambda tup: fnmatchcase(tup[attr], pattern)
+        if t['cmp']:
+            attr, compare, value = t['cattr'], _comparisons[t['cop']], float(t['cval'])
+            return lambda tup: compare(float(tup[attr]), value)
+        _logger.error(f"Unexpected [{t.group(0).strip()}] in restriction [{self.text}]")
+        raise PyRALException
+
+
+class InsertRun(NamedTuple):
+    """
+    Tuples inserted one after another into a relvar within a transaction, to be added as a single insert
+    """
+    relvar: str  # Relvar name in snake case
+    tuples: list
+
+
+class StorageMeta(ContextScoped, ABCMeta):
+    """
+    Metaclass of the storage backends, which have abstract methods as well as context state
+    """
+
+
+class Storage(ABC, metaclass=StorageMeta):
+    """
+    The store that holds the metamodel while it is populated
+
+    The populators read and write the metamodel through the Relvar, Relation, Transaction and Database calls
+    of the db module, which mirror PyRAL's. Each of those calls is answered by the method of the same purpose
+    of whichever backend is in use in the active population context, so the populators run unchanged against
+    any backend and populations in separate contexts can each use a different one.
+
+    Each backend handles inserts, updates and deletes (staged until the transaction they're added to
+    executes), the restrict, semijoin, join, project and rename operations along with the session relation
+    variables they set, loading and saving the database, and reading it back for the printout, export and
+    relvar index. A relation named None is the latest result.
+    """
+    default = 'pyral'  # Name of the backend in use in a context that hasn't put one into use
+    backend: type['Storage'] = ContextState(lambda: backends[Storage.default])  # The backend in use
+
+    name = ''
+    extension = ''  # Of the saved database file
+    tclral = False  # True if the metamodel is held in TclRAL, so raw TclRAL commands can be run against it
+
+    @classmethod
+    def use(cls, name: str):
+        """
+        Put a backend into use in the active population context
+
+        Args:
+            name: The backend name, a key of backends
+        """
+        _logger.info(f"Storing the metamodel with the [{name}] backend")
+        Storage.backend = backends[name]
+
+    @classmethod
+    @abstractmethod
+    def open_session(cls, name: str):
+        """
+        Args:
+            name: DB session name
+        """
+
+    @classmethod
+    @abstractmethod
+    def close_session(cls, name: str):
+        """
+        Args:
+            name: DB session name
+        """
+
+    @classmethod
+    @abstractmethod
+    def is_open(cls, name: str) -> bool:
+        """
+        Args:
+            name: DB session name
+
+        Returns:
+            True if the session is open in the active context
+        """
+
+    @classmethod
+    @abstractmethod
+    def load(cls, db: str, fname: str):
+        """
+        Replace the session's database with a saved one
+
+        Args:
+            db: DB session name
+            fname: The saved database
+        """
+
+    @classmethod
+    @abstractmethod
+    def save(cls, db: str, fname: str):
+        """
+        Args:
+            db: DB session name
+            fname: The saved file, replaced if it exists
+        """
+
+    @classmethod
+    @abstractmethod
+    def open_transaction(cls, db: str, name: str) -> str:
+        """
+        Args:
+            db: DB session name
+            name: Transaction name
+
+        Returns:
+            The transaction name
+        """
+
+    @classmethod
+    @abstractmethod
+    def execute_transaction(cls, db: str, name: str):
+        """
+        Make every change added to the transaction, none are made if any fails
+
+        Args:
+            db: DB session name
+            name: Transaction name
+        """
+
+    @classmethod
+    @abstractmethod
+    def insert(cls, db: str, relvar: str, tuples: list, tr: Optional[str] = None):
+        """
+        Args:
+            db: DB session name
+            relvar: Relvar name
+            tuples: Named tuples or dictionaries of attribute values
+            tr: The transaction the insert is added to, made immediately if None
+        """
+
+    @classmethod
+    @abstractmethod
+    def updateone(cls, db: str, relvar_name: str, id: dict, update: dict[str, Any]) -> str:
+        """
+        Update a tuple immediately
+
+        Args:
+            db: DB session name
+            relvar_name: Relvar name
+            id: Identifier value of the tuple
+            update: New value of each updated attribute
+        """
+
+    @classmethod
+    @abstractmethod
+    def deleteone(cls, db: str, relvar_name: str, tid: dict, tr: Optional[str] = None) -> str:
+        """
+        Args:
+            db: DB session name
+            relvar_name: Relvar name
+            tid: Identifier value of the tuple
+            tr: The transaction the delete is added to, made immediately if None
+        """
+
+    @classmethod
+    @abstractmethod
+    def restrict(cls, db: str, restriction: Optional[str] = None, relation: Optional[str] = None,
+                 svar_name: Optional[str] = None) -> RelationValue:
+        """
+        See PyRAL's Relation.restrict
+        """
+
+    @classmethod
+    @abstractmethod
+    def semijoin(cls, db: str, rname2: Optional[str] = None, attrs: Optional[dict[str, str]] = None,
+                 rname1: Optional[str] = None, svar_name: Optional[str] = None) -> RelationValue:
+        """
+        See PyRAL's Relation.semijoin
+        """
+
+    @classmethod
+    @abstractmethod
+    def join(cls, db: str, rname2: str, attrs: Optional[dict[str, str]] = None, rname1: Optional[str] = None,
+             svar_name: Optional[str] = None) -> RelationValue:
+        """
+        See PyRAL's Relation.join
+        """
+
+    @classmethod
+    @abstractmethod
+    def project(cls, db: str, attributes: Sequence[str], exclude: bool = False, relation: Optional[str] = None,
+                svar_name: Optional[str] = None) -> RelationValue:
+        """
+        See PyRAL's Relation.project
+        """
+
+    @classmethod
+    @abstractmethod
+    def rename(cls, db: str, names: dict[str, str], relation: Optional[str] = None,
+               svar_name: Optional[str] = None) -> RelationValue:
+        """
+        See PyRAL's Relation.rename
+        """
+
+    @classmethod
+    @abstractmethod
+    def printall(cls, db: str):
+        """
+        Print every relvar in alphabetical order
+
+        Args:
+            db: DB session name
+        """
+
+    @classmethod
+    @abstractmethod
+    def body(cls, db: str, relvar: str) -> list[dict[str, str]]:
+        """
+        Args:
+            db: DB session name
+            relvar: Relvar name in snake case
+
+        Returns:
+            Each tuple of the relvar with values as TclRAL strings
+        """
+
+    @classmethod
+    @abstractmethod
+    def tables(cls, db: str, typed: bool = True) -> list[RelvarTable]:
+        """
+        Read each relvar
+
+        Args:
+            db: DB session name
+            typed: Convert values to their Python types, otherwise they are kept as TclRAL strings
+
+        Returns:
+            A table for each relvar in alphabetical order
+        """
+
+
+class PyRALStorage(Storage):
+    """
+    The metamodel held in a TclRAL interpreter, as PyRAL has always stored it
+
+    Each method makes PyRAL's own call. Raw TclRAL commands and transaction statements can be run as well.
+
+    PyRAL keeps a single registry of open sessions, so a session opened in one population context is given a
+    PyRAL session name of its own if another context already has a session of the same name open. Each method
+    makes its call on the PyRAL session of the active context.
+
+    A populator typically inserts one tuple at a time, often into the same relvar many times in a row within a
+    transaction (all the Attributes of a Class, for example), and PyRAL makes each insert a TclRAL command of
+    its own. So changes added to a transaction are staged in order until it executes, with each run of inserts
+    into the same relvar gathered into a single insert. Nothing is reordered.
+    """
+    name = 'pyral'
+    extension = '.ral'
+    tclral = True
+
+    sessions: dict[str, str] = ContextState(dict)  # PyRAL session name of each session opened in the context
+    naming = threading.Lock()  # Held while a PyRAL session name is chosen and opened
+    staged: dict[tuple[str, str], list[InsertRun | Callable]] = ContextState(dict)  # Changes in each (db, transaction)
+
+    @classmethod
+    def session(cls, db: str) -> str:
+        """
+        Args:
+            db: DB session name
+
+        Returns:
+            The name of the PyRAL session opened for it in the active context
+        """
+        return cls.sessions.get(db, db)
+
+    @classmethod
+    def open_session(cls, name: str):
+        if name in cls.sessions:
+            _logger.error(f"Session [{name}] already open")
+            raise PyRALException
+        with cls.naming:
+            session, n = name, 1
+            while session in Database.sessions:
+                n += 1
+                session = f"{name}_{n}"
+            Database.open_session(session)
+        cls.sessions[name] = session
+
+    @classmethod
+    def close_session(cls, name: str):
+        session = cls.sessions.pop(name, name)
+        Database.close_session(session)
+        Transaction.pending.pop(session, None)  # Any transaction left open when a transaction failed
+        cls.staged = {k: v for k, v in cls.staged.items() if k[0] != name}
+
+    @classmethod
+    def is_open(cls, name: str) -> bool:
+        return name in cls.sessions
+
+    @classmethod
+    def load(cls, db: str, fname: str):
+        Database.load(db=cls.session(db), fname=fname)
+
+    @classmethod
+    def save(cls, db: str, fname: str):
+        Database.save(db=cls.session(db), fname=fname)
+
+    @classmethod
+    def execute(cls, db: str, cmd: str, log: bool = True) -> str:
+        """
+        Run a TclRAL command
+
+        Args:
+            db: DB session name
+            cmd: The command
+            log: Log the result
+
+        Returns:
+            TclRAL's result
+        """
+        return Database.execute(db=cls.session(db), cmd=cmd, log=log)
+
+    @classmethod
+    def open_transaction(cls, db: str, name: str) -> str:
+        tr = Transaction.open(db=cls.session(db), name=name)
+        cls.staged[(db, name)] = []
+        return tr
+
+    @classmethod
+    def stage(cls, db: str, tr: str) -> list[InsertRun | Callable]:
+        """
+        Args:
+            db: DB session name
+            tr: Transaction name
+
+        Returns:
+            The changes staged so far in the transaction, in the order they were added
+        """
+        try:
+            return cls.staged[(db, tr)]
+        except KeyError:
+            _logger.error(f"No transaction [{tr}] open on db [{db}]")
+            raise NoOpenTransaction
+
+    @classmethod
+    def append_statement(cls, db: str, name: str, statement: str):
+        """
+        Add a TclRAL statement to a transaction
+
+        Args:
+            db: DB session name
+            name: Transaction name
+            statement: The statement
+        """
+        session = cls.session(db)
+        cls.stage(db, name).append(lambda: Transaction.append_statement(db=session, name=name, statement=statement))
+
+    @classmethod
+    def execute_transaction(cls, db: str, name: str):
+        session = cls.session(db)
+        for change in cls.stage(db, name):
+            if isinstance(change, InsertRun):
+                tuples = change.tuples
+                if not all(hasattr(t, '_fields') for t in tuples):
+                    # PyRAL formats a body from either named tuples or dicts, but not a mix
+                    tuples = [t._asdict() if hasattr(t, '_fields') else t for t in tuples]
+                Relvar.insert(db=session, relvar=change.relvar, tuples=tuples, tr=name)
+            else:
+                change()
+        del cls.staged[(db, name)]
+        Transaction.execute(db=session, name=name)
+
+    @classmethod
+    def insert(cls, db: str, relvar: str, tuples: list, tr: Optional[str] = None):
+        if not tr:
+            Relvar.insert(db=cls.session(db), relvar=relvar, tuples=tuples)
+            return
+        if not tuples:
+            return
+        staged = cls.stage(db, tr)
+        rv = snake(relvar)
+        if staged and isinstance(staged[-1], InsertRun) and staged[-1].relvar == rv:
+            staged[-1].tuples.extend(tuples)
+        else:
+            staged.append(InsertRun(relvar=rv, tuples=list(tuples)))
+
+    @classmethod
+    def updateone(cls, db: str, relvar_name: str, id: dict, update: dict[str, Any]) -> str:
+        return Relvar.updateone(db=cls.session(db), relvar_name=relvar_name, id=id, update=update)
+
+    @classmethod
+    def deleteone(cls, db: str, relvar_name: str, tid: dict, tr: Optional[str] = None) -> str:
+        session = cls.session(db)
+        if not tr:
+            return Relvar.deleteone(db=session, relvar_name=relvar_name, tid=tid)
+        cls.stage(db, tr).append(lambda: Relvar.deleteone(db=session, relvar_name=relvar_name, tid=tid, tr=tr))
+        return ''
+
+    @classmethod
+    def restrict(cls, db: str, restriction: Optional[str] = None, relation: Optional[str] = None,
+                 svar_name: Optional[str] = None) -> RelationValue:
+        return Relation.restrict(db=cls.session(db), restriction=restriction, relation=relation or last_result,
+                                 svar_name=svar_name)
+
+    @classmethod
+    def semijoin(cls, db: str, rname2: Optional[str] = None, attrs: Optional[dict[str, str]] = None,
+                 rname1: Optional[str] = None, svar_name: Optional[str] = None) -> RelationValue:
+        return Relation.semijoin(db=cls.session(db), rname2=rname2 or last_result, attrs=attrs,
+                                 rname1=rname1 or last_result, svar_name=svar_name)
+
+    @classmethod
+    def join(cls, db: str, rname2: str, attrs: Optional[dict[str, str]] = None, rname1: Optional[str] = None,
+             svar_name: Optional[str] = None) -> RelationValue:
+        return Relation.join(db=cls.session(db), rname2=rname2, attrs=attrs, rname1=rname1 or last_result,
+                             svar_name=svar_name)
+
+    @classmethod
+    def project(cls, db: str, attributes: Sequence[str], exclude: bool = False, relation: Optional[str] = None,
+                svar_name: Optional[str] = None) -> RelationValue:
+        return Relation.project(db=cls.session(db), attributes=attributes, exclude=exclude,
+                                relation=relation or last_result, svar_name=svar_name)
+
+    @classmethod
+    def rename(cls, db: str, names: dict[str, str], relation: Optional[str] = None,
+               svar_name: Optional[str] = None) -> RelationValue:
+        return Relation.rename(db=cls.session(db), names=names, relation=relation or last_result,
+                               svar_name=svar_name)
+
+    @classmethod
+    def printall(cls, db: str):
+        Relvar.printall(db=cls.session(db))
+
+    @classmethod
+    def body(cls, db: str, relvar: str) -> list[dict[str, str]]:
+        # Split the body with Tcl's own list parsing so values are exactly as TclRAL holds them
+        session = cls.session(db)
+        tcl = Database.sessions[session]
+        body = Database.execute(db=session, cmd=f"relation body [relvar set {relvar}]", log=False)
+        return [dict(zip(t[::2], t[1::2])) for t in (tcl.splitlist(b) for b in tcl.splitlist(body))]
+
+    @classmethod
+    def tables(cls, db: str, typed: bool = True) -> list[RelvarTable]:
+        session = cls.session(db)
+        tcl = Database.sessions[session]
+        tables = []
+        for name in sorted(tcl.splitlist(Database.execute(db=session, cmd="relvar names", log=False))):
+            heading = tcl.splitlist(Database.execute(db=session, cmd=f"relation heading [relvar set {name}]",
+                                                     log=False))
+            # A non scalar type is itself a list, so just its first word, such as Relation, is kept
+            attributes = {a: tcl.splitlist(t)[0] for a, t in zip(heading[::2], heading[1::2])}
+            identifiers = [list(tcl.splitlist(i)) for i in
+                           tcl.splitlist(Database.execute(db=session, cmd=f"relvar identifiers {name}", log=False))]
+            rows = []
+            for t in cls.body(db=db, relvar=name):
+                rows.append([convert(t[a], tclral_type) if typed else t[a] for a, tclral_type in attributes.items()])
+            tables.append(RelvarTable(name=name.lstrip(':'), attributes=attributes, identifiers=identifiers,
+                                      rows=rows))
+        return tables
+
+
+class SQLiteStorage(Storage, metaclass=ContextScoped):
+    """
+    The metamodel held in an in-memory SQLite database
+
+    Each relvar is a table of text columns, holding values just as TclRAL would, keyed on the relvar's first
+    identifier with a unique index on each of the others. The TclRAL heading and identifiers of each relvar
+    are kept alongside in the _relvar_schema table. Relation values (the latest result and any session
+    variables) are kept in Python.
+
+    The empty metamodel is read from its TclRAL file when loaded. The populated database is saved as an
+    SQLite file, which may be loaded again.
+
+    Only identifiers are enforced. The metamodel's referential constraints (associations, partitions and
+    correlations) are not checked as they are by TclRAL, so a model error that breaks one is not reported.
+    """
+    name = 'sqlite'
+    extension = '.db'
+    tclral = False
+
+    connections: dict[str, sqlite3.Connection] = ContextState(dict)
+    headings: dict[str, dict[str, dict[str, str]]] = ContextState(dict)  # TclRAL type by attribute, by relvar, by db
+    identifiers: dict[str, dict[str, list[list[str]]]] = ContextState(dict)  # Identifiers by relvar, by db
+    variables: dict[str, dict[str, RelationValue]] = ContextState(dict)  # Session relation variables by db
+    pending: dict[tuple[str, str], list[Callable]] = ContextState(dict)  # Changes staged in each open (db, transaction)
+
+    @classmethod
+    def open_session(cls, name: str):
+        if name in cls.connections:
+            _logger.error(f"Session [{name}] already open")
+            raise PyRALException
+        # Transactions are begun and committed explicitly
+        cls.connections[name] = sqlite3.connect(':memory:', isolation_level=None)
+        cls.headings[name] = {}
+        cls.identifiers[name] = {}
+        cls.variables[name] = {}
+        _logger.info(f"SQLite session [{name}] initiated")
+
+    @classmethod
+    def close_session(cls, name: str):
+        con = cls.connection(name)
+        con.close()
+        for session_data in (cls.connections, cls.headings, cls.identifiers, cls.variables):
+            session_data.pop(name, None)
+        cls.pending = {k: v for k, v in cls.pending.items() if k[0] != name}
+        _logger.info(f"SQLite session [{name}] closed")
+
+    @classmethod
+    def is_open(cls, name: str) -> bool:
+        return name in cls.connections
+
+    @classmethod
+    def connection(cls, db: str) -> sqlite3.Connection:
+        try:
+            return cls.connections[db]
+        except KeyError:
+            _logger.error(f"No open session for database [{db}]")
+            raise SessionNotOpen
+
+    @classmethod
+    def load(cls, db: str, fname: str):
+        """
+        Replace the session's database with a saved one
+
+        Args:
+            db: DB session name
+            fname: A database saved by this backend or a TclRAL database such as the empty metamodel
+        """
+        con = cls.connection(db)
+        with open(fname, 'rb') as f:
+            saved_sqlite = f.read(16) == b'SQLite format 3\x00'
+        if saved_sqlite:
+            source = sqlite3.connect(fname)
+            source.backup(con)
+            source.close()
+            cls.headings[db] = {}
+            cls.identifiers[db] = {}
+            for relvar, heading, identifiers in con.execute(
+                    "SELECT relvar, heading, identifiers FROM _relvar_schema ORDER BY relvar"):
+                cls.headings[db][relvar] = json.loads(heading)
+                cls.identifiers[db][relvar] = json.loads(identifiers)
+            return
+
+        # Read the TclRAL database in a TclRAL session of its own
+        tclral_db = f"{db}_tclral"
+        PyRALStorage.open_session(tclral_db)
+        try:
+            PyRALStorage.load(db=tclral_db, fname=fname)
+            tables = PyRALStorage.tables(db=tclral_db, typed=False)
+        finally:
+            PyRALStorage.close_session(tclral_db)
+        for relvar in cls.headings[db]:
+            con.execute(f"DROP TABLE {quote(relvar)}")
+        con.execute("DROP TABLE IF EXISTS _relvar_schema")
+        cls.headings[db] = {}
+        cls.identifiers[db] = {}
+        con.execute("BEGIN")
+        con.execute("CREATE TABLE _relvar_schema (relvar TEXT PRIMARY KEY, heading TEXT, identifiers TEXT)")
+        for t in tables:
+            columns = [f"{quote(a)} TEXT" for a in t.attributes]
+            if t.identifiers:
+                columns.append(f"PRIMARY KEY ({', '.join(map(quote, t.identifiers[0]))})")
+            con.execute(f"CREATE TABLE {quote(t.name)} ({', '.join(columns)})")
+            for i, identifier in enumerate(t.identifiers[1:], start=2):
+                con.execute(f"CREATE UNIQUE INDEX {quote(f'{t.name}_I{i}')} ON {quote(t.name)} "
+                            f"({', '.join(map(quote, identifier))})")
+            if t.rows:
+                con.executemany(f"INSERT INTO {quote(t.name)} VALUES ({', '.join('?' * len(t.attributes))})",
+                                t.rows)
+            con.execute("INSERT INTO _relvar_schema VALUES (?, ?, ?)",
+                        (t.name, json.dumps(t.attributes), json.dumps(t.identifiers)))
+            cls.headings[db][t.name] = t.attributes
+            cls.identifiers[db][t.name] = t.identifiers
+        con.execute("COMMIT")
+
+    @classmethod
+    def save(cls, db: str, fname: str):
+        """
+        Save the session's database as an SQLite file
+
+        Args:
+            db: DB session name
+            fname: The saved file, replaced if it exists
+        """
+        con = cls.connection(db)
+        Path(fname).unlink(missing_ok=True)
+        saved = sqlite3.connect(fname)
+        con.backup(saved)
+        saved.close()
+
+    @classmethod
+    def open_transaction(cls, db: str, name: str) -> str:
+        cls.connection(db)
+        cls.pending[(db, name)] = []
+        return name
+
+    @classmethod
+    def execute_transaction(cls, db: str, name: str):
+        try:
+            changes = cls.pending.pop((db, name))
+        except KeyError:
+            _logger.error(f"No transaction [{name}] open on db [{db}]")
+            raise NoOpenTransaction
+        cls.apply(db=db, changes=changes, tr=name)
+
+    @classmethod
+    def apply(cls, db: str, changes: list[Callable], tr: Optional[str] = None):
+        """
+        Make a set of changes in a single SQLite transaction, none are made if any fails
+
+        Args:
+            db: DB session name
+            changes: Each change, called with the session's connection
+            tr: The name of the transaction the changes were added to, if any
+        """
+        con = cls.connection(db)
+        con.execute("BEGIN")
+        try:
+            for change in changes:
+                change(con)
+        except (sqlite3.Error, PyRALException) as e:
+            con.execute("ROLLBACK")
+            _logger.error(f"Transaction [{tr}] failed on db [{db}]: {e}")
+            raise PyRALException(f"Transaction [{tr}] failed on db [{db}]: {e}") from e
+        con.execute("COMMIT")
+
+    @classmethod
+    def change(cls, db: str, change: Callable, tr: Optional[str] = None):
+        if not tr:
+            cls.apply(db=db, changes=[change])
+            return
+        try:
+            cls.pending[(db, tr)].append(change)
+        except KeyError:
+            _logger.error(f"No transaction [{tr}] open on db [{db}]")
+            raise NoOpenTransaction
+
+    @classmethod
+    def heading(cls, db: str, relvar: str) -> dict[str, str]:
+        try:
+            return cls.headings[db][relvar]
+        except KeyError:
+            _logger.error(f"No relvar [{relvar}] in db [{db}]")
+            raise PyRALException
+
+    @classmethod
+    def where(cls, db: str, relvar: str, match: dict) -> tuple[str, list[str]]:
+        """
+        Args:
+            db: DB session name
+            relvar: Relvar name in snake case
+            match: Value of each matched attribute
+
+        Returns:
+            An SQL condition matching the attribute values and its parameters
+        """
+        heading = cls.heading(db, relvar)
+        attrs = [snake(a) for a in match]
+        if unknown := [a for a in attrs if a not in heading]:
+            _logger.error(f"No attributes {unknown} in relvar [{relvar}]")
+            raise PyRALException
+        return ' AND '.join(f"{quote(a)} = ?" for a in attrs), [f"{v}" for v in match.values()]
+
+    @classmethod
+    def insert(cls, db: str, relvar: str, tuples: list, tr: Optional[str] = None):
+        if not tuples:
+            return
+        rv = snake(relvar)
+        heading = cls.heading(db, rv)
+        rows = []
+        for t in tuples:
+            values = {snake(a): f"{v}" for a, v in (t._asdict() if hasattr(t, '_asdict') else t).items()}
+            if values.keys() != heading.keys():
+                _logger.error(f"Tuple {values} does not match the heading of relvar [{rv}]")
+                raise PyRALException
+            rows.append([values[a] for a in heading])
+        cls.change(db=db, tr=tr, change=lambda con: con.executemany(
+            f"INSERT INTO {quote(rv)} VALUES ({', '.join('?' * len(heading))})", rows))
+
+    @classmethod
+    def updateone(cls, db: str, relvar_name: str, id: dict, update: dict[str, Any]):
+        # As with PyRAL, an update is made immediately rather than added to a transaction
+        rv = snake(relvar_name)
+        condition, params = cls.where(db, rv, id)
+        assignments, values = cls.where(db, rv, update)
+        assignments = assignments.replace(' AND ', ', ')
+        cls.change(db=db, change=lambda con: con.execute(
+            f"UPDATE {quote(rv)} SET {assignments} WHERE {condition}", values + params))
+        return ''
+
+    @classmethod
+    def deleteone(cls, db: str, relvar_name: str, tid: dict, tr: Optional[str] = None):
+        rv = snake(relvar_name)
+        condition, params = cls.where(db, rv, tid)
+        cls.change(db=db, tr=tr, change=lambda con: con.execute(
+            f"DELETE FROM {quote(rv)} WHERE {condition}", params))
+        return ''
+
+    @classmethod
+    def select(cls, db: str, relvar: str, condition: str = '', params: Sequence[str] = ()) -> list[dict[str, str]]:
+        heading = cls.heading(db, relvar)
+        where = f" WHERE {condition}" if condition else ''
+        cursor = cls.connection(db).execute(f"SELECT * FROM {quote(relvar)}{where} ORDER BY rowid", params)
+        return [dict(zip(heading, r)) for r in cursor]
+
+    @classmethod
+    def body(cls, db: str, relvar: str) -> list[dict[str, str]]:
+        return cls.select(db, relvar.lstrip(':'))
+
+    @classmethod
+    def tables(cls, db: str, typed: bool = True) -> list[RelvarTable]:
+        tables = []
+        for name in sorted(cls.headings[db]):
+            attributes = cls.headings[db][name]
+            rows = [[convert(t[a], tclral_type) if typed else t[a] for a, tclral_type in attributes.items()]
+                    for t in cls.select(db, name)]
+            tables.append(RelvarTable(name=name, attributes=attributes, identifiers=cls.identifiers[db][name],
+                                      rows=rows))
+        return tables
+
+    @classmethod
+    def printall(cls, db: str):
+        for name in sorted(cls.headings[db]):
+            Relation.relformat(cls.relation(db, name)._replace(name=name))
+
+    @classmethod
+    def relation(cls, db: str, name: Optional[str]) -> RelationValue:
+        """
+        Args:
+            db: DB session name
+            name: A session variable or relvar name, the latest result if None
+
+        Returns:
+            The named relation value
+        """
+        name = snake(name) if name else last_result
+        if name in cls.variables[db]:
+            return cls.variables[db][name]
+        return RelationValue(name=name, header=dict(cls.heading(db, name)), body=cls.select(db, name))
+
+    @classmethod
+    def result(cls, db: str, rval: RelationValue, svar_name: Optional[str]) -> RelationValue:
+        rval = rval._replace(name=last_result)
+        cls.variables[db][last_result] = rval
+        if svar_name:
+            cls.variables[db][svar_name] = rval
+        return rval
+
+    @classmethod
+    def restrict(cls, db: str, restriction: Optional[str] = None, relation: Optional[str] = None,
+                 svar_name: Optional[str] = None) -> RelationValue:
+        rname = snake(relation) if relation else last_result
+        if not restriction:
+            return cls.result(db, cls.relation(db, rname), svar_name)
+        r = Restriction(restriction)
+        if rname not in cls.variables[db] and (exact := r.exact) is not None:
+            # Matches on a relvar are looked up in SQLite, using an identifier index where there is one
+            condition, params = cls.where(db, rname, exact)
+            body = cls.select(db, rname, condition, params)
+            return cls.result(db, RelationValue(name=rname, header=dict(cls.heading(db, rname)), body=body),
+                              svar_name)
+        rval = cls.relation(db, rname)
+        try:
+            body = [t for t in rval.body if r.predicate(t)]
+        except KeyError as e:
+            _logger.error(f"No attribute {e} in relation [{rname}] restricted by [{restriction}]")
+            raise PyRALException
+        return cls.result(db, rval._replace(body=body), svar_name)
+
+    @classmethod
+    def using(cls, r1: RelationValue, r2: RelationValue, attrs: Optional[dict[str, str]]) -> list[tuple[str, str]]:
+        """
+        Returns:
+            Pairs of matched attributes, those named alike if none are specified
+        """
+        if attrs:
+            return [(snake(a1), snake(a2)) for a1, a2 in attrs.items()]
+        return [(a, a) for a in r1.header if a in r2.header]
+
+    @classmethod
+    def semijoin(cls, db: str, rname2: Optional[str] = None, attrs: Optional[dict[str, str]] = None,
+                 rname1: Optional[str] = None, svar_name: Optional[str] = None) -> RelationValue:
+        r1, r2 = cls.relation(db, rname1), cls.relation(db, rname2)
+        pairs = cls.using(r1, r2, attrs)
+        matches: dict[tuple, list[dict]] = {}
+        for t in r2.body:
+            matches.setdefault(tuple(t[a2] for _, a2 in pairs), []).append(t)
+        # Like TclRAL, matching tuples are ordered as the first tuple of r1 that each matches
+        keys = dict.fromkeys(tuple(t[a1] for a1, _ in pairs) for t in r1.body)
+        body = [t for k in keys for t in matches.get(k, [])]
+        return cls.result(db, r2._replace(body=body), svar_name)
+
+    @classmethod
+    def join(cls, db: str, rname2: str, attrs: Optional[dict[str, str]] = None, rname1: Optional[str] = None,
+             svar_name: Optional[str] = None) -> RelationValue:
+        r1, r2 = cls.relation(db, rname1), cls.relation(db, rname2)
+        pairs = cls.using(r1, r2, attrs)
+        joined = {a2 for _, a2 in pairs}
+        header = r1.header | {a: t for a, t in r2.header.items() if a not in joined}
+        matches: dict[tuple, list[dict]] = {}
+        for t in r2.body:
+            matches.setdefault(tuple(t[a2] for _, a2 in pairs), []).append(t)
+        body = [t1 | {a: v for a, v in t2.items() if a not in joined}
+                for t1 in r1.body for t2 in matches.get(tuple(t1[a1] for a1, _ in pairs), [])]
+        return cls.result(db, RelationValue(name=last_result, header=header, body=body), svar_name)
+
+    @classmethod
+    def project(cls, db: str, attributes: Sequence[str], exclude: bool = False, relation: Optional[str] = None,
+                svar_name: Optional[str] = None) -> RelationValue:
+        rval = cls.relation(db, relation)
+        excluded = {snake(a) for a in attributes}
+        attrs = [a for a in rval.header if a not in excluded] if exclude else [snake(a) for a in attributes]
+        body = {tuple(t[a] for a in attrs): None for t in rval.body}  # Ordered and without duplicates
+        return cls.result(db, RelationValue(name=last_result, header={a: rval.header[a] for a in attrs},
+                                            body=[dict(zip(attrs, v)) for v in body]), svar_name)
+
+    @classmethod
+    def rename(cls, db: str, names: dict[str, str], relation: Optional[str] = None,
+               svar_name: Optional[str] = None) -> RelationValue:
+        rval = cls.relation(db, relation)
+        names = {snake(old): snake(new) for old, new in names.items()}
+        return cls.result(db, RelationValue(
+            name=last_result, header={names.get(a, a): t for a, t in rval.header.items()},
+            body=[{names.get(a, a): v for a, v in t.items()} for t in rval.body]), svar_name)
+
+
+# Backends by name
+backends: dict[str, type[Storage]] = {b.name: b for b in (PyRALStorage, SQLiteStorage)}
@@ -2,23 +2,31 @@
 
 # System
 import logging
+import threading
 from pathlib import Path
+from typing import Optional
 from contextlib import redirect_stdout
 import yaml
-
-# Model Integration
-from xcm_parser.class_model_parser import ClassModelParser
-from xsm_parser.state_model_parser import StateModelParser
-from op2_parser.op_parser import OpParser
-from mtd_parser.method_parser import MethodParser
-from pyral.relvar import Relvar
-from pyral.transaction import Transaction
+from tkinter import TclError
 
 # xUML Populate
 from xuml_metamodel import mmdb_path
 from xuml_metamodel.mmclass_nt import System_i, Domain_i, Realized_Domain_i
 from xuml_populate.config import mmdb
-from xuml_populate.populate.domain import Domain
+from xuml_populate.db import Database, Relvar, Transaction
+from xuml_populate.manifest import Manifest, ActivityChanges
+from xuml_populate.checkpoint import Checkpoint
+from xuml_populate.domain_pool import DomainPool
+from xuml_populate.activity_filter import ActivityFilter
+from xuml_populate.export import Export
+from xuml_populate.schedule import Schedule
+from xuml_populate.model_parse import ModelParse, SubsystemFiles
+from xuml_populate.parse_cache import ParseCache
+from xuml_populate.profiler import Profile
+from xuml_populate.relvar_index import RelvarIndex
+from xuml_populate.storage import Storage
+from xuml_populate.context import PopulationContext, in_population_context
+from xuml_populate.populate.domain import Domain, called_operations
 
 if __debug__:
     from xuml_populate.utility import print_mmdb
@@ -30,6 +38,10 @@ _system_fname = "system.yaml"
 
 _logger = logging.getLogger(__name__)
 
+# Printing redirects the standard output of the whole process
+_printout_lock = threading.Lock()
+
+
 class System:
     """
     The command line specifies a package representing a System. The organization of this package is defined
@@ -41,8 +53,12 @@ class System:
     """
     tr_Realized = 'Realized Domain'
 
+    @in_population_context(fresh=True)
     def __init__(self, name: str, system_path: Path, parse_actions: bool = False,
-                 verbose: bool = False):
+                 verbose: bool = False, jobs: int = 1, cache_path: Optional[Path] = None,
+                 incremental: bool = False, checkpoint: bool = False, from_checkpoint: bool = False,
+                 select: Optional[ActivityFilter] = None, export: str = 'none', printout: bool = True,
+                 storage: str = 'pyral', parallel_domains: bool = False):
         """
         Parse and otherwise process the contents of each modeled domain in the system.
         Then populate the content of each domain into the metamodel database.
@@ -50,21 +66,52 @@ class System:
         :param system_path: The path to the system package
         :param parse_actions: If true, all action text is parsed and populated into the metamodel,
         otherwise it is just kept as text
+        :param jobs: Number of processes used to parse the model files and action text
+        :param cache_path: Directory of cached parse results, parse results are not cached if None
+        :param incremental: If true, and only action text has changed since the saved metamodel was populated,
+        the saved metamodel is updated rather than populated from scratch
+        :param checkpoint: If true, a full population with actions saves the metamodel populated before its actions
+        as a checkpoint
+        :param from_checkpoint: If true, and the model structure hasn't changed since the last full population
+        saved a checkpoint, only the actions are populated, starting from that checkpoint. Otherwise the
+        population is a full one that saves a checkpoint.
+        :param select: If supplied, the model structure of every domain is populated, but only the selected
+        activities have their actions populated
+        :param export: Also export the populated metamodel as typed tables: json, sqlite or none
+        :param printout: If true, the populated metamodel is printed to a text file
+        :param storage: Name of the backend that stores the metamodel while it is populated, pyral or sqlite
+        :param parallel_domains: If true, each modeled domain is populated in its own process and the results
+        are merged into the system's metamodel
+        :param context: The population context that holds all population state, including the metamodel
+        session, passed as a keyword. A new context is made if none is supplied, so each System is populated
+        from a clean state even when others are populated in the same process before or at the same time.
         """
         _logger.info(f"Processing system: [{system_path}]")
+        Storage.use(storage)
 
         self.name = name
         self.parse_actions = parse_actions
         self.content = {}  # Parsed content for all files in the system package
         self.system_name = system_path.stem.title()
         self.verbose = verbose
+        self.jobs = jobs
+        self.checkpoint = checkpoint or from_checkpoint
+        self.storage = storage
+        self.parallel_domains = parallel_domains
+        self.export = export
+        self.printout = printout
+        self.select = select if select and select.active else None
         self.domains: dict[str, Domain] = {}  # Domain objects keyed by name
 
+        # Model file and Scrall activity parses are reused from earlier runs if a cache is supplied
+        ParseCache.path = cache_path
+
         # Load the system.yaml file
         with open(system_path / _system_fname, 'r') as file:
             self.system_data = yaml.safe_load(file)
 
-        # Process each domain folder in the system package
+        # Gather the model files in each domain folder in the order they are to be processed
+        domain_files: list[list[SubsystemFiles]] = []
         for domain_path in system_path.iterdir():
             # First make sure it is really a domain folder, or at least a folder
             # For example, on mac OS we sometimes trip on a .DS_Store file and, if so, we want to ignore it
@@ -75,24 +122,31 @@ class System:
             if not domain_path.is_dir():
                 _logger.warning(f"Path: {domain_path} is not a directory -- skipping")
                 continue
+            _logger.info(f"Processing domain: [{domain_path}]")
+
+            subsys_folders = [f for f in domain_path.iterdir() if f.is_dir()]
+            domain_files.append([ModelParse.find_subsystem_files(subsys_path) for subsys_path in subsys_folders])
+
+        # Parse every model file in the system at once, possibly spread across multiple processes
+        # The parse results come back in request order, so the content assembled below (and hence the
+        # populated metamodel) does not depend on the number of jobs
+        model_files = [
+            f for subsystems in domain_files for s in subsystems for f in [s.class_model, *s.methods, *s.state_models]
+        ]
+        with Profile.phase("parse"):
+            parsed = dict(zip(model_files, ModelParse.parse_files(paths=model_files, jobs=jobs,
+                                                                  cache_path=cache_path)))
+
+        # Organize the parsed content for each domain
+        for subsystems in domain_files:
             # File names may differ from the actual model element name due to case and delimiter differences
             # For example, the domain name `Elevator Management` may have the file name `elevator-management`
             # The domain name will be in the parsed content, but it is convenient to use the file names as keys
             # to organize our content dictionary since we these are immediately available
             domain_name = None  # Domain name is unknown until the class model is parsed
-            _logger.info(f"Processing domain: [{domain_path}]")
-
-            subsys_folders = [f for f in domain_path.iterdir() if f.is_dir()]
-            for subsys_path in subsys_folders:
 
-                # Process the class model for this subsystem
-                # The class file name must match the subsystem folder name
-                # Any other .xcm files will be ignored (only one class model recognized per subsystem)
-                cm_file_name = subsys_path.stem + ".xcm"
-                cm_path = subsys_path / "class-model" / cm_file_name
-                _logger.info(f"Processing class model: [{cm_path}]")
-                # Parse the class model
-                cm_parse = ClassModelParser.parse_file(file_input=cm_path, debug=False)
+            for subsys_files in subsystems:
+                cm_parse = parsed[subsys_files.class_model]
 
                 # If this is the first subsystem in the domain, get the domain name from the cm parse
                 # domain will be None on the first subsystem
@@ -111,37 +165,18 @@ class System:
                     'class_model': cm_parse, 'methods': {}, 'state_models': {}, 'external': {}
                 }
 
-                # Load and parse all the methods for the current subsystem folder
-                method_path = subsys_path / "methods"
-                if method_path.is_dir():
-                    # Find all class folders in the current subsystem methods directory
-                    class_folders = [f for f in method_path.iterdir() if f.is_dir()]
-                    for class_folder in class_folders:
-                        # Process each method file in this class folder
-                        for method_file in class_folder.glob("*.mtd"):
-                            method_name = method_file.stem
-                            _logger.info(f"Processing method: [{method_file}]")
-                            # Parse the method file and insert it in the subsystem subsys_parse
-                            mtd_parse = MethodParser.parse_file(method_file, debug=False)
-                            self.content[domain_name]['subsystems'][subsys_name]['methods'][method_name] = mtd_parse
-                else:
-                    _logger.info("No method dir")
-
-                # Load and parse the current subsystem's state models (state machines)
-                sm_path = subsys_path / "state-machines"
-                if sm_path.is_dir():
-                    for sm_file in sm_path.glob("*.xsm"):
-                        sm_name = sm_file.stem
-                        _logger.info(f"Processing state model: [{sm_file}]")
-                        # Parse the state model
-                        sm_parse = StateModelParser.parse_file(file_input=sm_file, debug=False)
-                        self.content[domain_name]['subsystems'][subsys_name]['state_models'][sm_name] = sm_parse
-                else:
-                    _logger.info("No state-machines dir")
-
-                # Load and parse the external services
-                ext_path = subsys_path / "external"
-                if ext_path.is_dir():
+                # Add all the methods for the current subsystem folder
+                for method_file in subsys_files.methods:
+                    self.content[domain_name]['subsystems'][subsys_name]['methods'][method_file.stem] = \
+                        parsed[method_file]
+
+                # Add the current subsystem's state models (state machines)
+                for sm_file in subsys_files.state_models:
+                    self.content[domain_name]['subsystems'][subsys_name]['state_models'][sm_file.stem] = \
+                        parsed[sm_file]
+
+                # Load the external services
+                if ext_path := subsys_files.external:
                     # Load external event/operation data
                     with open(ext_path/_external_fname, 'r') as file:
                         edata = yaml.safe_load(file)
@@ -150,16 +185,27 @@ class System:
                     with open(ext_path/_mark_fname, 'r') as file:
                         mdata = yaml.safe_load(file)
                     self.content[domain_name]['mark'] = mdata
-                else:
-                    _logger.info("No external dir")
 
-        self.populate()
-
-    def populate(self):
-        """Populate the database from the parsed input"""
+        self.manifest = Manifest.build(system_data=self.system_data, content=self.content,
+                                       parse_actions=parse_actions, select=self.select)
+        try:
+            if not ((from_checkpoint and self.resume()) or (incremental and self.repopulate())):
+                self.populate()
+            self.save()
+        finally:
+            # Release the populated metamodel, since a server populates one system after another in one process
+            if Database.is_open(mmdb):
+                Database.close_session(mmdb)
+
+    @classmethod
+    def open_metamodel(cls, system_name: str, domains: list[str]):
+        """
+        Open a session on an empty metamodel and populate the System with each of its Domains as Realized
 
+        :param system_name: The name of the System
+        :param domains: The name and alias of each domain, as listed in the system.yaml file
+        """
         # Initiate a connection to the TclRAL database
-        from pyral.database import Database  # Metamodel load or creates has already initialized the DB session
         _logger.info("Initializing TclRAL database connection")
         Database.open_session(mmdb)
 
@@ -169,35 +215,232 @@ class System:
 
         # Populate the single instance System class
         Relvar.insert(db=mmdb, relvar='System', tuples=[
-            System_i(Name=self.system_name),
+            System_i(Name=system_name),
         ])
 
         # Populate all the Domains as Realized by default (we'll migrate the Modeled Domains as we populate them)
-        Transaction.open(db=mmdb, name=System.tr_Realized)
-        for d in self.system_data['Domains']:
+        Transaction.open(db=mmdb, name=cls.tr_Realized)
+        for d in domains:
             name, alias = [s.strip() for s in d.split(",")]
-            Relvar.insert(db=mmdb, tr=System.tr_Realized, relvar='Domain', tuples=[
+            Relvar.insert(db=mmdb, tr=cls.tr_Realized, relvar='Domain', tuples=[
                 Domain_i(Name=name, Alias=alias)
             ])
-            Relvar.insert(db=mmdb, tr=System.tr_Realized, relvar='Realized Domain', tuples=[
+            Relvar.insert(db=mmdb, tr=cls.tr_Realized, relvar='Realized Domain', tuples=[
                 Realized_Domain_i(Name=name)
             ])
-        Transaction.execute(db=mmdb, name=System.tr_Realized)
+        Transaction.execute(db=mmdb, name=cls.tr_Realized)
+
+    def resume(self) -> bool:
+        """
+        Populate the actions of every Activity starting from the checkpoint saved by a full population
+
+        :return: False if there is no checkpoint matching the current model structure
+        """
+        if not self.parse_actions:
+            return False  # Without actions there is nothing beyond the checkpoint to populate
+
+        # Parsing is done before the TclRAL session is opened so that no worker process inherits it
+        self.preparse_actions()
+        if not Checkpoint.restore(name=self.name, manifest=self.manifest):
+            return False
+
+        for domain_name, domain_parse in self.content.items():
+            if not self.selects_domain(domain_name):
+                continue
+            anums = Checkpoint.activities(domain=domain_name)
+            _logger.info(f"Populating {len(anums)} activities in domain [{domain_name}] from checkpoint")
+            self.domains[domain_name] = Domain(domain=domain_name, content=domain_parse,
+                                               parse_actions=self.parse_actions, verbose=self.verbose, anums=anums,
+                                               select=self.select, context=self.context)
+        return True
+
+    def repopulate(self) -> bool:
+        """
+        Update the saved metamodel by populating again only those Activities whose action text has changed
+
+        :return: False if the saved metamodel can't be updated and must be populated from scratch
+        """
+        if not Storage.backend.tclral:
+            _logger.info(f"The saved metamodel can't be updated with the [{Storage.backend.name}] backend")
+            return False
+        saved_mmdb = Path(f"mmdb_{self.name}{Storage.backend.extension}")
+        saved_manifest = Manifest.load(self.name)
+        if not saved_mmdb.is_file() or not saved_manifest:
+            _logger.info("No saved metamodel to update")
+            return False
+        changes = Manifest.changed_activities(old=saved_manifest, new=self.manifest)
+        if changes is None:
+            _logger.info("Model structure has changed since the saved metamodel was populated")
+            return False
+        if not self.parse_actions:
+            changes = {}  # No actions were populated, so there is nothing to update
+
+        # Parsing is done before the TclRAL session is opened so that no worker process inherits it
+        self.preparse_actions(changes=changes)
+
+        Database.open_session(mmdb)
+        Database.load(db=mmdb, fname=str(saved_mmdb))
+
+        # Remove the changed actions in all domains before populating any
+        # so that we can still fall back to a full population if removal fails
+        domain_anums = {}
+        try:
+            with Profile.phase("depopulate"):
+                for domain_name, activities in changes.items():
+                    domain_anums[domain_name] = Domain.depopulate_activities(
+                        domain=domain_name, methods=activities.methods, states=activities.states)
+        except TclError as e:
+            _logger.warning(f"Cannot update the saved metamodel: {e}")
+            Database.close_session(mmdb)
+            return False
+        RelvarIndex.reset()  # Actions were removed by TclRAL commands the index doesn't see
+
+        for domain_name, anums in domain_anums.items():
+            if not self.selects_domain(domain_name):
+                continue
+            _logger.info(f"Repopulating {len(anums)} activities in domain [{domain_name}]")
+            self.domains[domain_name] = Domain(domain=domain_name, content=self.content[domain_name],
+                                               parse_actions=self.parse_actions, verbose=self.verbose, anums=anums,
+                                               select=self.select, context=self.context)
+        return True
+
+    def populate(self):
+        """Populate the database from the parsed input"""
+        if self.parallel_domains and len(self.content) > 1:
+            self.populate_domains_in_parallel()
+            return
+
+        # Parsing is done before the TclRAL session is opened so that no worker process inherits it
+        self.preparse_actions()
+
+        System.open_metamodel(system_name=self.system_name, domains=self.system_data['Domains'])
 
         # By default we populate each domain
 
-        # Populate each domain into the metamodel db
+        # Populate the model structure of each domain into the metamodel db
         for domain_name, domain_parse in self.content.items():
-            d = Domain(domain=domain_name, content=domain_parse, parse_actions=self.parse_actions, verbose=self.verbose)
+            d = Domain(domain=domain_name, content=domain_parse, parse_actions=self.parse_actions, verbose=self.verbose,
+                       context=self.context)
             self.domains[domain_name] = d
 
+        # Populate the action language for each Activity, unless action parsing was suppressed.
+        # When suppressed, the model structure (classes, relationships, states, method signatures)
+        # is populated, but the actions within each Activity are not.
+        if self.parse_actions:
+            if self.checkpoint:
+                # Everything populated so far only changes with the model structure, so save it for
+                # later runs that only change action text
+                with Profile.phase("checkpoint"):
+                    Checkpoint.save(name=self.name, manifest=self.manifest)
+            for d in self.domains.values():
+                if self.selects_domain(d.name):
+                    d.populate_actions(select=self.select)
+
+        # Print out the populated metamodel
+        if self.verbose:
+            Relvar.printall(mmdb)
+
+    def populate_domains_in_parallel(self):
+        """
+        Populate each modeled domain in a worker process and merge the results into the system's metamodel
+
+        Domains are independent of one another, so a worker process populates each of them into its own
+        session on the empty metamodel. The model structure of every domain is then merged in a single
+        transaction, followed by the actions of every domain in another, so that the constraints of the system's
+        metamodel are checked once for each. The merged metamodel is the same as one populated a domain at a time.
+        """
+        # Each worker parses its own domain's actions, and does so before the TclRAL session is opened here
+        with Profile.phase("populate domains"):
+            populated = DomainPool.populate(
+                system_name=self.system_name, domains=self.system_data['Domains'], content=self.content,
+                parse_actions=self.parse_actions, populate_actions={n: self.selects_domain(n) for n in self.content},
+                select=self.select, verbose=self.verbose, storage=self.storage, jobs=self.jobs)
+
+        System.open_metamodel(system_name=self.system_name, domains=self.system_data['Domains'])
+        with Profile.phase("merge"):
+            DomainPool.merge(changes=[d.structure for d in populated])
+        if self.parse_actions:
+            for d in populated:
+                Checkpoint.add_counters(d.counters)
+            if self.checkpoint:
+                with Profile.phase("checkpoint"):
+                    Checkpoint.save(name=self.name, manifest=self.manifest)
+            with Profile.phase("merge"):
+                DomainPool.merge(changes=[d.actions for d in populated])
+
+        # Print out the populated metamodel
+        if self.verbose:
+            Relvar.printall(mmdb)
+
+    def preparse_actions(self, changes: Optional[dict[str, ActivityChanges]] = None):
+        """
+        Parse the action text of the activities to be populated across multiple processes
+
+        Population itself stays in this process. Each Method and State Activity picks up its prepared parse
+        from the ParseCache.
+
+        :param changes: Only the activities changed in each domain, all activities if None
+        """
+        if not self.parse_actions:
+            return
+        texts = []
+        for domain_name, domain_parse in self.content.items():
+            if (changes is not None and domain_name not in changes) or not self.selects_domain(domain_name):
+                continue
+            method_texts = []
+            state_texts = []
+            for subsys_parse in domain_parse['subsystems'].values():
+                for m in subsys_parse['methods'].values():
+                    if changes is None or (m.class_name, m.method) in changes[domain_name].methods:
+                        method_texts.append((m.class_name, m.method, m.activity))
+                for sm in subsys_parse['state_models'].values():
+                    sm_name = sm.lifecycle if sm.lifecycle else sm.assigner_rnum
+                    for s in sm.states:
+                        if changes is None or (sm_name, s.state.name) in changes[domain_name].states:
+                            # State actions are parsed as a single newline terminated text block
+                            state_texts.append((sm_name, s.state.name, ''.join(s.activity) + '\n'))
+            if self.select:
+                # Methods named by an operation in a selected State are populated along with it
+                # (see Domain.populate_actions), so the States are parsed first
+                state_texts = [a for a in state_texts if self.select.selects(a[0], a[1])]
+                with Profile.phase("parse actions"):
+                    ParseCache.preparse_scrall(texts=[a[2] for a in state_texts], jobs=self.jobs)
+                called = set().union(*(called_operations(ParseCache.scrall.get(a[2])) for a in state_texts))
+                method_texts = [a for a in method_texts if self.select.selects(a[0], a[1]) or a[1] in called]
+            texts += [a[2] for a in method_texts + state_texts]
+        with Profile.phase("parse actions"):
+            ParseCache.preparse_scrall(texts=texts, jobs=self.jobs)
+
+    def selects_domain(self, name: str) -> bool:
+        """
+        :param name: Domain name
+        :return: True if the actions of the domain are populated
+        """
+        return not self.select or self.select.selects_domain(name=name, alias=self.content[name]['alias'])
+
+    def save(self):
+        """Save the populated metamodel along with its printout, schedule, any export and its manifest"""
         # Save the populated metamodel
-        saved_mmdb_name = f"mmdb_{self.name}.ral"
-        Database.save(db=mmdb, fname=saved_mmdb_name)
+        saved_mmdb_name = f"mmdb_{self.name}{Storage.backend.extension}"
+        with Profile.phase("save"):
+            Database.save(db=mmdb, fname=saved_mmdb_name)
 
         # Output a text file of the populated mmdb
-        mmdb_printout = f"mmdb_{self.name}.txt"
-        with open(mmdb_printout, 'w') as f:
-            with redirect_stdout(f):
-                Relvar.printall(db=mmdb)
+        if self.printout:
+            mmdb_printout = f"mmdb_{self.name}.txt"
+            with Profile.phase("printall"), _printout_lock:
+                with open(mmdb_printout, 'w') as f:
+                    with redirect_stdout(f):
+                        Relvar.printall(db=mmdb)
+
+        # Execution waves of every activity for model executors
+        if self.parse_actions:
+            with Profile.phase("schedule"):
+                Schedule.save(name=self.name)
+
+        # Export typed tables for downstream tools
+        with Profile.phase("export"):
+            Export.write(db=mmdb, name=self.name, export_format=self.export)
+
+        Manifest.save(name=self.name, manifest=self.manifest)
 
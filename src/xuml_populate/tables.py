@@ -0,0 +1,54 @@
+""" tables.py – The relvars of a metamodel database read back as typed tables """
+
+# System
+from typing import NamedTuple, Any
+
+# Python and SQLite type of each TclRAL scalar type, any other type (a relation valued attribute,
+# for example) is exported as its TclRAL string
+tclral_types = {
+    'string': ('str', 'TEXT'),
+    'int': ('int', 'INTEGER'),
+    'double': ('float', 'REAL'),
+    'boolean': ('bool', 'INTEGER'),
+}
+
+
+class RelvarTable(NamedTuple):
+    """
+    The heading, identifiers and body of a relvar
+    """
+    name: str
+    attributes: dict[str, str]  # TclRAL type by attribute name, in heading order
+    identifiers: list[list[str]]  # The first is exported as the primary key
+    rows: list[list[Any]]  # Values in heading order, converted to their Python types unless read untyped
+
+
+def convert(value: str, tclral_type: str) -> Any:
+    """
+    Args:
+        value: A TclRAL attribute value
+        tclral_type: The attribute's TclRAL type
+
+    Returns:
+        The value as the corresponding Python type
+    """
+    match tclral_types.get(tclral_type, ('str',))[0]:
+        case 'int':
+            return int(value)
+        case 'float':
+            return float(value)
+        case 'bool':
+            return value.lower() in ('1', 'true', 'yes', 'on')
+        case _:
+            return value
+
+
+def quote(name: str) -> str:
+    """
+    Args:
+        name: A relvar or attribute name
+
+    Returns:
+        The name as an SQL identifier
+    """
+    return f'"{name}"'
@@ -1,7 +1,7 @@
 """ utility.py - Debug utilities """
 from contextlib import redirect_stdout
-from pyral.relvar import Relvar
 from xuml_populate.config import mmdb
+from xuml_populate.db import Relvar
 
 def print_mmdb():
     mmdb_printout = f"mmdb_debug.txt"
@@ -0,0 +1,22 @@
+""" test_activity_filter.py -- Test the selection of activities whose actions are populated """
+
+from xuml_populate.activity_filter import ActivityFilter
+from xuml_populate.parse_cache import ParseCache
+from xuml_populate.populate.domain import called_operations
+
+def test_select():
+    select = ActivityFilter(domains=('EVMAN',), classes=('cabin', 'R5*'), activities=('Ping*',))
+    assert select.active and not ActivityFilter().active
+    assert select.selects_domain(name='Elevator Management', alias='EVMAN')
+    assert not select.selects_domain(name='Transport', alias='TRANS')
+    assert select.selects(cname='Cabin', activity='Ping both ways')
+    assert not select.selects(cname='Cabin', activity='Estimate delay')
+    assert select.selects(cname='R53', activity='Ping')
+    # No patterns of a kind selects everything of that kind
+    assert ActivityFilter(classes=('Door',)).selects(cname='Door', activity='Opening')
+
+def test_called_operations():
+    parse = ParseCache.parse_scrall(scrall_text="x = me.Floor\nshaft.Go to floor( dest: x )\nCabin.Stop()\n"
+                                                "~TRAN.Goto floor( Dest floor: x )\n")
+    # The operation on an External Entity is not a Method Call
+    assert called_operations(parse) == {'Go to floor', 'Stop'}
@@ -0,0 +1,22 @@
+""" test_attribute_types.py -- Test referential attribute type resolution along reference chains """
+
+import pytest
+from xuml_populate.populate.attribute import Attribute, UNRESOLVED
+from xuml_populate.exceptions.class_exceptions import CircularAttributeReference, UntypedAttribute
+
+def test_resolve_chain():
+    types = {('ID', 'Shaft'): 'Shaft ID', ('Shaft', 'Cabin'): UNRESOLVED, ('Shaft', 'Door'): UNRESOLVED}
+    refers_to = {('Shaft', 'Door'): ('Shaft', 'Cabin'), ('Shaft', 'Cabin'): ('ID', 'Shaft')}
+    assert Attribute.ResolveAttr(attr='Shaft', cname='Door', types=types, refers_to=refers_to) == 'Shaft ID'
+    # Each attribute along the chain is resolved as well
+    assert types[('Shaft', 'Cabin')] == 'Shaft ID'
+
+def test_circular_reference():
+    types = {('A', 'X'): UNRESOLVED, ('B', 'Y'): UNRESOLVED}
+    refers_to = {('A', 'X'): ('B', 'Y'), ('B', 'Y'): ('A', 'X')}
+    with pytest.raises(CircularAttributeReference):
+        Attribute.ResolveAttr(attr='A', cname='X', types=types, refers_to=refers_to)
+
+def test_untyped_attribute():
+    with pytest.raises(UntypedAttribute):
+        Attribute.ResolveAttr(attr='A', cname='X', types={('A', 'X'): UNRESOLVED}, refers_to={})
@@ -0,0 +1,107 @@
+""" test_class_topology.py -- Test the class model topology and the paths resolved against it """
+
+import pytest
+from pathlib import Path
+from xuml_populate.query import Metamodel
+from xuml_populate.system import System
+from xuml_populate.populate.class_topology import ClassTopology
+from xuml_populate.populate.actions.aparse_types import MaxMult
+
+class_model = """domain Building, BLDG
+subsystem Main, MAIN 1-99
+class Shaft
+attributes
+    ID : Nominal {I}
+    Value : Count
+--
+class Floor
+attributes
+    Name : Nominal {I}
+--
+class Floor Service
+attributes
+    Floor : Nominal {I, R1}
+    Shaft : Nominal {I, R1}
+    Direction : Nominal {I}
+--
+relationships
+    R1
+    serves, Mc Floor
+    is served by, Mc Shaft
+    M Floor Service
+    Floor Service.Floor -> Floor.Name
+    Floor Service.Shaft -> Shaft.ID
+--
+"""
+
+# The same path is traversed twice from the same class, to a many associative class from a single instance
+method = """--
+Shaft.Calls( dir: Nominal ) : Count
+--
+call up .= /R1/Floor Service(1, Direction: ^dir)
+call down .= /R1/Floor Service(1, Direction: ^dir)
+=>> Value
+"""
+
+@pytest.fixture(scope='module')
+def system(tmp_path_factory):
+    path = tmp_path_factory.mktemp("topology")
+    subsystem = path / "building" / "building" / "main"
+    (subsystem / "class-model").mkdir(parents=True)
+    (subsystem / "class-model" / "main.xcm").write_text(class_model)
+    (subsystem / "methods" / "shaft").mkdir(parents=True)
+    (subsystem / "methods" / "shaft" / "calls.mtd").write_text(method)
+    (path / "building" / "system.yaml").write_text("Domains:\n  - Building, BLDG\n")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(path)
+        yield System(name="building", system_path=path / "building", parse_actions=True, printout=False), path
+
+def test_topology(system):
+    s, _ = system
+    with s.context.active():
+        topology = ClassTopology.of(domain='Building')
+        assert ClassTopology.of(domain='Building') is topology
+        assert topology.rnums == {'R1'}
+        assert {(r['From_class'], r['To_class']) for r in topology.class_refs(rnum='R1', cname='Floor Service')} == {
+            ('Floor Service', 'Floor'), ('Floor Service', 'Shaft')}
+        assert topology.perspective(rnum='R1', viewed_class='Floor')['Phrase'] == 'serves'
+        assert topology.formalized_by['Floor Service'][0]['Multiplicity'] == 'M'
+        assert not topology.ordinals
+
+def test_path_resolved_once(system):
+    s, _ = system
+    with s.context.active():
+        paths = ClassTopology.of(domain='Building').paths
+        assert list(paths) == [('Shaft', '/R1/Floor Service', MaxMult.ONE)]
+
+def test_many_associative_select(system):
+    s, path = system
+    with s.context.active():
+        assert ClassTopology.of(domain='Building').paths[('Shaft', '/R1/Floor Service', MaxMult.ONE)].to_many_assoc_on_one
+    # Both traversals select a single Floor Service by its identifier, not only the one that populated the path
+    mm = Metamodel.load(path / "mmdb_building.ral")
+    assert len(mm.all('Traverse Action')) == 2
+    assert len(mm.all('Identifier Select')) == 2
+
+class Unresolved(dict):
+    """ Forgets every resolved path, so that each traversal resolves its path again """
+    def __setitem__(self, key, value):
+        pass
+
+def test_reused_path_output(system, tmp_path, monkeypatch):
+    # Populating with every path resolved again must give the same metamodel as reusing resolved paths
+    _, path = system
+    init = ClassTopology.__init__
+
+    def unresolved_init(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        self.paths = Unresolved()
+
+    monkeypatch.setattr(ClassTopology, '__init__', unresolved_init)
+    monkeypatch.chdir(tmp_path)
+    System(name="building", system_path=path / "building", parse_actions=True, printout=False)
+    unresolved = Metamodel.load(tmp_path / "mmdb_building.ral")
+    reused = Metamodel.load(path / "mmdb_building.ral")
+    assert reused.relvars == unresolved.relvars
+    for relvar in reused.relvars:
+        assert set(reused.all(relvar)) == set(unresolved.all(relvar)), relvar
@@ -0,0 +1,23 @@
+""" test_context.py -- Test that population contexts keep their state apart """
+
+from xuml_populate.context import PopulationContext, ContextScoped, ContextState
+
+
+class Counter(metaclass=ContextScoped):
+    count: int = ContextState(int)
+    seen: list[str] = ContextState(list)
+
+
+def test_context_state():
+
+    a, b = PopulationContext('a'), PopulationContext('b')
+    with a.active():
+        Counter.count += 1
+        Counter.seen.append('a')
+    with b.active():
+        assert Counter.count == 0 and Counter.seen == []  # Each context starts with a new value
+        Counter.count = 5
+    with a.active():
+        assert Counter.count == 1 and Counter.seen == ['a']
+    with b.active():
+        assert Counter.count == 5
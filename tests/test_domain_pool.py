@@ -0,0 +1,26 @@
+""" test_domain_pool.py -- Test finding the changes a domain's population makes to each relvar """
+
+from xuml_populate.tables import RelvarTable
+from xuml_populate.domain_pool import DomainPool, RelvarChanges
+
+attributes = {'Name': 'string', 'Alias': 'string'}
+
+def test_changes():
+
+    before = {
+        'Domain': RelvarTable('Domain', attributes, [['Name'], ['Alias']], [['Elevator Management', 'EVMAN']]),
+        'Realized_Domain': RelvarTable('Realized_Domain', {'Name': 'string'}, [['Name']],
+                                       [['Elevator Management'], ['Transport']]),
+    }
+    after = {
+        'Domain': RelvarTable('Domain', attributes, [['Name'], ['Alias']],
+                              [['Elevator Management', 'EVMAN'], ['Signal IO', 'SIO'], ['Transport', 'TRANS']]),
+        'Realized_Domain': RelvarTable('Realized_Domain', {'Name': 'string'}, [['Name']], [['Transport']]),
+    }
+
+    assert DomainPool.changes(before=before, after=after) == {
+        'Domain': RelvarChanges(removed=[], added=[{'Name': 'Signal IO', 'Alias': 'SIO'},
+                                                   {'Name': 'Transport', 'Alias': 'TRANS'}]),
+        'Realized_Domain': RelvarChanges(removed=[{'Name': 'Elevator Management'}], added=[]),
+    }
+    assert DomainPool.changes(before=before, after=before) == {}
@@ -0,0 +1,42 @@
+""" test_export.py -- Test exporting relvars as typed tables """
+
+import gzip
+import json
+import sqlite3
+from pathlib import Path
+from pyral.database import Database
+from pyral.relvar import Relvar
+from pyral.rtypes import Attribute
+from xuml_populate.export import Export
+
+db = "export_test"
+
+def test_sqlite_export(tmp_path):
+    Database.open_session(db)
+    Relvar.create_relvar(db=db, name='Class', attrs=[Attribute('Name', 'string'), Attribute('Cnum', 'int'),
+                                                     Attribute('Domain', 'string')],
+                         ids={1: ['Name', 'Domain'], 2: ['Cnum', 'Domain']})
+    Relvar.insert(db=db, relvar='Class', tuples=[{'Name': 'Shaft', 'Cnum': 1, 'Domain': 'EVMAN'}])
+    path = Export.to_sqlite(tables=Export.tables(db), path=tmp_path / "mmdb.sqlite")
+    Database.close_session(db)
+
+    con = sqlite3.connect(path)
+    assert con.execute('SELECT Name, Cnum FROM Class').fetchall() == [('Shaft', 1)]
+    # The second identifier is enforced as a unique index
+    assert con.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name = 'Class_I2'").fetchone()
+    con.close()
+
+def test_json_export(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    Database.open_session(db)
+    Relvar.create_relvar(db=db, name='Class', attrs=[Attribute('Name', 'string'), Attribute('Cnum', 'int'),
+                                                     Attribute('Domain', 'string')], ids={1: ['Name', 'Domain']})
+    Relvar.insert(db=db, relvar='Class', tuples=[{'Name': 'Shaft', 'Cnum': 1, 'Domain': 'EVMAN'}])
+    path = Export.write(db=db, name='test', export_format='json')
+    Database.close_session(db)
+
+    # A folder of JSON lines files, not to be mistaken for a JSON file
+    assert path == Path("mmdb_test.jsonl.d") and path.is_dir()
+    assert json.load(open(path / 'schema.json'))['Class']['identifiers'] == [['Name', 'Domain']]
+    with gzip.open(path / 'Class.jsonl.gz', 'rt') as f:
+        assert [json.loads(line) for line in f] == [{'Name': 'Shaft', 'Cnum': 1, 'Domain': 'EVMAN'}]
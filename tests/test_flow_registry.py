@@ -0,0 +1,59 @@
+""" test_flow_registry.py -- Test that the Flow registry of an Activity agrees with the Labeled Flow relvar """
+
+import pytest
+from pyral.relvar import Relvar as PyRALRelvar
+from pyral.rtypes import Attribute
+from xuml_populate.config import mmdb
+from xuml_populate.db import Database, Relation, Relvar
+from xuml_populate.storage import PyRALStorage
+from xuml_populate.context import PopulationContext
+from xuml_populate.populate.flow import Flow
+
+anum, domain = 'A1', 'EVMAN'
+
+@pytest.fixture
+def flows():
+    with PopulationContext('flow registry test').active():
+        Database.open_session(mmdb)
+        session = PyRALStorage.session(mmdb)  # Relvars are created with PyRAL itself
+        flow_attrs = [Attribute('ID', 'string'), Attribute('Activity', 'string'), Attribute('Domain', 'string')]
+        flow_id = {1: ['ID', 'Activity', 'Domain']}
+        PyRALRelvar.create_relvar(db=session, name='Unlabeled Flow', attrs=flow_attrs, ids=flow_id)
+        PyRALRelvar.create_relvar(db=session, name='Labeled Flow', attrs=flow_attrs + [Attribute('Name', 'string')],
+                                  ids=flow_id)
+        # No Data Flows, the registry is only asked for their summaries when started from the metamodel
+        PyRALRelvar.create_relvar(db=session, name='Data Flow', attrs=flow_attrs, ids=flow_id)
+        Relvar.insert(db=mmdb, relvar='Unlabeled Flow', tuples=[
+            {'ID': fid, 'Activity': anum, 'Domain': domain} for fid in ('F1', 'F2', 'F3')
+        ])
+        yield
+        Database.close_session(mmdb)
+
+def labels() -> dict[str, set[str]]:
+    """ The flow ids of each label in the Labeled Flow relvar """
+    labeled = {}
+    for t in Relation.restrict(db=mmdb, relation='Labeled Flow', restriction=f"Activity:<{anum}>").body:
+        labeled.setdefault(t['Name'], set()).add(t['ID'])
+    return labeled
+
+def registered() -> dict[str, set[str]]:
+    """ The flow ids of each label in the registry """
+    return {label: set(fids) for label, fids in Flow.registry(anum=anum, domain=domain).labeled.items() if fids}
+
+def test_label_and_relabel(flows):
+    Flow.label_flow(label='shaft', fid='F2', anum=anum, domain=domain)
+    Flow.label_flow(label='cabin', fid='F3', anum=anum, domain=domain)
+    Flow.label_flow(label='cabin', fid='F1', anum=anum, domain=domain)
+    assert registered() == labels() == {'shaft': {'F2'}, 'cabin': {'F1', 'F3'}}
+
+    Flow.relabel_flow(new_label='shaft', fid='F3', anum=anum, domain=domain)
+    assert registered() == labels() == {'shaft': {'F2', 'F3'}, 'cabin': {'F1'}}
+    registry = Flow.registry(anum=anum, domain=domain)
+    # A relabeled flow keeps its place among the flows sharing its new label
+    assert registry.labeled['shaft'] == ['F2', 'F3']
+    assert list(registry.label_seq) == ['F2', 'F3', 'F1']
+
+    # A registry started from the metamodel, as when an Activity is repopulated, agrees as well
+    Flow.activity_flows.clear()
+    assert registered() == labels()
+    assert set(Flow.registry(anum=anum, domain=domain).label_seq) == {'F1', 'F2', 'F3'}
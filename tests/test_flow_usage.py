@@ -0,0 +1,24 @@
+""" test_flow_usage.py -- Test the recording of flow usage as usage tuples are inserted """
+
+from types import SimpleNamespace
+from collections import namedtuple
+from xuml_populate.populate.flow_usage import FlowUsage
+
+Read_Action_i = namedtuple('Read_Action_i', 'ID Activity Domain Instance_flow')
+Attribute_Read_Access_i = namedtuple('Attribute_Read_Access_i', 'Attribute Class Read_action Activity Domain Output_flow')
+
+def test_record_usage():
+    activity = SimpleNamespace(anum='A1', domain='EVMAN', flow_usage={})
+    FlowUsage.register(activity)
+    FlowUsage.record('Read Action', [Read_Action_i(ID='ACTN1', Activity='A1', Domain='EVMAN', Instance_flow='F1')])
+    FlowUsage.record('Attribute Read Access', [
+        {'Attribute': 'Floor', 'Class': 'Cabin', 'Read_action': 'ACTN1', 'Activity': 'A1', 'Domain': 'EVMAN',
+         'Output_flow': 'F2'}
+    ])
+    # Usage of an activity that isn't registered is not recorded
+    FlowUsage.record('Read Action', [Read_Action_i(ID='ACTN1', Activity='A2', Domain='EVMAN', Instance_flow='F1')])
+    assert activity.flow_usage['F1'] == {'source': set(), 'dest': {'ACTN1'}}
+    assert activity.flow_usage['F2'] == {'source': {'ACTN1'}, 'dest': set()}
+    FlowUsage.clear(anum='A1', domain='EVMAN')
+    FlowUsage.record('Read Action', [Read_Action_i(ID='ACTN2', Activity='A1', Domain='EVMAN', Instance_flow='F3')])
+    assert 'F3' not in activity.flow_usage
@@ -0,0 +1,27 @@
+""" test_generate.py -- Test that generated benchmark models parse and populate """
+
+from pathlib import Path
+from benchmarks.generate import ModelGenerator, ModelSpec
+from xuml_populate.model_parse import ModelParse
+from xuml_populate.query import Metamodel
+from xuml_populate.system import System
+
+def test_generated_model_parses(tmp_path):
+    spec = ModelSpec(classes=5, associations=7, gen_depth=2, lifecycles=2)
+    ModelGenerator(spec).write(tmp_path)
+    files = ModelParse.find_subsystem_files(tmp_path / "benchmark" / "main")
+    cm_parse = ModelParse.parse_file(files.class_model)
+    assert len(cm_parse.classes) == spec.classes + 1 + 2 * spec.gen_depth
+    assert len(cm_parse.rels) == spec.associations + spec.gen_depth
+    assert len(files.methods) == spec.classes * spec.methods
+    assert len(files.state_models) == spec.lifecycles
+    for p in files.methods + files.state_models:
+        ModelParse.parse_file(p)
+
+def test_generated_methods_populate(tmp_path, monkeypatch):
+    spec = ModelSpec(classes=3, associations=3, methods=2, lifecycles=0)
+    ModelGenerator(spec).write(tmp_path / "bench")
+    monkeypatch.chdir(tmp_path)
+    System(name="bench", system_path=tmp_path / "bench", printout=False)
+    # Each method of each class has an activity of its own
+    assert len(Metamodel.load(tmp_path / "mmdb_bench.ral").all('Method')) == spec.classes * spec.methods
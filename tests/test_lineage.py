@@ -0,0 +1,47 @@
+""" test_lineage.py -- Test the derivation and numbering of the lineages of each domain """
+
+import pytest
+from pyral.relvar import Relvar as PyRALRelvar
+from pyral.rtypes import Attribute
+from xuml_populate.config import mmdb
+from xuml_populate.db import Database, Relation, Relvar
+from xuml_populate.storage import PyRALStorage
+from xuml_populate.context import PopulationContext
+from xuml_populate.populate.lineage import Lineage
+
+# Superclass and subclasses of one generalization in each domain, subclasses listed out of sorted order
+generalizations = {'Fleet': ('R1', 'Vehicle', ['Truck', 'Car']), 'Bank': ('R1', 'Account', ['Savings', 'Checking'])}
+
+@pytest.fixture
+def metamodel():
+    with PopulationContext('lineage test').active():
+        Database.open_session(mmdb)
+        session = PyRALStorage.session(mmdb)  # Relvars are created with PyRAL itself
+        for name, attrs in {'Facet': ['Class', 'Rnum'], 'Subclass': ['Class', 'Rnum'], 'Superclass': ['Class', 'Rnum'],
+                            'Element': ['Label'], 'Spanning_Element': ['Label'], 'Lineage': ['Lnum'],
+                            'Class_In_Lineage': ['Class', 'Lnum']}.items():
+            PyRALRelvar.create_relvar(db=session, name=name, attrs=[Attribute(a, 'string') for a in attrs + ['Domain']],
+                                      ids={1: attrs + ['Domain']})
+        for domain, (rnum, superclass, subclasses) in generalizations.items():
+            Relvar.insert(db=mmdb, relvar='Superclass', tuples=[{'Class': superclass, 'Rnum': rnum, 'Domain': domain}])
+            Relvar.insert(db=mmdb, relvar='Subclass', tuples=[
+                {'Class': c, 'Rnum': rnum, 'Domain': domain} for c in subclasses])
+            Relvar.insert(db=mmdb, relvar='Facet', tuples=[
+                {'Class': c, 'Rnum': rnum, 'Domain': domain} for c in [superclass] + subclasses])
+        yield
+        Database.close_session(mmdb)
+
+def lineages(domain: str) -> dict[str, set[str]]:
+    """ The classes of each populated lineage of a domain by Lnum """
+    classes = {}
+    for t in Relation.restrict(db=mmdb, relation='Class_In_Lineage', restriction=f"Domain:<{domain}>").body:
+        classes.setdefault(t['Lnum'], set()).add(t['Class'])
+    return classes
+
+def test_lineages_of_each_domain(metamodel):
+    Lineage.Derive(domain='Fleet')
+    Lineage.Derive(domain='Bank')
+    # Lineages are numbered from L1 in each domain, in the sorted order of their class names
+    assert lineages('Fleet') == {'L1': {'Car', 'Vehicle'}, 'L2': {'Truck', 'Vehicle'}}
+    assert lineages('Bank') == {'L1': {'Account', 'Checking'}, 'L2': {'Account', 'Savings'}}
+    assert len(Relation.restrict(db=mmdb, relation='Lineage', restriction="Domain:<Bank>").body) == 2
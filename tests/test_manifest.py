@@ -0,0 +1,31 @@
+""" test_manifest.py -- Test detection of action text only changes """
+
+from pathlib import Path
+from xuml_populate.model_parse import ModelParse
+from xuml_populate.manifest import Manifest
+
+subsys_path = Path(__file__).parent / "domains" / "elevator" / "elevator-management" / "elevator"
+
+def build(methods):
+    files = ModelParse.find_subsystem_files(subsys_path)
+    cm_parse = ModelParse.parse_file(files.class_model)
+    content = {'EVMAN': {'alias': 'EVMAN', 'subsystems': {
+        'Elevator': {'class_model': cm_parse, 'methods': methods, 'state_models': {}}
+    }}}
+    return Manifest.build(system_data={}, content=content, parse_actions=True)
+
+def test_changed_activities():
+
+    files = ModelParse.find_subsystem_files(subsys_path)
+    methods = {p.stem: ModelParse.parse_file(p) for p in files.methods}
+    old = build(methods)
+    assert Manifest.changed_activities(old=old, new=build(methods)) == {}
+
+    name, m = next(iter(methods.items()))
+    edited = methods | {name: m._replace(activity=m.activity + "\n// edited\n")}
+    changes = Manifest.changed_activities(old=old, new=build(edited))
+    assert changes['EVMAN'].methods == [(m.class_name, m.method)]
+    assert not changes['EVMAN'].states
+
+    resigned = methods | {name: m._replace(flows_in=[])}
+    assert Manifest.changed_activities(old=old, new=build(resigned)) is None
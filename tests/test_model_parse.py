@@ -0,0 +1,23 @@
+""" test_model_parse.py -- Test that parallel model parsing matches serial parsing """
+
+from pathlib import Path
+from xuml_populate.model_parse import ModelParse
+
+subsys_path = Path(__file__).parent / "domains" / "elevator" / "elevator-management" / "elevator"
+
+def test_parallel_parse_order():
+
+    files = ModelParse.find_subsystem_files(subsys_path)
+    paths = [files.class_model, *files.methods]
+    serial = ModelParse.parse_files(paths=paths, jobs=1)
+    parallel = ModelParse.parse_files(paths=paths, jobs=2)
+    assert parallel == serial
+
+def test_cached_parse(tmp_path):
+
+    files = ModelParse.find_subsystem_files(subsys_path)
+    paths = [files.class_model, *files.methods]
+    uncached = ModelParse.parse_files(paths=paths)
+    ModelParse.parse_files(paths=paths, cache_path=tmp_path)
+    assert len(list(tmp_path.glob("*.pickle"))) == len(paths)
+    assert ModelParse.parse_files(paths=paths, cache_path=tmp_path) == uncached
@@ -0,0 +1,10 @@
+""" test_preparse.py -- Test parsing activity text across processes ahead of population """
+
+from xuml_populate.parse_cache import ParseCache
+
+def test_preparse_scrall():
+    texts = ["x = a + b\n", "y = c\n", "x = a + b\n"]
+    ParseCache.preparse_scrall(texts=texts, jobs=2)
+    assert ParseCache.scrall.keys() == {"x = a + b\n", "y = c\n"}
+    # Population picks up the prepared parse rather than parsing again
+    assert ParseCache.parse_scrall(scrall_text="y = c\n") is ParseCache.scrall["y = c\n"]
@@ -0,0 +1,19 @@
+""" test_query.py -- Test indexed queries over a loaded metamodel """
+
+import pytest
+from xuml_populate.export import RelvarTable
+from xuml_populate.query import Metamodel
+
+d = 'Elevator Management'
+state = RelvarTable(name='State', attributes={'Name': 'string', 'State_model': 'string', 'Domain': 'string'},
+                    identifiers=[['Name', 'State_model', 'Domain']],
+                    rows=[['Moving', 'Cabin', d], ['Stopped', 'Cabin', d], ['Open', 'Door', d]])
+
+def test_queries():
+    m = Metamodel(tables=[state])
+    assert [s.Name for s in m.states('Cabin', d)] == ['Moving', 'Stopped']
+    assert m.get('State', Name='Open', State_model='Door', Domain=d).Name == 'Open'
+    assert m.get('State', Name='Closed', State_model='Door', Domain=d) is None
+    assert m.find('State', Name='Open') == m.find('State', State_model='Door', Domain=d)
+    with pytest.raises(KeyError):
+        m.get('State', Name='Open')
@@ -0,0 +1,26 @@
+""" test_read_reuse.py -- Test the scoping of reusable Read Actions """
+
+from xuml_populate.populate.actions.read_action import ReadAction
+
+def test_control_scope():
+    with ReadAction.control_scope(anum='A1', domain='EVMAN'):
+        scopes = ReadAction.reusable['EVMAN:A1']
+        scopes[-1][('F1', ('Floor',))] = ('ACTN1', [])
+        with ReadAction.control_scope(anum='A1', domain='EVMAN'):
+            # Reads outside a case or decision result are not reused inside it
+            assert not scopes[-1]
+            scopes[-1][('F1', ('Floor', 'Speed'))] = ('ACTN2', [])
+        assert list(scopes[-1]) == [('F1', ('Floor',))]
+    assert 'EVMAN:A1' not in ReadAction.reusable
+
+def test_forget():
+    with ReadAction.control_scope(anum='A1', domain='EVMAN'):
+        reads = ReadAction.reusable['EVMAN:A1'][-1]
+        reads[('F1', ('Floor',))] = ('ACTN1', [])
+        reads[('F1', ('Speed',))] = ('ACTN2', [])
+        with ReadAction.control_scope(anum='A1', domain='EVMAN'):
+            # A write inside a nested scope also applies to the reads of the enclosing scope
+            ReadAction.forget(anum='A1', domain='EVMAN', attr='Floor')
+        assert list(reads) == [('F1', ('Speed',))]
+        ReadAction.forget(anum='A1', domain='EVMAN')
+        assert not reads
@@ -0,0 +1,59 @@
+""" test_relvar_index.py -- Test that indexed lookups match TclRAL restrictions """
+
+import pytest
+from collections import namedtuple
+from xuml_populate.db import Database, Relation, Relvar, Transaction
+import pyral.relvar
+from pyral.rtypes import Attribute
+from xuml_populate.relvar_index import RelvarIndex
+from xuml_populate.storage import PyRALStorage
+
+db = "index_test"
+Class_i = namedtuple('Class_i', 'Name Cnum Domain')
+
+def restricted(R):
+    return Relation.restrict(db=db, relation='Class', restriction=R).body or []
+
+def test_write_through():
+
+    Database.open_session(db)
+    pyral.relvar.Relvar.create_relvar(db=PyRALStorage.session(db), name='Class', attrs=[Attribute('Name', 'string'), Attribute('Cnum', 'string'),
+                                                     Attribute('Domain', 'string')], ids={1: ['Name', 'Domain']})
+    Relvar.insert(db=db, relvar='Class', tuples=[Class_i(Name='Shaft', Cnum='C1', Domain='Elevator Management')])
+    assert RelvarIndex.lookup('Class', db=db, Domain='Elevator Management') == restricted("Domain:<Elevator Management>")
+
+    # Changes are seen only once their transaction executes
+    Transaction.open(db=db, name="tr")
+    Relvar.insert(db=db, tr="tr", relvar='Class', tuples=[
+        Class_i(Name='Cabin', Cnum='C2', Domain='Elevator Management'),
+        Class_i(Name='Door', Cnum='C3', Domain='Elevator Management'),
+    ])
+    assert not RelvarIndex.exists('Class', db=db, Name='Cabin')
+    Transaction.execute(db=db, name="tr")
+    assert RelvarIndex.lookup('Class', db=db, Name='Cabin') == restricted("Name:<Cabin>")
+
+    Relvar.updateone(db=db, relvar_name='Class', id={'Name': 'Door', 'Domain': 'Elevator Management'},
+                     update={'Cnum': 'C9'})
+    assert RelvarIndex.lookup('Class', db=db, Cnum='C9') == restricted("Cnum:<C9>")
+    Relvar.deleteone(db=db, relvar_name='Class', tid={'Name': 'Shaft', 'Domain': 'Elevator Management'})
+    assert RelvarIndex.lookup('Class', db=db, Domain='Elevator Management') == restricted("Domain:<Elevator Management>")
+    Database.close_session(db)
+
+def test_failed_transaction():
+
+    Database.open_session(db)
+    pyral.relvar.Relvar.create_relvar(db=PyRALStorage.session(db), name='Class', attrs=[
+        Attribute('Name', 'string'), Attribute('Cnum', 'string'), Attribute('Domain', 'string')],
+        ids={1: ['Name', 'Domain']})
+    Relvar.insert(db=db, relvar='Class', tuples=[Class_i(Name='Shaft', Cnum='C1', Domain='Elevator Management')])
+    assert RelvarIndex.exists('Class', db=db, Name='Shaft')
+
+    # A duplicate identifier fails the transaction, so none of its changes are indexed
+    Transaction.open(db=db, name="tr")
+    Relvar.insert(db=db, tr="tr", relvar='Class', tuples=[Class_i(Name='Cabin', Cnum='C2', Domain='Elevator Management')])
+    Relvar.insert(db=db, tr="tr", relvar='Class', tuples=[Class_i(Name='Shaft', Cnum='C3', Domain='Elevator Management')])
+    with pytest.raises(Exception):
+        Transaction.execute(db=db, name="tr")
+    assert not RelvarIndex.exists('Class', db=db, Name='Cabin')
+    assert RelvarIndex.lookup('Class', db=db, Domain='Elevator Management') == restricted("Domain:<Elevator Management>")
+    Database.close_session(db)
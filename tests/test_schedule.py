@@ -0,0 +1,14 @@
+""" test_schedule.py -- Test the assignment of actions to execution waves """
+
+from xuml_populate.schedule import Schedule
+
+def test_waves():
+    actions = ['ACTN1', 'ACTN2', 'ACTN3', 'ACTN10']
+    dependencies = [('ACTN1', 'ACTN3'), ('ACTN2', 'ACTN3'), ('ACTN3', 'ACTN10'), ('ACTN1', 'ACTN10')]
+    assert Schedule.waves(actions=actions, dependencies=dependencies) == [['ACTN1', 'ACTN2'], ['ACTN3'], ['ACTN10']]
+
+def test_iterator_cycle():
+    # An iterator and the method call in its body feed each other, so they run in the same wave
+    dependencies = [('ACTN1', 'ACTN2'), ('ACTN2', 'ACTN3'), ('ACTN3', 'ACTN2'), ('ACTN2', 'ACTN4')]
+    assert (Schedule.waves(actions=['ACTN1', 'ACTN2', 'ACTN3', 'ACTN4'], dependencies=dependencies) ==
+            [['ACTN1'], ['ACTN2', 'ACTN3'], ['ACTN4']])
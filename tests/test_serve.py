@@ -0,0 +1,46 @@
+""" test_serve.py -- Test the populate server's change detection and requests """
+
+import threading
+from pyral.database import Database
+from benchmarks.generate import ModelGenerator, ModelSpec
+from xuml_populate.serve import PopulateServer, request
+
+def test_scan(tmp_path):
+
+    server = PopulateServer(system_path=tmp_path, socket_path=tmp_path / "s.sock", options={})
+    (tmp_path / "cabin.xsm").write_text("state model")
+    (tmp_path / ".cabin.xsm.swp").write_text("editor swap file")
+    files = server.scan()
+    assert list(files) == [tmp_path / "cabin.xsm"]
+    (tmp_path / "cabin.xsm").write_text("edited state model")
+    assert server.scan() != files
+
+def test_requests(tmp_path):
+
+    # Without a system.yaml file, every population fails, yet the server keeps answering
+    server = PopulateServer(system_path=tmp_path / "missing", socket_path=tmp_path / "s.sock", options={})
+    (tmp_path / "missing").mkdir()
+    serving = threading.Thread(target=server.serve)
+    serving.start()
+    while not (tmp_path / "s.sock").exists():  # Once the first population is over
+        server.stopped.wait(0.05)
+    reply = request(tmp_path / "s.sock", "status")
+    assert not reply['ok'] and reply['error'].startswith("FileNotFoundError")
+    assert request(tmp_path / "s.sock", "compile")['error'] == "Unknown command: [compile]"
+    assert request(tmp_path / "s.sock", "stop")['ok']
+    serving.join(timeout=10)
+    assert not serving.is_alive()
+
+def test_sessions_closed(tmp_path, monkeypatch):
+
+    system_path = tmp_path / "bench"
+    ModelGenerator(ModelSpec(classes=3, associations=2, lifecycles=1)).write(system_path)
+    monkeypatch.chdir(tmp_path)
+    sessions = set(Database.sessions)
+    server = PopulateServer(system_path=system_path, socket_path=tmp_path / "s.sock", options={'parse_actions': True})
+    assert server.refresh()['ok']
+    for model_file in system_path.rglob('*.xsm'):
+        model_file.write_text(model_file.read_text() + "\n")
+    assert server.refresh()['ok']
+    # Each population releases its metamodel once saved, however many the server makes
+    assert set(Database.sessions) == sessions
@@ -0,0 +1,31 @@
+""" test_startup.py -- Test that popsystem checks its arguments without importing the populators """
+
+import sys
+import subprocess
+from benchmarks.startup import parse_importtime
+from xuml_populate.config import storage_backends, export_formats
+from xuml_populate.storage import backends
+from xuml_populate.export import Export
+
+def test_lazy_imports():
+
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import xuml_populate.__main__"],
+                          capture_output=True, text=True, check=True)
+    modules = {i.module for i in parse_importtime(proc.stderr)}
+    assert 'xuml_populate.__main__' in modules
+    assert not modules & {'pyral', 'yaml', 'xuml_metamodel', 'scrall', 'xuml_populate.system'}
+
+def test_command_line_names():
+
+    assert storage_backends == tuple(backends)
+    assert export_formats == Export.formats
+
+def test_parse_importtime():
+
+    stderr = ("import time: self [us] | cumulative | imported package\n"
+              "import time:       120 |        120 |   pyral.rtypes\n"
+              "import time:       300 |        420 | pyral.relvar\n"
+              "Some other message\n")
+    imports = parse_importtime(stderr)
+    assert [(i.module, i.self_us, i.cumulative_us, i.depth) for i in imports] == [
+        ('pyral.rtypes', 120, 120, 1), ('pyral.relvar', 300, 420, 0)]
@@ -0,0 +1,140 @@
+""" test_storage.py -- Test that the SQLite storage backend answers as TclRAL does """
+
+import pytest
+from collections import namedtuple
+from pyral.rtypes import Attribute
+from pyral.relvar import Relvar
+from pyral.database import Database
+from pyral.transaction import Transaction
+from pyral.exceptions import PyRALException
+from benchmarks.generate import ModelGenerator, ModelSpec
+from xuml_populate.storage import Restriction, Storage, PyRALStorage, SQLiteStorage
+from xuml_populate.context import PopulationContext
+from xuml_populate.system import System
+
+Class_i = namedtuple('Class_i', 'Name Cnum Domain')
+
+def test_restriction():
+
+    t = {'Name': 'Floor Service', 'Cnum': '12', 'Domain': 'Elevator Management'}
+    assert Restriction("Name:<Floor Service>, Domain:<Elevator Management>").predicate(t)
+    assert Restriction("Name:<Floor*> AND NOT (Cnum > 20 OR Domain:Transport)").predicate(t)
+    assert not Restriction("Cnum >= 13").predicate(t)
+    assert Restriction("Name:<Floor Service>, Cnum:12").exact == {'Name': 'Floor Service', 'Cnum': '12'}
+    assert Restriction("Name:<Floor*>").exact is None
+
+def test_sqlite_storage(tmp_path):
+
+    # The empty metamodel is read from a TclRAL database
+    PyRALStorage.open_session("tclral_test")
+    Relvar.create_relvar(db="tclral_test", name='Class', attrs=[
+        Attribute('Name', 'string'), Attribute('Cnum', 'string'), Attribute('Domain', 'string')],
+                         ids={1: ['Name', 'Domain'], 2: ['Cnum', 'Domain']})
+    PyRALStorage.save(db="tclral_test", fname=str(tmp_path / "empty.ral"))
+    PyRALStorage.close_session("tclral_test")
+
+    db = "sqlite_test"
+    SQLiteStorage.open_session(db)
+    SQLiteStorage.load(db=db, fname=str(tmp_path / "empty.ral"))
+    SQLiteStorage.open_transaction(db=db, name="tr")
+    SQLiteStorage.insert(db=db, tr="tr", relvar='Class', tuples=[
+        Class_i(Name='Cabin', Cnum='C1', Domain='EVMAN'), Class_i(Name='Door', Cnum='C2', Domain='EVMAN')])
+    assert not SQLiteStorage.restrict(db=db, relation='Class').body  # Nothing until the transaction executes
+    SQLiteStorage.execute_transaction(db=db, name="tr")
+    SQLiteStorage.updateone(db=db, relvar_name='Class', id={'Name': 'Door', 'Domain': 'EVMAN'}, update={'Cnum': 'C3'})
+    assert SQLiteStorage.restrict(db=db, relation='Class', restriction="Cnum:<C3>").body[0]['Name'] == 'Door'
+
+    # The second identifier is enforced along with the first
+    SQLiteStorage.open_transaction(db=db, name="tr")
+    SQLiteStorage.insert(db=db, tr="tr", relvar='Class', tuples=[Class_i(Name='Shaft', Cnum='C1', Domain='EVMAN')])
+    with pytest.raises(PyRALException):
+        SQLiteStorage.execute_transaction(db=db, name="tr")
+
+    # A saved database loads again
+    SQLiteStorage.save(db=db, fname=str(tmp_path / "mmdb.db"))
+    SQLiteStorage.close_session(db)
+    SQLiteStorage.open_session(db)
+    SQLiteStorage.load(db=db, fname=str(tmp_path / "mmdb.db"))
+    SQLiteStorage.restrict(db=db, relation='Class', restriction="Domain:<EVMAN>", svar_name="classes")
+    SQLiteStorage.project(db=db, attributes=('Name',), relation="classes")
+    assert [t['Name'] for t in SQLiteStorage.semijoin(db=db, rname2='Class').body] == ['Cabin', 'Door']
+    SQLiteStorage.close_session(db)
+
+def test_backends_in_one_process(tmp_path, monkeypatch):
+
+    system_path = tmp_path / "bench"
+    ModelGenerator(ModelSpec(classes=4, associations=4, lifecycles=1)).write(system_path)
+    for storage in ('sqlite', 'pyral'):
+        (tmp_path / storage).mkdir()
+        monkeypatch.chdir(tmp_path / storage)
+        System(name="bench", system_path=system_path, parse_actions=True, storage=storage)
+    # Each population answers the database calls from its own backend, whichever came first
+    assert (tmp_path / "sqlite" / "mmdb_bench.txt").read_text() == (tmp_path / "pyral" / "mmdb_bench.txt").read_text()
+    with pytest.raises(TypeError):
+        Storage()
+
+def test_pyral_left_alone(tmp_path, monkeypatch):
+
+    system_path = tmp_path / "bench"
+    ModelGenerator(ModelSpec(classes=3, associations=2, lifecycles=1)).write(system_path)
+    pyral_insert = Relvar.__dict__['insert']
+    monkeypatch.chdir(tmp_path)
+    System(name="bench", system_path=system_path, parse_actions=True, storage='sqlite')
+    assert Relvar.__dict__['insert'] is pyral_insert
+    # The backend was put into use only in the System's own context
+    with PopulationContext().active():
+        assert Storage.backend is PyRALStorage
+
+def test_sessions_per_context():
+
+    a, b = PopulationContext('a'), PopulationContext('b')
+    for context, name in ((a, 'Shaft'), (b, 'Cabin')):
+        with context.active():
+            PyRALStorage.open_session("mmdb")
+            Relvar.create_relvar(db=PyRALStorage.session("mmdb"), name='Class', attrs=[
+                Attribute('Name', 'string'), Attribute('Cnum', 'string'), Attribute('Domain', 'string')],
+                ids={1: ['Name', 'Domain']})
+            PyRALStorage.insert(db="mmdb", relvar='Class', tuples=[Class_i(Name=name, Cnum='C1', Domain='EVMAN')])
+    sessions = set()
+    for context, name in ((a, 'Shaft'), (b, 'Cabin')):
+        with context.active():
+            assert [t['Name'] for t in PyRALStorage.restrict(db="mmdb", relation='Class').body] == [name]
+            sessions.add(PyRALStorage.session("mmdb"))
+            PyRALStorage.close_session("mmdb")
+    assert len(sessions) == 2 and not sessions & set(Database.sessions)  # PyRAL's own registry, still a dict
+
+def test_insert_runs(monkeypatch):
+
+    db = "run_test"
+    PyRALStorage.open_session(db)
+    session = PyRALStorage.session(db)
+    Relvar.create_relvar(db=session, name='Class', attrs=[
+        Attribute('Name', 'string'), Attribute('Cnum', 'string'), Attribute('Domain', 'string')],
+        ids={1: ['Name', 'Domain']})
+    Relvar.create_relvar(db=session, name='Attribute', attrs=[
+        Attribute('Name', 'string'), Attribute('Class', 'string'), Attribute('Domain', 'string')],
+        ids={1: ['Name', 'Class', 'Domain']})
+    PyRALStorage.open_transaction(db=db, name="tr")
+    PyRALStorage.insert(db=db, tr="tr", relvar='Class', tuples=[Class_i(Name='Shaft', Cnum='C1', Domain='EVMAN')])
+    PyRALStorage.insert(db=db, tr="tr", relvar='Class', tuples=[{'Name': 'Cabin', 'Cnum': 'C2', 'Domain': 'EVMAN'}])
+    PyRALStorage.insert(db=db, tr="tr", relvar='Attribute', tuples=[
+        {'Name': 'Floor', 'Class': 'Shaft', 'Domain': 'EVMAN'}])
+    PyRALStorage.insert(db=db, tr="tr", relvar='Class', tuples=[Class_i(Name='Door', Cnum='C3', Domain='EVMAN')])
+    PyRALStorage.deleteone(db=db, relvar_name='Class', tid={'Name': 'Door', 'Domain': 'EVMAN'}, tr="tr")
+    PyRALStorage.insert(db=db, tr="tr", relvar='Class', tuples=[Class_i(Name='Floor', Cnum='C4', Domain='EVMAN')])
+    assert not Transaction.pending[session]["tr"]  # Nothing is added to PyRAL's transaction until it executes
+
+    statements = []
+    execute = Transaction.execute
+    def record(db: str, name: str):
+        statements.extend(s.split()[:3] for s in Transaction.pending[db][name])
+        execute(db=db, name=name)
+    monkeypatch.setattr(Transaction, 'execute', record)
+    PyRALStorage.execute_transaction(db=db, name="tr")
+
+    # Only the two inserts in a row into Class are gathered, every statement keeps its place
+    assert statements == [['relvar', 'insert', 'Class'], ['relvar', 'insert', 'Attribute'],
+                          ['relvar', 'insert', 'Class'], ['relvar', 'deleteone', 'Class'],
+                          ['relvar', 'insert', 'Class']]
+    assert [t['Name'] for t in PyRALStorage.restrict(db=db, relation='Class').body] == ['Shaft', 'Cabin', 'Floor']
+    PyRALStorage.close_session(db)